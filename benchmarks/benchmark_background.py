@@ -0,0 +1,88 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+.. py:currentmodule:: benchmarks.benchmark_background
+   :synopsis: Benchmark of the background estimation.
+
+.. moduleauthor:: Hendrix Demers <hendrix.demers@mail.mcgill.ca>
+
+Benchmark of the background estimation of a batch of spectra, one spectrum at a time and by chunks of spectra.
+
+Run with::
+
+    python -m benchmarks.benchmark_background
+"""
+
+###############################################################################
+# GUI for the x-ray spectrum analyzer project
+# Copyright (C) 2017  Hendrix Demers
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+###############################################################################
+
+# Standard library modules.
+import timeit
+
+# Third party modules.
+import numpy as np
+
+# Local modules.
+
+# Project modules.
+from xrayspectrumanalyzergui.analysis.background import compute_background, compute_backgrounds, \
+    BackgroundParameters, METHODS
+from xrayspectrumanalyzergui.model.spectrum_data import SpectrumData
+
+# Globals and constants variables.
+NUMBER_CHANNELS = 4096
+NUMBER_SPECTRA = 2048
+NUMBER_SPECTRA_BATCH = 50000
+
+
+def create_counts(number_spectra, number_channels=NUMBER_CHANNELS):
+    energies_eV = 5.0 * np.arange(number_channels)
+    model = 2000.0 * np.exp(-energies_eV / 4000.0) + 20.0
+    for energy_eV in [1740.0, 5415.0, 6400.0, 7478.0]:
+        model += 1.0e4 * np.exp(-0.5 * ((energies_eV - energy_eV) / 55.0) ** 2)
+
+    counts = np.random.RandomState(0).poisson(model, (number_spectra, number_channels)).astype(np.uint16)
+    return energies_eV, counts
+
+
+def run_benchmark():
+    energies_eV, counts = create_counts(NUMBER_SPECTRA)
+    spectra = [SpectrumData(spectrum_counts, 0.0, 5.0) for spectrum_counts in counts]
+
+    print("{:d} spectra of {:d} channels, time extrapolated to {:d} spectra".format(NUMBER_SPECTRA, NUMBER_CHANNELS,
+                                                                                    NUMBER_SPECTRA_BATCH))
+    print("{:>12s} {:>16s} {:>16s}".format("Method", "One by one (s)", "Chunks (s)"))
+    for method in METHODS:
+        parameters = BackgroundParameters(method)
+
+        start_time_s = timeit.default_timer()
+        for spectrum in spectra:
+            compute_background(spectrum, parameters)
+        single_time_s = timeit.default_timer() - start_time_s
+
+        start_time_s = timeit.default_timer()
+        compute_backgrounds(counts, energies_eV, parameters)
+        chunk_time_s = timeit.default_timer() - start_time_s
+
+        scale = NUMBER_SPECTRA_BATCH / NUMBER_SPECTRA
+        print("{:>12s} {:16.1f} {:16.1f}".format(method, single_time_s * scale, chunk_time_s * scale))
+
+
+if __name__ == '__main__':  # pragma: no cover
+    run_benchmark()
@@ -0,0 +1,162 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+.. py:currentmodule:: benchmarks.benchmark_element_maps
+   :synopsis: Benchmark of the element maps of a spectrum image.
+
+.. moduleauthor:: Hendrix Demers <hendrix.demers@mail.mcgill.ca>
+
+Benchmark of the element maps of a spectrum image.
+
+The maps of 20 ROIs of a 1 GB Ripple spectrum image are built in one pass over blocks of rows, with a pool of
+processes, compared with one pass over the cube for each ROI. The raw file is evicted from the page cache before each
+pass, as for a cube larger than the memory, where available (Linux).
+
+Run with::
+
+    python -m benchmarks.benchmark_element_maps
+"""
+
+###############################################################################
+# GUI for the x-ray spectrum analyzer project
+# Copyright (C) 2017  Hendrix Demers
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+###############################################################################
+
+# Standard library modules.
+import os.path
+import tempfile
+import shutil
+import timeit
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+# Third party modules.
+import numpy as np
+
+# Local modules.
+
+# Project modules.
+from xrayspectrumanalyzergui.file_format.spectrum_image import write_rpl, read_spectrum_image
+from xrayspectrumanalyzergui.analysis.element_maps import build_element_maps
+from xrayspectrumanalyzergui.model.spectrum_image import CHUNK_SIZE_BYTES
+
+# Globals and constants variables.
+NUMBER_ROWS = 512
+NUMBER_COLUMNS = 512
+NUMBER_CHANNELS = 2048
+GAIN_eV = 10.0
+NUMBER_ROIS = 20
+
+
+def write_file(file_path, folder):
+    """
+    Fill a memory-mapped cube by rows, as a microscope does, to bound the memory of the benchmark.
+    """
+    random = np.random.default_rng(0)
+    shape = (NUMBER_ROWS, NUMBER_COLUMNS, NUMBER_CHANNELS)
+    data = np.memmap(os.path.join(folder, "source.dat"), dtype=np.uint16, mode="w+", shape=shape)
+    for row in range(NUMBER_ROWS):
+        data[row] = random.poisson(1.0, shape[1:])
+    data.flush()
+
+    write_rpl(file_path, data, 0.0, GAIN_eV)
+    del data
+    os.remove(os.path.join(folder, "source.dat"))
+    if hasattr(os, "sync"):
+        os.sync()
+
+
+def create_rois():
+    centres_eV = np.linspace(1000.0, 19000.0, NUMBER_ROIS)
+    return [("ROI {:d}".format(index), centre_eV - 100.0, centre_eV + 100.0, 50.0)
+            for index, centre_eV in enumerate(centres_eV)]
+
+
+def evict_file(file_path):
+    """
+    Drop the pages of a file from the page cache, so the next pass reads it from the disk, the file must not be
+    mapped.
+    """
+    if not hasattr(os, "posix_fadvise"):
+        return
+
+    file_descriptor = os.open(file_path, os.O_RDONLY)
+    try:
+        os.posix_fadvise(file_descriptor, 0, 0, os.POSIX_FADV_DONTNEED)
+    finally:
+        os.close(file_descriptor)
+
+
+def build_maps_by_roi(file_path, raw_file_path, rois):
+    """
+    Sum the channels of each ROI in a separate pass over the cube, without background.
+    """
+    maps = None
+    for index, (_name, energy_min_eV, energy_max_eV, _background_width_eV) in enumerate(rois):
+        evict_file(raw_file_path)
+        spectrum_image = read_spectrum_image(file_path)
+        if maps is None:
+            maps = np.zeros((len(rois),) + spectrum_image.shape[:2])
+
+        channel_min = int(round(energy_min_eV / GAIN_eV))
+        channel_max = int(round(energy_max_eV / GAIN_eV))
+        for row, chunk in spectrum_image.iterate_chunks():
+            maps[index, row:row + chunk.shape[0]] = chunk[:, :, channel_min:channel_max].sum(axis=2)
+        del spectrum_image, chunk
+    return maps
+
+
+def run_benchmark():
+    folder = tempfile.mkdtemp()
+    try:
+        file_path = os.path.join(folder, "map.rpl")
+        write_file(file_path, folder)
+        raw_file_path = os.path.join(folder, "map.raw")
+        file_size_MB = os.path.getsize(raw_file_path) / 1.0e6
+        rois = create_rois()
+
+        evict_file(raw_file_path)
+        start_time_s = timeit.default_timer()
+        maps = build_element_maps(read_spectrum_image(file_path), rois)
+        single_pass_time_s = timeit.default_timer() - start_time_s
+
+        number_workers = multiprocessing.cpu_count()
+        with ProcessPoolExecutor(max_workers=number_workers) as executor:
+            # Start the workers before the timing.
+            executor.submit(int).result()
+
+            evict_file(raw_file_path)
+            start_time_s = timeit.default_timer()
+            pool_maps = build_element_maps(read_spectrum_image(file_path), rois, executor)
+            pool_time_s = timeit.default_timer() - start_time_s
+
+        start_time_s = timeit.default_timer()
+        build_maps_by_roi(file_path, raw_file_path, rois)
+        by_roi_time_s = timeit.default_timer() - start_time_s
+
+        print("{:d} x {:d} x {:d} cube, {:.0f} MB, {:d} ROIs".format(NUMBER_ROWS, NUMBER_COLUMNS, NUMBER_CHANNELS,
+                                                                     file_size_MB, NUMBER_ROIS))
+        print("One pass, this process: {:.2f} s".format(single_pass_time_s))
+        print("One pass, {:d} processes: {:.2f} s".format(number_workers, pool_time_s))
+        print("One pass per ROI, chunks of {:.0f} MB: {:.2f} s".format(CHUNK_SIZE_BYTES / 1.0e6, by_roi_time_s))
+        print("Same maps: {}".format(bool(np.allclose(maps, pool_maps))))
+    finally:
+        shutil.rmtree(folder)
+
+
+if __name__ == '__main__':  # pragma: no cover
+    run_benchmark()
@@ -0,0 +1,123 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+.. py:currentmodule:: benchmarks.benchmark_event_list
+   :synopsis: Benchmark of the event-list histogramming.
+
+.. moduleauthor:: Hendrix Demers <hendrix.demers@mail.mcgill.ca>
+
+Benchmark of the event-list histogramming.
+
+An event-list file is written, indexed once, then re-sliced by time windows and re-binned, compared with a gate of
+the whole file for each window.
+
+Run with::
+
+    python -m benchmarks.benchmark_event_list
+"""
+
+###############################################################################
+# GUI for the x-ray spectrum analyzer project
+# Copyright (C) 2017  Hendrix Demers
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+###############################################################################
+
+# Standard library modules.
+import os.path
+import tempfile
+import shutil
+import timeit
+
+# Third party modules.
+import numpy as np
+
+# Local modules.
+
+# Project modules.
+from xrayspectrumanalyzergui.file_format.event_list import EventList, HEADER, HEADER_SIZE, MAGIC, VERSION, \
+    EVENT_DTYPE, CHUNK_SIZE
+
+# Globals and constants variables.
+NUMBER_EVENTS = 50 * 1000 * 1000
+NUMBER_CHANNELS = 4096
+DURATION_s = 600.0
+TICK_s = 1.0e-7
+NUMBER_WINDOWS = 20
+
+
+def gate_file(event_list, start_s, end_s):
+    start_tick = int(event_list.events[0]["time"]) + int(np.ceil(start_s / event_list.tick_s))
+    end_tick = int(event_list.events[0]["time"]) + int(np.ceil(end_s / event_list.tick_s))
+    counts = np.zeros(event_list.number_channels + 1, dtype=np.int64)
+    for times, channels in event_list.iterate_chunks():
+        channels = np.minimum(channels[(times >= start_tick) & (times < end_tick)], event_list.number_channels)
+        counts += np.bincount(channels, minlength=counts.size)
+    return counts[:event_list.number_channels]
+
+
+def write_file(file_path):
+    """
+    Write the events in chunks, as a detector does, to bound the memory of the benchmark.
+    """
+    random = np.random.default_rng(0)
+    ticks_per_event = DURATION_s / TICK_s / NUMBER_EVENTS
+    with open(file_path, "wb") as event_file:
+        header = HEADER.pack(MAGIC, VERSION, 0, NUMBER_CHANNELS, TICK_s, 0.0, 5.0)
+        event_file.write(header.ljust(HEADER_SIZE, b"\0"))
+
+        for start in range(0, NUMBER_EVENTS, CHUNK_SIZE):
+            number_events = min(CHUNK_SIZE, NUMBER_EVENTS - start)
+            events = np.empty(number_events, dtype=EVENT_DTYPE)
+            events["time"] = (start + np.arange(number_events)) * ticks_per_event
+            events["channel"] = random.integers(0, NUMBER_CHANNELS, number_events)
+            events.tofile(event_file)
+
+
+def run_benchmark():
+    folder = tempfile.mkdtemp()
+    try:
+        file_path = os.path.join(folder, "events.evt")
+        write_file(file_path)
+        file_size_MB = os.path.getsize(file_path) / 1.0e6
+
+        event_list = EventList(file_path)
+        start_time_s = timeit.default_timer()
+        event_list.build_index()
+        index_time_s = timeit.default_timer() - start_time_s
+
+        windows = np.random.default_rng(1).uniform(0.0, DURATION_s, (NUMBER_WINDOWS, 2))
+        windows.sort(axis=1)
+        start_time_s = timeit.default_timer()
+        for start_s, end_s in windows:
+            event_list.get_spectrum(start_s, end_s, rebin=2)
+        slice_time_s = (timeit.default_timer() - start_time_s) / NUMBER_WINDOWS
+
+        start_time_s = timeit.default_timer()
+        gate_file(event_list, windows[0][0], windows[0][1])
+        gate_time_s = timeit.default_timer() - start_time_s
+
+        print("{:d} events, {:.0f} MB".format(NUMBER_EVENTS, file_size_MB))
+        print("Index (once): {:.2f} s".format(index_time_s))
+        print("Time window from the index: {:.4f} s".format(slice_time_s))
+        print("Time window by gating the file: {:.2f} s".format(gate_time_s))
+        print("Events indexed: {:d}".format(int(event_list.get_time_profile()[1].sum())))
+        del event_list
+    finally:
+        shutil.rmtree(folder)
+
+
+if __name__ == '__main__':  # pragma: no cover
+    run_benchmark()
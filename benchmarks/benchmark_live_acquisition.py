@@ -0,0 +1,107 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+.. py:currentmodule:: benchmarks.benchmark_live_acquisition
+   :synopsis: Benchmark of the live acquisition.
+
+.. moduleauthor:: Hendrix Demers <hendrix.demers@mail.mcgill.ca>
+
+Benchmark of the live acquisition.
+
+The simulator streams events at a high count rate to the reader thread while the GUI thread refreshes the canvas at
+the capped frame rate, with a full draw per frame and with the live blitting path. The time of the GUI thread per
+frame is what must stay well below the frame period.
+
+Run with, on a computer without display::
+
+    QT_QPA_PLATFORM=offscreen python -m benchmarks.benchmark_live_acquisition
+"""
+
+###############################################################################
+# GUI for the x-ray spectrum analyzer project
+# Copyright (C) 2017  Hendrix Demers
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+###############################################################################
+
+# Standard library modules.
+import time
+import timeit
+
+# Third party modules.
+from qtpy.QtWidgets import QApplication
+
+# Local modules.
+
+# Project modules.
+from xrayspectrumanalyzergui.acquisition.accumulator import SpectrumAccumulator
+from xrayspectrumanalyzergui.acquisition.simulator import AcquisitionSimulator
+from xrayspectrumanalyzergui.acquisition.stream import EventStreamReader
+from xrayspectrumanalyzergui.gui.live_acquisition import MAXIMUM_FRAME_RATE_Hz
+from xrayspectrumanalyzergui.gui.spectrum_widget import SpectrumCanvas
+
+# Globals and constants variables.
+COUNT_RATE_cps = 1.0e6
+DURATION_s = 3.0
+
+
+def run_frames(application, canvas, accumulator, update):
+    frame_period_s = 1.0 / MAXIMUM_FRAME_RATE_Hz
+    gui_time_s = 0.0
+    number_frames = 0
+    end_time_s = time.monotonic() + DURATION_s
+    while time.monotonic() < end_time_s:
+        start_time_s = timeit.default_timer()
+        update(accumulator.get_spectrum())
+        application.processEvents()
+        elapsed_time_s = timeit.default_timer() - start_time_s
+        gui_time_s += elapsed_time_s
+        number_frames += 1
+        time.sleep(max(0.0, frame_period_s - elapsed_time_s))
+    return gui_time_s / number_frames
+
+
+def run_benchmark():
+    application = QApplication.instance() or QApplication([])
+    canvas = SpectrumCanvas(width=8, height=5)
+    canvas.show()
+    application.processEvents()
+
+    simulator = AcquisitionSimulator(("localhost", 0), count_rate_cps=COUNT_RATE_cps)
+    simulator.start()
+    accumulator = SpectrumAccumulator()
+    reader = EventStreamReader(simulator.address, accumulator)
+    reader.start()
+
+    def update_full(spectrum):
+        canvas.update_figure(spectrum)
+        canvas.draw()
+
+    full_time_s = run_frames(application, canvas, accumulator, update_full)
+    live_time_s = run_frames(application, canvas, accumulator, canvas.update_live_figure)
+
+    reader.stop()
+    reader.join()
+    simulator.stop()
+    simulator.join()
+
+    print("{:.0f} counts/s requested, {:d} events received".format(COUNT_RATE_cps, accumulator.number_events))
+    print("Frame period: {:.1f} ms".format(1000.0 / MAXIMUM_FRAME_RATE_Hz))
+    print("GUI thread per frame, full draw: {:.1f} ms".format(full_time_s * 1000.0))
+    print("GUI thread per frame, live blitting: {:.1f} ms".format(live_time_s * 1000.0))
+
+
+if __name__ == '__main__':  # pragma: no cover
+    run_benchmark()
@@ -0,0 +1,116 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+.. py:currentmodule:: benchmarks.benchmark_msa
+   :synopsis: Benchmark of the msa reader.
+
+.. moduleauthor:: Hendrix Demers <hendrix.demers@mail.mcgill.ca>
+
+Benchmark of the msa reader against a naive line by line reader.
+
+Run with::
+
+    python -m benchmarks.benchmark_msa
+"""
+
+###############################################################################
+# GUI for the x-ray spectrum analyzer project
+# Copyright (C) 2017  Hendrix Demers
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+###############################################################################
+
+# Standard library modules.
+import os.path
+import tempfile
+import shutil
+import timeit
+
+# Third party modules.
+import numpy as np
+
+# Local modules.
+
+# Project modules.
+from xrayspectrumanalyzergui.file_format.msa import read_msa
+
+# Globals and constants variables.
+NUMBER_CHANNELS = [4096, 8192, 16384]
+NUMBER_REPEATS = 20
+
+
+def create_msa_file(file_path, number_channels):
+    random_state = np.random.RandomState(0)
+    counts = random_state.poisson(1000.0, number_channels)
+    energies_eV = 10.0 * np.arange(number_channels)
+
+    with open(file_path, "w") as msa_file:
+        msa_file.write("#FORMAT      : EMSA/MAS Spectral Data File\n")
+        msa_file.write("#VERSION     : 1.0\n")
+        msa_file.write("#TITLE       : Benchmark spectrum\n")
+        msa_file.write("#NPOINTS     : {:d}\n".format(number_channels))
+        msa_file.write("#NCOLUMNS    : 1\n")
+        msa_file.write("#XUNITS      : eV\n")
+        msa_file.write("#YUNITS      : counts\n")
+        msa_file.write("#DATATYPE    : XY\n")
+        msa_file.write("#XPERCHAN    : 10.0\n")
+        msa_file.write("#OFFSET      : 0.0\n")
+        msa_file.write("#SPECTRUM    : Spectral Data Starts Here\n")
+        for energy_eV, count in zip(energies_eV, counts):
+            msa_file.write("{:.4f}, {:d},\n".format(energy_eV, count))
+        msa_file.write("#ENDOFDATA   : End Of Data and Checksum\n")
+
+
+def read_msa_naive(file_path):
+    header = {}
+    energies_eV = []
+    counts = []
+    is_data = False
+    with open(file_path, "r") as msa_file:
+        for line in msa_file:
+            if line.startswith("#SPECTRUM"):
+                is_data = True
+            elif line.startswith("#ENDOFDATA"):
+                break
+            elif is_data:
+                items = [item for item in line.split(",") if item.strip()]
+                energies_eV.append(float(items[0]))
+                counts.append(float(items[1]))
+            elif line.startswith("#"):
+                keyword, value = line[1:].split(":", 1)
+                header[keyword.strip()] = value.strip()
+
+    return header, np.array(energies_eV), np.array(counts)
+
+
+def run_benchmark():
+    folder = tempfile.mkdtemp()
+    try:
+        print("{:>10s} {:>12s} {:>12s} {:>8s}".format("Channels", "Naive (ms)", "NumPy (ms)", "Speedup"))
+        for number_channels in NUMBER_CHANNELS:
+            file_path = os.path.join(folder, "spectrum_{:d}.msa".format(number_channels))
+            create_msa_file(file_path, number_channels)
+
+            naive_time_s = min(timeit.repeat(lambda: read_msa_naive(file_path), number=1, repeat=NUMBER_REPEATS))
+            numpy_time_s = min(timeit.repeat(lambda: read_msa(file_path), number=1, repeat=NUMBER_REPEATS))
+
+            print("{:10d} {:12.3f} {:12.3f} {:8.1f}".format(number_channels, naive_time_s * 1.0e3,
+                                                            numpy_time_s * 1.0e3, naive_time_s / numpy_time_s))
+    finally:
+        shutil.rmtree(folder)
+
+
+if __name__ == '__main__':  # pragma: no cover
+    run_benchmark()
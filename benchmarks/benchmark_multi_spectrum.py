@@ -0,0 +1,118 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+.. py:currentmodule:: benchmarks.benchmark_multi_spectrum
+   :synopsis: Benchmark of the overlay of the spectra of a line scan.
+
+.. moduleauthor:: Hendrix Demers <hendrix.demers@mail.mcgill.ca>
+
+Benchmark of the overlay of the spectra of a line scan.
+
+The spectra of a line scan across an interface are shown together with the line collection of the canvas, from the
+selection to the drawn figure, then with a new normalisation, which reuses the pyramids of the spectra. The time to
+draw the same spectra with one line per spectrum at full resolution is given for comparison.
+
+Run with, on a computer without display::
+
+    QT_QPA_PLATFORM=offscreen python -m benchmarks.benchmark_multi_spectrum
+"""
+
+###############################################################################
+# GUI for the x-ray spectrum analyzer project
+# Copyright (C) 2017  Hendrix Demers
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+###############################################################################
+
+# Standard library modules.
+import timeit
+
+# Third party modules.
+import numpy as np
+from qtpy.QtWidgets import QApplication
+
+# Local modules.
+
+# Project modules.
+from xrayspectrumanalyzergui.model.spectrum_data import SpectrumData
+from xrayspectrumanalyzergui.gui.multi_spectrum import MultiSpectrum, NORMALISATION_NONE, NORMALISATION_TOTAL_COUNTS
+from xrayspectrumanalyzergui.gui.spectrum_widget import SpectrumCanvas
+
+# Globals and constants variables.
+NUMBER_SPECTRA = 200
+NUMBER_CHANNELS = 4096
+GAIN_eV = 5.0
+
+
+def create_line_scan(number_spectra=NUMBER_SPECTRA, number_channels=NUMBER_CHANNELS):
+    """
+    Return the spectra of a line scan from iron to nickel, with a live time changing along the scan.
+    """
+    random_state = np.random.RandomState(0)
+    energies_eV = GAIN_eV * np.arange(number_channels)
+    background = 200.0 * np.exp(-energies_eV / 3000.0) + 5.0
+
+    spectra = []
+    for index in range(number_spectra):
+        fraction = index / max(number_spectra - 1, 1)
+        model = background.copy()
+        model += 2000.0 * (1.0 - fraction) * np.exp(-0.5 * ((energies_eV - 6400.0) / 60.0) ** 2)
+        model += 2000.0 * fraction * np.exp(-0.5 * ((energies_eV - 7480.0) / 65.0) ** 2)
+        live_time_s = 1.0 + fraction
+        counts = random_state.poisson(model * live_time_s)
+        spectra.append(SpectrumData(counts, 0.0, GAIN_eV, {"LIVETIME": "{:g}".format(live_time_s)}))
+    return spectra
+
+
+def run_benchmark():
+    application = QApplication.instance() or QApplication([])
+    canvas = SpectrumCanvas(width=8, height=5)
+    canvas.show()
+    application.processEvents()
+
+    spectra = create_line_scan()
+
+    start_time_s = timeit.default_timer()
+    multi_spectrum = MultiSpectrum(spectra)
+    canvas.update_multi_spectrum_figure(multi_spectrum, NORMALISATION_NONE)
+    canvas.draw()
+    overlay_time_s = timeit.default_timer() - start_time_s
+    number_points = sum(len(segment) for segment in canvas.multi_spectrum_lines.get_segments())
+
+    start_time_s = timeit.default_timer()
+    canvas.update_multi_spectrum_figure(multi_spectrum, NORMALISATION_TOTAL_COUNTS)
+    canvas.draw()
+    normalisation_time_s = timeit.default_timer() - start_time_s
+
+    canvas.update_figure(spectra[0])
+    start_time_s = timeit.default_timer()
+    lines = [canvas.axes.plot(spectrum.energies_eV, spectrum.counts)[0] for spectrum in spectra]
+    canvas.draw()
+    lines_time_s = timeit.default_timer() - start_time_s
+    for line in lines:
+        line.remove()
+
+    canvas.close()
+
+    print("{:d} spectra of {:d} channels".format(len(spectra), NUMBER_CHANNELS))
+    print("Overlay, from the selection to the drawn figure: {:.3f} s, {:d} points".format(overlay_time_s,
+                                                                                          number_points))
+    print("Overlay, new normalisation: {:.3f} s".format(normalisation_time_s))
+    print("One line per spectrum at full resolution: {:.3f} s, {:d} points".format(lines_time_s,
+                                                                                   len(spectra) * NUMBER_CHANNELS))
+
+
+if __name__ == '__main__':  # pragma: no cover
+    run_benchmark()
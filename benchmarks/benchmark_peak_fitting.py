@@ -0,0 +1,92 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+.. py:currentmodule:: benchmarks.benchmark_peak_fitting
+   :synopsis: Benchmark of the batched peak fitting.
+
+.. moduleauthor:: Hendrix Demers <hendrix.demers@mail.mcgill.ca>
+
+Benchmark of the peak fitting of a batch of spectra, one spectrum at a time, as one stack and by chunks in a process
+pool.
+
+Run with::
+
+    python -m benchmarks.benchmark_peak_fitting
+"""
+
+###############################################################################
+# GUI for the x-ray spectrum analyzer project
+# Copyright (C) 2017  Hendrix Demers
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+###############################################################################
+
+# Standard library modules.
+import timeit
+import multiprocessing
+
+# Third party modules.
+import numpy as np
+
+# Local modules.
+
+# Project modules.
+from xrayspectrumanalyzergui.analysis.peak_fitting import PeakFitter, fit_parallel, gaussian
+from xrayspectrumanalyzergui.analysis.peak_identification import get_fwhm_eV, FWHM_TO_SIGMA
+from xrayspectrumanalyzergui.analysis.xray_lines import get_database
+
+# Globals and constants variables.
+NUMBER_CHANNELS = 4096
+NUMBER_SPECTRA = 4096
+ELEMENTS = ["Si", "Cr", "Mn", "Fe", "Ni"]
+
+
+def create_counts(number_spectra, number_channels=NUMBER_CHANNELS):
+    energies_eV = 5.0 * np.arange(number_channels)
+    model = 2000.0 * np.exp(-energies_eV / 4000.0) + 20.0
+    for element in ELEMENTS:
+        for line in get_database().get_lines(element, "K"):
+            sigma_eV = get_fwhm_eV(line["energy_eV"]) * FWHM_TO_SIGMA
+            model += 2.0e4 * line["weight"] * 5.0 * gaussian(energies_eV, line["energy_eV"], sigma_eV)
+
+    counts = np.random.RandomState(0).poisson(model, (number_spectra, number_channels)).astype(np.uint16)
+    return energies_eV, counts
+
+
+def run_benchmark():
+    energies_eV, counts = create_counts(NUMBER_SPECTRA)
+    fitter = PeakFitter(ELEMENTS)
+
+    print("{:d} spectra of {:d} channels, {:d} cores".format(NUMBER_SPECTRA, NUMBER_CHANNELS,
+                                                             multiprocessing.cpu_count()))
+
+    number_single_spectra = 256
+    start_time_s = timeit.default_timer()
+    for spectrum_counts in counts[:number_single_spectra]:
+        fitter.fit(spectrum_counts, energies_eV)
+    single_time_s = (timeit.default_timer() - start_time_s) * NUMBER_SPECTRA / number_single_spectra
+    print("{:>24s} {:8.2f} s".format("One by one", single_time_s))
+
+    start_time_s = timeit.default_timer()
+    fitter.fit(counts, energies_eV)
+    print("{:>24s} {:8.2f} s".format("One stack", timeit.default_timer() - start_time_s))
+
+    start_time_s = timeit.default_timer()
+    fit_parallel(fitter, counts, energies_eV)
+    print("{:>24s} {:8.2f} s".format("Chunks in process pool", timeit.default_timer() - start_time_s))
+
+
+if __name__ == '__main__':  # pragma: no cover
+    run_benchmark()
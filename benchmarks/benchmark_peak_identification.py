@@ -0,0 +1,88 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+.. py:currentmodule:: benchmarks.benchmark_peak_identification
+   :synopsis: Benchmark of the automatic peak identification.
+
+.. moduleauthor:: Hendrix Demers <hendrix.demers@mail.mcgill.ca>
+
+Benchmark of the automatic peak identification of synthetic spectra.
+
+Run with::
+
+    python -m benchmarks.benchmark_peak_identification
+"""
+
+###############################################################################
+# GUI for the x-ray spectrum analyzer project
+# Copyright (C) 2017  Hendrix Demers
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+###############################################################################
+
+# Standard library modules.
+import timeit
+
+# Third party modules.
+import numpy as np
+
+# Local modules.
+
+# Project modules.
+from xrayspectrumanalyzergui.analysis.peak_identification import detect_peaks, identify_spectrum, get_fwhm_eV, \
+    FWHM_TO_SIGMA
+from xrayspectrumanalyzergui.analysis.xray_lines import get_database
+from xrayspectrumanalyzergui.model.spectrum_data import SpectrumData
+
+# Globals and constants variables.
+NUMBER_CHANNELS = [2048, 4096, 8192]
+ELEMENTS = ["Si", "Cr", "Mn", "Fe", "Ni", "Mo", "Pb"]
+NUMBER_REPEATS = 20
+
+
+def create_spectrum(number_channels):
+    gain_eV = 20480.0 / number_channels
+    energies_eV = gain_eV * np.arange(number_channels)
+    model = 2000.0 * np.exp(-energies_eV / 4000.0) + 20.0
+    for element in ELEMENTS:
+        for line in get_database().get_lines(element):
+            sigma_eV = get_fwhm_eV(line["energy_eV"]) * FWHM_TO_SIGMA
+            model += 20000.0 * line["weight"] * gain_eV / (np.sqrt(2.0 * np.pi) * sigma_eV) * \
+                np.exp(-0.5 * ((energies_eV - line["energy_eV"]) / sigma_eV) ** 2)
+
+    counts = np.random.RandomState(0).poisson(model)
+    return SpectrumData(counts, 0.0, gain_eV)
+
+
+def run_benchmark():
+    print("Elements: {}".format(" ".join(ELEMENTS)))
+    print("{:>10s} {:>10s} {:>12s} {:>14s}  {}".format("Channels", "Peaks", "Detect (ms)", "Identify (ms)",
+                                                       "Identified"))
+    for number_channels in NUMBER_CHANNELS:
+        spectrum = create_spectrum(number_channels)
+
+        detect_time_s = min(timeit.repeat(lambda: detect_peaks(spectrum), number=10, repeat=NUMBER_REPEATS)) / 10
+        identify_time_s = min(timeit.repeat(lambda: identify_spectrum(spectrum), number=10,
+                                            repeat=NUMBER_REPEATS)) / 10
+
+        elements = identify_spectrum(spectrum)
+        identified = " ".join("{} {}".format(element["symbol"], element["family"]) for element in elements)
+        print("{:10d} {:10d} {:12.3f} {:14.3f}  {}".format(number_channels, detect_peaks(spectrum).size,
+                                                           detect_time_s * 1.0e3, identify_time_s * 1.0e3,
+                                                           identified))
+
+
+if __name__ == '__main__':  # pragma: no cover
+    run_benchmark()
@@ -0,0 +1,96 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+.. py:currentmodule:: benchmarks.benchmark_roi_integration
+   :synopsis: Benchmark of the ROI integration.
+
+.. moduleauthor:: Hendrix Demers <hendrix.demers@mail.mcgill.ca>
+
+Benchmark of the integration of ROIs in a project of spectra, by slicing and summing each spectrum and from the
+cumulative sums, as done for each motion event while a ROI edge is dragged.
+
+Run with::
+
+    python -m benchmarks.benchmark_roi_integration
+"""
+
+###############################################################################
+# GUI for the x-ray spectrum analyzer project
+# Copyright (C) 2017  Hendrix Demers
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+###############################################################################
+
+# Standard library modules.
+import timeit
+
+# Third party modules.
+import numpy as np
+
+# Local modules.
+
+# Project modules.
+from xrayspectrumanalyzergui.analysis.roi_integration import PrefixSums, integrate_rois
+
+# Globals and constants variables.
+NUMBER_CHANNELS = 4096
+NUMBER_SPECTRA = 10000
+NUMBER_ROIS = 8
+NUMBER_REPEATS = 10
+
+
+def integrate_by_slices(counts, offset_eV, gain_eV, rois):
+    net = np.empty((counts.shape[0], len(rois)))
+    for spectrum_index, spectrum_counts in enumerate(counts):
+        for roi_index, (_name, energy_min_eV, energy_max_eV, background_width_eV) in enumerate(rois):
+            start = int(np.ceil((energy_min_eV - offset_eV) / gain_eV))
+            end = int(np.floor((energy_max_eV - offset_eV) / gain_eV)) + 1
+            number_background = int(round(background_width_eV / gain_eV))
+            left_counts = np.sum(spectrum_counts[start - number_background:start], dtype=np.float64)
+            right_counts = np.sum(spectrum_counts[end:end + number_background], dtype=np.float64)
+            background = 0.5 * (end - start) * (left_counts + right_counts) / number_background
+            net[spectrum_index, roi_index] = np.sum(spectrum_counts[start:end], dtype=np.float64) - background
+    return net
+
+
+def run_benchmark():
+    counts = np.random.RandomState(0).poisson(50.0, (NUMBER_SPECTRA, NUMBER_CHANNELS)).astype(np.uint16)
+    rois = [("ROI {:d}".format(index), 1000.0 + 2000.0 * index, 1200.0 + 2000.0 * index, 100.0)
+            for index in range(NUMBER_ROIS)]
+    offsets_eV = np.zeros(NUMBER_SPECTRA)
+    gains_eV = np.full(NUMBER_SPECTRA, 5.0)
+
+    start_time_s = timeit.default_timer()
+    prefix_sums = PrefixSums()
+    prefix_sums.append_block(counts, np.full(NUMBER_SPECTRA, NUMBER_CHANNELS))
+    prefix_time_s = timeit.default_timer() - start_time_s
+
+    start_time_s = timeit.default_timer()
+    integrate_by_slices(counts, 0.0, 5.0, rois)
+    slice_time_s = timeit.default_timer() - start_time_s
+
+    start_time_s = timeit.default_timer()
+    for _repeat in range(NUMBER_REPEATS):
+        integrate_rois(prefix_sums, offsets_eV, gains_eV, rois)
+    prefix_integration_time_s = (timeit.default_timer() - start_time_s) / NUMBER_REPEATS
+
+    print("{:d} spectra of {:d} channels, {:d} ROIs".format(NUMBER_SPECTRA, NUMBER_CHANNELS, NUMBER_ROIS))
+    print("Cumulative sums (once): {:.3f} s".format(prefix_time_s))
+    print("Integration by slices: {:.3f} s".format(slice_time_s))
+    print("Integration from the cumulative sums: {:.4f} s".format(prefix_integration_time_s))
+
+
+if __name__ == '__main__':  # pragma: no cover
+    run_benchmark()
@@ -0,0 +1,113 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+.. py:currentmodule:: benchmarks.benchmark_spectrum_image
+   :synopsis: Benchmark of the memory-mapped spectrum images.
+
+.. moduleauthor:: Hendrix Demers <hendrix.demers@mail.mcgill.ca>
+
+Benchmark of the memory-mapped spectrum images.
+
+A Ripple spectrum image is written, opened with its sum spectrum and total-count image streamed in chunks of rows,
+then pixel and region spectra are extracted. The peak of the NumPy allocations is compared with the size of the data.
+
+Run with::
+
+    python -m benchmarks.benchmark_spectrum_image
+"""
+
+###############################################################################
+# GUI for the x-ray spectrum analyzer project
+# Copyright (C) 2017  Hendrix Demers
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+###############################################################################
+
+# Standard library modules.
+import os.path
+import tempfile
+import shutil
+import timeit
+import tracemalloc
+
+# Third party modules.
+import numpy as np
+
+# Local modules.
+
+# Project modules.
+from xrayspectrumanalyzergui.file_format.spectrum_image import write_rpl, load_spectrum_image
+
+# Globals and constants variables.
+NUMBER_ROWS = 256
+NUMBER_COLUMNS = 256
+NUMBER_CHANNELS = 2048
+NUMBER_PIXELS = 100
+REGION_SIZE = 32
+
+
+def write_file(file_path, folder):
+    """
+    Fill a memory-mapped cube by rows, as a microscope does, to bound the memory of the benchmark.
+    """
+    random = np.random.default_rng(0)
+    shape = (NUMBER_ROWS, NUMBER_COLUMNS, NUMBER_CHANNELS)
+    data = np.memmap(os.path.join(folder, "source.dat"), dtype=np.uint16, mode="w+", shape=shape)
+    for row in range(NUMBER_ROWS):
+        data[row] = random.poisson(1.0, shape[1:])
+    data.flush()
+
+    write_rpl(file_path, data, 0.0, 10.0)
+    del data
+
+
+def run_benchmark():
+    folder = tempfile.mkdtemp()
+    try:
+        file_path = os.path.join(folder, "map.rpl")
+        write_file(file_path, folder)
+        file_size_MB = os.path.getsize(os.path.join(folder, "map.raw")) / 1.0e6
+
+        tracemalloc.start()
+        start_time_s = timeit.default_timer()
+        spectrum_image = load_spectrum_image(file_path)
+        load_time_s = timeit.default_timer() - start_time_s
+        _size, peak_size = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        pixels = np.random.default_rng(1).integers(0, [NUMBER_ROWS, NUMBER_COLUMNS], (NUMBER_PIXELS, 2))
+        start_time_s = timeit.default_timer()
+        for row, column in pixels:
+            spectrum_image.get_spectrum(int(row), int(column))
+        pixel_time_s = (timeit.default_timer() - start_time_s) / NUMBER_PIXELS
+
+        start_time_s = timeit.default_timer()
+        spectrum_image.get_region_spectrum(0, REGION_SIZE, 0, REGION_SIZE)
+        region_time_s = timeit.default_timer() - start_time_s
+
+        print("{:d} x {:d} x {:d} cube, {:.0f} MB".format(NUMBER_ROWS, NUMBER_COLUMNS, NUMBER_CHANNELS,
+                                                          file_size_MB))
+        print("Open with sum spectrum and total image: {:.2f} s, peak allocations {:.0f} MB".format(
+            load_time_s, peak_size / 1.0e6))
+        print("Pixel spectrum: {:.6f} s".format(pixel_time_s))
+        print("Region spectrum of {:d} x {:d} pixels: {:.4f} s".format(REGION_SIZE, REGION_SIZE, region_time_s))
+        print("Total counts: {:d}".format(int(spectrum_image.get_sum_spectrum().counts.sum())))
+        spectrum_image.close()
+    finally:
+        shutil.rmtree(folder)
+
+
+if __name__ == '__main__':  # pragma: no cover
+    run_benchmark()
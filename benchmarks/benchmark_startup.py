@@ -0,0 +1,172 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+.. py:currentmodule:: benchmarks.benchmark_startup
+   :synopsis: Cold-start benchmark of the application.
+
+.. moduleauthor:: Hendrix Demers <hendrix.demers@mail.mcgill.ca>
+
+Cold-start benchmark of the application.
+
+Each measure runs in a new headless process with the ``offscreen`` Qt platform:
+
+* import time breakdown by package of :py:mod:`xrayspectrumanalyzergui.gui.main_window` with
+  ``python -X importtime``;
+* time from the process start to the first paint of the main window and to the creation of the spectrum widget.
+
+Run with::
+
+    python -m benchmarks.benchmark_startup
+"""
+
+###############################################################################
+# GUI for the x-ray spectrum analyzer project
+# Copyright (C) 2017  Hendrix Demers
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+###############################################################################
+
+# Standard library modules.
+import os
+import sys
+import json
+import time
+import subprocess
+import collections
+
+# Third party modules.
+
+# Local modules.
+
+# Project modules.
+
+# Globals and constants variables.
+NUMBER_REPEATS = 5
+NUMBER_TOP_IMPORTS = 10
+START_TIME_VARIABLE = "STARTUP_BENCHMARK_START_TIME"
+
+
+def _get_environment():
+    environment = dict(os.environ)
+    environment["QT_QPA_PLATFORM"] = "offscreen"
+    project_path = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    environment["PYTHONPATH"] = os.pathsep.join([project_path, environment.get("PYTHONPATH", "")])
+    return environment
+
+
+def measure_import_times():
+    """
+    Return the import time in seconds of each top level package imported by the main window module.
+    """
+    command = [sys.executable, "-X", "importtime", "-c", "import xrayspectrumanalyzergui.gui.main_window"]
+    output = subprocess.run(command, env=_get_environment(), stderr=subprocess.PIPE, universal_newlines=True,
+                            check=True).stderr
+
+    import_times_s = collections.Counter()
+    for line in output.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        self_us, _cumulative_us, name = line[len("import time:"):].split("|")
+        if not self_us.strip().isdigit():
+            continue
+        package = name.strip().split(".")[0]
+        import_times_s[package] += int(self_us) * 1.0e-6
+
+    return import_times_s
+
+
+def measure_startup_times():
+    """
+    Return the time in seconds from the process start to the first paint and to the spectrum widget.
+    """
+    environment = _get_environment()
+    environment[START_TIME_VARIABLE] = repr(time.time())
+    command = [sys.executable, "-m", "benchmarks.benchmark_startup", "--child"]
+    output = subprocess.run(command, env=environment, stdout=subprocess.PIPE, universal_newlines=True,
+                            check=True).stdout
+
+    return json.loads(output.splitlines()[-1])
+
+
+def run_child():
+    start_time = float(os.environ[START_TIME_VARIABLE])
+
+    from qtpy.QtWidgets import QApplication
+    from qtpy.QtCore import QObject, QEvent, QTimer, QStandardPaths
+
+    times_s = {"import_qt": time.time() - start_time}
+
+    application = QApplication(sys.argv)
+    # Keep the autosave session and the recovery of crashed sessions out of the user data folder.
+    QStandardPaths.setTestModeEnabled(True)
+
+    from xrayspectrumanalyzergui.gui.main_window import MainWindow
+
+    times_s["import_main_window"] = time.time() - start_time
+
+    class FirstPaintFilter(QObject):
+        def eventFilter(self, watched, event):
+            if event.type() == QEvent.Paint and "first_paint" not in times_s:
+                times_s["first_paint"] = time.time() - start_time
+            return False
+
+    paint_filter = FirstPaintFilter()
+    application.installEventFilter(paint_filter)
+
+    window = MainWindow()
+
+    def check_done():
+        if window.main_widget is not None and "spectrum_widget" not in times_s:
+            times_s["spectrum_widget"] = time.time() - start_time
+        if "first_paint" in times_s and "spectrum_widget" in times_s:
+            application.quit()
+
+    timer = QTimer()
+    timer.timeout.connect(check_done)
+    timer.start(1)
+    QTimer.singleShot(10000, application.quit)
+
+    application.exec_()
+    window.close()
+
+    print(json.dumps(times_s))
+
+
+def run_benchmark():
+    import_times_s = measure_import_times()
+    print("Import time of xrayspectrumanalyzergui.gui.main_window by top level package")
+    for package, import_time_s in import_times_s.most_common(NUMBER_TOP_IMPORTS):
+        print("{:>30s} {:10.1f} ms".format(package, import_time_s * 1.0e3))
+    print("{:>30s} {:10.1f} ms".format("total", sum(import_times_s.values()) * 1.0e3))
+    print()
+
+    all_times_s = collections.defaultdict(list)
+    for _repeat in range(NUMBER_REPEATS):
+        for name, value_s in measure_startup_times().items():
+            all_times_s[name].append(value_s)
+
+    print("Time from the process start ({:d} runs)".format(NUMBER_REPEATS))
+    print("{:>30s} {:>10s} {:>10s}".format("", "min (ms)", "max (ms)"))
+    for name in ["import_qt", "import_main_window", "first_paint", "spectrum_widget"]:
+        values_s = all_times_s[name]
+        if values_s:
+            print("{:>30s} {:10.1f} {:10.1f}".format(name, min(values_s) * 1.0e3, max(values_s) * 1.0e3))
+
+
+if __name__ == '__main__':  # pragma: no cover
+    if "--child" in sys.argv:
+        run_child()
+    else:
+        run_benchmark()
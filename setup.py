@@ -11,10 +11,16 @@ with open('HISTORY.rst') as history_file:
 
 requirements = [
     "matplotlib",
+    "numpy",
     "qtpy",
     "six",
 ]
 
+extra_requirements = {
+    "parquet": ["pyarrow"],
+    "hdf5": ["h5py"],
+}
+
 test_requirements = [
     "nose",
     "coverage",
@@ -34,7 +40,15 @@ setup(
     package_dir={'xrayspectrumanalyzergui':
                  'xrayspectrumanalyzergui'},
     include_package_data=True,
+    package_data={'xrayspectrumanalyzergui.gui': ['*.rcc'], 'xrayspectrumanalyzergui.analysis': ['*.csv']},
+    python_requires=">=3.5",
     install_requires=requirements,
+    extras_require=extra_requirements,
+    entry_points={
+        'console_scripts': [
+            'xrayspectrumanalyzer-batch = xrayspectrumanalyzergui.batch:main',
+        ],
+    },
     license="GNU General Public License v3",
     zip_safe=False,
     keywords='xrayspectrumanalyzergui',
@@ -43,12 +57,8 @@ setup(
         'Intended Audience :: Developers',
         'License :: OSI Approved :: GNU General Public License v3 (GPLv3)',
         'Natural Language :: English',
-        "Programming Language :: Python :: 2",
-        'Programming Language :: Python :: 2.6',
-        'Programming Language :: Python :: 2.7',
         'Programming Language :: Python :: 3',
-        'Programming Language :: Python :: 3.3',
-        'Programming Language :: Python :: 3.4',
+        'Programming Language :: Python :: 3 :: Only',
         'Programming Language :: Python :: 3.5',
     ],
     test_suite='tests',
@@ -0,0 +1,152 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+.. py:currentmodule:: xrayspectrumanalyzergui.tests.acquisition.test_accumulator
+   :synopsis: Tests for the module :py:mod:`xrayspectrumanalyzergui.acquisition.accumulator`
+
+.. moduleauthor:: Hendrix Demers <hendrix.demers@mail.mcgill.ca>
+
+Tests for the module :py:mod:`xrayspectrumanalyzergui.acquisition.accumulator`.
+"""
+
+###############################################################################
+# GUI for the x-ray spectrum analyzer project
+# Copyright (C) 2017  Hendrix Demers
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+###############################################################################
+
+# Standard library modules.
+import unittest
+
+# Third party modules.
+import numpy as np
+
+# Local modules.
+
+# Project modules.
+from xrayspectrumanalyzergui.acquisition.accumulator import SpectrumAccumulator
+
+# Globals and constants variables.
+
+
+class FakeClock(object):
+    def __init__(self):
+        self.time_s = 100.0
+
+    def __call__(self):
+        return self.time_s
+
+
+class TestAccumulator(unittest.TestCase):
+    """
+    TestCase class for the module `xrayspectrumanalyzergui.acquisition.accumulator`.
+    """
+
+    def setUp(self):
+        """
+        Setup method.
+        """
+
+        unittest.TestCase.setUp(self)
+
+        self.clock = FakeClock()
+        self.accumulator = SpectrumAccumulator(8, 0.0, 10.0, number_slices=4, slice_duration_s=1.0,
+                                               clock=self.clock)
+
+    def tearDown(self):
+        """
+        Teardown method.
+        """
+
+        unittest.TestCase.tearDown(self)
+
+    def testSkeleton(self):
+        """
+        First test to check if the testcase is working with the testing framework.
+        """
+
+        # self.fail("Test if the testcase is working.")
+
+    def test_add_events(self):
+        """
+        Test add_events histogram the channels and drop the channels outside the spectrum.
+        """
+
+        self.accumulator.add_events(np.array([0, 1, 1, 7, 8, 100], dtype=np.uint16))
+        self.accumulator.add_events([])
+
+        counts, revision = self.accumulator.get_counts()
+        np.testing.assert_array_equal([1, 2, 0, 0, 0, 0, 0, 1], counts)
+        self.assertEqual(2, revision)
+        self.assertEqual(4, self.accumulator.number_events)
+
+        spectrum = self.accumulator.get_spectrum()
+        self.assertEqual(8, spectrum.number_channels)
+        self.assertEqual(10.0, spectrum.gain_eV)
+        np.testing.assert_array_equal(counts, spectrum.counts)
+
+        # self.fail("Test if the testcase is working.")
+
+    def test_ring_buffer(self):
+        """
+        Test the recent counts and count rate only cover the time slices of the ring buffer.
+        """
+
+        self.accumulator.add_events([0] * 10)
+        self.clock.time_s += 1.0
+        self.accumulator.add_events([1] * 20)
+        self.clock.time_s += 1.0
+        self.accumulator.add_events([2] * 30)
+
+        np.testing.assert_array_equal([10, 20, 30, 0, 0, 0, 0, 0], self.accumulator.get_recent_counts())
+        self.assertAlmostEqual(15.0, self.accumulator.get_count_rate())
+
+        self.clock.time_s += 2.5
+        np.testing.assert_array_equal([0, 20, 30, 0, 0, 0, 0, 0], self.accumulator.get_recent_counts())
+        self.assertAlmostEqual(50.0 / 3.0, self.accumulator.get_count_rate())
+
+        self.clock.time_s += 10.0
+        np.testing.assert_array_equal(np.zeros(8), self.accumulator.get_recent_counts())
+        self.assertEqual(0.0, self.accumulator.get_count_rate())
+        np.testing.assert_array_equal([10, 20, 30, 0, 0, 0, 0, 0], self.accumulator.get_counts()[0])
+
+        # self.fail("Test if the testcase is working.")
+
+    def test_configure(self):
+        """
+        Test configure and clear reset the counts.
+        """
+
+        self.accumulator.add_events([0, 1])
+        revision = self.accumulator.revision
+        self.accumulator.configure(16, 100.0, 5.0)
+        counts, new_revision = self.accumulator.get_counts()
+        np.testing.assert_array_equal(np.zeros(16), counts)
+        self.assertGreater(new_revision, revision)
+        self.assertEqual(100.0, self.accumulator.offset_eV)
+
+        self.accumulator.add_events([15])
+        self.accumulator.clear()
+        self.assertEqual(0, self.accumulator.number_events)
+        self.assertEqual(0, self.accumulator.get_counts()[0].sum())
+
+        # self.fail("Test if the testcase is working.")
+
+
+if __name__ == '__main__':  # pragma: no cover
+    import nose
+
+    nose.runmodule()
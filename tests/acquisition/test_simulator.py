@@ -0,0 +1,106 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+.. py:currentmodule:: xrayspectrumanalyzergui.tests.acquisition.test_simulator
+   :synopsis: Tests for the module :py:mod:`xrayspectrumanalyzergui.acquisition.simulator`
+
+.. moduleauthor:: Hendrix Demers <hendrix.demers@mail.mcgill.ca>
+
+Tests for the module :py:mod:`xrayspectrumanalyzergui.acquisition.simulator`.
+"""
+
+###############################################################################
+# GUI for the x-ray spectrum analyzer project
+# Copyright (C) 2017  Hendrix Demers
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+###############################################################################
+
+# Standard library modules.
+import unittest
+
+# Third party modules.
+import numpy as np
+
+# Local modules.
+
+# Project modules.
+from xrayspectrumanalyzergui.acquisition.simulator import EventSampler, create_model_spectrum
+
+# Globals and constants variables.
+
+
+class TestSimulator(unittest.TestCase):
+    """
+    TestCase class for the module `xrayspectrumanalyzergui.acquisition.simulator`.
+    """
+
+    def setUp(self):
+        """
+        Setup method.
+        """
+
+        unittest.TestCase.setUp(self)
+
+    def tearDown(self):
+        """
+        Teardown method.
+        """
+
+        unittest.TestCase.tearDown(self)
+
+    def testSkeleton(self):
+        """
+        First test to check if the testcase is working with the testing framework.
+        """
+
+        # self.fail("Test if the testcase is working.")
+
+    def test_create_model_spectrum(self):
+        """
+        Test the model spectrum has the lines of the elements.
+        """
+
+        model = create_model_spectrum(["Fe"], number_channels=2048, gain_eV=5.0)
+
+        self.assertEqual(2048, model.size)
+        self.assertTrue(np.all(model > 0.0))
+        self.assertEqual(1280, np.argmax(model[1000:2048]) + 1000)
+
+        # self.fail("Test if the testcase is working.")
+
+    def test_event_sampler(self):
+        """
+        Test the channels sampled follow the model.
+        """
+
+        model = np.array([1.0, 0.0, 3.0, 0.0])
+        sampler = EventSampler(model, seed=0)
+
+        channels = sampler.sample(40000)
+        self.assertEqual(np.uint16, channels.dtype)
+        counts = np.bincount(channels, minlength=4)
+        self.assertEqual(0, counts[1] + counts[3])
+        self.assertAlmostEqual(0.25, counts[0] / 40000.0, delta=0.01)
+
+        self.assertEqual(0, sampler.sample_poisson(0.0).size)
+
+        # self.fail("Test if the testcase is working.")
+
+
+if __name__ == '__main__':  # pragma: no cover
+    import nose
+
+    nose.runmodule()
@@ -0,0 +1,187 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+.. py:currentmodule:: xrayspectrumanalyzergui.tests.acquisition.test_stream
+   :synopsis: Tests for the module :py:mod:`xrayspectrumanalyzergui.acquisition.stream`
+
+.. moduleauthor:: Hendrix Demers <hendrix.demers@mail.mcgill.ca>
+
+Tests for the module :py:mod:`xrayspectrumanalyzergui.acquisition.stream`.
+"""
+
+###############################################################################
+# GUI for the x-ray spectrum analyzer project
+# Copyright (C) 2017  Hendrix Demers
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+###############################################################################
+
+# Standard library modules.
+import unittest
+import os.path
+import tempfile
+import shutil
+import socket
+
+# Third party modules.
+import numpy as np
+
+# Local modules.
+
+# Project modules.
+from xrayspectrumanalyzergui.acquisition.stream import PacketDecoder, EventStreamReader, StreamFormatError, \
+    encode_calibration, encode_events, parse_address, CALIBRATION_KIND, EVENTS_KIND
+from xrayspectrumanalyzergui.acquisition.accumulator import SpectrumAccumulator
+from xrayspectrumanalyzergui.acquisition.simulator import AcquisitionSimulator
+
+# Globals and constants variables.
+
+
+class TestStream(unittest.TestCase):
+    """
+    TestCase class for the module `xrayspectrumanalyzergui.acquisition.stream`.
+    """
+
+    def setUp(self):
+        """
+        Setup method.
+        """
+
+        unittest.TestCase.setUp(self)
+
+    def tearDown(self):
+        """
+        Teardown method.
+        """
+
+        unittest.TestCase.tearDown(self)
+
+    def testSkeleton(self):
+        """
+        First test to check if the testcase is working with the testing framework.
+        """
+
+        # self.fail("Test if the testcase is working.")
+
+    def test_packet_decoder(self):
+        """
+        Test the packets split across several receives are decoded once complete.
+        """
+
+        data = encode_calibration(1024, -10.0, 5.0) + encode_events([1, 2, 65535]) + encode_events([])
+
+        decoder = PacketDecoder()
+        packets = []
+        for index in range(0, len(data), 7):
+            packets.extend(decoder.feed(data[index:index + 7]))
+
+        self.assertEqual([CALIBRATION_KIND, EVENTS_KIND, EVENTS_KIND], [kind for kind, _payload in packets])
+        np.testing.assert_array_equal([1, 2, 65535], np.frombuffer(packets[1][1], dtype="<u2"))
+        self.assertEqual(b"", packets[2][1])
+
+        self.assertRaises(StreamFormatError, PacketDecoder().feed, b"XXXX\x00\x00\x00\x00")
+
+        # self.fail("Test if the testcase is working.")
+
+    def test_parse_address(self):
+        """
+        Test parse_address for TCP and UNIX socket addresses.
+        """
+
+        self.assertEqual(("localhost", 5555), parse_address("localhost:5555"))
+        self.assertEqual(("localhost", 5555), parse_address(" 5555 "))
+        self.assertEqual(("192.168.0.2", 80), parse_address("192.168.0.2:80"))
+        self.assertEqual("/tmp/detector.sock", parse_address("/tmp/detector.sock"))
+        self.assertRaises(ValueError, parse_address, "")
+
+        # self.fail("Test if the testcase is working.")
+
+    def test_reader_tcp(self):
+        """
+        Test the reader accumulate all the events sent by the simulator over TCP.
+        """
+
+        simulator = AcquisitionSimulator(("localhost", 0), gain_eV=10.0, count_rate_cps=1.0e6,
+                                         maximum_number_events=50000, seed=0)
+        simulator.start()
+        accumulator = SpectrumAccumulator()
+
+        reader = EventStreamReader(simulator.address, accumulator)
+        reader.start()
+        reader.join(10.0)
+        simulator.stop()
+        simulator.join(5.0)
+
+        self.assertFalse(reader.is_alive())
+        self.assertIsNone(reader.error)
+        self.assertEqual(50000, accumulator.number_events)
+        self.assertEqual(10.0, accumulator.gain_eV)
+        self.assertEqual(simulator.model.size, accumulator.number_channels)
+
+        # self.fail("Test if the testcase is working.")
+
+    @unittest.skipUnless(hasattr(socket, "AF_UNIX"), "UNIX sockets not available")
+    def test_reader_unix(self):
+        """
+        Test the reader with a UNIX socket and stop.
+        """
+
+        folder = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, folder)
+        address = os.path.join(folder, "detector.sock")
+
+        simulator = AcquisitionSimulator(address, count_rate_cps=1.0e5, seed=0)
+        simulator.start()
+        accumulator = SpectrumAccumulator()
+
+        reader = EventStreamReader(address, accumulator)
+        reader.start()
+        reader.join(0.2)
+        reader.stop()
+        reader.join(5.0)
+        simulator.stop()
+        simulator.join(5.0)
+
+        self.assertFalse(reader.is_alive())
+        self.assertIsNone(reader.error)
+        self.assertGreater(accumulator.number_events, 0)
+        self.assertFalse(os.path.exists(address))
+
+        # self.fail("Test if the testcase is working.")
+
+    def test_reader_error(self):
+        """
+        Test the reader keep the error of a connection refused.
+        """
+
+        server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        server.bind(("localhost", 0))
+        address = server.getsockname()
+        server.close()
+
+        reader = EventStreamReader(address, SpectrumAccumulator())
+        reader.start()
+        reader.join(5.0)
+
+        self.assertFalse(reader.is_alive())
+        self.assertIsNotNone(reader.error)
+
+        # self.fail("Test if the testcase is working.")
+
+
+if __name__ == '__main__':  # pragma: no cover
+    import nose
+
+    nose.runmodule()
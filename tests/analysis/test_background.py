@@ -0,0 +1,232 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+.. py:currentmodule:: xrayspectrumanalyzergui.tests.analysis.test_background
+   :synopsis: Tests for the module :py:mod:`xrayspectrumanalyzergui.analysis.background`
+
+.. moduleauthor:: Hendrix Demers <hendrix.demers@mail.mcgill.ca>
+
+Tests for the module :py:mod:`xrayspectrumanalyzergui.analysis.background`.
+"""
+
+###############################################################################
+# GUI for the x-ray spectrum analyzer project
+# Copyright (C) 2017  Hendrix Demers
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+###############################################################################
+
+# Standard library modules.
+import unittest
+
+# Third party modules.
+import numpy as np
+
+# Local modules.
+
+# Project modules.
+from xrayspectrumanalyzergui.analysis.background import lls_transform, inverse_lls_transform, smooth, snip, \
+    fit_clipped, create_polynomial_basis, create_kramers_basis, compute_background, compute_backgrounds, \
+    BackgroundParameters, BackgroundCache, METHODS, METHOD_POLYNOMIAL
+from xrayspectrumanalyzergui.model.spectrum_data import SpectrumData
+
+# Globals and constants variables.
+
+
+def create_spectrum(seed=0):
+    """
+    Return a spectrum with Poisson counts of an exponential background and two peaks.
+    """
+    energies_eV = 5.0 * np.arange(4096)
+    background = 2000.0 * np.exp(-energies_eV / 4000.0) + 20.0
+    peaks = 1.0e4 * np.exp(-0.5 * ((energies_eV - 1740.0) / 30.0) ** 2) + \
+        5.0e3 * np.exp(-0.5 * ((energies_eV - 6400.0) / 55.0) ** 2)
+    counts = np.random.RandomState(seed).poisson(background + peaks)
+    return SpectrumData(counts, 0.0, 5.0), background
+
+
+class TestBackground(unittest.TestCase):
+    """
+    TestCase class for the module `xrayspectrumanalyzergui.analysis.background`.
+    """
+
+    def setUp(self):
+        """
+        Setup method.
+        """
+
+        unittest.TestCase.setUp(self)
+
+        self.spectrum, self.background = create_spectrum()
+        energies_eV = self.spectrum.energies_eV
+        self.mask = (energies_eV > 500.0) & (energies_eV < 15000.0)
+
+    def tearDown(self):
+        """
+        Teardown method.
+        """
+
+        unittest.TestCase.tearDown(self)
+
+    def testSkeleton(self):
+        """
+        First test to check if the testcase is working with the testing framework.
+        """
+
+        # self.fail("Test if the testcase is working.")
+
+    def _get_relative_errors(self, background):
+        return (background - self.background)[self.mask] / self.background[self.mask]
+
+    def test_lls_transform(self):
+        """
+        Test inverse_lls_transform is the inverse of lls_transform.
+        """
+
+        counts = np.array([0.0, 1.0, 10.0, 1.0e3, 1.0e6])
+        np.testing.assert_allclose(counts, inverse_lls_transform(lls_transform(counts)), atol=1.0e-6)
+
+        # self.fail("Test if the testcase is working.")
+
+    def test_smooth(self):
+        """
+        Test smooth on one spectrum and a stack of spectra.
+        """
+
+        np.testing.assert_allclose([1.0 / 3.0, 1.0, 2.0, 3.0, 11.0 / 3.0], smooth(np.arange(5), 3))
+        np.testing.assert_allclose(np.arange(5), smooth(np.arange(5), 1))
+        np.testing.assert_allclose(np.ones((2, 7)), smooth(np.ones((2, 7)), 5))
+
+        # self.fail("Test if the testcase is working.")
+
+    def test_snip(self):
+        """
+        Test snip remove the peaks and keep a linear background.
+        """
+
+        counts = 100.0 + np.arange(200.0)
+        np.testing.assert_allclose(counts, snip(counts, 20, use_lls=False), rtol=1.0e-12)
+
+        counts[100] += 1000.0
+        background = snip(counts, 20)
+        self.assertAlmostEqual(200.0, background[100], delta=2.0)
+
+        stack = np.stack([counts, 2.0 * counts])
+        backgrounds = snip(stack, 20, use_lls=False)
+        np.testing.assert_allclose(2.0 * backgrounds[0], backgrounds[1])
+
+        # self.fail("Test if the testcase is working.")
+
+    def test_fit_clipped(self):
+        """
+        Test fit_clipped fit the background under a peak.
+        """
+
+        x = np.linspace(-1.0, 1.0, 201)
+        counts = 1000.0 + 200.0 * x
+        counts[100] += 5000.0
+        basis = create_polynomial_basis(x, 1)
+
+        np.testing.assert_allclose(1000.0 + 200.0 * x, fit_clipped(counts, basis), rtol=1.0e-6)
+
+        # self.fail("Test if the testcase is working.")
+
+    def test_create_kramers_basis(self):
+        """
+        Test the Kramers basis is zero above the beam energy.
+        """
+
+        basis = create_kramers_basis([1000.0, 5000.0, 20000.0], beam_energy_eV=10000.0, order=2)
+        self.assertEqual((3, 3), basis.shape)
+        np.testing.assert_allclose([9.0, 0.9, 0.09], basis[0])
+        np.testing.assert_allclose(0.0, basis[2])
+
+        # self.fail("Test if the testcase is working.")
+
+    def test_compute_background(self):
+        """
+        Test the background of each method is close to the true background.
+        """
+
+        maximum_median_errors = {"snip": 0.05, "polynomial": 0.05, "kramers": 0.05}
+        for method in METHODS:
+            background = compute_background(self.spectrum, BackgroundParameters(method))
+            self.assertEqual(self.spectrum.counts.shape, background.shape)
+            relative_errors = self._get_relative_errors(background)
+            self.assertLess(abs(np.median(relative_errors)), maximum_median_errors[method], method)
+
+        self.assertEqual(0, compute_background(SpectrumData(np.zeros(0))).size)
+
+        # self.fail("Test if the testcase is working.")
+
+    def test_compute_backgrounds(self):
+        """
+        Test compute_backgrounds of a stack of spectra by chunks give the backgrounds of each spectrum.
+        """
+
+        spectra = [create_spectrum(seed)[0] for seed in range(5)]
+        counts = np.stack([spectrum.counts for spectrum in spectra])
+        energies_eV = spectra[0].energies_eV
+
+        for parameters in [BackgroundParameters(), BackgroundParameters(METHOD_POLYNOMIAL)]:
+            backgrounds = compute_backgrounds(counts, energies_eV, parameters, chunk_size=2)
+            self.assertEqual(counts.shape, backgrounds.shape)
+            for spectrum, background in zip(spectra, backgrounds):
+                np.testing.assert_allclose(compute_background(spectrum, parameters), background, rtol=1.0e-5)
+
+        # self.fail("Test if the testcase is working.")
+
+    def test_background_parameters(self):
+        """
+        Test BackgroundParameters comparison and validation.
+        """
+
+        self.assertEqual(BackgroundParameters(), BackgroundParameters())
+        self.assertEqual(hash(BackgroundParameters()), hash(BackgroundParameters()))
+        self.assertNotEqual(BackgroundParameters(), BackgroundParameters(width_eV=100.0))
+        self.assertRaises(ValueError, BackgroundParameters, "unknown")
+
+        # self.fail("Test if the testcase is working.")
+
+    def test_background_cache(self):
+        """
+        Test the cache return the same background for the same counts and parameters.
+        """
+
+        cache = BackgroundCache(maximum_size=2)
+        background = cache.get_background(self.spectrum)
+        self.assertFalse(background.flags.writeable)
+
+        same_spectrum = SpectrumData(self.spectrum.counts.copy(), 0.0, 5.0)
+        self.assertIs(background, cache.get_background(same_spectrum))
+        self.assertIsNone(same_spectrum._energies_eV)
+        energies_eV = np.arange(self.spectrum.number_channels) ** 1.1
+        non_linear_spectrum = SpectrumData.from_energies(energies_eV, self.spectrum.counts)
+        self.assertNotEqual(BackgroundCache.get_key(self.spectrum, BackgroundParameters()),
+                            BackgroundCache.get_key(non_linear_spectrum, BackgroundParameters()))
+        self.assertIsNot(background, cache.get_background(SpectrumData(self.spectrum.counts, 10.0, 5.0)))
+        self.assertIsNot(background, cache.get_background(self.spectrum, BackgroundParameters(METHOD_POLYNOMIAL)))
+        self.assertEqual(2, len(cache))
+
+        cache.clear()
+        self.assertEqual(0, len(cache))
+
+        # self.fail("Test if the testcase is working.")
+
+
+if __name__ == '__main__':  # pragma: no cover
+    import nose
+
+    nose.runmodule()
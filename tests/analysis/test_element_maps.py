@@ -0,0 +1,191 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+.. py:currentmodule:: xrayspectrumanalyzergui.tests.analysis.test_element_maps
+   :synopsis: Tests for the module :py:mod:`xrayspectrumanalyzergui.analysis.element_maps`
+
+.. moduleauthor:: Hendrix Demers <hendrix.demers@mail.mcgill.ca>
+
+Tests for the module :py:mod:`xrayspectrumanalyzergui.analysis.element_maps`.
+"""
+
+###############################################################################
+# GUI for the x-ray spectrum analyzer project
+# Copyright (C) 2017  Hendrix Demers
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+###############################################################################
+
+# Standard library modules.
+import unittest
+import os.path
+import tempfile
+import shutil
+from concurrent.futures import ThreadPoolExecutor
+
+# Third party modules.
+import numpy as np
+
+# Local modules.
+
+# Project modules.
+from xrayspectrumanalyzergui.analysis.element_maps import build_element_maps, compute_maps, get_row_blocks, \
+    group_rois, get_block_task, get_source
+from xrayspectrumanalyzergui.analysis.roi_integration import PrefixSums, integrate_rois
+from xrayspectrumanalyzergui.file_format.spectrum_image import write_rpl, read_spectrum_image
+from xrayspectrumanalyzergui.model.spectrum_image import SpectrumImage
+
+# Globals and constants variables.
+ROIS = [("Fe Ka", 500.0, 700.0, 50.0), ("Cu Ka", 1000.0, 1200.0, 0.0)]
+
+
+class TestElementMaps(unittest.TestCase):
+    """
+    TestCase class for the module `xrayspectrumanalyzergui.analysis.element_maps`.
+    """
+
+    def setUp(self):
+        """
+        Setup method.
+        """
+
+        unittest.TestCase.setUp(self)
+
+        self.folder = tempfile.mkdtemp()
+        self.file_path = os.path.join(self.folder, "map.rpl")
+        self.data = np.random.RandomState(0).poisson(5.0, (7, 5, 200)).astype(np.uint16)
+        write_rpl(self.file_path, self.data, 100.0, 10.0)
+
+    def tearDown(self):
+        """
+        Teardown method.
+        """
+
+        unittest.TestCase.tearDown(self)
+
+        shutil.rmtree(self.folder)
+
+    def testSkeleton(self):
+        """
+        First test to check if the testcase is working with the testing framework.
+        """
+
+        # self.fail("Test if the testcase is working.")
+
+    def test_get_row_blocks(self):
+        """
+        Test the blocks cover all the rows.
+        """
+
+        spectrum_image = SpectrumImage(self.data)
+
+        self.assertEqual([(0, 3), (3, 6), (6, 7)], get_row_blocks(spectrum_image, 3))
+        self.assertEqual([(0, 7)], get_row_blocks(spectrum_image))
+
+        # self.fail("Test if the testcase is working.")
+
+    def test_group_rois(self):
+        """
+        Test the overlapping ROIs are grouped with the channels of their edges.
+        """
+
+        indexes = np.array([[50, 10, 15], [55, 12, 20], [60, 14, 25], [65, 16, 30]])
+        groups = group_rois(indexes)
+
+        self.assertEqual([[1, 2], [0]], [list(rois) for rois, _edges in groups])
+        np.testing.assert_array_equal([10, 12, 14, 15, 16, 20, 25, 30], groups[0][1])
+        np.testing.assert_array_equal([50, 55, 60, 65], groups[1][1])
+
+        # self.fail("Test if the testcase is working.")
+
+    def test_compute_maps(self):
+        """
+        Test the maps are the net counts of the ROIs integrated in each pixel spectrum.
+        """
+
+        # Overlapping ROIs, a ROI partly outside the spectra and a ROI inside a channel.
+        rois = ROIS + [("Mn Ka", 600.0, 800.0, 30.0), ("C Ka", 0.0, 250.0, 100.0), ("Zn Ka", 2000.0, 2200.0, 20.0),
+                       ("Narrow", 1503.0, 1504.0, 2.0)]
+        maps = compute_maps(self.data, 100.0, 10.0, rois)
+
+        prefix_sums = PrefixSums()
+        for row in self.data.reshape(-1, 200):
+            prefix_sums.append(row)
+        integrals = integrate_rois(prefix_sums, np.full(35, 100.0), np.full(35, 10.0), rois)
+
+        self.assertEqual((6, 7, 5), maps.shape)
+        np.testing.assert_allclose(integrals.net.T.reshape(6, 7, 5), maps, atol=1.0e-9)
+        # The limits of the ROI are at the centres of the channels 90 and 110.
+        expected_map = self.data[:, :, 91:110].sum(axis=2) + 0.5 * (self.data[:, :, 90] + self.data[:, :, 110])
+        np.testing.assert_allclose(expected_map, maps[1])
+
+        # self.fail("Test if the testcase is working.")
+
+    def test_build_element_maps(self):
+        """
+        Test the maps built by blocks, in this process or by an executor, are the maps of the whole cube.
+        """
+
+        expected_maps = compute_maps(self.data, 100.0, 10.0, ROIS)
+
+        spectrum_image = read_spectrum_image(self.file_path)
+        np.testing.assert_allclose(expected_maps, build_element_maps(spectrum_image, ROIS, rows_per_block=2))
+        self.assertEqual((0, 7, 5), build_element_maps(spectrum_image, []).shape)
+
+        with ThreadPoolExecutor(2) as executor:
+            maps = build_element_maps(spectrum_image, ROIS, executor, rows_per_block=3)
+            np.testing.assert_allclose(expected_maps, maps)
+
+            maps = build_element_maps(SpectrumImage(self.data, 100.0, 10.0), ROIS, executor, rows_per_block=3)
+            np.testing.assert_allclose(expected_maps, maps)
+
+        # self.fail("Test if the testcase is working.")
+
+    def test_get_block_task(self):
+        """
+        Test the block of a spectrum image file is read by the task.
+        """
+
+        function, arguments = get_block_task(read_spectrum_image(self.file_path), 2, 4, ROIS)
+        self.assertEqual((self.file_path, None, 2, 4, ROIS), arguments)
+        np.testing.assert_allclose(compute_maps(self.data[2:4], 100.0, 10.0, ROIS), function(*arguments))
+
+        function, arguments = get_block_task(SpectrumImage(self.data, 100.0, 10.0), 2, 4, ROIS)
+        np.testing.assert_array_equal(self.data[2:4], arguments[0])
+
+        # self.fail("Test if the testcase is working.")
+
+    def test_get_source(self):
+        """
+        Test the source changes with the data file.
+        """
+
+        source = get_source(read_spectrum_image(self.file_path))
+
+        self.assertEqual(os.path.abspath(self.file_path), source["file_path"])
+        self.assertEqual([7, 5, 200], source["shape"])
+        self.assertEqual(self.data.nbytes, source["size"])
+        self.assertIsNone(get_source(SpectrumImage(self.data)))
+
+        write_rpl(self.file_path, self.data[:, :, :100], 100.0, 10.0)
+        self.assertNotEqual(source, get_source(read_spectrum_image(self.file_path)))
+
+        # self.fail("Test if the testcase is working.")
+
+
+if __name__ == '__main__':  # pragma: no cover
+    import nose
+
+    nose.runmodule()
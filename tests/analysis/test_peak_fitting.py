@@ -0,0 +1,223 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+.. py:currentmodule:: xrayspectrumanalyzergui.tests.analysis.test_peak_fitting
+   :synopsis: Tests for the module :py:mod:`xrayspectrumanalyzergui.analysis.peak_fitting`
+
+.. moduleauthor:: Hendrix Demers <hendrix.demers@mail.mcgill.ca>
+
+Tests for the module :py:mod:`xrayspectrumanalyzergui.analysis.peak_fitting`.
+"""
+
+###############################################################################
+# GUI for the x-ray spectrum analyzer project
+# Copyright (C) 2017  Hendrix Demers
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+###############################################################################
+
+# Standard library modules.
+import unittest
+import math
+from concurrent.futures import ThreadPoolExecutor
+import pickle
+
+# Third party modules.
+import numpy as np
+
+# Local modules.
+
+# Project modules.
+from xrayspectrumanalyzergui.analysis.peak_fitting import erfcx, gaussian, exponential_tail, PeakFitter, \
+    BatchFitResults, fit_parallel
+from xrayspectrumanalyzergui.analysis.peak_identification import get_fwhm_eV, FWHM_TO_SIGMA
+from xrayspectrumanalyzergui.analysis.xray_lines import get_database
+from xrayspectrumanalyzergui.model.spectrum_data import SpectrumData
+
+# Globals and constants variables.
+ELEMENTS = ["Si", "Cr", "Fe", "Ni"]
+INTENSITY = 20000.0
+
+
+def create_counts(elements=ELEMENTS, seed=0, number_channels=4096, gain_eV=5.0):
+    """
+    Return the counts of an exponential background and the K lines of the elements, the Ka1 line has `INTENSITY`
+    counts.
+    """
+    energies_eV = gain_eV * np.arange(number_channels)
+    model = 2000.0 * np.exp(-energies_eV / 4000.0) + 20.0
+    for element in elements:
+        for line in get_database().get_lines(element, "K"):
+            sigma_eV = get_fwhm_eV(line["energy_eV"]) * FWHM_TO_SIGMA
+            model += INTENSITY * line["weight"] * gain_eV * gaussian(energies_eV, line["energy_eV"], sigma_eV)
+
+    return np.random.RandomState(seed).poisson(model)
+
+
+class TestPeakFitting(unittest.TestCase):
+    """
+    TestCase class for the module `xrayspectrumanalyzergui.analysis.peak_fitting`.
+    """
+
+    def setUp(self):
+        """
+        Setup method.
+        """
+
+        unittest.TestCase.setUp(self)
+
+        self.fitter = PeakFitter(ELEMENTS)
+
+    def tearDown(self):
+        """
+        Teardown method.
+        """
+
+        unittest.TestCase.tearDown(self)
+
+    def testSkeleton(self):
+        """
+        First test to check if the testcase is working with the testing framework.
+        """
+
+        # self.fail("Test if the testcase is working.")
+
+    def test_erfcx(self):
+        """
+        Test erfcx with math.erfc.
+        """
+
+        x = np.linspace(0.0, 5.0, 21)
+        expected = [math.erfc(value) for value in x]
+        np.testing.assert_allclose(expected, erfcx(x) * np.exp(-x * x), rtol=0.0, atol=2.0e-7)
+
+        # self.fail("Test if the testcase is working.")
+
+    def test_peak_shapes(self):
+        """
+        Test the Gaussian and the tail have a unit area and the tail does not overflow.
+        """
+
+        energies_eV = np.arange(0.0, 20000.0, 1.0)
+        self.assertAlmostEqual(1.0, gaussian(energies_eV, 6000.0, 50.0).sum(), places=6)
+
+        tail = exponential_tail(energies_eV, 6000.0, 50.0, 50.0)
+        self.assertTrue(np.all(np.isfinite(tail)))
+        self.assertAlmostEqual(1.0, tail.sum(), places=4)
+        self.assertGreater(tail[5800], tail[6200])
+
+        # self.fail("Test if the testcase is working.")
+
+    def test_create_basis(self):
+        """
+        Test the basis has one component per group of lines in the energy range.
+        """
+
+        energies_eV = 5.0 * np.arange(4096)
+        labels, basis = self.fitter.create_basis(energies_eV)
+
+        self.assertIn("Fe Ka", labels)
+        self.assertIn("Fe Kb", labels)
+        self.assertIn("Fe La", labels)
+        self.assertEqual((4096, len(labels)), basis.shape)
+        np.testing.assert_allclose(1.0, basis[:, labels.index("Fe Ka")].sum(), rtol=1.0e-6)
+
+        fitter = PeakFitter(["Fe"], tail_fraction=0.2)
+        labels, tail_basis = fitter.create_basis(energies_eV)
+        np.testing.assert_allclose(1.0, tail_basis[:, labels.index("Fe Ka")].sum(), rtol=1.0e-3)
+
+        self.assertIs(self.fitter.get_basis(energies_eV)[1], self.fitter.get_basis(energies_eV.copy())[1])
+
+        # self.fail("Test if the testcase is working.")
+
+    def test_fit(self):
+        """
+        Test the net intensities of a stack of spectra.
+        """
+
+        counts = np.stack([create_counts(seed=seed) for seed in range(4)])
+        energies_eV = 5.0 * np.arange(4096)
+        results = self.fitter.fit(counts, energies_eV)
+
+        self.assertEqual(4, results.number_spectra)
+        for element in ELEMENTS:
+            ka_intensities = results.net_intensities[:, results.labels.index(element + " Ka")]
+            ka_errors = results.errors[:, results.labels.index(element + " Ka")]
+            np.testing.assert_allclose(1.5 * INTENSITY, ka_intensities, rtol=0.05)
+            self.assertTrue(np.all(ka_errors > 0.0))
+            self.assertTrue(np.all(ka_errors < 0.05 * INTENSITY))
+
+        self.assertTrue(np.all(results.reduced_chi_squares < 1.5))
+        self.assertFalse(np.any(results.is_refined))
+
+        # self.fail("Test if the testcase is working.")
+
+    def test_fit_refinement(self):
+        """
+        Test a spectrum with a calibration shift is refined.
+        """
+
+        spectrum = SpectrumData(create_counts(), 20.0, 5.0)
+        results = self.fitter.fit_spectrum(spectrum)
+
+        self.assertTrue(results.is_refined[0])
+        self.assertAlmostEqual(20.0, results.energy_shifts_eV[0], delta=2.0)
+        ka_intensity = results.net_intensities[0, results.labels.index("Fe Ka")]
+        self.assertAlmostEqual(1.5 * INTENSITY, ka_intensity, delta=0.05 * INTENSITY)
+
+        fitter = PeakFitter(ELEMENTS, refinement_threshold=None)
+        self.assertFalse(fitter.fit_spectrum(spectrum).is_refined[0])
+
+        # self.fail("Test if the testcase is working.")
+
+    def test_fit_parallel(self):
+        """
+        Test fit_parallel by chunks give the same results as one fit.
+        """
+
+        counts = np.stack([create_counts(seed=seed) for seed in range(5)])
+        energies_eV = 5.0 * np.arange(4096)
+        results = self.fitter.fit(counts, energies_eV)
+
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            parallel_results = fit_parallel(self.fitter, counts, energies_eV, executor, chunk_size=2)
+
+        self.assertEqual(results.labels, parallel_results.labels)
+        np.testing.assert_allclose(results.net_intensities, parallel_results.net_intensities)
+        np.testing.assert_allclose(results.errors, parallel_results.errors)
+
+        # The fitter is sent to the processes of a pool without its bases.
+        self.fitter.get_basis(energies_eV)
+        self.assertEqual(0, len(pickle.loads(pickle.dumps(self.fitter))._bases))
+
+        # self.fail("Test if the testcase is working.")
+
+    def test_get_rows(self):
+        """
+        Test the rows of the results for the project.
+        """
+
+        results = BatchFitResults(["Fe Ka", "Fe Kb"], np.array([[10.0, 1.0]]), np.array([[2.0, 0.5]]),
+                                  np.ones(1), np.ones(1), np.zeros(1), np.full(1, 130.0), np.zeros(1, dtype=bool))
+
+        self.assertEqual([(7, "Fe Ka", 10.0, 2.0), (7, "Fe Kb", 1.0, 0.5)], results.get_rows([7]))
+
+        # self.fail("Test if the testcase is working.")
+
+
+if __name__ == '__main__':  # pragma: no cover
+    import nose
+
+    nose.runmodule()
@@ -0,0 +1,179 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+.. py:currentmodule:: xrayspectrumanalyzergui.tests.analysis.test_peak_identification
+   :synopsis: Tests for the module :py:mod:`xrayspectrumanalyzergui.analysis.peak_identification`
+
+.. moduleauthor:: Hendrix Demers <hendrix.demers@mail.mcgill.ca>
+
+Tests for the module :py:mod:`xrayspectrumanalyzergui.analysis.peak_identification`.
+"""
+
+###############################################################################
+# GUI for the x-ray spectrum analyzer project
+# Copyright (C) 2017  Hendrix Demers
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+###############################################################################
+
+# Standard library modules.
+import unittest
+
+# Third party modules.
+import numpy as np
+
+# Local modules.
+
+# Project modules.
+from xrayspectrumanalyzergui.analysis.peak_identification import create_top_hat_kernel, top_hat_filter, \
+    detect_peaks, identify_spectrum, get_fwhm_eV, FWHM_MN_KA_eV, FWHM_TO_SIGMA
+from xrayspectrumanalyzergui.analysis.xray_lines import get_database
+from xrayspectrumanalyzergui.model.spectrum_data import SpectrumData
+
+# Globals and constants variables.
+
+
+def create_spectrum(elements, families="K", seed=0, number_channels=4096, gain_eV=5.0, intensity=20000.0):
+    """
+    Return a spectrum with Poisson counts of an exponential background and the lines of the elements.
+    """
+    energies_eV = gain_eV * np.arange(number_channels)
+    model = 2000.0 * np.exp(-energies_eV / 4000.0) + 20.0
+    for element in elements:
+        for line in get_database().get_lines(element, families):
+            sigma_eV = get_fwhm_eV(line["energy_eV"]) * FWHM_TO_SIGMA
+            model += intensity * line["weight"] * gain_eV / (np.sqrt(2.0 * np.pi) * sigma_eV) * \
+                np.exp(-0.5 * ((energies_eV - line["energy_eV"]) / sigma_eV) ** 2)
+
+    counts = np.random.RandomState(seed).poisson(model)
+    return SpectrumData(counts, 0.0, gain_eV)
+
+
+class TestPeakIdentification(unittest.TestCase):
+    """
+    TestCase class for the module `xrayspectrumanalyzergui.analysis.peak_identification`.
+    """
+
+    def setUp(self):
+        """
+        Setup method.
+        """
+
+        unittest.TestCase.setUp(self)
+
+    def tearDown(self):
+        """
+        Teardown method.
+        """
+
+        unittest.TestCase.tearDown(self)
+
+    def testSkeleton(self):
+        """
+        First test to check if the testcase is working with the testing framework.
+        """
+
+        # self.fail("Test if the testcase is working.")
+
+    def test_get_fwhm_eV(self):
+        """
+        Test get_fwhm_eV increase with the energy.
+        """
+
+        self.assertAlmostEqual(FWHM_MN_KA_eV, get_fwhm_eV(5898.75))
+        fwhms_eV = get_fwhm_eV([1000.0, 5000.0, 10000.0])
+        self.assertTrue(np.all(np.diff(fwhms_eV) > 0.0))
+
+        # self.fail("Test if the testcase is working.")
+
+    def test_top_hat_filter(self):
+        """
+        Test the top-hat filter remove a linear background.
+        """
+
+        kernel = create_top_hat_kernel(26.0)
+        self.assertAlmostEqual(0.0, kernel.sum())
+        self.assertEqual(1, kernel.size % 2)
+
+        counts = 100.0 + 2.0 * np.arange(200)
+        filtered, variance = top_hat_filter(counts, 26.0)
+
+        half_width = kernel.size // 2
+        np.testing.assert_allclose(0.0, filtered[half_width:-half_width], atol=1.0e-9)
+        self.assertTrue(np.all(variance[half_width:-half_width] > 0.0))
+
+        # self.fail("Test if the testcase is working.")
+
+    def test_detect_peaks(self):
+        """
+        Test detect_peaks find the lines of the spectrum at their energy.
+        """
+
+        spectrum = create_spectrum(["Fe"])
+        peaks = detect_peaks(spectrum)
+
+        self.assertEqual(2, peaks.size)
+        np.testing.assert_allclose([6400.0, 7058.0], peaks["energy_eV"], atol=25.0)
+        self.assertTrue(np.all(peaks["significance"] > 5.0))
+
+        background = SpectrumData(np.random.RandomState(0).poisson(np.full(4096, 1000.0)), 0.0, 5.0)
+        self.assertEqual(0, detect_peaks(background).size)
+
+        # self.fail("Test if the testcase is working.")
+
+    def test_identify_spectrum(self):
+        """
+        Test identify_spectrum find the elements of steel, without the elements of overlapping lines.
+        """
+
+        elements = ["Si", "Cr", "Mn", "Fe", "Ni"]
+        for seed in range(3):
+            identified_elements = identify_spectrum(create_spectrum(elements, seed=seed))
+
+            self.assertEqual(sorted(elements), sorted(identified_elements["symbol"]))
+            self.assertTrue(np.all(identified_elements["family"] == "K"))
+            self.assertTrue(np.all(np.diff(identified_elements["score"]) <= 0.0))
+
+        # self.fail("Test if the testcase is working.")
+
+    def test_identify_spectrum_l_lines(self):
+        """
+        Test identify_spectrum with elements identified by their L lines.
+        """
+
+        identified_elements = identify_spectrum(create_spectrum(["Ti", "Ba"], families="KLM"))
+        self.assertEqual(["Ba", "Ti"], sorted(identified_elements["symbol"]))
+        self.assertEqual("L", identified_elements[identified_elements["symbol"] == "Ba"]["family"][0])
+
+        identified_elements = identify_spectrum(create_spectrum(["Pb"], families="KLM"))
+        self.assertEqual(["Pb"], list(identified_elements["symbol"]))
+
+        # self.fail("Test if the testcase is working.")
+
+    def test_identify_spectrum_empty(self):
+        """
+        Test identify_spectrum without peak.
+        """
+
+        self.assertEqual(0, identify_spectrum(SpectrumData(np.zeros(4096), 0.0, 5.0)).size)
+        self.assertEqual(0, identify_spectrum(SpectrumData(np.zeros(3), 0.0, 5.0)).size)
+
+        # self.fail("Test if the testcase is working.")
+
+
+if __name__ == '__main__':  # pragma: no cover
+    import nose
+
+    nose.runmodule()
@@ -0,0 +1,219 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+.. py:currentmodule:: xrayspectrumanalyzergui.tests.analysis.test_roi_integration
+   :synopsis: Tests for the module :py:mod:`xrayspectrumanalyzergui.analysis.roi_integration`
+
+.. moduleauthor:: Hendrix Demers <hendrix.demers@mail.mcgill.ca>
+
+Tests for the module :py:mod:`xrayspectrumanalyzergui.analysis.roi_integration`.
+"""
+
+###############################################################################
+# GUI for the x-ray spectrum analyzer project
+# Copyright (C) 2017  Hendrix Demers
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+###############################################################################
+
+# Standard library modules.
+import unittest
+
+# Third party modules.
+import numpy as np
+
+# Local modules.
+
+# Project modules.
+from xrayspectrumanalyzergui.analysis.roi_integration import BLOCK_SIZE, PrefixSums, RoiIntegrator, integrate_rois, \
+    get_roi_limits
+from xrayspectrumanalyzergui.model.project import Project
+from xrayspectrumanalyzergui.model.spectrum_data import SpectrumData
+
+# Globals and constants variables.
+
+
+class TestRoiIntegration(unittest.TestCase):
+    """
+    TestCase class for the module `xrayspectrumanalyzergui.analysis.roi_integration`.
+    """
+
+    def setUp(self):
+        """
+        Setup method.
+        """
+
+        unittest.TestCase.setUp(self)
+
+        self.counts = np.full(100, 10, dtype=np.uint16)
+        self.counts[40:60] += 100
+
+    def tearDown(self):
+        """
+        Teardown method.
+        """
+
+        unittest.TestCase.tearDown(self)
+
+    def testSkeleton(self):
+        """
+        First test to check if the testcase is working with the testing framework.
+        """
+
+        # self.fail("Test if the testcase is working.")
+
+    def test_get_roi_limits(self):
+        """
+        Test get_roi_limits with and without background width.
+        """
+
+        energies_min_eV, energies_max_eV, background_widths_eV = get_roi_limits([("a", 1.0, 2.0),
+                                                                                 ("b", 3.0, 4.0, 5.0)])
+
+        np.testing.assert_array_equal([1.0, 3.0], energies_min_eV)
+        np.testing.assert_array_equal([2.0, 4.0], energies_max_eV)
+        np.testing.assert_array_equal([0.0, 5.0], background_widths_eV)
+
+        # self.fail("Test if the testcase is working.")
+
+    def test_prefix_sums(self):
+        """
+        Test the rows of spectra of different sizes are interpolated inside the channels.
+        """
+
+        prefix_sums = PrefixSums()
+        for index in range(100):
+            prefix_sums.append(np.ones(3))
+        prefix_sums.append(np.arange(5))
+
+        self.assertEqual(101, prefix_sums.number_spectra)
+        self.assertEqual(1, prefix_sums.number_blocks)
+        np.testing.assert_array_equal([0, 1, 2, 3], prefix_sums.get_sums(0))
+        np.testing.assert_array_equal([0, 0, 1, 3, 6, 10], prefix_sums.get_sums(100))
+
+        positions = np.tile([-1.0, 1.5, 4.5, 10.0], (101, 1))
+        cumulative = prefix_sums.get_cumulative(positions)
+        np.testing.assert_allclose([0.0, 1.5, 3.0, 3.0], cumulative[0])
+        np.testing.assert_allclose([0.0, 0.5, 8.0, 10.0], cumulative[100])
+
+        # self.fail("Test if the testcase is working.")
+
+    def test_prefix_sums_blocks(self):
+        """
+        Test the blocks of spectra are appended up to the block size and keep compact sums.
+        """
+
+        prefix_sums = PrefixSums()
+        counts = np.ones((BLOCK_SIZE - 1, 4), dtype=np.uint16)
+        prefix_sums.append_block(counts, np.full(BLOCK_SIZE - 1, 4))
+        prefix_sums.append(np.full(2, 2 ** 16 - 1, dtype=np.uint16))
+        prefix_sums.append(np.arange(6, dtype=np.uint16))
+
+        self.assertEqual(BLOCK_SIZE + 1, prefix_sums.number_spectra)
+        self.assertEqual(2, prefix_sums.number_blocks)
+        np.testing.assert_array_equal(np.concatenate((np.full(BLOCK_SIZE - 1, 4), [2, 6])),
+                                      prefix_sums.number_channels)
+        self.assertEqual(np.uint32, prefix_sums.get_sums(0).dtype)
+        np.testing.assert_array_equal([0, 1, 2, 3, 4], prefix_sums.get_sums(BLOCK_SIZE - 2))
+        np.testing.assert_array_equal([0, 2 ** 16 - 1, 2 ** 17 - 2], prefix_sums.get_sums(BLOCK_SIZE - 1))
+        np.testing.assert_array_equal([0, 0, 1, 3, 6, 10, 15], prefix_sums.get_sums(BLOCK_SIZE))
+
+        positions = np.tile([1.0, 2.0], (BLOCK_SIZE + 1, 1))
+        cumulative = prefix_sums.get_cumulative(positions)
+        np.testing.assert_allclose([1.0, 2.0], cumulative[0])
+        np.testing.assert_allclose([2 ** 16 - 1, 2 ** 17 - 2], cumulative[BLOCK_SIZE - 1])
+        np.testing.assert_allclose([0.0, 1.0], cumulative[BLOCK_SIZE])
+
+        prefix_sums.clear()
+        self.assertEqual(0, prefix_sums.number_spectra)
+        self.assertEqual(0, prefix_sums.number_blocks)
+
+        # self.fail("Test if the testcase is working.")
+
+    def test_integrate_rois(self):
+        """
+        Test the gross, background and net counts of whole and partial channels.
+        """
+
+        prefix_sums = PrefixSums()
+        prefix_sums.append(self.counts)
+        prefix_sums.append(self.counts)
+
+        rois = [("peak", 395.0, 595.0, 100.0), ("no background", 395.0, 595.0), ("half channels", 400.0, 590.0, 0.0),
+                ("outside", -1000.0, 1.0e5, 100.0)]
+        integrals = integrate_rois(prefix_sums, [0.0, 100.0], [10.0, 10.0], rois)
+
+        np.testing.assert_allclose([2200.0, 2200.0, 19 * 110.0, 3000.0], integrals.gross[0])
+        np.testing.assert_allclose([200.0, 0.0, 0.0, 0.0], integrals.background[0])
+        np.testing.assert_allclose([2000.0, 2200.0, 19 * 110.0, 3000.0], integrals.net[0])
+        np.testing.assert_allclose(integrals.errors[0, 0], np.sqrt(2200.0 + 200.0))
+
+        # The second spectrum is shifted by ten channels.
+        np.testing.assert_allclose([1200.0, 1200.0], integrals.gross[1, :2])
+        np.testing.assert_allclose(integrals.background[1, 0], 20 * 0.5 * (10.0 + 110.0))
+
+        # self.fail("Test if the testcase is working.")
+
+    def test_linear_background(self):
+        """
+        Test a linear background is interpolated under the ROI, also with an asymmetric window at the edge.
+        """
+
+        counts = np.arange(100.0)
+        prefix_sums = PrefixSums()
+        prefix_sums.append(counts)
+
+        rois = [("centre", 395.0, 595.0, 100.0), ("edge", 15.0, 215.0, 300.0)]
+        integrals = integrate_rois(prefix_sums, [0.0], [10.0], rois)
+
+        np.testing.assert_allclose([np.sum(counts[40:60]), np.sum(counts[2:22])], integrals.background[0])
+        np.testing.assert_allclose([0.0, 0.0], integrals.net[0], atol=1.0e-9)
+
+        # self.fail("Test if the testcase is working.")
+
+    def test_roi_integrator(self):
+        """
+        Test the cumulative sums are computed only for the new spectra of the project.
+        """
+
+        project = Project()
+        project.add_spectrum(SpectrumData(self.counts, 0.0, 10.0), "spectrum_0")
+        project.set_rois([("peak", 395.0, 595.0, 100.0)])
+
+        integrator = RoiIntegrator()
+        integrals = integrator.integrate(project)
+        self.assertEqual((1, 1), integrals.net.shape)
+        self.assertAlmostEqual(2000.0, integrals.net[0, 0])
+
+        project.add_spectrum(SpectrumData(2 * self.counts, 0.0, 10.0), "spectrum_1")
+        sums = integrator.prefix_sums.get_sums(0).copy()
+        integrals = integrator.integrate(project)
+        np.testing.assert_allclose([[2000.0], [4000.0]], integrals.net)
+        np.testing.assert_array_equal(sums, integrator.prefix_sums.get_sums(0))
+
+        integrals = integrator.integrate(project, [("peak", 395.0, 595.0), ("low", 0.0, 95.0)])
+        np.testing.assert_allclose([[2200.0, 95.0], [4400.0, 190.0]], integrals.net)
+
+        project = Project()
+        self.assertEqual((0, 0), integrator.integrate(project).net.shape)
+        self.assertEqual(0, integrator.prefix_sums.number_spectra)
+
+        # self.fail("Test if the testcase is working.")
+
+
+if __name__ == '__main__':  # pragma: no cover
+    import nose
+
+    nose.runmodule()
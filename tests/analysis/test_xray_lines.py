@@ -0,0 +1,159 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+.. py:currentmodule:: xrayspectrumanalyzergui.tests.analysis.test_xray_lines
+   :synopsis: Tests for the module :py:mod:`xrayspectrumanalyzergui.analysis.xray_lines`
+
+.. moduleauthor:: Hendrix Demers <hendrix.demers@mail.mcgill.ca>
+
+Tests for the module :py:mod:`xrayspectrumanalyzergui.analysis.xray_lines`.
+"""
+
+###############################################################################
+# GUI for the x-ray spectrum analyzer project
+# Copyright (C) 2017  Hendrix Demers
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+###############################################################################
+
+# Standard library modules.
+import unittest
+
+# Third party modules.
+import numpy as np
+
+# Local modules.
+
+# Project modules.
+from xrayspectrumanalyzergui.analysis.xray_lines import get_database, read_xray_lines, format_line
+
+# Globals and constants variables.
+
+
+class TestXrayLines(unittest.TestCase):
+    """
+    TestCase class for the module `xrayspectrumanalyzergui.analysis.xray_lines`.
+    """
+
+    def setUp(self):
+        """
+        Setup method.
+        """
+
+        unittest.TestCase.setUp(self)
+
+        self.database = get_database()
+
+    def tearDown(self):
+        """
+        Teardown method.
+        """
+
+        unittest.TestCase.tearDown(self)
+
+    def testSkeleton(self):
+        """
+        First test to check if the testcase is working with the testing framework.
+        """
+
+        # self.fail("Test if the testcase is working.")
+
+    def test_read_xray_lines(self):
+        """
+        Test the bundled file covers the elements Z = 3 to 98.
+        """
+
+        lines, edges = read_xray_lines()
+
+        self.assertEqual(list(range(3, 99)), sorted(set(lines["atomic_number"].tolist())))
+        self.assertEqual(list(range(3, 99)), sorted(set(edges["atomic_number"].tolist())))
+        self.assertEqual({"K", "L", "M"}, set(lines["family"].tolist()))
+        self.assertTrue(np.all(lines["energy_eV"] > 0.0))
+        self.assertIs(get_database(), self.database)
+
+        # self.fail("Test if the testcase is working.")
+
+    def test_sorted_energies(self):
+        """
+        Test the lines of each family are sorted by atomic number and energy.
+        """
+
+        self.assertTrue(np.all(np.diff(self.database.lines["energy_eV"]) >= 0.0))
+        self.assertTrue(np.all(np.diff(self.database.edges["energy_eV"]) >= 0.0))
+
+        for line in ["Ka1", "Kb1", "La1", "Lb1", "Ma1"]:
+            lines = self.database.lines[self.database.lines["line"] == line]
+            lines = lines[np.argsort(lines["atomic_number"])]
+            self.assertTrue(np.all(np.diff(lines["energy_eV"]) > 0.0), line)
+
+        # self.fail("Test if the testcase is working.")
+
+    def test_find_lines(self):
+        """
+        Test the lines near an energy.
+        """
+
+        lines = self.database.find_lines(6400.0, 20.0)
+        self.assertEqual(["Fe Ka2", "Fe Ka1"], [format_line(line) for line in lines])
+
+        lines = self.database.find_lines(1486.7, 0.0)
+        self.assertEqual(["Al Ka1"], [format_line(line) for line in lines])
+
+        self.assertEqual(0, self.database.find_lines(200000.0, 100.0).size)
+
+        edges = self.database.find_edges(7112.0, 1.0)
+        self.assertEqual(("Fe", "K"), (edges[0]["symbol"], edges[0]["edge"]))
+
+        # self.fail("Test if the testcase is working.")
+
+    def test_identify(self):
+        """
+        Test the closest and strongest lines come first.
+        """
+
+        lines = self.database.identify(8040.0, 50.0)
+        self.assertEqual("Cu Ka1", format_line(lines[0]))
+        self.assertEqual("Cu Ka2", format_line(lines[1]))
+
+        lines = self.database.identify(705.0, 5.0, maximum_number_lines=1)
+        self.assertEqual(["Fe La1"], [format_line(line) for line in lines])
+
+        # self.fail("Test if the testcase is working.")
+
+    def test_get_lines(self):
+        """
+        Test the lines and the symbols of an element.
+        """
+
+        self.assertEqual(26, self.database.get_atomic_number("fe"))
+        self.assertEqual("Fe", self.database.get_symbol(26))
+        self.assertRaises(ValueError, self.database.get_atomic_number, "Xx")
+        self.assertRaises(ValueError, self.database.get_atomic_number, 120)
+
+        lines = self.database.get_lines("Cu", families="K")
+        self.assertEqual(["Ka2", "Ka1", "Kb1"], lines["line"].tolist())
+        self.assertEqual(6, self.database.get_lines(29).size)
+        self.assertEqual(["L3", "K"], self.database.get_edges("Cu")["edge"].tolist())
+
+        self.assertEqual(96, len(self.database.symbols))
+        self.assertEqual("Li", self.database.symbols[0])
+
+        # self.fail("Test if the testcase is working.")
+
+
+if __name__ == '__main__':  # pragma: no cover
+    import nose
+
+    nose.runmodule()
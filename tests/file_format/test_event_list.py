@@ -0,0 +1,202 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+.. py:currentmodule:: xrayspectrumanalyzergui.tests.file_format.test_event_list
+   :synopsis: Tests for the module :py:mod:`xrayspectrumanalyzergui.file_format.event_list`
+
+.. moduleauthor:: Hendrix Demers <hendrix.demers@mail.mcgill.ca>
+
+Tests for the module :py:mod:`xrayspectrumanalyzergui.file_format.event_list`.
+"""
+
+###############################################################################
+# GUI for the x-ray spectrum analyzer project
+# Copyright (C) 2017  Hendrix Demers
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+###############################################################################
+
+# Standard library modules.
+import unittest
+import os.path
+import tempfile
+import shutil
+
+# Third party modules.
+import numpy as np
+
+# Local modules.
+
+# Project modules.
+from xrayspectrumanalyzergui.file_format.event_list import EventList, EventListFormatError, write_event_list, \
+    read_event_list, rebin_counts
+
+# Globals and constants variables.
+NUMBER_EVENTS = 20000
+NUMBER_CHANNELS = 64
+TICK_s = 1.0e-3
+
+
+class TestEventList(unittest.TestCase):
+    """
+    TestCase class for the module `xrayspectrumanalyzergui.file_format.event_list`.
+    """
+
+    def setUp(self):
+        """
+        Setup method.
+        """
+
+        unittest.TestCase.setUp(self)
+
+        self.folder = tempfile.mkdtemp()
+        self.file_path = os.path.join(self.folder, "events.evt")
+
+        random = np.random.RandomState(0)
+        self.times = np.sort(random.randint(0, 100000, NUMBER_EVENTS)).astype(np.uint64) + 5000
+        # A few events are outside the spectrum.
+        self.channels = random.randint(0, NUMBER_CHANNELS + 4, NUMBER_EVENTS).astype(np.uint16)
+
+    def tearDown(self):
+        """
+        Teardown method.
+        """
+
+        unittest.TestCase.tearDown(self)
+
+        shutil.rmtree(self.folder)
+
+    def _get_reference_counts(self, start_s, end_s):
+        times_s = (self.times.astype(np.int64) - int(self.times.min())) * TICK_s
+        mask = (times_s >= start_s - 1.0e-9) & (times_s < end_s - 1.0e-9) & (self.channels < NUMBER_CHANNELS)
+        return np.bincount(self.channels[mask], minlength=NUMBER_CHANNELS)
+
+    def testSkeleton(self):
+        """
+        First test to check if the testcase is working with the testing framework.
+        """
+
+        # self.fail("Test if the testcase is working.")
+
+    def test_get_counts(self):
+        """
+        Test the counts of time windows of a sorted file match a gate of all the events.
+        """
+
+        write_event_list(self.file_path, self.times, self.channels, TICK_s, number_channels=NUMBER_CHANNELS)
+        event_list = EventList(self.file_path, chunk_size=3000)
+        event_list.build_index(7)
+
+        self.assertTrue(event_list.is_sorted)
+        self.assertEqual(7, event_list.number_time_bins)
+        self.assertEqual(NUMBER_EVENTS, event_list.number_events)
+        self.assertFalse(event_list.has_positions)
+
+        for start_s, end_s in [(0.0, 1000.0), (0.0, 50.0), (12.345, 67.891), (33.3331, 33.4), (90.0, 1000.0),
+                               (-5.0, 10.0), (50.0, 50.0)]:
+            np.testing.assert_array_equal(self._get_reference_counts(start_s, end_s),
+                                          event_list.get_counts(start_s, end_s))
+        np.testing.assert_array_equal(self._get_reference_counts(0.0, 1000.0), event_list.get_counts())
+
+        # self.fail("Test if the testcase is working.")
+
+    def test_get_counts_unsorted(self):
+        """
+        Test the time windows of an unsorted file.
+        """
+
+        order = np.random.RandomState(1).permutation(NUMBER_EVENTS)
+        self.times = self.times[order]
+        self.channels = self.channels[order]
+        write_event_list(self.file_path, self.times, self.channels, TICK_s, number_channels=NUMBER_CHANNELS)
+        event_list = EventList(self.file_path, chunk_size=3000)
+        event_list.build_index(7)
+
+        self.assertFalse(event_list.is_sorted)
+        for start_s, end_s in [(0.0, 1000.0), (12.345, 67.891), (33.3331, 33.4)]:
+            np.testing.assert_array_equal(self._get_reference_counts(start_s, end_s),
+                                          event_list.get_counts(start_s, end_s))
+
+        # self.fail("Test if the testcase is working.")
+
+    def test_get_spectrum(self):
+        """
+        Test the calibration and metadata of a re-binned spectrum.
+        """
+
+        write_event_list(self.file_path, self.times, self.channels, TICK_s, 100.0, 10.0, NUMBER_CHANNELS,
+                         x=self.channels, y=self.channels)
+        event_list = EventList(self.file_path)
+        self.assertTrue(event_list.has_positions)
+
+        spectrum = event_list.get_spectrum(10.0, 20.0, rebin=4)
+        self.assertEqual(NUMBER_CHANNELS // 4, spectrum.number_channels)
+        self.assertAlmostEqual(115.0, spectrum.offset_eV)
+        self.assertAlmostEqual(40.0, spectrum.gain_eV)
+        self.assertEqual("10.000000", spectrum.metadata["REALTIME"])
+        self.assertEqual(self.file_path, spectrum.metadata["EVENTLIST"])
+        np.testing.assert_array_equal(rebin_counts(self._get_reference_counts(10.0, 20.0), 4), spectrum.counts)
+
+        start_times_s, totals = event_list.get_time_profile()
+        self.assertEqual(event_list.number_time_bins, start_times_s.size)
+        self.assertEqual(0.0, start_times_s[0])
+        self.assertEqual(NUMBER_EVENTS, totals.sum())
+
+        spectrum = read_event_list(self.file_path)
+        self.assertEqual(np.sum(self.channels < NUMBER_CHANNELS), spectrum.counts.sum())
+
+        # self.fail("Test if the testcase is working.")
+
+    def test_rebin_counts(self):
+        """
+        Test rebin_counts sum the adjacent channels.
+        """
+
+        np.testing.assert_array_equal([3, 7, 5], rebin_counts(np.arange(1, 6), 2))
+        np.testing.assert_array_equal(np.arange(5), rebin_counts(np.arange(5), 1))
+
+        # self.fail("Test if the testcase is working.")
+
+    def test_bad_file(self):
+        """
+        Test a file without the event-list header.
+        """
+
+        with open(self.file_path, "wb") as event_file:
+            event_file.write(b"#FORMAT : EMSA/MAS Spectral Data File\n")
+
+        self.assertRaises(EventListFormatError, EventList, self.file_path)
+
+        # self.fail("Test if the testcase is working.")
+
+    def test_truncated_file(self):
+        """
+        Test a file ending with a partial event.
+        """
+
+        write_event_list(self.file_path, self.times, self.channels, TICK_s, number_channels=NUMBER_CHANNELS)
+        self.assertEqual(NUMBER_EVENTS, EventList(self.file_path).number_events)
+        with open(self.file_path, "ab") as event_file:
+            event_file.write(b"\x00\x01\x02")
+
+        self.assertRaises(EventListFormatError, EventList, self.file_path)
+
+        # self.fail("Test if the testcase is working.")
+
+
+if __name__ == '__main__':  # pragma: no cover
+    import nose
+
+    nose.runmodule()
@@ -0,0 +1,132 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+.. py:currentmodule:: xrayspectrumanalyzergui.tests.file_format.test_journal
+   :synopsis: Tests for the module :py:mod:`xrayspectrumanalyzergui.file_format.journal`
+
+.. moduleauthor:: Hendrix Demers <hendrix.demers@mail.mcgill.ca>
+
+Tests for the module :py:mod:`xrayspectrumanalyzergui.file_format.journal`.
+"""
+
+###############################################################################
+# GUI for the x-ray spectrum analyzer project
+# Copyright (C) 2017  Hendrix Demers
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+###############################################################################
+
+# Standard library modules.
+import unittest
+import os.path
+import tempfile
+import shutil
+
+# Third party modules.
+import numpy as np
+
+# Local modules.
+
+# Project modules.
+from xrayspectrumanalyzergui.file_format.journal import JournalWriter, read_journal
+
+# Globals and constants variables.
+
+
+class TestJournal(unittest.TestCase):
+    """
+    TestCase class for the module `xrayspectrumanalyzergui.file_format.journal`.
+    """
+
+    def setUp(self):
+        """
+        Setup method.
+        """
+
+        unittest.TestCase.setUp(self)
+
+        self.folder = tempfile.mkdtemp()
+        self.file_path = os.path.join(self.folder, "journal.bin")
+
+    def tearDown(self):
+        """
+        Teardown method.
+        """
+
+        unittest.TestCase.tearDown(self)
+
+        shutil.rmtree(self.folder)
+
+    def testSkeleton(self):
+        """
+        First test to check if the testcase is working with the testing framework.
+        """
+
+        # self.fail("Test if the testcase is working.")
+
+    def test_append_read(self):
+        """
+        Test the records are read back with their arrays.
+        """
+
+        journal_writer = JournalWriter(self.file_path)
+        journal_writer.append("add_spectrum", 1, {"name": "a.msa", "counts": np.arange(5, dtype=np.uint16),
+                                                  "gain_eV": np.float64(10.0)})
+        journal_writer.append("set_elements", 2, {"elements": ["Fe", "Si"]})
+        journal_writer.flush()
+
+        records = list(read_journal(self.file_path))
+        self.assertEqual(2, len(records))
+
+        operation, revision, arguments = records[0]
+        self.assertEqual("add_spectrum", operation)
+        self.assertEqual(1, revision)
+        self.assertEqual("a.msa", arguments["name"])
+        self.assertEqual(10.0, arguments["gain_eV"])
+        np.testing.assert_array_equal(np.arange(5), arguments["counts"])
+        self.assertEqual(np.uint16, arguments["counts"].dtype)
+
+        self.assertEqual(("set_elements", 2, {"elements": ["Fe", "Si"]}), records[1])
+
+        journal_writer.truncate()
+        self.assertEqual([], list(read_journal(self.file_path)))
+        journal_writer.close()
+
+        # self.fail("Test if the testcase is working.")
+
+    def test_truncated_record(self):
+        """
+        Test a record truncated by a crash ends the journal.
+        """
+
+        journal_writer = JournalWriter(self.file_path)
+        journal_writer.append("set_elements", 1, {"elements": ["Fe"]})
+        size = journal_writer.size()
+        journal_writer.append("add_spectrum", 2, {"counts": np.arange(100)})
+        journal_writer.close()
+
+        with open(self.file_path, "r+b") as journal_file:
+            journal_file.truncate(size + 50)
+
+        self.assertEqual([("set_elements", 1, {"elements": ["Fe"]})], list(read_journal(self.file_path)))
+        self.assertEqual([], list(read_journal(os.path.join(self.folder, "missing.bin"))))
+
+        # self.fail("Test if the testcase is working.")
+
+
+if __name__ == '__main__':  # pragma: no cover
+    import nose
+
+    nose.runmodule()
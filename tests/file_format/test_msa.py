@@ -0,0 +1,181 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+.. py:currentmodule:: xrayspectrumanalyzergui.tests.file_format.test_msa
+   :synopsis: Tests for the module :py:mod:`xrayspectrumanalyzergui.file_format.msa`
+
+.. moduleauthor:: Hendrix Demers <hendrix.demers@mail.mcgill.ca>
+
+Tests for the module :py:mod:`xrayspectrumanalyzergui.file_format.msa`.
+"""
+
+###############################################################################
+# GUI for the x-ray spectrum analyzer project
+# Copyright (C) 2017  Hendrix Demers
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+###############################################################################
+
+# Standard library modules.
+import unittest
+import io
+
+# Third party modules.
+import numpy as np
+
+# Local modules.
+
+# Project modules.
+from xrayspectrumanalyzergui.file_format.msa import read_msa, parse_msa, parse_header, MsaFormatError
+
+# Globals and constants variables.
+MSA_XY = b"""#FORMAT      : EMSA/MAS Spectral Data File
+#VERSION     : 1.0
+#TITLE       : Test spectrum
+#NPOINTS     : 4
+#NCOLUMNS    : 1
+#XUNITS      : keV
+#YUNITS      : counts
+#DATATYPE    : XY
+#XPERCHAN    : 0.01
+#OFFSET      : -0.02
+#LIVETIME  -s: 100.0
+#SPECTRUM    : Spectral Data Starts Here\r
+-0.02, 1.0,\r
+-0.01, 2.0,\r
+0.00, 30.0,\r
+0.01, 4.0,\r
+#ENDOFDATA   : End Of Data and Checksum\r
+"""
+
+MSA_Y = b"""#FORMAT      : EMSA/MAS Spectral Data File
+#VERSION     : 1.0
+#NPOINTS     : 6
+#NCOLUMNS    : 3
+#XUNITS      : eV
+#DATATYPE    : Y
+#XPERCHAN    : 10.0
+#OFFSET      : 100.0
+#SPECTRUM    : Spectral Data Starts Here
+1, 2, 3
+4, 5, 6
+#ENDOFDATA   : End Of Data and Checksum
+"""
+
+
+class TestMsa(unittest.TestCase):
+    """
+    TestCase class for the module `xrayspectrumanalyzergui.file_format.msa`.
+    """
+
+    def setUp(self):
+        """
+        Setup method.
+        """
+
+        unittest.TestCase.setUp(self)
+
+    def tearDown(self):
+        """
+        Teardown method.
+        """
+
+        unittest.TestCase.tearDown(self)
+
+    def testSkeleton(self):
+        """
+        First test to check if the testcase is working with the testing framework.
+        """
+
+        # self.fail("Test if the testcase is working.")
+
+    def test_parse_header(self):
+        """
+        Test parse_header.
+        """
+
+        header = parse_header(MSA_XY.split(b"#SPECTRUM")[0])
+
+        self.assertEqual("EMSA/MAS Spectral Data File", header["FORMAT"])
+        self.assertEqual("XY", header["DATATYPE"])
+        self.assertEqual("100.0", header["LIVETIME"])
+        self.assertEqual("s", header["LIVETIME_UNITS"])
+
+        # self.fail("Test if the testcase is working.")
+
+    def test_parse_msa_xy(self):
+        """
+        Test parse_msa with a XY data block in keV.
+        """
+
+        spectrum = parse_msa(MSA_XY)
+
+        np.testing.assert_allclose([-20.0, -10.0, 0.0, 10.0], spectrum.energies_eV)
+        np.testing.assert_allclose([1.0, 2.0, 30.0, 4.0], spectrum.counts)
+        self.assertEqual(np.uint16, spectrum.counts.dtype)
+        self.assertAlmostEqual(-20.0, spectrum.offset_eV)
+        self.assertAlmostEqual(10.0, spectrum.gain_eV)
+        self.assertEqual("Test spectrum", spectrum.metadata["TITLE"])
+
+        # self.fail("Test if the testcase is working.")
+
+    def test_parse_msa_y(self):
+        """
+        Test parse_msa with a Y data block on several columns.
+        """
+
+        spectrum = parse_msa(MSA_Y)
+
+        np.testing.assert_allclose([100.0, 110.0, 120.0, 130.0, 140.0, 150.0], spectrum.energies_eV)
+        np.testing.assert_allclose([1, 2, 3, 4, 5, 6], spectrum.counts)
+
+        # self.fail("Test if the testcase is working.")
+
+    def test_read_msa_file_object(self):
+        """
+        Test read_msa with a file object.
+        """
+
+        spectrum = read_msa(io.BytesIO(MSA_Y))
+        self.assertEqual(6, spectrum.counts.size)
+
+        # self.fail("Test if the testcase is working.")
+
+    def test_parse_msa_bad_file(self):
+        """
+        Test parse_msa with a file without data.
+        """
+
+        self.assertRaises(MsaFormatError, parse_msa, b"#FORMAT : EMSA/MAS Spectral Data File\n")
+        self.assertRaises(MsaFormatError, parse_msa, MSA_XY.replace(b"0.01, 4.0,", b"0.01,"))
+        self.assertRaises(MsaFormatError, parse_msa, MSA_Y.replace(b"4, 5, 6", b"4, x, 6"))
+
+        # self.fail("Test if the testcase is working.")
+
+    def test_parse_msa_missing_points(self):
+        """
+        Test parse_msa with less values than NPOINTS in the data block.
+        """
+
+        self.assertRaises(MsaFormatError, parse_msa, MSA_Y.replace(b"4, 5, 6\n", b""))
+        self.assertRaises(MsaFormatError, parse_msa, MSA_XY.replace(b"0.01, 4.0,\r\n", b""))
+
+        # self.fail("Test if the testcase is working.")
+
+
+if __name__ == '__main__':  # pragma: no cover
+    import nose
+
+    nose.runmodule()
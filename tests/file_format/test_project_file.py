@@ -0,0 +1,134 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+.. py:currentmodule:: xrayspectrumanalyzergui.tests.file_format.test_project_file
+   :synopsis: Tests for the module :py:mod:`xrayspectrumanalyzergui.file_format.project_file`
+
+.. moduleauthor:: Hendrix Demers <hendrix.demers@mail.mcgill.ca>
+
+Tests for the module :py:mod:`xrayspectrumanalyzergui.file_format.project_file`.
+"""
+
+###############################################################################
+# GUI for the x-ray spectrum analyzer project
+# Copyright (C) 2017  Hendrix Demers
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+###############################################################################
+
+# Standard library modules.
+import unittest
+import os
+import tempfile
+import shutil
+
+# Third party modules.
+import numpy as np
+
+# Local modules.
+
+# Project modules.
+from xrayspectrumanalyzergui.file_format.project_file import ProjectFile, ProjectFormatError, FORMAT_VERSION
+
+# Globals and constants variables.
+
+
+class TestProjectFile(unittest.TestCase):
+    """
+    TestCase class for the module `xrayspectrumanalyzergui.file_format.project_file`.
+    """
+
+    def setUp(self):
+        """
+        Setup method.
+        """
+
+        unittest.TestCase.setUp(self)
+
+        self.folder = tempfile.mkdtemp()
+        self.project_file = ProjectFile(os.path.join(self.folder, "test.xsa"))
+        self.project_file.create()
+
+    def tearDown(self):
+        """
+        Teardown method.
+        """
+
+        unittest.TestCase.tearDown(self)
+
+        shutil.rmtree(self.folder)
+
+    def testSkeleton(self):
+        """
+        First test to check if the testcase is working with the testing framework.
+        """
+
+        # self.fail("Test if the testcase is working.")
+
+    def test_manifest(self):
+        """
+        Test writing and reading the manifest.
+        """
+
+        self.assertFalse(self.project_file.exists())
+        self.assertRaises(ProjectFormatError, self.project_file.read_manifest)
+
+        self.project_file.write_manifest({"number_spectra": 3})
+        self.assertTrue(self.project_file.exists())
+
+        manifest = self.project_file.read_manifest()
+        self.assertEqual(3, manifest["number_spectra"])
+        self.assertEqual(FORMAT_VERSION, manifest["version"])
+
+        # self.fail("Test if the testcase is working.")
+
+    def test_chunk(self):
+        """
+        Test writing, mapping and removing chunks.
+        """
+
+        counts = np.arange(12, dtype=np.uint16).reshape(3, 4)
+        self.project_file.write_chunk(0, counts, [{"TITLE": "a"}, {}, {}])
+        self.project_file.write_chunk(1, counts, [{}, {}, {}])
+
+        mapped_counts, metadata = self.project_file.map_chunk(0)
+        self.assertIsInstance(mapped_counts, np.memmap)
+        np.testing.assert_array_equal(counts, mapped_counts)
+        self.assertEqual("a", metadata[0]["TITLE"])
+
+        self.project_file.remove_chunks(1)
+        self.assertRaises(IOError, self.project_file.map_chunk, 1)
+        self.assertEqual(["chunk_000000.json", "chunk_000000.npy"],
+                         sorted(os.listdir(os.path.join(self.project_file.path, "spectra"))))
+
+        # self.fail("Test if the testcase is working.")
+
+    def test_table(self):
+        """
+        Test writing and reading a table.
+        """
+
+        self.assertIsNone(self.project_file.read_table("names"))
+
+        self.project_file.write_table("names", np.array(["a.msa", "b.msa"]))
+        self.assertEqual(["a.msa", "b.msa"], self.project_file.read_table("names").tolist())
+
+        # self.fail("Test if the testcase is working.")
+
+
+if __name__ == '__main__':  # pragma: no cover
+    import nose
+
+    nose.runmodule()
@@ -0,0 +1,140 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+.. py:currentmodule:: xrayspectrumanalyzergui.tests.file_format.test_spectrum_files
+   :synopsis: Tests for the module :py:mod:`xrayspectrumanalyzergui.file_format.spectrum_files`
+
+.. moduleauthor:: Hendrix Demers <hendrix.demers@mail.mcgill.ca>
+
+Tests for the module :py:mod:`xrayspectrumanalyzergui.file_format.spectrum_files`.
+"""
+
+###############################################################################
+# GUI for the x-ray spectrum analyzer project
+# Copyright (C) 2017  Hendrix Demers
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+###############################################################################
+
+# Standard library modules.
+import unittest
+import os.path
+import tempfile
+import shutil
+
+# Third party modules.
+import numpy as np
+
+# Local modules.
+
+# Project modules.
+from xrayspectrumanalyzergui.file_format.spectrum_files import collect_spectrum_files, expand_glob_patterns, \
+    read_spectrum
+from xrayspectrumanalyzergui.file_format.event_list import write_event_list
+
+# Globals and constants variables.
+
+
+class TestSpectrumFiles(unittest.TestCase):
+    """
+    TestCase class for the module `xrayspectrumanalyzergui.file_format.spectrum_files`.
+    """
+
+    def setUp(self):
+        """
+        Setup method.
+        """
+
+        unittest.TestCase.setUp(self)
+
+        self.folder = tempfile.mkdtemp()
+
+        self.file_paths = []
+        for index in range(5):
+            file_path = os.path.join(self.folder, "spectrum_{:d}.msa".format(index))
+            with open(file_path, "wb") as msa_file:
+                msa_file.write(b"")
+            self.file_paths.append(file_path)
+
+    def tearDown(self):
+        """
+        Teardown method.
+        """
+
+        unittest.TestCase.tearDown(self)
+
+        shutil.rmtree(self.folder)
+
+    def testSkeleton(self):
+        """
+        First test to check if the testcase is working with the testing framework.
+        """
+
+        # self.fail("Test if the testcase is working.")
+
+    def test_collect_spectrum_files(self):
+        """
+        Test collect_spectrum_files expand the directories and remove the duplicates.
+        """
+
+        sub_folder = os.path.join(self.folder, "sub_folder")
+        os.mkdir(sub_folder)
+        sub_file_path = os.path.join(sub_folder, "spectrum.txt")
+        with open(sub_file_path, "wb") as msa_file:
+            msa_file.write(b"")
+        with open(os.path.join(sub_folder, "image.png"), "wb") as image_file:
+            image_file.write(b"")
+
+        paths = [self.file_paths[1], self.folder, os.path.join(self.folder, "missing.msa")]
+        file_paths = collect_spectrum_files(paths)
+
+        expected_file_paths = [self.file_paths[1]] + self.file_paths[:1] + self.file_paths[2:] + [sub_file_path]
+        self.assertEqual(expected_file_paths, file_paths)
+
+        # self.fail("Test if the testcase is working.")
+
+    def test_expand_glob_patterns(self):
+        """
+        Test expand_glob_patterns expand only the paths with wildcards.
+        """
+
+        pattern = os.path.join(self.folder, "spectrum_[13].msa")
+        paths = expand_glob_patterns([self.folder, pattern, os.path.join(self.folder, "*.txt")])
+
+        self.assertEqual([self.folder, self.file_paths[1], self.file_paths[3]], paths)
+
+        # self.fail("Test if the testcase is working.")
+
+    def test_read_spectrum(self):
+        """
+        Test read_spectrum choose the reader with the extension.
+        """
+
+        file_path = os.path.join(self.folder, "spectrum.msa")
+        with open(file_path, "wb") as msa_file:
+            msa_file.write(b"#XPERCHAN : 10.0\n#OFFSET : 0.0\n#SPECTRUM :\n1, 2, 3\n")
+        np.testing.assert_array_equal([1, 2, 3], read_spectrum(file_path).counts)
+
+        file_path = os.path.join(self.folder, "events.EVT")
+        write_event_list(file_path, [0, 1, 2, 3], [0, 2, 2, 1], number_channels=3)
+        np.testing.assert_array_equal([1, 1, 2], read_spectrum(file_path).counts)
+
+        # self.fail("Test if the testcase is working.")
+
+
+if __name__ == '__main__':  # pragma: no cover
+    import nose
+
+    nose.runmodule()
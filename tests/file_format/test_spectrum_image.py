@@ -0,0 +1,183 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+.. py:currentmodule:: xrayspectrumanalyzergui.tests.file_format.test_spectrum_image
+   :synopsis: Tests for the module :py:mod:`xrayspectrumanalyzergui.file_format.spectrum_image`
+
+.. moduleauthor:: Hendrix Demers <hendrix.demers@mail.mcgill.ca>
+
+Tests for the module :py:mod:`xrayspectrumanalyzergui.file_format.spectrum_image`.
+"""
+
+###############################################################################
+# GUI for the x-ray spectrum analyzer project
+# Copyright (C) 2017  Hendrix Demers
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+###############################################################################
+
+# Standard library modules.
+import unittest
+import os.path
+import tempfile
+import shutil
+import importlib.util
+
+# Third party modules.
+import numpy as np
+
+# Local modules.
+
+# Project modules.
+from xrayspectrumanalyzergui.file_format.spectrum_image import read_rpl, write_rpl, parse_rpl, read_hdf5, \
+    read_spectrum_image, load_spectrum_image, SpectrumImageFormatError
+
+# Globals and constants variables.
+
+
+class TestSpectrumImage(unittest.TestCase):
+    """
+    TestCase class for the module `xrayspectrumanalyzergui.file_format.spectrum_image`.
+    """
+
+    def setUp(self):
+        """
+        Setup method.
+        """
+
+        unittest.TestCase.setUp(self)
+
+        self.folder = tempfile.mkdtemp()
+        self.data = np.random.RandomState(0).poisson(5.0, (4, 3, 8)).astype(np.uint16)
+
+    def tearDown(self):
+        """
+        Teardown method.
+        """
+
+        unittest.TestCase.tearDown(self)
+
+        shutil.rmtree(self.folder)
+
+    def testSkeleton(self):
+        """
+        First test to check if the testcase is working with the testing framework.
+        """
+
+        # self.fail("Test if the testcase is working.")
+
+    def test_parse_rpl(self):
+        """
+        Test parse_rpl with comments and the key/value title line.
+        """
+
+        header = parse_rpl("key\tvalue\n; comment\nWidth\t256\ndata-type  unsigned ; type\n\n")
+        self.assertEqual({"width": "256", "data-type": "unsigned"}, header)
+
+        # self.fail("Test if the testcase is working.")
+
+    def test_read_rpl(self):
+        """
+        Test a written RPL file is mapped, not read.
+        """
+
+        file_path = os.path.join(self.folder, "map.rpl")
+        write_rpl(file_path, self.data, -20.0, 10.0)
+        self.assertTrue(os.path.isfile(os.path.join(self.folder, "map.raw")))
+
+        spectrum_image = read_spectrum_image(file_path)
+        self.assertIsInstance(spectrum_image.data, np.memmap)
+        self.assertEqual((4, 3, 8), spectrum_image.shape)
+        self.assertEqual(-20.0, spectrum_image.offset_eV)
+        self.assertEqual(10.0, spectrum_image.gain_eV)
+        np.testing.assert_array_equal(self.data[2, 1], spectrum_image.get_spectrum(2, 1).counts)
+
+        spectrum_image = load_spectrum_image(file_path)
+        np.testing.assert_array_equal(self.data.sum(axis=2), spectrum_image.get_total_image())
+
+        # self.fail("Test if the testcase is working.")
+
+    def test_read_rpl_image(self):
+        """
+        Test a big-endian RPL file recorded by image, with the calibration in keV.
+        """
+
+        file_path = os.path.join(self.folder, "map.rpl")
+        with open(file_path, "w") as rpl_file:
+            rpl_file.write("width 3\nheight 4\ndepth 8\noffset 16\ndata-length 4\ndata-type signed\n"
+                           "byte-order big-endian\nrecord-by image\ndepth-scale 0.01\ndepth-origin 0.1\n"
+                           "depth-units keV\n")
+        with open(os.path.join(self.folder, "map.raw"), "wb") as raw_file:
+            raw_file.write(b"\0" * 16)
+            raw_file.write(self.data.transpose(2, 0, 1).astype(">i4").tobytes())
+
+        spectrum_image = read_rpl(file_path)
+        self.assertEqual((4, 3, 8), spectrum_image.shape)
+        self.assertAlmostEqual(100.0, spectrum_image.offset_eV)
+        self.assertAlmostEqual(10.0, spectrum_image.gain_eV)
+        np.testing.assert_array_equal(self.data[3, 2], spectrum_image.get_spectrum(3, 2).counts)
+        np.testing.assert_array_equal(self.data.sum(axis=(0, 1)), spectrum_image.get_sum_spectrum().counts)
+
+        # self.fail("Test if the testcase is working.")
+
+    def test_read_rpl_bad_file(self):
+        """
+        Test the errors of a RPL file without raw file, too small or with a missing key.
+        """
+
+        file_path = os.path.join(self.folder, "map.rpl")
+        with open(file_path, "w") as rpl_file:
+            rpl_file.write("width 3\nheight 4\ndepth 8\ndata-length 2\n")
+        self.assertRaises(SpectrumImageFormatError, read_rpl, file_path)
+
+        with open(os.path.join(self.folder, "map.raw"), "wb") as raw_file:
+            raw_file.write(b"\0" * 10)
+        self.assertRaises(SpectrumImageFormatError, read_rpl, file_path)
+
+        with open(file_path, "w") as rpl_file:
+            rpl_file.write("width 3\nheight 4\ndata-length 2\n")
+        self.assertRaises(SpectrumImageFormatError, read_rpl, file_path)
+
+        # self.fail("Test if the testcase is working.")
+
+    def test_read_hdf5(self):
+        """
+        Test the first 3-D dataset of a HDF5 file is read lazily.
+        """
+
+        file_path = os.path.join(self.folder, "map.h5")
+        if importlib.util.find_spec("h5py") is None:
+            self.assertRaises(ImportError, read_hdf5, file_path)
+        else:  # pragma: no cover
+            import h5py
+            with h5py.File(file_path, "w") as hdf5_file:
+                hdf5_file.create_dataset("metadata/values", data=np.arange(3))
+                dataset = hdf5_file.create_dataset("data/map", data=self.data, chunks=(1, 3, 8))
+                dataset.attrs["offset_eV"] = -20.0
+                dataset.attrs["gain_eV"] = 10.0
+
+            spectrum_image = read_spectrum_image(file_path)
+            self.assertEqual("data/map", spectrum_image.metadata["DATASET"])
+            self.assertEqual(10.0, spectrum_image.gain_eV)
+            np.testing.assert_array_equal(self.data[2, 1], spectrum_image.get_spectrum(2, 1).counts)
+            spectrum_image.close()
+
+        # self.fail("Test if the testcase is working.")
+
+
+if __name__ == '__main__':  # pragma: no cover
+    import nose
+
+    nose.runmodule()
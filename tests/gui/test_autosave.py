@@ -0,0 +1,191 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+.. py:currentmodule:: xrayspectrumanalyzergui.tests.gui.test_autosave
+   :synopsis: Tests for the module :py:mod:`xrayspectrumanalyzergui.gui.autosave`
+
+.. moduleauthor:: Hendrix Demers <hendrix.demers@mail.mcgill.ca>
+
+Tests for the module :py:mod:`xrayspectrumanalyzergui.gui.autosave`.
+"""
+
+###############################################################################
+# GUI for the x-ray spectrum analyzer project
+# Copyright (C) 2017  Hendrix Demers
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+###############################################################################
+
+# Standard library modules.
+import unittest
+import os
+import tempfile
+import shutil
+
+# Third party modules.
+import numpy as np
+
+# Local modules.
+
+# Project modules.
+from xrayspectrumanalyzergui.gui.autosave import Autosave, find_crashed_sessions, recover_session
+from xrayspectrumanalyzergui.model.project import Project
+from xrayspectrumanalyzergui.model.spectrum_data import SpectrumData
+
+# Globals and constants variables.
+
+
+class TestAutosave(unittest.TestCase):
+    """
+    TestCase class for the module `xrayspectrumanalyzergui.gui.autosave`.
+    """
+
+    def setUp(self):
+        """
+        Setup method.
+        """
+
+        unittest.TestCase.setUp(self)
+
+        self.location = tempfile.mkdtemp()
+        self.autosave = Autosave(self.location)
+
+        self.project = Project(chunk_size=2)
+        self.autosave.watch(self.project)
+        for index in range(5):
+            self.project.add_spectrum(SpectrumData(np.arange(10 + index)), "spectrum_{:d}.msa".format(index))
+
+    def tearDown(self):
+        """
+        Teardown method.
+        """
+
+        unittest.TestCase.tearDown(self)
+
+        self.autosave.close()
+        shutil.rmtree(self.location)
+
+    def _crash(self):
+        self.assertTrue(self.autosave.sync(5.0))
+        self.autosave._lock_file.unlock()
+
+    def testSkeleton(self):
+        """
+        First test to check if the testcase is working with the testing framework.
+        """
+
+        # self.fail("Test if the testcase is working.")
+
+    def test_find_crashed_sessions(self):
+        """
+        Test the session of a running application is not a crashed session.
+        """
+
+        self.assertEqual([], find_crashed_sessions(self.location))
+        self.assertEqual([], find_crashed_sessions(os.path.join(self.location, "missing")))
+
+        self._crash()
+        self.assertEqual([self.autosave.session_path], find_crashed_sessions(self.location))
+
+        # self.fail("Test if the testcase is working.")
+
+    def test_recover_session(self):
+        """
+        Test the project is recovered from the snapshot and the journal.
+        """
+
+        self.autosave.compact()
+        self.project.set_calibration(1, -5.0, 7.5)
+        self.project.set_rois([("Fe Ka", 6300.0, 6500.0)])
+        self._crash()
+
+        project = recover_session(self.autosave.session_path)
+
+        self.assertEqual(self.project.revision, project.revision)
+        self.assertEqual(5, project.number_spectra)
+        self.assertEqual(["spectrum_{:d}.msa".format(index) for index in range(5)], project.names)
+        np.testing.assert_array_equal(np.arange(14), project.get_spectrum(4).counts)
+        self.assertEqual(7.5, project.get_spectrum(1).gain_eV)
+        self.assertEqual([("Fe Ka", 6300.0, 6500.0, 0.0)], project.rois)
+        self.assertIsNone(project.path)
+        self.assertTrue(project.is_modified())
+
+        # self.fail("Test if the testcase is working.")
+
+    def test_compact(self):
+        """
+        Test the compaction saves the snapshot and truncates the journal.
+        """
+
+        self.autosave.compact()
+        self.assertTrue(self.autosave.sync(5.0))
+
+        journal_path = os.path.join(self.autosave.session_path, "journal.bin")
+        self.assertEqual(0, os.path.getsize(journal_path))
+
+        self.project.set_elements(["Fe"])
+        self._crash()
+        self.assertGreater(os.path.getsize(journal_path), 0)
+        self.assertEqual(["Fe"], recover_session(self.autosave.session_path).elements)
+
+        # self.fail("Test if the testcase is working.")
+
+    def test_saved(self):
+        """
+        Test a project saved by the user is not recovered.
+        """
+
+        project_path = os.path.join(self.location, "test.xsa")
+        self.project.save(project_path)
+        self.autosave.saved(self.project)
+        self._crash()
+
+        self.assertIsNone(recover_session(self.autosave.session_path))
+
+        # self.fail("Test if the testcase is working.")
+
+    def test_watch_opened_project(self):
+        """
+        Test the changes of an opened project are recovered.
+        """
+
+        project_path = os.path.join(self.location, "test.xsa")
+        self.project.save(project_path)
+
+        project = Project.open(project_path)
+        self.autosave.watch(project)
+        project.add_spectrum(SpectrumData(np.ones(3)), "new.msa")
+        self.assertIsNone(self.project.change_callback)
+
+        # The snapshot is a layer over the project file, only the chunk of the new spectrum is written.
+        self.autosave.compact()
+        project.set_elements(["Fe"])
+        self._crash()
+        snapshot_spectra_path = os.path.join(self.autosave.session_path, "snapshot.xsa", "spectra")
+        self.assertEqual(["chunk_000002.json", "chunk_000002.npy"], sorted(os.listdir(snapshot_spectra_path)))
+
+        recovered_project = recover_session(self.autosave.session_path)
+        self.assertEqual(6, recovered_project.number_spectra)
+        self.assertEqual(["Fe"], recovered_project.elements)
+        np.testing.assert_array_equal(np.arange(10), recovered_project.get_spectrum(0).counts)
+        np.testing.assert_array_equal(np.ones(3), recovered_project.get_spectrum(5).counts)
+
+        # self.fail("Test if the testcase is working.")
+
+
+if __name__ == '__main__':  # pragma: no cover
+    import nose
+
+    nose.runmodule()
@@ -0,0 +1,151 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+.. py:currentmodule:: xrayspectrumanalyzergui.tests.gui.test_element_map_service
+   :synopsis: Tests for the module :py:mod:`xrayspectrumanalyzergui.gui.element_map_service`
+
+.. moduleauthor:: Hendrix Demers <hendrix.demers@mail.mcgill.ca>
+
+Tests for the module :py:mod:`xrayspectrumanalyzergui.gui.element_map_service`.
+"""
+
+###############################################################################
+# GUI for the x-ray spectrum analyzer project
+# Copyright (C) 2017  Hendrix Demers
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+###############################################################################
+
+# Standard library modules.
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+import threading
+
+# Third party modules.
+import numpy as np
+from qtpy.QtWidgets import QApplication
+from qtpy.QtCore import QEventLoop, QTimer
+
+# Local modules.
+
+# Project modules.
+from xrayspectrumanalyzergui.gui.element_map_service import ElementMapService
+from xrayspectrumanalyzergui.analysis.element_maps import compute_maps
+from xrayspectrumanalyzergui.model.spectrum_image import SpectrumImage
+
+# Globals and constants variables.
+ROIS = [("Fe Ka", 500.0, 700.0, 50.0), ("Cu Ka", 1000.0, 1200.0, 0.0)]
+
+
+class TestElementMapService(unittest.TestCase):
+    """
+    TestCase class for the module `xrayspectrumanalyzergui.gui.element_map_service`.
+    """
+
+    def setUp(self):
+        """
+        Setup method.
+        """
+
+        unittest.TestCase.setUp(self)
+
+        self.application = QApplication.instance() or QApplication([])
+
+        self.data = np.random.RandomState(0).poisson(5.0, (7, 5, 200)).astype(np.uint16)
+        self.spectrum_image = SpectrumImage(self.data, 100.0, 10.0)
+
+    def tearDown(self):
+        """
+        Teardown method.
+        """
+
+        unittest.TestCase.tearDown(self)
+
+    def _wait_finished(self, element_map_service):
+        loop = QEventLoop()
+        element_map_service.maps_finished.connect(loop.quit)
+        element_map_service.maps_failed.connect(loop.quit)
+        QTimer.singleShot(5000, loop.quit)
+        loop.exec_()
+
+    def testSkeleton(self):
+        """
+        First test to check if the testcase is working with the testing framework.
+        """
+
+        # self.fail("Test if the testcase is working.")
+
+    def test_build_maps(self):
+        """
+        Test build_maps deliver the maps assembled from the blocks in the GUI thread.
+        """
+
+        element_map_service = ElementMapService(executor=ThreadPoolExecutor(max_workers=2), rows_per_block=2)
+        results = []
+        delivery_threads = []
+        progress = []
+        element_map_service.maps_finished.connect(lambda rois, maps: results.append((rois, maps)))
+        element_map_service.maps_finished.connect(
+            lambda rois, maps: delivery_threads.append(threading.current_thread()))
+        element_map_service.progress.connect(lambda number_done, number_total: progress.append(number_done))
+
+        element_map_service.build_maps(self.spectrum_image, ROIS)
+        self.assertTrue(element_map_service.is_running())
+        self._wait_finished(element_map_service)
+
+        self.assertFalse(element_map_service.is_running())
+        self.assertEqual([threading.main_thread()], delivery_threads)
+        self.assertEqual(ROIS, results[0][0])
+        np.testing.assert_allclose(compute_maps(self.data, 100.0, 10.0, ROIS), results[0][1])
+        self.assertEqual(0, progress[0])
+        self.assertEqual(7, progress[-1])
+        self.assertEqual(5, len(progress))
+
+        element_map_service.shutdown()
+
+        # self.fail("Test if the testcase is working.")
+
+    def test_cancel(self):
+        """
+        Test cancel drop the blocks of the cancelled maps.
+        """
+
+        event = threading.Event()
+
+        class BlockingExecutor(ThreadPoolExecutor):
+            def submit(self, function, *arguments):
+                return super(BlockingExecutor, self).submit(lambda: event.wait(5.0) and function(*arguments))
+
+        element_map_service = ElementMapService(executor=BlockingExecutor(max_workers=1))
+        results = []
+        element_map_service.maps_finished.connect(lambda rois, maps: results.append(maps))
+
+        element_map_service.build_maps(self.spectrum_image, ROIS)
+        element_map_service.cancel()
+        self.assertFalse(element_map_service.is_running())
+
+        event.set()
+        element_map_service.shutdown()
+        QApplication.processEvents()
+
+        self.assertEqual([], results)
+
+        # self.fail("Test if the testcase is working.")
+
+
+if __name__ == '__main__':  # pragma: no cover
+    import nose
+
+    nose.runmodule()
@@ -0,0 +1,200 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+.. py:currentmodule:: xrayspectrumanalyzergui.tests.gui.test_fit_service
+   :synopsis: Tests for the module :py:mod:`xrayspectrumanalyzergui.gui.fit_service`
+
+.. moduleauthor:: Hendrix Demers <hendrix.demers@mail.mcgill.ca>
+
+Tests for the module :py:mod:`xrayspectrumanalyzergui.gui.fit_service`.
+"""
+
+###############################################################################
+# GUI for the x-ray spectrum analyzer project
+# Copyright (C) 2017  Hendrix Demers
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+###############################################################################
+
+# Standard library modules.
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+import threading
+
+# Third party modules.
+import numpy as np
+from qtpy.QtWidgets import QApplication
+from qtpy.QtCore import QEventLoop, QTimer
+
+# Local modules.
+
+# Project modules.
+from xrayspectrumanalyzergui.gui.fit_service import FitService, group_spectra
+from xrayspectrumanalyzergui.analysis.peak_fitting import PeakFitter, gaussian
+from xrayspectrumanalyzergui.model.project import Project
+from xrayspectrumanalyzergui.model.spectrum_data import SpectrumData
+
+# Globals and constants variables.
+
+
+def create_spectrum(seed, offset_eV=0.0):
+    energies_eV = offset_eV + 5.0 * np.arange(2048)
+    model = 100.0 + 1.0e4 * 5.0 * gaussian(energies_eV, 6403.84, 55.0)
+    return SpectrumData(np.random.RandomState(seed).poisson(model), offset_eV, 5.0)
+
+
+class TestFitService(unittest.TestCase):
+    """
+    TestCase class for the module `xrayspectrumanalyzergui.gui.fit_service`.
+    """
+
+    def setUp(self):
+        """
+        Setup method.
+        """
+
+        unittest.TestCase.setUp(self)
+
+        self.application = QApplication.instance() or QApplication([])
+
+        self.project = Project()
+        for index in range(5):
+            self.project.add_spectrum(create_spectrum(index), "spectrum {:d}".format(index))
+        self.project.add_spectrum(create_spectrum(5, offset_eV=-100.0), "spectrum 5")
+
+        self.fitter = PeakFitter(["Fe"], refinement_threshold=None)
+
+    def tearDown(self):
+        """
+        Teardown method.
+        """
+
+        unittest.TestCase.tearDown(self)
+
+    def _wait_finished(self, fit_service):
+        loop = QEventLoop()
+        fit_service.fit_finished.connect(loop.quit)
+        fit_service.fit_failed.connect(loop.quit)
+        QTimer.singleShot(5000, loop.quit)
+        loop.exec_()
+
+    def testSkeleton(self):
+        """
+        First test to check if the testcase is working with the testing framework.
+        """
+
+        # self.fail("Test if the testcase is working.")
+
+    def test_group_spectra(self):
+        """
+        Test group_spectra group the spectra by calibration.
+        """
+
+        groups = group_spectra(self.project)
+        self.assertEqual({(0.0, 5.0, 2048): [0, 1, 2, 3, 4], (-100.0, 5.0, 2048): [5]}, dict(groups))
+
+        # self.fail("Test if the testcase is working.")
+
+    def test_fit_project(self):
+        """
+        Test fit_project deliver the results of all the spectra in the GUI thread.
+        """
+
+        fit_service = FitService(executor=ThreadPoolExecutor(max_workers=2), chunk_size=2)
+        rows = []
+        delivery_threads = []
+        fit_service.fit_finished.connect(rows.extend)
+        fit_service.fit_finished.connect(lambda results: delivery_threads.append(threading.current_thread()))
+
+        fit_service.fit_project(self.project, self.fitter)
+        self.assertTrue(fit_service.is_running())
+        self._wait_finished(fit_service)
+
+        self.assertFalse(fit_service.is_running())
+        self.assertEqual([threading.main_thread()], delivery_threads)
+        ka_rows = [row for row in rows if row[1] == "Fe Ka"]
+        self.assertEqual(list(range(6)), [row[0] for row in ka_rows])
+        for _index, _label, net_intensity, error in ka_rows:
+            self.assertAlmostEqual(1.0e4, net_intensity, delta=5.0 * error)
+
+        fit_service.shutdown()
+
+        # self.fail("Test if the testcase is working.")
+
+    def test_fit_project_bounded(self):
+        """
+        Test fit_project submit a bounded number of chunks and the next ones when chunks are done.
+        """
+
+        executor = ThreadPoolExecutor(max_workers=2)
+        submitted = []
+
+        class CountingExecutor(object):
+            def submit(self, function, *args):
+                submitted.append(args[1].shape[0])
+                return executor.submit(function, *args)
+
+            def shutdown(self, wait=True):
+                executor.shutdown(wait)
+
+        fit_service = FitService(executor=CountingExecutor(), chunk_size=1, maximum_submitted_chunks=2)
+        rows = []
+        fit_service.fit_finished.connect(rows.extend)
+
+        fit_service.fit_project(self.project, self.fitter)
+        self.assertEqual([1, 1], submitted)
+        self._wait_finished(fit_service)
+
+        self.assertFalse(fit_service.is_running())
+        self.assertEqual(6, len(submitted))
+        self.assertEqual(list(range(6)), [row[0] for row in rows if row[1] == "Fe Ka"])
+
+        fit_service.shutdown()
+
+        # self.fail("Test if the testcase is working.")
+
+    def test_cancel(self):
+        """
+        Test cancel drop the results of the cancelled fit.
+        """
+
+        event = threading.Event()
+
+        class BlockingFitter(object):
+            def fit(self, counts, energies_eV):
+                event.wait(5.0)
+                raise RuntimeError("Cancelled fit")
+
+        fit_service = FitService(executor=ThreadPoolExecutor(max_workers=1))
+        failures = []
+        fit_service.fit_failed.connect(failures.append)
+
+        fit_service.fit_project(self.project, BlockingFitter())
+        fit_service.cancel()
+        self.assertFalse(fit_service.is_running())
+
+        event.set()
+        fit_service.shutdown()
+        QApplication.processEvents()
+
+        self.assertEqual([], failures)
+
+        # self.fail("Test if the testcase is working.")
+
+
+if __name__ == '__main__':  # pragma: no cover
+    import nose
+
+    nose.runmodule()
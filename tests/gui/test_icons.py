@@ -0,0 +1,108 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+.. py:currentmodule:: xrayspectrumanalyzergui.tests.gui.test_icons
+   :synopsis: Tests for the module :py:mod:`xrayspectrumanalyzergui.gui.icons`
+
+.. moduleauthor:: Hendrix Demers <hendrix.demers@mail.mcgill.ca>
+
+Tests for the module :py:mod:`xrayspectrumanalyzergui.gui.icons`.
+"""
+
+###############################################################################
+# GUI for the x-ray spectrum analyzer project
+# Copyright (C) 2017  Hendrix Demers
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+###############################################################################
+
+# Standard library modules.
+import unittest
+
+# Third party modules.
+from qtpy.QtWidgets import QApplication
+from qtpy.QtCore import QFile
+
+# Local modules.
+
+# Project modules.
+from xrayspectrumanalyzergui.gui import icons
+
+# Globals and constants variables.
+
+
+class TestIcons(unittest.TestCase):
+    """
+    TestCase class for the module `xrayspectrumanalyzergui.gui.icons`.
+    """
+
+    def setUp(self):
+        """
+        Setup method.
+        """
+
+        unittest.TestCase.setUp(self)
+
+        self.application = QApplication.instance() or QApplication([])
+
+        icons.unregister_resources()
+
+    def tearDown(self):
+        """
+        Teardown method.
+        """
+
+        unittest.TestCase.tearDown(self)
+
+        icons.unregister_resources()
+
+    def testSkeleton(self):
+        """
+        First test to check if the testcase is working with the testing framework.
+        """
+
+        # self.fail("Test if the testcase is working.")
+
+    def test_register_resources(self):
+        """
+        Test the resource file is registered.
+        """
+
+        self.assertTrue(icons.register_resources())
+        self.assertTrue(QFile(':/oi/svg/document.svg').exists())
+
+        # self.fail("Test if the testcase is working.")
+
+    def test_get_icon(self):
+        """
+        Test get_icon register the resources on the first request and cache the icons.
+        """
+
+        self.assertFalse(icons._is_registered)
+
+        icon = icons.get_icon(':/oi/svg/document.svg')
+        self.assertTrue(icons._is_registered)
+        self.assertFalse(icon.isNull())
+        self.assertFalse(icon.pixmap(16, 16).isNull())
+
+        self.assertIs(icon, icons.get_icon(':/oi/svg/document.svg'))
+
+        # self.fail("Test if the testcase is working.")
+
+
+if __name__ == '__main__':  # pragma: no cover
+    import nose
+
+    nose.runmodule()
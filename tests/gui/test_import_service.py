@@ -0,0 +1,243 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+.. py:currentmodule:: xrayspectrumanalyzergui.tests.gui.test_import_service
+   :synopsis: Tests for the module :py:mod:`xrayspectrumanalyzergui.gui.import_service`
+
+.. moduleauthor:: Hendrix Demers <hendrix.demers@mail.mcgill.ca>
+
+Tests for the module :py:mod:`xrayspectrumanalyzergui.gui.import_service`.
+"""
+
+###############################################################################
+# GUI for the x-ray spectrum analyzer project
+# Copyright (C) 2017  Hendrix Demers
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+###############################################################################
+
+# Standard library modules.
+import unittest
+import os.path
+import tempfile
+import shutil
+import threading
+from concurrent.futures import Future
+
+# Third party modules.
+from qtpy.QtWidgets import QApplication
+from qtpy.QtCore import QEventLoop, QTimer
+
+# Local modules.
+
+# Project modules.
+from xrayspectrumanalyzergui.gui.import_service import ImportService
+
+# Globals and constants variables.
+MSA_Y = b"""#FORMAT      : EMSA/MAS Spectral Data File
+#NPOINTS     : 3
+#DATATYPE    : Y
+#XPERCHAN    : 10.0
+#OFFSET      : 0.0
+#SPECTRUM    : Spectral Data Starts Here
+1, 2, 3
+#ENDOFDATA   : End Of Data and Checksum
+"""
+
+
+class SynchronousExecutor(object):
+    def submit(self, function, *args):
+        future = Future()
+        future.set_result(function(*args))
+        return future
+
+    def shutdown(self, wait=True):
+        pass
+
+
+class TestImportService(unittest.TestCase):
+    """
+    TestCase class for the module `xrayspectrumanalyzergui.gui.import_service`.
+    """
+
+    def setUp(self):
+        """
+        Setup method.
+        """
+
+        unittest.TestCase.setUp(self)
+
+        self.application = QApplication.instance() or QApplication([])
+        self.folder = tempfile.mkdtemp()
+
+        self.file_paths = []
+        for index in range(5):
+            file_path = os.path.join(self.folder, "spectrum_{:d}.msa".format(index))
+            with open(file_path, "wb") as msa_file:
+                msa_file.write(MSA_Y)
+            self.file_paths.append(file_path)
+
+        self.imported = []
+        self.failed = []
+
+    def tearDown(self):
+        """
+        Teardown method.
+        """
+
+        unittest.TestCase.tearDown(self)
+
+        shutil.rmtree(self.folder)
+
+    def _connect(self, import_service):
+        import_service.spectra_imported.connect(self.imported.extend)
+        import_service.import_failed.connect(lambda file_path, message: self.failed.append(file_path))
+
+    def _wait_finished(self, import_service):
+        loop = QEventLoop()
+        import_service.finished.connect(loop.quit)
+        QTimer.singleShot(5000, loop.quit)
+        loop.exec_()
+
+    def testSkeleton(self):
+        """
+        First test to check if the testcase is working with the testing framework.
+        """
+
+        # self.fail("Test if the testcase is working.")
+
+    def test_import_files(self):
+        """
+        Test import_files deliver the spectra in the GUI thread.
+        """
+
+        import_service = ImportService()
+        self._connect(import_service)
+
+        delivery_threads = []
+        import_service.spectra_imported.connect(lambda spectra: delivery_threads.append(threading.current_thread()))
+
+        bad_file_path = os.path.join(self.folder, "missing.msa")
+        import_service.import_files(self.file_paths + [bad_file_path])
+        self._wait_finished(import_service)
+
+        self.assertEqual(sorted(self.file_paths), sorted(file_path for file_path, _spectrum in self.imported))
+        self.assertEqual([bad_file_path], self.failed)
+        self.assertFalse(import_service.is_running())
+        for delivery_thread in delivery_threads:
+            self.assertIs(threading.main_thread(), delivery_thread)
+
+        import_service.shutdown()
+
+        # self.fail("Test if the testcase is working.")
+
+    def test_analyzer(self):
+        """
+        Test the analyzer results are delivered after the spectra.
+        """
+
+        import_service = ImportService(analyzer=lambda spectrum: int(spectrum.counts.sum()))
+        self._connect(import_service)
+
+        analyzed = []
+        import_service.spectra_analyzed.connect(analyzed.extend)
+        import_service.spectra_analyzed.connect(lambda results: self.assertEqual(len(self.imported), len(analyzed)))
+
+        import_service.import_files(self.file_paths)
+        self._wait_finished(import_service)
+
+        self.assertEqual(sorted(self.file_paths), sorted(file_path for file_path, _result in analyzed))
+        self.assertEqual([6] * len(self.file_paths), [result for _file_path, result in analyzed])
+
+        import_service.shutdown()
+
+        # self.fail("Test if the testcase is working.")
+
+    def test_done_futures(self):
+        """
+        Test the import finishes when the futures are already done as their callbacks are added.
+        """
+
+        import_service = ImportService(executor=SynchronousExecutor())
+        self._connect(import_service)
+
+        import_service.import_files(self.file_paths)
+        self.assertTrue(import_service.is_running())
+        self._wait_finished(import_service)
+
+        self.assertEqual(self.file_paths, [file_path for file_path, _spectrum in self.imported])
+        self.assertFalse(import_service.is_running())
+
+        import_service.shutdown()
+
+        # self.fail("Test if the testcase is working.")
+
+    def test_import_paths(self):
+        """
+        Test import_paths expand the directories in a worker and import the files found.
+        """
+
+        import_service = ImportService()
+        self._connect(import_service)
+
+        import_service.import_paths([self.folder, self.file_paths[0]])
+        self.assertTrue(import_service.is_running())
+        self._wait_finished(import_service)
+
+        self.assertEqual(self.file_paths, [file_path for file_path, _spectrum in self.imported])
+        self.assertFalse(import_service.is_running())
+
+        import_service.import_paths([os.path.join(self.folder, "missing")])
+        self._wait_finished(import_service)
+        self.assertEqual(len(self.file_paths), len(self.imported))
+        self.assertFalse(import_service.is_running())
+
+        import_service.shutdown()
+
+        # self.fail("Test if the testcase is working.")
+
+    def test_cancel(self):
+        """
+        Test cancel drop the results of the cancelled import.
+        """
+
+        event = threading.Event()
+
+        def blocking_reader(file_path):
+            event.wait(5.0)
+            return file_path
+
+        import_service = ImportService(reader=blocking_reader)
+        self._connect(import_service)
+
+        import_service.import_files(self.file_paths)
+        self.assertTrue(import_service.is_running())
+
+        import_service.cancel()
+        self.assertFalse(import_service.is_running())
+
+        event.set()
+        import_service.shutdown()
+        QApplication.processEvents()
+
+        self.assertEqual([], self.imported)
+
+        # self.fail("Test if the testcase is working.")
+
+
+if __name__ == '__main__':  # pragma: no cover
+    import nose
+
+    nose.runmodule()
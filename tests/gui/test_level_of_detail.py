@@ -0,0 +1,139 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+.. py:currentmodule:: xrayspectrumanalyzergui.tests.gui.test_level_of_detail
+   :synopsis: Tests for the module :py:mod:`xrayspectrumanalyzergui.gui.level_of_detail`
+
+.. moduleauthor:: Hendrix Demers <hendrix.demers@mail.mcgill.ca>
+
+Tests for the module :py:mod:`xrayspectrumanalyzergui.gui.level_of_detail`.
+"""
+
+###############################################################################
+# GUI for the x-ray spectrum analyzer project
+# Copyright (C) 2017  Hendrix Demers
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+###############################################################################
+
+# Standard library modules.
+import unittest
+
+# Third party modules.
+import numpy as np
+
+# Local modules.
+
+# Project modules.
+from xrayspectrumanalyzergui.gui.level_of_detail import MinMaxPyramid
+
+# Globals and constants variables.
+
+
+class TestLevelOfDetail(unittest.TestCase):
+    """
+    TestCase class for the module `xrayspectrumanalyzergui.gui.level_of_detail`.
+    """
+
+    def setUp(self):
+        """
+        Setup method.
+        """
+
+        unittest.TestCase.setUp(self)
+
+        random_state = np.random.RandomState(0)
+        self.x = np.arange(10001) * 10.0
+        self.y = random_state.poisson(100.0, self.x.size).astype(np.float64)
+        self.y[1234] = 5000.0
+        self.y[5678] = -10.0
+
+    def tearDown(self):
+        """
+        Teardown method.
+        """
+
+        unittest.TestCase.tearDown(self)
+
+    def testSkeleton(self):
+        """
+        First test to check if the testcase is working with the testing framework.
+        """
+
+        # self.fail("Test if the testcase is working.")
+
+    def test_pyramid(self):
+        """
+        Test the min/max of each level.
+        """
+
+        pyramid = MinMaxPyramid(self.x, self.y)
+
+        self.assertEqual(14, pyramid.number_levels)
+        self.assertEqual((-10.0, 5000.0), pyramid.get_y_limits())
+
+        block_size = 2 ** 3
+        min_indexes = pyramid.min_indexes[2]
+        max_indexes = pyramid.max_indexes[2]
+        for block in [0, 154, 1250]:
+            values = self.y[block * block_size:(block + 1) * block_size]
+            self.assertEqual(np.min(values), self.y[min_indexes[block]])
+            self.assertEqual(np.max(values), self.y[max_indexes[block]])
+
+        # self.fail("Test if the testcase is working.")
+
+    def test_get_envelope(self):
+        """
+        Test the envelope keep the extrema at their exact position.
+        """
+
+        pyramid = MinMaxPyramid(self.x, self.y)
+
+        x, y = pyramid.get_envelope(0.0, 100000.0, 800)
+        self.assertLessEqual(x.size, 4 * 800)
+        self.assertTrue(np.all(np.diff(x) >= 0.0))
+        self.assertIn(12340.0, x)
+        self.assertEqual(5000.0, np.max(y))
+        self.assertEqual(-10.0, np.min(y))
+
+        x, y = pyramid.get_envelope(50000.0, 60000.0, 100)
+        self.assertGreaterEqual(x[0], 49000.0)
+        self.assertLessEqual(x[-1], 61000.0)
+        self.assertIn(56780.0, x)
+
+        x, y = pyramid.get_envelope(12000.0, 12500.0, 800)
+        np.testing.assert_array_equal(self.x[1199:1252], x)
+        np.testing.assert_array_equal(self.y[1199:1252], y)
+
+        # self.fail("Test if the testcase is working.")
+
+    def test_empty(self):
+        """
+        Test an empty spectrum.
+        """
+
+        pyramid = MinMaxPyramid([], [])
+
+        self.assertIsNone(pyramid.get_y_limits())
+        x, y = pyramid.get_envelope(0.0, 1.0, 800)
+        self.assertEqual(0, x.size)
+
+        # self.fail("Test if the testcase is working.")
+
+
+if __name__ == '__main__':  # pragma: no cover
+    import nose
+
+    nose.runmodule()
@@ -0,0 +1,143 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+.. py:currentmodule:: xrayspectrumanalyzergui.tests.gui.test_live_acquisition
+   :synopsis: Tests for the module :py:mod:`xrayspectrumanalyzergui.gui.live_acquisition`
+
+.. moduleauthor:: Hendrix Demers <hendrix.demers@mail.mcgill.ca>
+
+Tests for the module :py:mod:`xrayspectrumanalyzergui.gui.live_acquisition`.
+"""
+
+###############################################################################
+# GUI for the x-ray spectrum analyzer project
+# Copyright (C) 2017  Hendrix Demers
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+###############################################################################
+
+# Standard library modules.
+import unittest
+
+# Third party modules.
+from qtpy.QtWidgets import QApplication
+from qtpy.QtCore import QEventLoop, QTimer
+
+# Local modules.
+
+# Project modules.
+from xrayspectrumanalyzergui.gui.live_acquisition import LiveAcquisition
+from xrayspectrumanalyzergui.acquisition.simulator import AcquisitionSimulator
+
+# Globals and constants variables.
+
+
+class TestLiveAcquisition(unittest.TestCase):
+    """
+    TestCase class for the module `xrayspectrumanalyzergui.gui.live_acquisition`.
+    """
+
+    def setUp(self):
+        """
+        Setup method.
+        """
+
+        unittest.TestCase.setUp(self)
+
+        self.application = QApplication.instance() or QApplication([])
+
+    def tearDown(self):
+        """
+        Teardown method.
+        """
+
+        unittest.TestCase.tearDown(self)
+
+    def testSkeleton(self):
+        """
+        First test to check if the testcase is working with the testing framework.
+        """
+
+        # self.fail("Test if the testcase is working.")
+
+    def test_acquisition(self):
+        """
+        Test the spectrum is emitted at the frame rate, not for each packet, until the stream ends.
+        """
+
+        simulator = AcquisitionSimulator(("localhost", 0), count_rate_cps=2.0e5, packet_duration_s=0.001,
+                                         maximum_number_events=100000, seed=0)
+        simulator.start()
+        self.addCleanup(simulator.join, 5.0)
+        self.addCleanup(simulator.stop)
+
+        live_acquisition = LiveAcquisition(frame_rate_Hz=10.0)
+        spectra = []
+        messages = []
+        live_acquisition.spectrum_updated.connect(spectra.append)
+        live_acquisition.stopped.connect(messages.append)
+
+        loop = QEventLoop()
+        live_acquisition.stopped.connect(loop.quit)
+        QTimer.singleShot(10000, loop.quit)
+        live_acquisition.start(simulator.address)
+        self.assertTrue(live_acquisition.is_running())
+        loop.exec_()
+
+        self.assertFalse(live_acquisition.is_running())
+        self.assertEqual([""], messages)
+        self.assertEqual(100000, int(live_acquisition.spectrum.counts.sum()))
+        self.assertIs(spectra[-1], live_acquisition.spectrum)
+        # The stream lasts about 0.5 s: a few frames for about 500 packets.
+        self.assertLess(len(spectra), 20)
+        self.assertLess(len(spectra), live_acquisition.accumulator.revision)
+
+        live_acquisition.stop()
+        self.assertEqual(1, len(messages))
+
+        # self.fail("Test if the testcase is working.")
+
+    def test_connection_refused(self):
+        """
+        Test the error of the stream is emitted when the acquisition stops.
+        """
+
+        simulator = AcquisitionSimulator(("localhost", 0))
+        address = simulator.address
+        simulator.stop()
+        simulator.start()
+        simulator.join(5.0)
+
+        live_acquisition = LiveAcquisition()
+        messages = []
+        live_acquisition.stopped.connect(messages.append)
+
+        loop = QEventLoop()
+        live_acquisition.stopped.connect(loop.quit)
+        QTimer.singleShot(10000, loop.quit)
+        live_acquisition.start(address)
+        loop.exec_()
+
+        self.assertEqual(1, len(messages))
+        self.assertNotEqual("", messages[0])
+        self.assertIsNone(live_acquisition.spectrum)
+
+        # self.fail("Test if the testcase is working.")
+
+
+if __name__ == '__main__':  # pragma: no cover
+    import nose
+
+    nose.runmodule()
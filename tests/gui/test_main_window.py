@@ -30,13 +30,25 @@ Tests for the module :py:mod:`xrayspectrumanalyzergui.gui.main_window`.
 
 # Standard library modules.
 import unittest
+import os.path
+import tempfile
+import shutil
 
 # Third party modules.
+import numpy as np
+from qtpy.QtWidgets import QApplication
+from qtpy.QtCore import QEventLoop, QTimer, QStandardPaths
 
 # Local modules.
 
 # Project modules.
-# import xrayspectrumanalyzergui.gui.main_window
+from xrayspectrumanalyzergui.gui.main_window import MainWindow
+from xrayspectrumanalyzergui.gui import icons
+from xrayspectrumanalyzergui.model.spectrum_data import SpectrumData
+from xrayspectrumanalyzergui.acquisition.simulator import AcquisitionSimulator
+from xrayspectrumanalyzergui.file_format.spectrum_image import write_rpl, load_spectrum_image
+from xrayspectrumanalyzergui.analysis.background import BackgroundParameters, METHOD_POLYNOMIAL
+from xrayspectrumanalyzergui.gui.multi_spectrum import NORMALISATION_PEAK
 
 
 # Globals and constants variables.
@@ -53,6 +65,9 @@ class TestMainWindow(unittest.TestCase):
 
         unittest.TestCase.setUp(self)
 
+        self.application = QApplication.instance() or QApplication([])
+        QStandardPaths.setTestModeEnabled(True)
+
     def tearDown(self):
         """
         Teardown method.
@@ -60,6 +75,9 @@ class TestMainWindow(unittest.TestCase):
 
         unittest.TestCase.tearDown(self)
 
+        icons.unregister_resources()
+        QStandardPaths.setTestModeEnabled(False)
+
     def testSkeleton(self):
         """
         First test to check if the testcase is working with the testing framework.
@@ -67,6 +85,323 @@ class TestMainWindow(unittest.TestCase):
 
         # self.fail("Test if the testcase is working.")
 
+    def test_create_spectrum_widget(self):
+        """
+        Test the spectrum widget is created after the window is painted.
+        """
+
+        main_window = MainWindow()
+        self.assertIsNone(main_window.main_widget)
+
+        main_window.repaint()
+        for _index in range(100):
+            if main_window.main_widget is not None:
+                break
+            loop = QEventLoop()
+            QTimer.singleShot(10, loop.quit)
+            loop.exec_()
+
+        spectrum_widget = main_window.main_widget
+        self.assertIsNotNone(spectrum_widget)
+        self.assertIs(spectrum_widget, main_window.centralWidget())
+        self.assertIs(spectrum_widget, main_window.create_spectrum_widget())
+
+        main_window.close()
+
+        # self.fail("Test if the testcase is working.")
+
+    def test_autosave(self):
+        """
+        Test the project changes are autosaved and the session is removed when the window is closed.
+        """
+
+        main_window = MainWindow()
+        session_path = main_window.autosave.session_path
+        self.assertTrue(os.path.isdir(session_path))
+        self.assertEqual(main_window.autosave._record, main_window.project.change_callback)
+
+        main_window.project.set_elements(["Fe"])
+        self.assertTrue(main_window.autosave.sync(5.0))
+        self.assertTrue(main_window.project.is_modified())
+
+        folder = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, folder)
+        self.assertTrue(main_window._save_project(os.path.join(folder, "test.xsa")))
+        self.assertFalse(main_window.project.is_modified())
+
+        main_window.close()
+        self.assertFalse(os.path.isdir(session_path))
+
+        # self.fail("Test if the testcase is working.")
+
+    def test_identify_elements(self):
+        """
+        Test the identified elements of the current spectrum are added to the project.
+        """
+
+        energies_eV = 5.0 * np.arange(4096)
+        model = 100.0 + 2.0e5 * np.exp(-0.5 * ((energies_eV - 6403.84) / 55.0) ** 2) + \
+            1.0e5 * np.exp(-0.5 * ((energies_eV - 6390.84) / 55.0) ** 2) + \
+            3.0e4 * np.exp(-0.5 * ((energies_eV - 7057.98) / 57.0) ** 2)
+        spectrum = SpectrumData(np.random.RandomState(0).poisson(model), 0.0, 5.0)
+
+        main_window = MainWindow()
+        main_window.identify_elements()
+        self.assertEqual([], list(main_window.project.elements))
+
+        main_window.project.set_elements(["Si"])
+        main_window.show_spectrum(spectrum)
+        main_window.identify_elements()
+        self.assertEqual(["Si", "Fe"], list(main_window.project.elements))
+        self.assertEqual(2, main_window.element_model.rowCount())
+
+        main_window.identify_on_import_action.setChecked(True)
+        self.assertIsNotNone(main_window.import_service.analyzer)
+        main_window.identify_on_import_action.setChecked(False)
+        self.assertIsNone(main_window.import_service.analyzer)
+
+        folder = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, folder)
+        self.assertTrue(main_window._save_project(os.path.join(folder, "test.xsa")))
+        main_window.close()
+
+        # self.fail("Test if the testcase is working.")
+
+    def test_rois(self):
+        """
+        Test the integrals of all the spectra follow the ROI dragged in the canvas.
+        """
+
+        counts = np.full(4096, 10, dtype=np.uint16)
+        counts[1270:1290] += 100
+        spectra = [("spectrum_{:d}.msa".format(index), SpectrumData((index + 1) * counts, 0.0, 5.0))
+                   for index in range(3)]
+
+        main_window = MainWindow()
+        main_window.spectra_imported(spectra)
+        self.assertEqual(3, main_window.spectra_model.columnCount())
+
+        main_window.create_spectrum_widget().spectrum_canvas.axes.set_xlim(6000.0, 7000.0)
+        main_window.add_roi()
+        name, energy_min_eV, energy_max_eV, background_width_eV = main_window.project.rois[0]
+        self.assertEqual("ROI 1", name)
+        self.assertAlmostEqual(6475.0, energy_min_eV)
+        self.assertAlmostEqual(6525.0, energy_max_eV)
+        self.assertAlmostEqual(25.0, background_width_eV)
+        self.assertEqual(1, len(main_window.main_widget.spectrum_canvas.overlay.roi_spans))
+        self.assertEqual(4, main_window.spectra_model.columnCount())
+        self.assertEqual(1, main_window.roi_model.rowCount())
+
+        canvas = main_window.main_widget.spectrum_canvas
+        canvas.roi_changed.emit(0, 6347.5, 6447.5)
+        self.assertEqual((6475.0, 6525.0), main_window.project.rois[0][1:3])
+        model = main_window.spectra_model
+        net = [float(model.data(model.index(row, 3))) for row in range(3)]
+        np.testing.assert_allclose([2000.0, 4000.0, 6000.0], net)
+
+        canvas.roi_drag_finished.emit(0, 6347.5, 6447.5)
+        self.assertEqual((6347.5, 6447.5), main_window.project.rois[0][1:3])
+        self.assertEqual("ROI 1 (6348-6448 eV), background 25 eV",
+                         main_window.roi_model.data(main_window.roi_model.index(0)))
+
+        main_window.clear_rois()
+        self.assertEqual(3, main_window.spectra_model.columnCount())
+        self.assertEqual([], main_window.main_widget.spectrum_canvas.overlay.roi_spans)
+
+        # The pending events may read the spectra, before the project file is removed.
+        QApplication.processEvents()
+        folder = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, folder)
+        self.assertTrue(main_window._save_project(os.path.join(folder, "test.xsa")))
+        main_window.close()
+
+        # self.fail("Test if the testcase is working.")
+
+    def test_live_acquisition(self):
+        """
+        Test the live spectrum is shown during the acquisition and added to the project when it stops.
+        """
+
+        simulator = AcquisitionSimulator(("localhost", 0), count_rate_cps=1.0e5, maximum_number_events=20000, seed=0)
+        simulator.start()
+        self.addCleanup(simulator.join, 5.0)
+        self.addCleanup(simulator.stop)
+
+        main_window = MainWindow()
+        canvas = main_window.create_spectrum_widget().spectrum_canvas
+
+        loop = QEventLoop()
+        main_window.live_acquisition.stopped.connect(loop.quit)
+        QTimer.singleShot(10000, loop.quit)
+        main_window.live_acquisition.start(simulator.address)
+        main_window.start_live_action.setEnabled(False)
+        main_window.stop_live_action.setEnabled(True)
+        loop.exec_()
+
+        self.assertFalse(canvas.is_live())
+        self.assertTrue(main_window.start_live_action.isEnabled())
+        self.assertFalse(main_window.stop_live_action.isEnabled())
+        self.assertEqual(1, main_window.project.number_spectra)
+        self.assertEqual(20000, int(main_window.project.get_spectrum(0).counts.sum()))
+        self.assertGreater(np.max(canvas.spectrum_line.get_ydata()), 0)
+
+        QApplication.processEvents()
+        folder = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, folder)
+        self.assertTrue(main_window._save_project(os.path.join(folder, "test.xsa")))
+        main_window.close()
+
+        # self.fail("Test if the testcase is working.")
+
+    def test_spectrum_image(self):
+        """
+        Test a spectrum image is opened off the GUI thread and its pixels and regions shown from the map view.
+        """
+
+        folder = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, folder)
+        data = np.random.RandomState(0).poisson(5.0, (6, 8, 256)).astype(np.uint16)
+        file_path = os.path.join(folder, "map.rpl")
+        write_rpl(file_path, data, 0.0, 10.0)
+
+        main_window = MainWindow()
+        loop = QEventLoop()
+        main_window.spectrum_image_service.finished.connect(loop.quit)
+        QTimer.singleShot(10000, loop.quit)
+        main_window.spectrum_image_service.import_files([file_path])
+        loop.exec_()
+
+        self.assertEqual((6, 8, 256), main_window.spectrum_image.shape)
+        self.assertFalse(main_window.map_dock.isHidden())
+        np.testing.assert_array_equal(data.sum(axis=(0, 1)), main_window.current_spectrum.counts)
+        self.assertEqual(0, main_window.project.number_spectra)
+
+        main_window.map_view.pixel_selected.emit(2, 5)
+        np.testing.assert_array_equal(data[2, 5], main_window.current_spectrum.counts)
+
+        main_window.map_view.region_selected.emit(1, 3, 4, 8)
+        np.testing.assert_array_equal(data[1:3, 4:8].sum(axis=(0, 1)), main_window.current_spectrum.counts)
+
+        main_window.close()
+        self.assertIsNone(main_window.spectrum_image)
+
+        # self.fail("Test if the testcase is working.")
+
+    def test_element_maps(self):
+        """
+        Test the element maps of the ROIs are built by the process pool, shown and cached in the project.
+        """
+
+        folder = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, folder)
+        data = np.random.RandomState(0).poisson(5.0, (6, 8, 256)).astype(np.uint16)
+        file_path = os.path.join(folder, "map.rpl")
+        write_rpl(file_path, data, 0.0, 10.0)
+
+        main_window = MainWindow()
+        main_window.spectrum_image_loaded([(file_path, load_spectrum_image(file_path))])
+        main_window.set_rois([("Fe", 500.0, 700.0, 50.0), ("Cu", 1000.0, 1200.0)])
+        self.assertEqual(1, main_window.map_combo_box.count())
+
+        loop = QEventLoop()
+        main_window.element_map_service.maps_finished.connect(lambda rois, maps: QTimer.singleShot(0, loop.quit))
+        main_window.element_map_service.maps_failed.connect(loop.quit)
+        QTimer.singleShot(10000, loop.quit)
+        main_window.build_element_maps()
+        loop.exec_()
+
+        self.assertEqual(["Total counts", "Fe", "Cu"],
+                         [main_window.map_combo_box.itemText(index) for index in range(3)])
+        self.assertEqual(1, main_window.map_combo_box.currentIndex())
+        self.assertEqual((2, 6, 8), main_window.project.element_maps.shape)
+        expected_map = data[:, :, 101:120].sum(axis=2) + 0.5 * (data[:, :, 100] + data[:, :, 120])
+        np.testing.assert_allclose(expected_map, main_window.element_maps[1])
+
+        main_window.map_combo_box.setCurrentIndex(0)
+        main_window.set_rois([("Fe", 500.0, 700.0, 50.0)])
+        self.assertEqual(1, main_window.map_combo_box.count())
+
+        QApplication.processEvents()
+        main_window._save_project(os.path.join(folder, "maps.xsa"))
+        main_window.close()
+
+        # self.fail("Test if the testcase is working.")
+
+    def test_background(self):
+        """
+        Test the background is shown or subtracted and computed once per spectrum and parameters.
+        """
+
+        energies_eV = 5.0 * np.arange(4096)
+        model = 1000.0 * np.exp(-energies_eV / 4000.0) + 10.0 + \
+            1.0e4 * np.exp(-0.5 * ((energies_eV - 6400.0) / 55.0) ** 2)
+        spectrum = SpectrumData(np.random.RandomState(0).poisson(model), 0.0, 5.0)
+
+        main_window = MainWindow()
+        main_window.show_spectrum(spectrum)
+        canvas = main_window.main_widget.spectrum_canvas
+        self.assertEqual(0, len(canvas.background_line.get_xdata()))
+        self.assertEqual(0, len(main_window.background_cache))
+
+        main_window.show_background_action.setChecked(True)
+        self.assertEqual(4096, len(canvas.background_line.get_xdata()))
+        self.assertEqual(1, len(main_window.background_cache))
+
+        main_window.subtract_background_action.setChecked(True)
+        self.assertEqual(0, len(canvas.background_line.get_xdata()))
+        self.assertLess(np.median(canvas.spectrum_line.get_ydata()), 20.0)
+        self.assertEqual(1, len(main_window.background_cache))
+
+        main_window.set_background_parameters(BackgroundParameters(METHOD_POLYNOMIAL))
+        self.assertEqual(2, len(main_window.background_cache))
+
+        main_window.close()
+
+        # self.fail("Test if the testcase is working.")
+
+    def test_overlay_spectra(self):
+        """
+        Test the selected spectra are overlaid and their pyramids are kept when the normalisation changes.
+        """
+
+        counts = np.full(4096, 10, dtype=np.uint16)
+        counts[1270:1290] += 100
+        spectra = [("spectrum_{:d}.msa".format(index), SpectrumData((index + 1) * counts, 0.0, 5.0))
+                   for index in range(3)]
+
+        main_window = MainWindow()
+        main_window.spectra_imported(spectra)
+        canvas = main_window.create_spectrum_widget().spectrum_canvas
+
+        main_window.spectra_list_view.selectAll()
+        self.assertEqual([0, 1, 2], main_window.get_selected_spectrum_indexes())
+        self.assertFalse(canvas.is_multi_spectrum())
+
+        main_window.overlay_spectra_action.setChecked(True)
+        self.assertTrue(canvas.is_multi_spectrum())
+        self.assertEqual(3, len(canvas.multi_spectrum_lines.get_segments()))
+        self.assertEqual(0, len(canvas.spectrum_line.get_xdata()))
+        self.assertAlmostEqual(330.0 * 1.05, canvas.axes.get_ylim()[1])
+
+        multi_spectrum = main_window.get_multi_spectrum([0, 1, 2])
+        main_window.set_normalisation(NORMALISATION_PEAK)
+        self.assertIs(multi_spectrum, main_window.get_multi_spectrum([0, 1, 2]))
+        self.assertAlmostEqual(1.05, canvas.axes.get_ylim()[1])
+        checked_actions = [action for action in main_window.normalisation_action_group.actions() if action.isChecked()]
+        self.assertEqual([NORMALISATION_PEAK], [action.data() for action in checked_actions])
+
+        main_window.spectra_list_view.selectRow(1)
+        self.assertFalse(canvas.is_multi_spectrum())
+        self.assertEqual(220.0, np.max(canvas.spectrum_line.get_ydata()))
+
+        QApplication.processEvents()
+        folder = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, folder)
+        self.assertTrue(main_window._save_project(os.path.join(folder, "test.xsa")))
+        main_window.close()
+
+        # self.fail("Test if the testcase is working.")
+
 
 if __name__ == '__main__':  # pragma: no cover
     import nose
@@ -0,0 +1,135 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+.. py:currentmodule:: xrayspectrumanalyzergui.tests.gui.test_map_view
+   :synopsis: Tests for the module :py:mod:`xrayspectrumanalyzergui.gui.map_view`
+
+.. moduleauthor:: Hendrix Demers <hendrix.demers@mail.mcgill.ca>
+
+Tests for the module :py:mod:`xrayspectrumanalyzergui.gui.map_view`.
+"""
+
+###############################################################################
+# GUI for the x-ray spectrum analyzer project
+# Copyright (C) 2017  Hendrix Demers
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+###############################################################################
+
+# Standard library modules.
+import unittest
+
+# Third party modules.
+import numpy as np
+from qtpy.QtWidgets import QApplication
+from qtpy.QtCore import Qt, QPoint
+from qtpy.QtTest import QTest
+
+# Local modules.
+
+# Project modules.
+from xrayspectrumanalyzergui.gui.map_view import MapView, create_grayscale
+
+# Globals and constants variables.
+
+
+class TestMapView(unittest.TestCase):
+    """
+    TestCase class for the module `xrayspectrumanalyzergui.gui.map_view`.
+    """
+
+    def setUp(self):
+        """
+        Setup method.
+        """
+
+        unittest.TestCase.setUp(self)
+
+        self.application = QApplication.instance() or QApplication([])
+
+    def tearDown(self):
+        """
+        Teardown method.
+        """
+
+        unittest.TestCase.tearDown(self)
+
+    def testSkeleton(self):
+        """
+        First test to check if the testcase is working with the testing framework.
+        """
+
+        # self.fail("Test if the testcase is working.")
+
+    def test_create_grayscale(self):
+        """
+        Test create_grayscale scale the image to uint8.
+        """
+
+        grayscale = create_grayscale(np.arange(4.0).reshape(2, 2))
+        self.assertEqual(np.uint8, grayscale.dtype)
+        np.testing.assert_array_equal([[0, 85], [170, 255]], grayscale)
+
+        # The outliers are saturated, they do not darken the other pixels.
+        grayscale = create_grayscale(np.append(np.arange(1000.0), 1.0e6))
+        self.assertEqual(255, grayscale[-1])
+        self.assertAlmostEqual(128, grayscale[500], delta=1)
+        np.testing.assert_array_equal(np.zeros((2, 2)), create_grayscale(np.ones((2, 2))))
+
+        # self.fail("Test if the testcase is working.")
+
+    def test_select(self):
+        """
+        Test a click select a pixel and a drag select a region.
+        """
+
+        map_view = MapView()
+        map_view.resize(200, 100)
+        map_view.set_image(np.arange(12.0).reshape(3, 4))
+        map_view.show()
+        self.application.processEvents()
+
+        pixels = []
+        regions = []
+        map_view.pixel_selected.connect(lambda row, column: pixels.append((row, column)))
+        map_view.region_selected.connect(lambda *region: regions.append(region))
+
+        # The image of 4 x 3 pixels is painted from x = 33.3 to 166.7, 33.3 pixels per pixel.
+        self.assertEqual((2, 3), map_view.map_to_pixel(QPoint(150, 90)))
+        self.assertIsNone(map_view.map_to_pixel(QPoint(10, 50)))
+
+        QTest.mouseClick(map_view, Qt.LeftButton, pos=QPoint(80, 50))
+        self.assertEqual([(1, 1)], pixels)
+
+        QTest.mousePress(map_view, Qt.LeftButton, pos=QPoint(150, 90))
+        QTest.mouseMove(map_view, QPoint(60, 10))
+        QTest.mouseRelease(map_view, Qt.LeftButton, pos=QPoint(5, 10))
+        self.assertEqual([(0, 3, 0, 4)], regions)
+        self.assertEqual((0, 3, 0, 4), map_view.selection)
+
+        map_view.clear()
+        self.assertIsNone(map_view.selection)
+        QTest.mouseClick(map_view, Qt.LeftButton, pos=QPoint(80, 50))
+        self.assertEqual(1, len(pixels))
+
+        map_view.close()
+
+        # self.fail("Test if the testcase is working.")
+
+
+if __name__ == '__main__':  # pragma: no cover
+    import nose
+
+    nose.runmodule()
@@ -0,0 +1,158 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+.. py:currentmodule:: xrayspectrumanalyzergui.tests.gui.test_multi_spectrum
+   :synopsis: Tests for the module :py:mod:`xrayspectrumanalyzergui.gui.multi_spectrum`
+
+.. moduleauthor:: Hendrix Demers <hendrix.demers@mail.mcgill.ca>
+
+Tests for the module :py:mod:`xrayspectrumanalyzergui.gui.multi_spectrum`.
+"""
+
+###############################################################################
+# GUI for the x-ray spectrum analyzer project
+# Copyright (C) 2017  Hendrix Demers
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+###############################################################################
+
+# Standard library modules.
+import unittest
+
+# Third party modules.
+import numpy as np
+
+# Local modules.
+
+# Project modules.
+from xrayspectrumanalyzergui.model.spectrum_data import SpectrumData
+from xrayspectrumanalyzergui.gui.multi_spectrum import MultiSpectrum, get_normalisation_factors, NORMALISATIONS, \
+    NORMALISATION_NONE, NORMALISATION_LIVE_TIME, NORMALISATION_TOTAL_COUNTS, NORMALISATION_PEAK
+
+# Globals and constants variables.
+
+
+class TestMultiSpectrum(unittest.TestCase):
+    """
+    TestCase class for the module `xrayspectrumanalyzergui.gui.multi_spectrum`.
+    """
+
+    def setUp(self):
+        """
+        Setup method.
+        """
+
+        unittest.TestCase.setUp(self)
+
+        energies_eV = np.arange(2048) * 10.0
+        self.spectra = []
+        for index in range(3):
+            counts = np.full(2048, 10.0 * (index + 1))
+            counts[1000] = 100.0 * (index + 1)
+            metadata = {"LIVETIME": "{:g}".format(2.0 * index)}
+            self.spectra.append(SpectrumData.from_energies(energies_eV + 100.0 * index, counts, metadata))
+
+    def tearDown(self):
+        """
+        Teardown method.
+        """
+
+        unittest.TestCase.tearDown(self)
+
+    def testSkeleton(self):
+        """
+        First test to check if the testcase is working with the testing framework.
+        """
+
+        # self.fail("Test if the testcase is working.")
+
+    def test_get_normalisation_factors(self):
+        """
+        Test the factors of each normalisation, spectra without a value are not scaled.
+        """
+
+        live_times_s = [0.0, 2.0, 4.0]
+        total_counts = [10.0, 0.0, 40.0]
+        peaks = [5.0, 10.0, -1.0]
+
+        factors = get_normalisation_factors(NORMALISATION_NONE, live_times_s, total_counts, peaks)
+        np.testing.assert_array_equal([1.0, 1.0, 1.0], factors)
+        factors = get_normalisation_factors(NORMALISATION_LIVE_TIME, live_times_s, total_counts, peaks)
+        np.testing.assert_array_equal([1.0, 0.5, 0.25], factors)
+        factors = get_normalisation_factors(NORMALISATION_TOTAL_COUNTS, live_times_s, total_counts, peaks)
+        np.testing.assert_array_equal([0.1, 1.0, 0.025], factors)
+        factors = get_normalisation_factors(NORMALISATION_PEAK, live_times_s, total_counts, peaks)
+        np.testing.assert_array_equal([0.2, 0.1, 1.0], factors)
+
+        self.assertRaises(ValueError, get_normalisation_factors, "area", live_times_s, total_counts, peaks)
+
+        # self.fail("Test if the testcase is working.")
+
+    def test_multi_spectrum(self):
+        """
+        Test the values read from the spectra and the limits.
+        """
+
+        multi_spectrum = MultiSpectrum(self.spectra)
+
+        self.assertEqual(3, multi_spectrum.number_spectra)
+        np.testing.assert_array_equal([0.0, 2.0, 4.0], multi_spectrum.live_times_s)
+        np.testing.assert_array_equal([10.0 * 2047 + 100.0, 20.0 * 2047 + 200.0, 30.0 * 2047 + 300.0],
+                                      multi_spectrum.total_counts)
+        np.testing.assert_array_equal([100.0, 200.0, 300.0], multi_spectrum.peaks)
+
+        self.assertEqual((0.0, 20670.0), multi_spectrum.get_x_limits())
+        self.assertEqual((10.0, 300.0), multi_spectrum.get_y_limits(multi_spectrum.get_factors(NORMALISATION_NONE)))
+        self.assertEqual((0.1, 1.0), multi_spectrum.get_y_limits(multi_spectrum.get_factors(NORMALISATION_PEAK)))
+
+        for normalisation in NORMALISATIONS:
+            self.assertEqual(3, multi_spectrum.get_factors(normalisation).size)
+
+        multi_spectrum = MultiSpectrum(self.spectra, live_times_s=[1.0, 1.0, 1.0], total_counts=[1.0, 2.0, 3.0])
+        np.testing.assert_array_equal([1.0, 0.5, 1.0 / 3.0], multi_spectrum.get_factors(NORMALISATION_TOTAL_COUNTS))
+
+        multi_spectrum = MultiSpectrum([])
+        self.assertIsNone(multi_spectrum.get_x_limits())
+        self.assertEqual(0, multi_spectrum.get_factors(NORMALISATION_PEAK).size)
+
+        # self.fail("Test if the testcase is working.")
+
+    def test_get_segments(self):
+        """
+        Test the segments are the scaled envelopes of the visible range.
+        """
+
+        multi_spectrum = MultiSpectrum(self.spectra)
+        factors = multi_spectrum.get_factors(NORMALISATION_PEAK)
+
+        segments = multi_spectrum.get_segments(0.0, 30000.0, 100, factors)
+        self.assertEqual(3, len(segments))
+        for segment in segments:
+            self.assertEqual(2, segment.shape[1])
+            self.assertLessEqual(segment.shape[0], 4 * 100)
+            self.assertEqual(1.0, np.max(segment[:, 1]))
+        self.assertIn(10100.0, segments[1][:, 0])
+
+        segments = multi_spectrum.get_segments(5000.0, 5100.0, 800, factors)
+        np.testing.assert_array_equal(np.arange(499, 512) * 10.0, segments[0][:, 0])
+        np.testing.assert_array_equal(np.full(13, 0.1), segments[0][:, 1])
+
+        # self.fail("Test if the testcase is working.")
+
+
+if __name__ == '__main__':  # pragma: no cover
+    import nose
+
+    nose.runmodule()
@@ -0,0 +1,246 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+.. py:currentmodule:: xrayspectrumanalyzergui.tests.gui.test_project_models
+   :synopsis: Tests for the module :py:mod:`xrayspectrumanalyzergui.gui.project_models`
+
+.. moduleauthor:: Hendrix Demers <hendrix.demers@mail.mcgill.ca>
+
+Tests for the module :py:mod:`xrayspectrumanalyzergui.gui.project_models`.
+"""
+
+###############################################################################
+# GUI for the x-ray spectrum analyzer project
+# Copyright (C) 2017  Hendrix Demers
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+###############################################################################
+
+# Standard library modules.
+import unittest
+
+# Third party modules.
+import numpy as np
+from qtpy.QtWidgets import QApplication
+from qtpy.QtCore import Qt, QEventLoop, QTimer
+from qtpy.QtGui import QPixmap
+
+# Local modules.
+
+# Project modules.
+from xrayspectrumanalyzergui.gui.project_models import SpectraTableModel, RoiListModel, ElementListModel
+from xrayspectrumanalyzergui.gui.thumbnails import ThumbnailService
+from xrayspectrumanalyzergui.model.project import Project
+from xrayspectrumanalyzergui.model.spectrum_data import SpectrumData
+
+# Globals and constants variables.
+
+
+class TestProjectModels(unittest.TestCase):
+    """
+    TestCase class for the module `xrayspectrumanalyzergui.gui.project_models`.
+    """
+
+    def setUp(self):
+        """
+        Setup method.
+        """
+
+        unittest.TestCase.setUp(self)
+
+        self.application = QApplication.instance() or QApplication([])
+
+        self.project = Project()
+        for index in range(25):
+            metadata = {"LIVETIME": str(100.0 - index)}
+            self.project.add_spectrum(SpectrumData(np.full(10, index % 7), metadata=metadata),
+                                      "spectrum_{:02d}.msa".format(index))
+
+        self.model = SpectraTableModel(self.project, fetch_size=10)
+
+    def tearDown(self):
+        """
+        Teardown method.
+        """
+
+        unittest.TestCase.tearDown(self)
+
+    def testSkeleton(self):
+        """
+        First test to check if the testcase is working with the testing framework.
+        """
+
+        # self.fail("Test if the testcase is working.")
+
+    def test_fetch_more(self):
+        """
+        Test the rows are fetched by batches.
+        """
+
+        self.assertEqual(0, self.model.rowCount())
+        self.assertEqual(3, self.model.columnCount())
+        self.assertTrue(self.model.canFetchMore())
+
+        self.model.fetchMore()
+        self.model.fetchMore()
+        self.assertEqual(20, self.model.rowCount())
+        self.model.fetchMore()
+        self.assertEqual(25, self.model.rowCount())
+        self.assertFalse(self.model.canFetchMore())
+
+        self.assertEqual("spectrum_03.msa", self.model.data(self.model.index(3, 0)))
+        self.assertEqual("97.00", self.model.data(self.model.index(3, 1)))
+        self.assertEqual("30", self.model.data(self.model.index(3, 2)))
+        self.assertEqual("Live time (s)", self.model.headerData(1, Qt.Horizontal))
+
+        # self.fail("Test if the testcase is working.")
+
+    def test_sort(self):
+        """
+        Test the sort permutes the rows and keeps the persistent indexes.
+        """
+
+        self.model.fetchMore()
+
+        self.model.sort(1, Qt.AscendingOrder)
+        self.assertEqual("spectrum_24.msa", self.model.data(self.model.index(0, 0)))
+        self.assertEqual(24, self.model.get_spectrum_index(0))
+
+        self.model.sort(2, Qt.DescendingOrder)
+        total_counts = [float(self.model.data(self.model.index(row, 2))) for row in range(10)]
+        self.assertEqual(sorted(total_counts, reverse=True), total_counts)
+
+        self.model.sort(0, Qt.AscendingOrder)
+        self.assertEqual(0, self.model.get_spectrum_index(0))
+
+        # self.fail("Test if the testcase is working.")
+
+    def test_spectra_added(self):
+        """
+        Test the added spectra are inserted in one batch.
+        """
+
+        while self.model.canFetchMore():
+            self.model.fetchMore()
+
+        inserted_rows = []
+        self.model.rowsInserted.connect(lambda parent, first, last: inserted_rows.append((first, last)))
+
+        for index in range(3):
+            self.project.add_spectrum(SpectrumData(np.ones(10)), "new_{:d}.msa".format(index))
+        self.model.spectra_added()
+
+        self.assertEqual([(25, 27)], inserted_rows)
+        self.assertEqual(28, self.model.rowCount())
+        self.assertEqual("new_2.msa", self.model.data(self.model.index(27, 0)))
+
+        self.model.sort(0, Qt.DescendingOrder)
+        self.project.add_spectrum(SpectrumData(np.ones(10)), "z.msa")
+        self.model.spectra_added()
+        self.assertEqual("z.msa", self.model.data(self.model.index(0, 0)))
+
+        # self.fail("Test if the testcase is working.")
+
+    def test_thumbnail(self):
+        """
+        Test the thumbnail of a row is rendered and the row is updated.
+        """
+
+        thumbnail_service = ThumbnailService()
+        model = SpectraTableModel(self.project, fetch_size=10, thumbnail_service=thumbnail_service)
+        model.fetchMore()
+        model.sort(1, Qt.AscendingOrder)
+
+        changed_rows = []
+        loop = QEventLoop()
+        model.dataChanged.connect(lambda top_left, bottom_right, roles: changed_rows.append(top_left.row()))
+        model.dataChanged.connect(loop.quit)
+
+        self.assertIsNone(model.data(model.index(2, 0), Qt.DecorationRole))
+        self.assertIsNone(model.data(model.index(2, 1), Qt.DecorationRole))
+        QTimer.singleShot(5000, loop.quit)
+        loop.exec_()
+
+        self.assertEqual([2], changed_rows)
+        self.assertIsInstance(model.data(model.index(2, 0), Qt.DecorationRole), QPixmap)
+
+        thumbnail_service.shutdown()
+
+        # self.fail("Test if the testcase is working.")
+
+    def test_roi_integrals(self):
+        """
+        Test the ROI columns are added, updated, sorted and removed.
+        """
+
+        self.model.fetchMore()
+
+        columns = []
+        self.model.columnsInserted.connect(lambda parent, first, last: columns.append((first, last)))
+        changes = []
+        self.model.dataChanged.connect(lambda top_left, bottom_right, roles: changes.append(bottom_right.column()))
+
+        values = np.column_stack((np.arange(25.0), 100.0 - np.arange(25.0)))
+        self.model.set_roi_integrals(["Fe Ka", "Cr Ka"], values)
+
+        self.assertEqual([(3, 4)], columns)
+        self.assertEqual(5, self.model.columnCount())
+        self.assertEqual("Cr Ka net", self.model.headerData(4, Qt.Horizontal))
+        self.assertEqual("97", self.model.data(self.model.index(3, 4)))
+
+        self.model.set_roi_integrals(["Fe Ka", "Cr Ka"], 2.0 * values)
+        self.assertEqual(5, self.model.columnCount())
+        self.assertEqual("194", self.model.data(self.model.index(3, 4)))
+        self.assertEqual([4, 4], changes)
+
+        self.model.set_roi_integral(0, np.full(25, 7.0))
+        self.assertEqual("7", self.model.data(self.model.index(3, 3)))
+        self.assertEqual("194", self.model.data(self.model.index(3, 4)))
+        self.assertEqual([4, 4, 3], changes)
+
+        self.model.sort(4, Qt.AscendingOrder)
+        self.assertEqual(24, self.model.get_spectrum_index(0))
+
+        self.model.set_roi_integrals([], None)
+        self.assertEqual(3, self.model.columnCount())
+
+        # self.fail("Test if the testcase is working.")
+
+    def test_list_models(self):
+        """
+        Test the ROI and element models.
+        """
+
+        roi_model = RoiListModel(self.project)
+        element_model = ElementListModel(self.project)
+        self.assertEqual(0, roi_model.rowCount())
+
+        self.project.set_rois([("Fe Ka", 6300.0, 6500.0), ("Cr Ka", 5300.0, 5500.0, 100.0)])
+        self.project.set_elements(["Fe", "Si"])
+        roi_model.refresh()
+        element_model.refresh()
+
+        self.assertEqual("Fe Ka (6300-6500 eV)", roi_model.data(roi_model.index(0)))
+        self.assertEqual("Cr Ka (5300-5500 eV), background 100 eV", roi_model.data(roi_model.index(1)))
+        self.assertEqual(2, element_model.rowCount())
+        self.assertEqual("Si", element_model.data(element_model.index(1)))
+
+        # self.fail("Test if the testcase is working.")
+
+
+if __name__ == '__main__':  # pragma: no cover
+    import nose
+
+    nose.runmodule()
@@ -0,0 +1,180 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+.. py:currentmodule:: xrayspectrumanalyzergui.tests.gui.test_spectrum_overlay
+   :synopsis: Tests for the module :py:mod:`xrayspectrumanalyzergui.gui.spectrum_overlay`
+
+.. moduleauthor:: Hendrix Demers <hendrix.demers@mail.mcgill.ca>
+
+Tests for the module :py:mod:`xrayspectrumanalyzergui.gui.spectrum_overlay`.
+"""
+
+###############################################################################
+# GUI for the x-ray spectrum analyzer project
+# Copyright (C) 2017  Hendrix Demers
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+###############################################################################
+
+# Standard library modules.
+import unittest
+
+# Third party modules.
+import numpy as np
+from qtpy.QtWidgets import QApplication
+from matplotlib.backend_bases import MouseEvent
+
+# Local modules.
+
+# Project modules.
+from xrayspectrumanalyzergui.model.spectrum_data import SpectrumData
+from xrayspectrumanalyzergui.gui.spectrum_widget import SpectrumCanvas
+
+# Globals and constants variables.
+
+
+class TestSpectrumOverlay(unittest.TestCase):
+    """
+    TestCase class for the module `xrayspectrumanalyzergui.gui.spectrum_overlay`.
+    """
+
+    def setUp(self):
+        """
+        Setup method.
+        """
+
+        unittest.TestCase.setUp(self)
+
+        self.application = QApplication.instance() or QApplication([])
+
+        self.canvas = SpectrumCanvas(width=5, height=4, dpi=100)
+        energies_eV = np.arange(1024) * 10.0
+        counts = np.arange(1024) * 2.0
+        self.canvas.update_figure(SpectrumData.from_energies(energies_eV, counts))
+        self.canvas.draw()
+
+        self.overlay = self.canvas.overlay
+
+    def tearDown(self):
+        """
+        Teardown method.
+        """
+
+        unittest.TestCase.tearDown(self)
+
+        self.canvas.close()
+
+    def _mouse_event(self, name, energy_eV, intensity, button=None):
+        x, y = self.canvas.axes.transData.transform((energy_eV, intensity))
+        MouseEvent(name, self.canvas, x, y, button=button)._process()
+
+    def testSkeleton(self):
+        """
+        First test to check if the testcase is working with the testing framework.
+        """
+
+        # self.fail("Test if the testcase is working.")
+
+    def test_crosshair(self):
+        """
+        Test the crosshair follow the mouse without a full draw.
+        """
+
+        draw_events = []
+        self.canvas.mpl_connect("draw_event", draw_events.append)
+
+        self._mouse_event("motion_notify_event", 5000.0, 100.0)
+
+        self.assertTrue(self.overlay.vertical_line.get_visible())
+        self.assertAlmostEqual(5000.0, self.overlay.vertical_line.get_xdata()[0], delta=10.0)
+        self.assertIn("I = 1000", self.overlay.readout_text.get_text())
+        self.assertEqual([], draw_events)
+
+        # self.fail("Test if the testcase is working.")
+
+    def test_identify_callback(self):
+        """
+        Test the label of the identify callback is shown in the readout.
+        """
+
+        energies = []
+
+        def identify_callback(energy_eV):
+            energies.append(energy_eV)
+            return "Fe Ka1"
+
+        self.overlay.identify_callback = identify_callback
+        self._mouse_event("motion_notify_event", 6400.0, 100.0)
+
+        self.assertEqual(1, len(energies))
+        self.assertTrue(self.overlay.readout_text.get_text().endswith("\nFe Ka1"))
+
+        # self.fail("Test if the testcase is working.")
+
+    def test_drag_roi(self):
+        """
+        Test dragging the edge of a ROI.
+        """
+
+        roi_changes = []
+        self.canvas.roi_changed.connect(lambda *args: roi_changes.append(args))
+        finished_drags = []
+        self.canvas.roi_drag_finished.connect(lambda *args: finished_drags.append(args))
+
+        index = self.overlay.add_roi(2000.0, 3000.0, 200.0)
+
+        self._mouse_event("button_press_event", 3000.0, 100.0, button=1)
+        self._mouse_event("motion_notify_event", 3500.0, 100.0)
+        self._mouse_event("button_release_event", 3500.0, 100.0, button=1)
+        self._mouse_event("motion_notify_event", 6000.0, 100.0)
+
+        energy_min_eV, energy_max_eV = self.overlay.get_roi(index)
+        self.assertEqual(2000.0, energy_min_eV)
+        self.assertAlmostEqual(3500.0, energy_max_eV, delta=10.0)
+        self.assertEqual(1, len(roi_changes))
+        self.assertEqual(index, roi_changes[0][0])
+        self.assertEqual([(index, energy_min_eV, energy_max_eV)], finished_drags)
+
+        left_span, right_span = self.overlay.roi_background_spans[index]
+        self.assertEqual(1800.0, left_span.get_x())
+        self.assertEqual(energy_max_eV, right_span.get_x())
+        self.assertEqual(200.0, right_span.get_width())
+
+        self.overlay.clear_rois()
+        self.assertEqual([], self.overlay.roi_spans)
+        self.assertEqual([], self.overlay.roi_background_spans)
+
+        # self.fail("Test if the testcase is working.")
+
+    def test_set_line_markers(self):
+        """
+        Test the line markers are replaced.
+        """
+
+        self.overlay.set_line_markers([(1740.0, "Si Ka"), (8040.0, "Cu Ka")])
+        self.assertEqual(2, len(self.overlay.marker_lines))
+        self.assertEqual("Cu Ka", self.overlay.marker_texts[1].get_text())
+
+        self.overlay.set_line_markers([(6400.0, "Fe Ka")])
+        self.assertEqual(1, len(self.overlay.marker_lines))
+        self.assertTrue(self.overlay.marker_lines[0].get_animated())
+
+        # self.fail("Test if the testcase is working.")
+
+
+if __name__ == '__main__':  # pragma: no cover
+    import nose
+
+    nose.runmodule()
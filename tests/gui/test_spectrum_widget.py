@@ -30,17 +30,26 @@ Tests for the module :py:mod:`xrayspectrumanalyzergui.gui.spectrum_widget`.
 
 # Standard library modules.
 import unittest
+import os.path
+import tempfile
+import shutil
 
 # Third party modules.
+import numpy as np
+from qtpy.QtWidgets import QApplication
+from qtpy.QtCore import QMimeData, QUrl, QEventLoop, QTimer
 
 # Local modules.
 
 # Project modules.
-# import xrayspectrumanalyzergui.gui.spectrum_widget
+from xrayspectrumanalyzergui.model.spectrum_data import SpectrumData
+from xrayspectrumanalyzergui.gui.spectrum_widget import SpectrumCanvas, RESIZE_DELAY_ms, LIVE_Y_LIMIT_GROWTH
+from xrayspectrumanalyzergui.gui.multi_spectrum import MultiSpectrum, NORMALISATION_LIVE_TIME
 
 
 # Globals and constants variables.
 
+
 class TestSpectrumWidget(unittest.TestCase):
     """
     TestCase class for the module `xrayspectrumanalyzergui.gui.spectrum_widget`.
@@ -53,6 +62,8 @@ class TestSpectrumWidget(unittest.TestCase):
 
         unittest.TestCase.setUp(self)
 
+        self.application = QApplication.instance() or QApplication([])
+
     def tearDown(self):
         """
         Teardown method.
@@ -67,6 +78,220 @@ class TestSpectrumWidget(unittest.TestCase):
 
         # self.fail("Test if the testcase is working.")
 
+    def test_update_figure(self):
+        """
+        Test update_figure reuse the line artist and only change the limits when needed.
+        """
+
+        canvas = SpectrumCanvas()
+        line = canvas.spectrum_line
+        lines = list(canvas.axes.lines)
+
+        energies_eV = np.arange(1024) * 10.0
+        canvas.update_figure(SpectrumData.from_energies(energies_eV, np.ones(1024) * 100.0))
+        self.assertEqual(lines, list(canvas.axes.lines))
+        self.assertEqual((0.0, 10230.0), canvas.axes.get_xlim())
+        self.assertEqual((0.0, 105.0), canvas.axes.get_ylim())
+
+        canvas.axes.set_xlim(1000.0, 2000.0)
+        canvas.update_figure(SpectrumData.from_energies(energies_eV, np.ones(1024) * 100.0))
+        self.assertEqual(lines, list(canvas.axes.lines))
+        self.assertEqual((1000.0, 2000.0), canvas.axes.get_xlim())
+
+        counts = np.arange(1024.0)
+        canvas.update_figure(SpectrumData.from_energies(energies_eV, counts))
+        self.assertEqual(1023.0, np.max(line.get_ydata()))
+        self.assertEqual((0.0, 10230.0), canvas.axes.get_xlim())
+
+        # self.fail("Test if the testcase is working.")
+
+    def test_update_live_figure(self):
+        """
+        Test the live spectrum is blitted and the figure only drawn when the y limit grows.
+        """
+
+        canvas = SpectrumCanvas()
+        canvas.resize(300, 200)
+        canvas.show()
+        self.application.processEvents()
+
+        draw_events = []
+        canvas.mpl_connect("draw_event", draw_events.append)
+        energies_eV = np.arange(1024) * 10.0
+        counts = np.zeros(1024)
+
+        counts[100] = 100.0
+        canvas.update_live_figure(SpectrumData.from_energies(energies_eV, counts))
+        self.assertTrue(canvas.is_live())
+        self.assertTrue(canvas.spectrum_line.get_animated())
+        self.assertIn(canvas.spectrum_line, canvas.overlay.get_animated_artists())
+        self.assertEqual((0.0, 100.0 * LIVE_Y_LIMIT_GROWTH), canvas.axes.get_ylim())
+        self.application.processEvents()
+        number_draws = len(draw_events)
+
+        for _ in range(5):
+            counts[100] += 5.0
+            canvas.update_live_figure(SpectrumData.from_energies(energies_eV, counts))
+            self.application.processEvents()
+        self.assertEqual(number_draws, len(draw_events))
+        self.assertEqual(125.0, np.max(canvas.spectrum_line.get_ydata()))
+
+        counts[100] = 200.0
+        canvas.update_live_figure(SpectrumData.from_energies(energies_eV, counts))
+        self.assertEqual((0.0, 200.0 * LIVE_Y_LIMIT_GROWTH), canvas.axes.get_ylim())
+
+        canvas.set_live(False)
+        self.assertFalse(canvas.spectrum_line.get_animated())
+        self.assertNotIn(canvas.spectrum_line, canvas.overlay.get_animated_artists())
+
+        canvas.close()
+
+        # self.fail("Test if the testcase is working.")
+
+    def test_set_background(self):
+        """
+        Test set_background show and hide the background line.
+        """
+
+        canvas = SpectrumCanvas()
+        energies_eV = np.arange(1024) * 10.0
+        background = np.linspace(100.0, 10.0, 1024)
+
+        canvas.set_background(energies_eV, background)
+        np.testing.assert_array_equal(background, canvas.background_line.get_ydata())
+
+        canvas.set_background(energies_eV, None)
+        self.assertEqual(0, len(canvas.background_line.get_xdata()))
+
+        # self.fail("Test if the testcase is working.")
+
+    def test_update_multi_spectrum_figure(self):
+        """
+        Test the spectra are drawn with one line collection, one colour per spectrum.
+        """
+
+        canvas = SpectrumCanvas()
+        energies_eV = np.arange(65536) * 0.5
+        spectra = [SpectrumData.from_energies(energies_eV, np.full(65536, 100.0 * (index + 1)),
+                                              {"LIVETIME": "{:g}".format(index + 1)}) for index in range(200)]
+        multi_spectrum = MultiSpectrum(spectra)
+
+        canvas.update_figure(spectra[0])
+        collections = list(canvas.axes.collections)
+        canvas.update_multi_spectrum_figure(multi_spectrum, NORMALISATION_LIVE_TIME)
+        self.assertEqual(collections, list(canvas.axes.collections))
+        self.assertTrue(canvas.is_multi_spectrum())
+        self.assertEqual(0, len(canvas.spectrum_line.get_xdata()))
+        self.assertEqual("Intensity (counts/s)", canvas.axes.get_ylabel())
+        self.assertEqual(0.0, canvas.axes.get_ylim()[0])
+        self.assertAlmostEqual(105.0, canvas.axes.get_ylim()[1])
+
+        segments = canvas.multi_spectrum_lines.get_segments()
+        self.assertEqual(200, len(segments))
+        self.assertLessEqual(len(segments[0]), 4 * canvas.axes.bbox.width)
+        np.testing.assert_allclose(100.0, segments[199][:, 1])
+        self.assertEqual(200, len(np.unique(canvas.multi_spectrum_lines.get_colors(), axis=0)))
+
+        canvas.axes.set_xlim(1000.0, 1100.0)
+        segments = canvas.multi_spectrum_lines.get_segments()
+        self.assertEqual(203, len(segments[0]))
+
+        canvas.update_figure(spectra[0])
+        self.assertFalse(canvas.is_multi_spectrum())
+        self.assertEqual(0, len(canvas.multi_spectrum_lines.get_segments()))
+        self.assertEqual("Intensity", canvas.axes.get_ylabel())
+
+        # self.fail("Test if the testcase is working.")
+
+    def test_update_figure_level_of_detail(self):
+        """
+        Test only the envelope of the visible range is plotted.
+        """
+
+        canvas = SpectrumCanvas()
+
+        number_channels = 65536
+        energies_eV = np.arange(number_channels) * 0.5
+        counts = np.random.RandomState(0).poisson(100.0, number_channels).astype(np.float64)
+        counts[40000] = 1.0e6
+        canvas.update_figure(SpectrumData.from_energies(energies_eV, counts))
+
+        line = canvas.spectrum_line
+        self.assertLess(len(line.get_xdata()), 4 * canvas.axes.bbox.width + 4)
+        self.assertIn(20000.0, line.get_xdata())
+        self.assertEqual(1.0e6, np.max(line.get_ydata()))
+
+        canvas.axes.set_xlim(19990.0, 20010.0)
+        np.testing.assert_array_equal(energies_eV[39979:40022], line.get_xdata())
+
+        # self.fail("Test if the testcase is working.")
+
+    def test_resize_event(self):
+        """
+        Test the figure is resized once the resize events settle.
+        """
+
+        canvas = SpectrumCanvas(width=3, height=2, dpi=100)
+        canvas.resize(300, 200)
+        canvas.show()
+        self.application.processEvents()
+        canvas._finish_resize()
+        self.application.processEvents()
+
+        draw_events = []
+        canvas.mpl_connect("draw_event", draw_events.append)
+
+        for width in range(310, 500, 10):
+            canvas.resize(width, 300)
+            self.application.processEvents()
+
+        self.assertIsNotNone(canvas._resize_pixmap)
+        self.assertEqual([], draw_events)
+        np.testing.assert_allclose((3.0, 2.0), canvas.figure.get_size_inches())
+
+        loop = QEventLoop()
+        QTimer.singleShot(2 * RESIZE_DELAY_ms, loop.quit)
+        loop.exec_()
+        self.application.processEvents()
+
+        self.assertIsNone(canvas._resize_pixmap)
+        self.assertEqual(1, len(draw_events))
+        np.testing.assert_allclose((4.9 * canvas.device_pixel_ratio, 3.0 * canvas.device_pixel_ratio),
+                                   canvas.figure.get_size_inches())
+
+        canvas.close()
+
+        # self.fail("Test if the testcase is working.")
+
+    def test_open_spectra(self):
+        """
+        Test the dropped local urls are emitted.
+        """
+
+        folder = tempfile.mkdtemp()
+        try:
+            file_path = os.path.join(folder, "spectrum.msa")
+            with open(file_path, "wb") as msa_file:
+                msa_file.write(b"#SPECTRUM :\n1\n")
+
+            mime_data = QMimeData()
+            mime_data.setUrls([QUrl.fromLocalFile(folder), QUrl.fromLocalFile(file_path),
+                               QUrl("http://example.com/spectrum.msa")])
+
+            canvas = SpectrumCanvas()
+            dropped_file_paths = []
+            canvas.files_dropped.connect(dropped_file_paths.extend)
+
+            paths = canvas._get_local_paths(mime_data)
+            self.assertEqual([folder, file_path], paths)
+
+            canvas.open_spectra(paths)
+            self.assertEqual([folder, file_path], dropped_file_paths)
+        finally:
+            shutil.rmtree(folder)
+
+        # self.fail("Test if the testcase is working.")
+
 
 if __name__ == '__main__':  # pragma: no cover
     import nose
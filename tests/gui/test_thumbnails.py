@@ -0,0 +1,162 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+.. py:currentmodule:: xrayspectrumanalyzergui.tests.gui.test_thumbnails
+   :synopsis: Tests for the module :py:mod:`xrayspectrumanalyzergui.gui.thumbnails`
+
+.. moduleauthor:: Hendrix Demers <hendrix.demers@mail.mcgill.ca>
+
+Tests for the module :py:mod:`xrayspectrumanalyzergui.gui.thumbnails`.
+"""
+
+###############################################################################
+# GUI for the x-ray spectrum analyzer project
+# Copyright (C) 2017  Hendrix Demers
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+###############################################################################
+
+# Standard library modules.
+import unittest
+
+# Third party modules.
+import numpy as np
+from qtpy.QtWidgets import QApplication
+from qtpy.QtCore import QEventLoop, QTimer, QSize
+from qtpy.QtGui import QPixmap
+
+# Local modules.
+
+# Project modules.
+from xrayspectrumanalyzergui.gui.thumbnails import decimate_counts, render_sparkline, PixmapCache, \
+    ThumbnailService
+
+# Globals and constants variables.
+
+
+class TestThumbnails(unittest.TestCase):
+    """
+    TestCase class for the module `xrayspectrumanalyzergui.gui.thumbnails`.
+    """
+
+    def setUp(self):
+        """
+        Setup method.
+        """
+
+        unittest.TestCase.setUp(self)
+
+        self.application = QApplication.instance() or QApplication([])
+
+    def tearDown(self):
+        """
+        Teardown method.
+        """
+
+        unittest.TestCase.tearDown(self)
+
+    def testSkeleton(self):
+        """
+        First test to check if the testcase is working with the testing framework.
+        """
+
+        # self.fail("Test if the testcase is working.")
+
+    def test_decimate_counts(self):
+        """
+        Test the minimum and maximum per pixel.
+        """
+
+        counts = np.array([1, 5, 2, 8, 3, 0, 4, 4])
+        minimums, maximums = decimate_counts(counts, 4)
+        np.testing.assert_array_equal([1, 2, 0, 4], minimums)
+        np.testing.assert_array_equal([5, 8, 3, 4], maximums)
+
+        minimums, maximums = decimate_counts(counts[:2], 4)
+        self.assertEqual(4, minimums.size)
+
+        # self.fail("Test if the testcase is working.")
+
+    def test_render_sparkline(self):
+        """
+        Test the sparkline is painted up to the top of the image.
+        """
+
+        counts = np.zeros(1000)
+        counts[500] = 1000.0
+        image = render_sparkline(counts, QSize(50, 10))
+
+        self.assertEqual(QSize(50, 10), image.size())
+        self.assertNotEqual(0, image.pixelColor(25, 0).alpha())
+        self.assertEqual(0, image.pixelColor(5, 0).alpha())
+        self.assertEqual(0, render_sparkline(np.zeros(10), QSize(5, 5)).pixelColor(0, 4).alpha())
+
+        # self.fail("Test if the testcase is working.")
+
+    def test_pixmap_cache(self):
+        """
+        Test the least recently used pixmap is removed.
+        """
+
+        cache = PixmapCache(2)
+        cache.put("a", QPixmap(1, 1))
+        cache.put("b", QPixmap(1, 1))
+        self.assertIsNotNone(cache.get("a"))
+        cache.put("c", QPixmap(1, 1))
+
+        self.assertEqual(2, len(cache))
+        self.assertIn("a", cache)
+        self.assertNotIn("b", cache)
+
+        # self.fail("Test if the testcase is working.")
+
+    def test_thumbnail_service(self):
+        """
+        Test the thumbnails are rendered in the background and cached.
+        """
+
+        thumbnail_service = ThumbnailService()
+        ready_keys = []
+        loop = QEventLoop()
+        thumbnail_service.thumbnail_ready.connect(ready_keys.append)
+        thumbnail_service.thumbnail_ready.connect(loop.quit)
+
+        requested_keys = []
+
+        def get_counts():
+            requested_keys.append(7)
+            return np.arange(100)
+
+        self.assertIsNone(thumbnail_service.get_thumbnail(7, get_counts))
+        self.assertIsNone(thumbnail_service.get_thumbnail(7, get_counts))
+        QTimer.singleShot(5000, loop.quit)
+        loop.exec_()
+
+        self.assertEqual([7], ready_keys)
+        self.assertEqual([7], requested_keys)
+        pixmap = thumbnail_service.get_thumbnail(7, get_counts)
+        self.assertEqual(thumbnail_service.size, pixmap.size())
+
+        thumbnail_service.set_size(QSize(10, 10))
+        self.assertIsNone(thumbnail_service.get_thumbnail(7, get_counts))
+        thumbnail_service.shutdown()
+
+        # self.fail("Test if the testcase is working.")
+
+
+if __name__ == '__main__':  # pragma: no cover
+    import nose
+
+    nose.runmodule()
@@ -0,0 +1,305 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+.. py:currentmodule:: xrayspectrumanalyzergui.tests.model.test_project
+   :synopsis: Tests for the module :py:mod:`xrayspectrumanalyzergui.model.project`
+
+.. moduleauthor:: Hendrix Demers <hendrix.demers@mail.mcgill.ca>
+
+Tests for the module :py:mod:`xrayspectrumanalyzergui.model.project`.
+"""
+
+###############################################################################
+# GUI for the x-ray spectrum analyzer project
+# Copyright (C) 2017  Hendrix Demers
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+###############################################################################
+
+# Standard library modules.
+import unittest
+import os.path
+import tempfile
+import shutil
+
+# Third party modules.
+import numpy as np
+
+# Local modules.
+
+# Project modules.
+from xrayspectrumanalyzergui.model.project import Project
+from xrayspectrumanalyzergui.model.spectrum_data import SpectrumData
+from xrayspectrumanalyzergui.file_format.project_file import ProjectFile
+
+# Globals and constants variables.
+
+
+class TestProject(unittest.TestCase):
+    """
+    TestCase class for the module `xrayspectrumanalyzergui.model.project`.
+    """
+
+    def setUp(self):
+        """
+        Setup method.
+        """
+
+        unittest.TestCase.setUp(self)
+
+        self.folder = tempfile.mkdtemp()
+        self.path = os.path.join(self.folder, "test.xsa")
+
+        self.project = Project(chunk_size=4)
+        for index in range(10):
+            counts = np.arange(100 + index) + index
+            spectrum = SpectrumData(counts, offset_eV=-10.0, gain_eV=5.0 + index, metadata={"LIVETIME": "10.0"})
+            self.project.add_spectrum(spectrum, "spectrum_{:d}.msa".format(index))
+
+        self.written_chunks = []
+        write_chunk = ProjectFile.write_chunk
+
+        def spy_write_chunk(project_file, index, counts, metadata):
+            self.written_chunks.append(index)
+            write_chunk(project_file, index, counts, metadata)
+
+        ProjectFile.write_chunk = spy_write_chunk
+        self.addCleanup(setattr, ProjectFile, "write_chunk", write_chunk)
+
+    def tearDown(self):
+        """
+        Teardown method.
+        """
+
+        unittest.TestCase.tearDown(self)
+
+        shutil.rmtree(self.folder)
+
+    def testSkeleton(self):
+        """
+        First test to check if the testcase is working with the testing framework.
+        """
+
+        # self.fail("Test if the testcase is working.")
+
+    def test_add_spectrum(self):
+        """
+        Test the spectra and the columns in memory.
+        """
+
+        self.assertEqual(10, self.project.number_spectra)
+        self.assertTrue(self.project.is_modified())
+
+        spectrum = self.project.get_spectrum(3)
+        np.testing.assert_array_equal(np.arange(103) + 3, spectrum.counts)
+        self.assertEqual(8.0, spectrum.gain_eV)
+
+        np.testing.assert_array_equal(np.arange(100, 110), self.project.get_column("number_channels"))
+        self.assertEqual(10.0, self.project.get_column("live_time_s")[0])
+        self.assertEqual("spectrum_9.msa", self.project.get_column("name")[-1])
+        self.assertRaises(IndexError, self.project.get_spectrum, 10)
+
+        # self.fail("Test if the testcase is working.")
+
+    def test_save_open(self):
+        """
+        Test a saved project is opened with the same spectra and tables.
+        """
+
+        self.project.set_rois([("Si Ka", 1700.0, 1800.0)])
+        self.project.set_elements(["Si", "Fe"])
+        self.project.set_fit_results([(1, "Fe Ka", 1000.0, 31.6)])
+        self.project.save(self.path)
+
+        self.assertFalse(self.project.is_modified())
+        self.assertEqual([0, 1, 2], self.written_chunks)
+
+        project = Project.open(self.path)
+        self.assertEqual(10, project.number_spectra)
+        self.assertFalse(any(chunk.is_loaded() for chunk in project._chunks))
+
+        spectrum = project.get_spectrum(9)
+        np.testing.assert_array_equal(np.arange(109) + 9, spectrum.counts)
+        self.assertEqual("10.0", spectrum.metadata["LIVETIME"])
+        self.assertIsInstance(project._chunks[2].counts, np.memmap)
+        self.assertFalse(project._chunks[0].is_loaded())
+
+        self.assertEqual([("Si Ka", 1700.0, 1800.0, 0.0)], project.rois)
+        self.assertEqual(["Si", "Fe"], project.elements)
+        self.assertEqual([(1, "Fe Ka", 1000.0, 31.6)], project.fit_results)
+
+        # self.fail("Test if the testcase is working.")
+
+    def test_save_dirty_chunks(self):
+        """
+        Test only the modified chunks are written.
+        """
+
+        self.project.save(self.path)
+        del self.written_chunks[:]
+
+        project = Project.open(self.path)
+        project.add_spectrum(SpectrumData(np.ones(50)), "new.msa")
+        project.save()
+        self.assertEqual([2], self.written_chunks)
+
+        project = Project.open(self.path)
+        self.assertEqual(11, project.number_spectra)
+        np.testing.assert_array_equal(np.arange(108) + 8, project.get_spectrum(8).counts)
+        np.testing.assert_array_equal(np.ones(50), project.get_spectrum(10).counts)
+
+        new_path = os.path.join(self.folder, "copy.xsa")
+        project.save(new_path)
+        self.assertEqual([2], self.written_chunks)
+        np.testing.assert_array_equal(np.arange(100), Project.open(new_path).get_spectrum(0).counts)
+
+        # self.fail("Test if the testcase is working.")
+
+    def test_change_callback(self):
+        """
+        Test the changes reported to change_callback are replayed with apply_change.
+        """
+
+        changes = []
+        self.project.change_callback = lambda operation, revision, arguments: changes.append((operation, arguments))
+        self.project.set_calibration(2, 1.0, 20.0)
+        self.project.add_spectrum(SpectrumData(np.ones(5)), "new.msa")
+        self.project.set_elements(["Fe"])
+        self.assertEqual(13, self.project.revision)
+        self.assertEqual(["set_calibration", "add_spectrum", "set_elements"], [change[0] for change in changes])
+
+        self.project.save(self.path)
+        project = Project.open(self.path)
+        self.assertEqual(13, project.revision)
+
+        project = Project(chunk_size=4)
+        for index in range(10):
+            project.add_spectrum(self.project.get_spectrum(index), self.project.names[index])
+        project.set_calibration(2, 0.0, 0.0)
+        for operation, arguments in changes:
+            project.apply_change(operation, arguments)
+
+        self.assertEqual(20.0, project.get_spectrum(2).gain_eV)
+        np.testing.assert_array_equal(np.ones(5), project.get_spectrum(10).counts)
+        self.assertEqual(["Fe"], project.elements)
+        self.assertRaises(ValueError, project.apply_change, "unknown", {})
+
+        # self.fail("Test if the testcase is working.")
+
+    def test_element_maps(self):
+        """
+        Test the element maps are found for the same source and ROIs, saved and replayed.
+        """
+
+        source = {"file_path": "/data/map.rpl", "shape": [2, 3, 100], "size": 1200, "mtime": 1.5}
+        rois = [("Fe Ka", 6300.0, 6500.0, 50.0), ("Cu Ka", 7950.0, 8150.0)]
+        maps = np.arange(12.0).reshape(2, 2, 3)
+        changes = []
+        self.project.change_callback = lambda operation, revision, arguments: changes.append((operation, arguments))
+        self.project.set_element_maps(source, rois, maps)
+
+        self.assertIsNone(Project().get_element_maps(source, rois))
+        np.testing.assert_array_equal(maps, self.project.get_element_maps(dict(source), rois))
+        self.assertIsNone(self.project.get_element_maps(dict(source, mtime=2.0), rois))
+        self.assertIsNone(self.project.get_element_maps(source, rois[:1]))
+        self.assertIsNone(self.project.get_element_maps(None, rois))
+
+        self.project.save(self.path)
+        project = Project.open(self.path)
+        self.assertIsInstance(project.element_maps, np.memmap)
+        np.testing.assert_array_equal(maps, project.get_element_maps(source, rois))
+        self.assertEqual("Cu Ka", project.element_map_rois[1][0])
+
+        project = Project()
+        for operation, arguments in changes:
+            project.apply_change(operation, arguments)
+        np.testing.assert_array_equal(maps, project.get_element_maps(source, rois))
+
+        project = Project.open(self.path)
+        project.detach()
+        shutil.rmtree(self.path)
+        np.testing.assert_array_equal(maps, project.element_maps)
+
+        # self.fail("Test if the testcase is working.")
+
+    def test_detach(self):
+        """
+        Test a detached project is saved as a new project.
+        """
+
+        self.project.save(self.path)
+        project = Project.open(self.path)
+        project.detach()
+
+        self.assertIsNone(project.path)
+        self.assertTrue(project.is_modified())
+        shutil.rmtree(self.path)
+
+        np.testing.assert_array_equal(np.arange(105) + 5, project.get_spectrum(5).counts)
+        new_path = os.path.join(self.folder, "new.xsa")
+        project.save(new_path)
+        self.assertEqual(10, Project.open(new_path).number_spectra)
+
+        # self.fail("Test if the testcase is working.")
+
+    def test_save_layer(self):
+        """
+        Test a layer writes only the modified chunks and reads the others from the base project.
+        """
+
+        self.project.save(self.path)
+        project = Project.open(self.path)
+        layer_path = os.path.join(self.folder, "layer.xsa")
+        del self.written_chunks[:]
+
+        project.save_layer(layer_path)
+        self.assertEqual([], self.written_chunks)
+        self.assertEqual(layer_path, project.path)
+
+        project.set_elements(["Fe"])
+        project.save()
+        self.assertEqual([], self.written_chunks)
+        self.assertEqual([], os.listdir(os.path.join(layer_path, "spectra")))
+
+        # The base project saved again with more spectra does not change the spectra of the layer.
+        self.project.add_spectrum(SpectrumData(np.zeros(5)), "base.msa")
+        self.project.save()
+
+        layer = Project.open(layer_path)
+        self.assertEqual(10, layer.number_spectra)
+        self.assertEqual(["Fe"], layer.elements)
+        self.assertEqual([], Project.open(self.path).elements)
+        np.testing.assert_array_equal(np.arange(101) + 1, layer.get_spectrum(1).counts)
+
+        del self.written_chunks[:]
+        layer.add_spectrum(SpectrumData(np.ones(5)), "layer.msa")
+        layer.save()
+        self.assertEqual([2], self.written_chunks)
+        self.assertEqual(["chunk_000002.json", "chunk_000002.npy"],
+                         sorted(os.listdir(os.path.join(layer_path, "spectra"))))
+
+        layer = Project.open(layer_path)
+        layer.detach()
+        self.assertEqual(11, layer.number_spectra)
+        np.testing.assert_array_equal(np.arange(109) + 9, layer.get_spectrum(9).counts)
+        np.testing.assert_array_equal(np.ones(5), layer.get_spectrum(10).counts)
+
+        # self.fail("Test if the testcase is working.")
+
+
+if __name__ == '__main__':  # pragma: no cover
+    import nose
+
+    nose.runmodule()
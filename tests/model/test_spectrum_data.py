@@ -0,0 +1,145 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+.. py:currentmodule:: xrayspectrumanalyzergui.tests.model.test_spectrum_data
+   :synopsis: Tests for the module :py:mod:`xrayspectrumanalyzergui.model.spectrum_data`
+
+.. moduleauthor:: Hendrix Demers <hendrix.demers@mail.mcgill.ca>
+
+Tests for the module :py:mod:`xrayspectrumanalyzergui.model.spectrum_data`.
+"""
+
+###############################################################################
+# GUI for the x-ray spectrum analyzer project
+# Copyright (C) 2017  Hendrix Demers
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+###############################################################################
+
+# Standard library modules.
+import unittest
+
+# Third party modules.
+import numpy as np
+
+# Local modules.
+
+# Project modules.
+from xrayspectrumanalyzergui.model.spectrum_data import SpectrumData, compact_counts
+
+# Globals and constants variables.
+
+
+class TestSpectrumData(unittest.TestCase):
+    """
+    TestCase class for the module `xrayspectrumanalyzergui.model.spectrum_data`.
+    """
+
+    def setUp(self):
+        """
+        Setup method.
+        """
+
+        unittest.TestCase.setUp(self)
+
+    def tearDown(self):
+        """
+        Teardown method.
+        """
+
+        unittest.TestCase.tearDown(self)
+
+    def testSkeleton(self):
+        """
+        First test to check if the testcase is working with the testing framework.
+        """
+
+        # self.fail("Test if the testcase is working.")
+
+    def test_compact_counts(self):
+        """
+        Test compact_counts.
+        """
+
+        self.assertEqual(np.uint16, compact_counts([0.0, 1.0, 65535.0]).dtype)
+        self.assertEqual(np.uint32, compact_counts([0, 1, 65536]).dtype)
+        self.assertEqual(np.float32, compact_counts([0.0, 1.5]).dtype)
+        self.assertEqual(np.float32, compact_counts([-1.0, 1.0]).dtype)
+        self.assertEqual(np.float32, compact_counts([0.0, 2.0 ** 40]).dtype)
+        self.assertEqual(0, compact_counts([]).size)
+
+        # self.fail("Test if the testcase is working.")
+
+    def test_energies_eV(self):
+        """
+        Test the energies are created lazily and shared between spectra.
+        """
+
+        spectrum_1 = SpectrumData(np.arange(1024), offset_eV=-100.0, gain_eV=10.0)
+        spectrum_2 = SpectrumData(np.ones(1024), offset_eV=-100.0, gain_eV=10.0)
+        spectrum_3 = SpectrumData(np.ones(2048), offset_eV=-100.0, gain_eV=10.0)
+
+        self.assertIsNone(spectrum_1._energies_eV)
+        energies_eV = spectrum_1.energies_eV
+        self.assertEqual(-100.0, energies_eV[0])
+        self.assertEqual(10130.0, energies_eV[-1])
+        self.assertFalse(energies_eV.flags.writeable)
+
+        self.assertIs(energies_eV, spectrum_1.energies_eV)
+        self.assertIs(energies_eV, spectrum_2.energies_eV)
+        self.assertEqual(2048, spectrum_3.energies_eV.size)
+
+        self.assertEqual(20, spectrum_1.get_channel(100.0))
+
+        # self.fail("Test if the testcase is working.")
+
+    def test_from_energies(self):
+        """
+        Test from_energies keep only the calibration of linear energies.
+        """
+
+        spectrum = SpectrumData.from_energies(5.0 + 2.5 * np.arange(100), np.ones(100))
+        self.assertIsNone(spectrum._energies_eV)
+        self.assertAlmostEqual(5.0, spectrum.offset_eV)
+        self.assertAlmostEqual(2.5, spectrum.gain_eV)
+        self.assertTrue(spectrum.is_linear)
+        spectrum.energies_eV
+        self.assertTrue(spectrum.is_linear)
+
+        energies_eV = np.arange(100) ** 1.1
+        spectrum = SpectrumData.from_energies(energies_eV, np.ones(100))
+        np.testing.assert_array_equal(energies_eV, spectrum.energies_eV)
+        self.assertFalse(spectrum.is_linear)
+
+        # self.fail("Test if the testcase is working.")
+
+    def test_slots(self):
+        """
+        Test the spectrum has no instance dictionary.
+        """
+
+        spectrum = SpectrumData([1, 2, 3], metadata={"TITLE": "test"})
+
+        self.assertFalse(hasattr(spectrum, "__dict__"))
+        self.assertEqual("test", spectrum.metadata["TITLE"])
+        self.assertEqual(3, spectrum.number_channels)
+
+        # self.fail("Test if the testcase is working.")
+
+
+if __name__ == '__main__':  # pragma: no cover
+    import nose
+
+    nose.runmodule()
@@ -0,0 +1,138 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+.. py:currentmodule:: xrayspectrumanalyzergui.tests.model.test_spectrum_image
+   :synopsis: Tests for the module :py:mod:`xrayspectrumanalyzergui.model.spectrum_image`
+
+.. moduleauthor:: Hendrix Demers <hendrix.demers@mail.mcgill.ca>
+
+Tests for the module :py:mod:`xrayspectrumanalyzergui.model.spectrum_image`.
+"""
+
+###############################################################################
+# GUI for the x-ray spectrum analyzer project
+# Copyright (C) 2017  Hendrix Demers
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+###############################################################################
+
+# Standard library modules.
+import unittest
+
+# Third party modules.
+import numpy as np
+
+# Local modules.
+
+# Project modules.
+from xrayspectrumanalyzergui.model import spectrum_image
+from xrayspectrumanalyzergui.model.spectrum_image import SpectrumImage
+
+# Globals and constants variables.
+
+
+class TestSpectrumImage(unittest.TestCase):
+    """
+    TestCase class for the module `xrayspectrumanalyzergui.model.spectrum_image`.
+    """
+
+    def setUp(self):
+        """
+        Setup method.
+        """
+
+        unittest.TestCase.setUp(self)
+
+        self.data = np.random.RandomState(0).poisson(5.0, (7, 5, 16)).astype(np.uint16)
+        self.spectrum_image = SpectrumImage(self.data, 100.0, 10.0, {"SPECTRUMIMAGE": "map.rpl"})
+
+        # Chunks of 2 rows.
+        chunk_size_bytes = spectrum_image.CHUNK_SIZE_BYTES
+        self.addCleanup(setattr, spectrum_image, "CHUNK_SIZE_BYTES", chunk_size_bytes)
+        spectrum_image.CHUNK_SIZE_BYTES = 2 * 5 * 16 * 2
+
+    def tearDown(self):
+        """
+        Teardown method.
+        """
+
+        unittest.TestCase.tearDown(self)
+
+    def testSkeleton(self):
+        """
+        First test to check if the testcase is working with the testing framework.
+        """
+
+        # self.fail("Test if the testcase is working.")
+
+    def test_get_spectrum(self):
+        """
+        Test get_spectrum read the counts of a pixel.
+        """
+
+        self.assertEqual((7, 5, 16), self.spectrum_image.shape)
+        self.assertEqual(2, self.spectrum_image.rows_per_chunk)
+
+        spectrum = self.spectrum_image.get_spectrum(3, 4)
+        np.testing.assert_array_equal(self.data[3, 4], spectrum.counts)
+        self.assertEqual(100.0, spectrum.offset_eV)
+        self.assertEqual(10.0, spectrum.gain_eV)
+        self.assertEqual("Pixel (3, 4)", spectrum.metadata["TITLE"])
+        self.assertEqual("map.rpl", spectrum.metadata["SPECTRUMIMAGE"])
+
+        self.assertRaises(IndexError, self.spectrum_image.get_spectrum, 7, 0)
+        self.assertRaises(ValueError, SpectrumImage, self.data[0])
+
+        # self.fail("Test if the testcase is working.")
+
+    def test_get_region_spectrum(self):
+        """
+        Test get_region_spectrum sum the pixels of a rectangle over several chunks.
+        """
+
+        spectrum = self.spectrum_image.get_region_spectrum(1, 6, 2, 4)
+        np.testing.assert_array_equal(self.data[1:6, 2:4].sum(axis=(0, 1)), spectrum.counts)
+
+        spectrum = self.spectrum_image.get_region_spectrum(-3, 100, 0, 100)
+        np.testing.assert_array_equal(self.data.sum(axis=(0, 1)), spectrum.counts)
+
+        spectrum = self.spectrum_image.get_region_spectrum(3, 3, 0, 5)
+        self.assertEqual(0, spectrum.counts.sum())
+
+        # self.fail("Test if the testcase is working.")
+
+    def test_summaries(self):
+        """
+        Test the sum spectrum and the total-count image.
+        """
+
+        spectrum = self.spectrum_image.get_sum_spectrum()
+        np.testing.assert_array_equal(self.data.sum(axis=(0, 1)), spectrum.counts)
+        self.assertEqual("Sum spectrum", spectrum.metadata["TITLE"])
+
+        total_image = self.spectrum_image.get_total_image()
+        self.assertEqual(np.int64, total_image.dtype)
+        np.testing.assert_array_equal(self.data.sum(axis=2), total_image)
+
+        float_image = SpectrumImage(self.data.astype(np.float32) * 0.5)
+        np.testing.assert_allclose(self.data.sum(axis=2) * 0.5, float_image.get_total_image())
+
+        # self.fail("Test if the testcase is working.")
+
+
+if __name__ == '__main__':  # pragma: no cover
+    import nose
+
+    nose.runmodule()
@@ -0,0 +1,233 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+.. py:currentmodule:: xrayspectrumanalyzergui.tests.test_batch
+   :synopsis: Tests for the module :py:mod:`xrayspectrumanalyzergui.batch`
+
+.. moduleauthor:: Hendrix Demers <hendrix.demers@mail.mcgill.ca>
+
+Tests for the module :py:mod:`xrayspectrumanalyzergui.batch`.
+"""
+
+###############################################################################
+# GUI for the x-ray spectrum analyzer project
+# Copyright (C) 2017  Hendrix Demers
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+###############################################################################
+
+# Standard library modules.
+import unittest
+import os.path
+import tempfile
+import shutil
+import csv
+import subprocess
+import sys
+import importlib.util
+
+# Third party modules.
+
+# Local modules.
+
+# Project modules.
+from xrayspectrumanalyzergui.batch import process_files, run_batch, create_writer, main, CsvResultWriter, \
+    RESULT_COLUMNS
+from xrayspectrumanalyzergui.analysis.peak_fitting import PeakFitter
+from xrayspectrumanalyzergui.file_format.spectrum_files import read_spectrum
+from tests.analysis.test_peak_fitting import create_counts, INTENSITY
+
+# Globals and constants variables.
+# Net intensity of the Ka component, the sum of the Ka1 and Ka2 lines.
+KA_INTENSITY = 1.5 * INTENSITY
+MSA_HEADER = """#FORMAT      : EMSA/MAS Spectral Data File
+#NPOINTS     : {:d}
+#DATATYPE    : Y
+#XPERCHAN    : {:.1f}
+#OFFSET      : 0.0
+#SPECTRUM    : Spectral Data Starts Here
+"""
+
+
+class TestBatch(unittest.TestCase):
+    """
+    TestCase class for the module `xrayspectrumanalyzergui.batch`.
+    """
+
+    def setUp(self):
+        """
+        Setup method.
+        """
+
+        unittest.TestCase.setUp(self)
+
+        self.folder = tempfile.mkdtemp()
+
+        self.file_paths = []
+        for index, gain_eV in enumerate([5.0, 5.0, 10.0]):
+            counts = create_counts(["Cr", "Fe"], seed=index, number_channels=int(20480 / gain_eV), gain_eV=gain_eV)
+            file_path = os.path.join(self.folder, "spectrum_{:d}.msa".format(index))
+            with open(file_path, "w") as msa_file:
+                msa_file.write(MSA_HEADER.format(counts.size, gain_eV))
+                msa_file.write("\n".join(str(value) for value in counts))
+                msa_file.write("\n#ENDOFDATA   : End Of Data and Checksum\n")
+            self.file_paths.append(file_path)
+
+        self.bad_file_path = os.path.join(self.folder, "bad.msa")
+        with open(self.bad_file_path, "w") as msa_file:
+            msa_file.write("#FORMAT      : EMSA/MAS Spectral Data File\n")
+
+    def tearDown(self):
+        """
+        Teardown method.
+        """
+
+        unittest.TestCase.tearDown(self)
+
+        shutil.rmtree(self.folder)
+
+    def _read_csv(self, file_path):
+        with open(file_path, "r") as csv_file:
+            rows = list(csv.reader(csv_file))
+        self.assertEqual([name for name, _type in RESULT_COLUMNS], rows[0])
+        return dict(((row[0], row[1]), float(row[2])) for row in rows[1:])
+
+    def testSkeleton(self):
+        """
+        First test to check if the testcase is working with the testing framework.
+        """
+
+        # self.fail("Test if the testcase is working.")
+
+    def test_process_files(self):
+        """
+        Test process_files fit the spectra of each calibration and report the bad files.
+        """
+
+        rows, failures = process_files(self.file_paths + [self.bad_file_path], PeakFitter(["Cr", "Fe"]))
+
+        self.assertEqual([self.bad_file_path], [file_path for file_path, _message in failures])
+        self.assertEqual(set(self.file_paths), set(row[0] for row in rows))
+        self.assertEqual(len(RESULT_COLUMNS), len(rows[0]))
+        for row in rows:
+            if row[1] in ("Cr Ka", "Fe Ka"):
+                self.assertAlmostEqual(1.0, row[2] / KA_INTENSITY, delta=0.05)
+
+        # self.fail("Test if the testcase is working.")
+
+    def test_process_files_reader_error(self):
+        """
+        Test any error of the reader fails only its file.
+        """
+
+        def reader(file_path):
+            if file_path == self.file_paths[1]:
+                raise RuntimeError("Unexpected reader error")
+            return read_spectrum(file_path)
+
+        rows, failures = process_files(self.file_paths, PeakFitter(["Cr", "Fe"]), reader)
+
+        self.assertEqual([(self.file_paths[1], "Unexpected reader error")], failures)
+        self.assertEqual({self.file_paths[0], self.file_paths[2]}, set(row[0] for row in rows))
+
+        # self.fail("Test if the testcase is working.")
+
+    def test_process_files_identify(self):
+        """
+        Test the elements of each spectrum are identified when the fitter has none.
+        """
+
+        rows, failures = process_files(self.file_paths[:1], PeakFitter([]))
+
+        self.assertEqual([], failures)
+        self.assertIn("Fe Ka", [row[1] for row in rows])
+        self.assertIn("Cr Ka", [row[1] for row in rows])
+
+        # self.fail("Test if the testcase is working.")
+
+    def test_run_batch(self):
+        """
+        Test run_batch write the results of each chunk and report the progress, in this process and with a pool.
+        """
+
+        for number_workers in [1, 2]:
+            output_path = os.path.join(self.folder, "results_{:d}.csv".format(number_workers))
+            progress = []
+            writer = CsvResultWriter(output_path)
+            failures = run_batch(self.file_paths + [self.bad_file_path], PeakFitter(["Cr", "Fe"]), writer,
+                                 number_workers, chunk_size=2,
+                                 progress_callback=lambda done, total: progress.append((done, total)))
+            writer.close()
+
+            self.assertEqual(1, len(failures))
+            self.assertEqual(2, len(progress))
+            self.assertEqual((4, 4), progress[-1])
+
+            results = self._read_csv(output_path)
+            self.assertAlmostEqual(1.0, results[(self.file_paths[2], "Fe Ka")] / KA_INTENSITY, delta=0.05)
+
+        # self.fail("Test if the testcase is working.")
+
+    def test_create_writer(self):
+        """
+        Test the output format is given by the extension, Parquet requires pyarrow.
+        """
+
+        self.assertIsInstance(create_writer(os.path.join(self.folder, "results.txt")), CsvResultWriter)
+
+        if importlib.util.find_spec("pyarrow") is None:
+            self.assertRaises(ImportError, create_writer, os.path.join(self.folder, "results.parquet"))
+        else:  # pragma: no cover
+            writer = create_writer(os.path.join(self.folder, "results.parquet"))
+            writer.write_rows([("spectrum.msa", "Fe Ka", 1.0, 0.1, 1.0, 0.0, 130.0)])
+            writer.close()
+
+        # self.fail("Test if the testcase is working.")
+
+    def test_main(self):
+        """
+        Test the command line with a directory and a glob pattern.
+        """
+
+        output_path = os.path.join(self.folder, "results.csv")
+        status = main(["-e", "Cr,Fe", "-o", output_path, "-j", "1", "-q", self.folder,
+                       os.path.join(self.folder, "*.msa")])
+        self.assertEqual(1, status)
+        self.assertEqual(set(self.file_paths), set(file_path for file_path, _line in self._read_csv(output_path)))
+
+        status = main(["-e", "Cr,Fe", "-o", output_path, "-q"] + self.file_paths)
+        self.assertEqual(0, status)
+
+        self.assertRaises(SystemExit, main, ["-e", "Xx", "-o", output_path, self.folder])
+        self.assertRaises(SystemExit, main, ["-o", output_path, os.path.join(self.folder, "missing")])
+
+        # self.fail("Test if the testcase is working.")
+
+    def test_headless(self):
+        """
+        Test the batch processing does not import Qt.
+        """
+
+        code = "import sys, xrayspectrumanalyzergui.batch; print(any('qt' in name.lower() for name in sys.modules))"
+        output = subprocess.check_output([sys.executable, "-c", code])
+        self.assertEqual(b"False", output.strip())
+
+        # self.fail("Test if the testcase is working.")
+
+
+if __name__ == '__main__':  # pragma: no cover
+    import nose
+
+    nose.runmodule()
@@ -0,0 +1,194 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+.. py:currentmodule:: xrayspectrumanalyzergui.acquisition.accumulator
+   :synopsis: Thread-safe accumulator of the counts of a live acquisition.
+
+.. moduleauthor:: Hendrix Demers <hendrix.demers@mail.mcgill.ca>
+
+Thread-safe accumulator of the counts of a live acquisition.
+
+The counts are accumulated in preallocated histograms: the total spectrum and a ring buffer of short time slices used
+for the recent counts and the count rate. The reader thread adds each packet of events with a single
+:py:func:`numpy.bincount`, the GUI thread only copies the total spectrum when it refreshes the display.
+"""
+
+###############################################################################
+# GUI for the x-ray spectrum analyzer project
+# Copyright (C) 2017  Hendrix Demers
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+###############################################################################
+
+# Standard library modules.
+import threading
+import time
+
+# Third party modules.
+import numpy as np
+
+# Local modules.
+
+# Project modules.
+from xrayspectrumanalyzergui.model.spectrum_data import SpectrumData
+
+# Globals and constants variables.
+DEFAULT_NUMBER_CHANNELS = 4096
+DEFAULT_NUMBER_SLICES = 50
+DEFAULT_SLICE_DURATION_s = 0.1
+
+
+class SpectrumAccumulator(object):
+    """
+    Histograms of the channels of the detected events.
+
+    :param number_channels: number of channels of the spectrum, events outside are dropped.
+    :param offset_eV: energy of the first channel.
+    :param gain_eV: energy width of a channel.
+    :param number_slices: number of time slices of the ring buffer.
+    :param slice_duration_s: duration of a time slice.
+    :param clock: function returning the time in seconds.
+    """
+
+    def __init__(self, number_channels=DEFAULT_NUMBER_CHANNELS, offset_eV=0.0, gain_eV=1.0,
+                 number_slices=DEFAULT_NUMBER_SLICES, slice_duration_s=DEFAULT_SLICE_DURATION_s, clock=time.monotonic):
+        self.number_slices = int(number_slices)
+        self.slice_duration_s = float(slice_duration_s)
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._revision = 0
+
+        self.configure(number_channels, offset_eV, gain_eV)
+
+    def configure(self, number_channels, offset_eV, gain_eV):
+        """
+        Set the calibration of the spectrum and clear the counts.
+        """
+        with self._lock:
+            self.number_channels = int(number_channels)
+            self.offset_eV = float(offset_eV)
+            self.gain_eV = float(gain_eV)
+
+            self._counts = np.zeros(self.number_channels, dtype=np.int64)
+            self._slices = np.zeros((self.number_slices, self.number_channels), dtype=np.int64)
+            self._slice_totals = np.zeros(self.number_slices, dtype=np.int64)
+            self._reset()
+
+    def clear(self):
+        with self._lock:
+            self._counts.fill(0)
+            self._slices.fill(0)
+            self._slice_totals.fill(0)
+            self._reset()
+
+    def _reset(self):
+        self._slice_index = 0
+        self._slice_start_s = self._clock()
+        self._start_s = self._slice_start_s
+        self._number_events = 0
+        self._revision += 1
+
+    @property
+    def revision(self):
+        """
+        Number of changes of the counts, to skip refreshing a display that is up to date.
+        """
+        return self._revision
+
+    @property
+    def number_events(self):
+        return self._number_events
+
+    def add_events(self, channels):
+        """
+        Add events given by their channel.
+        """
+        channels = np.asarray(channels)
+        if channels.size == 0:
+            return
+
+        histogram = np.bincount(channels, minlength=self.number_channels)
+        if histogram.size > self.number_channels:
+            histogram = histogram[:self.number_channels]
+        self.add_counts(histogram)
+
+    def add_counts(self, counts):
+        """
+        Add a histogram of counts with the number of channels of the spectrum.
+        """
+        with self._lock:
+            self._advance(self._clock())
+            self._counts += counts
+            self._slices[self._slice_index] += counts
+            total = int(counts.sum())
+            self._slice_totals[self._slice_index] += total
+            self._number_events += total
+            self._revision += 1
+
+    def _advance(self, time_s):
+        """
+        Move the ring buffer to the time slice of `time_s`, clearing the slices skipped.
+        """
+        number_elapsed = int((time_s - self._slice_start_s) // self.slice_duration_s)
+        if number_elapsed <= 0:
+            return
+
+        for _ in range(min(number_elapsed, self.number_slices)):
+            self._slice_index = (self._slice_index + 1) % self.number_slices
+            self._slices[self._slice_index].fill(0)
+            self._slice_totals[self._slice_index] = 0
+        self._slice_start_s += number_elapsed * self.slice_duration_s
+
+    def get_counts(self):
+        """
+        Return a copy of the total counts and the revision of the copy.
+        """
+        with self._lock:
+            return self._counts.copy(), self._revision
+
+    def get_recent_counts(self):
+        """
+        Return the counts of the time slices of the ring buffer, the last few seconds of the acquisition.
+        """
+        with self._lock:
+            self._advance(self._clock())
+            return self._slices.sum(axis=0)
+
+    def get_count_rate(self):
+        """
+        Return the count rate in counts per second over the complete time slices of the ring buffer.
+        """
+        with self._lock:
+            time_s = self._clock()
+            self._advance(time_s)
+
+            number_complete = self.number_slices - 1
+            duration_s = min(number_complete * self.slice_duration_s, self._slice_start_s - self._start_s)
+            if duration_s <= 0.0:
+                duration_s = time_s - self._start_s
+                return self._number_events / duration_s if duration_s > 0.0 else 0.0
+
+            number_slices = int(round(duration_s / self.slice_duration_s))
+            indexes = (self._slice_index - 1 - np.arange(number_slices)) % self.number_slices
+            return float(self._slice_totals[indexes].sum()) / duration_s
+
+    def get_spectrum(self):
+        """
+        Return the total counts as a spectrum, with the real time of the acquisition in the metadata.
+        """
+        counts, _revision = self.get_counts()
+        metadata = {"REALTIME": "{:.3f}".format(self._clock() - self._start_s),
+                    "SIGNALTYPE": "EDS"}
+        return SpectrumData(counts, self.offset_eV, self.gain_eV, metadata)
@@ -0,0 +1,219 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+.. py:currentmodule:: xrayspectrumanalyzergui.acquisition.simulator
+   :synopsis: Simulator of a detector event stream.
+
+.. moduleauthor:: Hendrix Demers <hendrix.demers@mail.mcgill.ca>
+
+Simulator of a detector event stream.
+
+The simulator is a socket server standing in for a detector: each client receives the calibration, then packets of
+events sampled from a model spectrum at a given count rate. It runs on its own thread, or from the command line::
+
+    python -m xrayspectrumanalyzergui.acquisition.simulator --port 5555 --rate 200000
+"""
+
+###############################################################################
+# GUI for the x-ray spectrum analyzer project
+# Copyright (C) 2017  Hendrix Demers
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+###############################################################################
+
+# Standard library modules.
+import argparse
+import os
+import socket
+import threading
+import time
+import logging
+
+# Third party modules.
+import numpy as np
+
+# Local modules.
+
+# Project modules.
+from xrayspectrumanalyzergui.analysis.peak_fitting import gaussian
+from xrayspectrumanalyzergui.analysis.peak_identification import get_fwhm_eV, FWHM_TO_SIGMA
+from xrayspectrumanalyzergui.analysis.xray_lines import get_database
+from xrayspectrumanalyzergui.acquisition.stream import create_socket, encode_calibration, encode_events
+
+# Globals and constants variables.
+DEFAULT_PORT = 5555
+DEFAULT_COUNT_RATE_cps = 100000.0
+DEFAULT_PACKET_DURATION_s = 0.01
+DEFAULT_ELEMENTS = ("Fe", "Cr", "Ni")
+
+
+def create_model_spectrum(elements=DEFAULT_ELEMENTS, number_channels=4096, offset_eV=0.0, gain_eV=5.0):
+    """
+    Return the relative intensity of each channel of a spectrum with the K and L lines of the elements over a
+    bremsstrahlung-like background.
+    """
+    energies_eV = offset_eV + gain_eV * np.arange(number_channels)
+    model = np.exp(-energies_eV / 4000.0) + 0.01
+    for element in elements:
+        for line in get_database().get_lines(element, "KL"):
+            sigma_eV = get_fwhm_eV(line["energy_eV"]) * FWHM_TO_SIGMA
+            model += 50.0 * line["weight"] * gain_eV * gaussian(energies_eV, line["energy_eV"], sigma_eV)
+    return model
+
+
+class EventSampler(object):
+    """
+    Sample the channels of events with the probabilities of a model spectrum.
+    """
+
+    def __init__(self, model, seed=None):
+        cumulative = np.cumsum(model, dtype=np.float64)
+        self._cumulative = cumulative / cumulative[-1]
+        self._random = np.random.default_rng(seed)
+
+    def sample(self, number_events):
+        channels = np.searchsorted(self._cumulative, self._random.random(number_events), side="right")
+        return np.minimum(channels, self._cumulative.size - 1).astype(np.uint16)
+
+    def sample_poisson(self, mean_number_events):
+        return self.sample(self._random.poisson(mean_number_events))
+
+
+class AcquisitionSimulator(threading.Thread):
+    """
+    Socket server sending the events of a model spectrum to its clients, one client at a time.
+
+    :param address: ``(host, port)`` or path of a UNIX socket, the port 0 chooses a free port, see :py:attr:`address`.
+    :param count_rate_cps: mean number of events per second.
+    :param packet_duration_s: duration of the events of a packet.
+    :param maximum_number_events: number of events sent to a client before closing the connection, None for no limit.
+    """
+
+    def __init__(self, address=("localhost", DEFAULT_PORT), model=None, offset_eV=0.0, gain_eV=5.0,
+                 count_rate_cps=DEFAULT_COUNT_RATE_cps, packet_duration_s=DEFAULT_PACKET_DURATION_s,
+                 maximum_number_events=None, seed=None):
+        super(AcquisitionSimulator, self).__init__(name="AcquisitionSimulator")
+        self.daemon = True
+
+        self.logger = logging.getLogger(__name__)
+
+        self.model = create_model_spectrum(gain_eV=gain_eV, offset_eV=offset_eV) if model is None else model
+        self.offset_eV = offset_eV
+        self.gain_eV = gain_eV
+        self.count_rate_cps = count_rate_cps
+        self.packet_duration_s = packet_duration_s
+        self.maximum_number_events = maximum_number_events
+        self.number_events_sent = 0
+
+        self._sampler = EventSampler(self.model, seed)
+        self._stopped = threading.Event()
+        self._client = None
+
+        self._unix_path = None if isinstance(address, tuple) else address
+        if self._unix_path is not None and os.path.exists(self._unix_path):
+            os.remove(self._unix_path)
+        self._server = create_socket(address)
+        self._server.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self._server.bind(address)
+        self._server.listen(1)
+        self._server.settimeout(0.1)
+
+    @property
+    def address(self):
+        return self._server.getsockname()
+
+    def run(self):
+        try:
+            while not self._stopped.is_set():
+                try:
+                    client, _client_address = self._server.accept()
+                except socket.timeout:
+                    continue
+
+                self._client = client
+                try:
+                    self._send(client)
+                except OSError as message:
+                    self.logger.info("Simulator client disconnected: %s", message)
+                finally:
+                    client.close()
+                    self._client = None
+        finally:
+            self._server.close()
+            if self._unix_path is not None and os.path.exists(self._unix_path):
+                os.remove(self._unix_path)
+
+    def _send(self, client):
+        client.settimeout(None)
+        client.sendall(encode_calibration(self.model.size, self.offset_eV, self.gain_eV))
+
+        number_events_sent = 0
+        start_s = time.monotonic()
+        number_packets = 0
+        while not self._stopped.is_set():
+            channels = self._sampler.sample_poisson(self.count_rate_cps * self.packet_duration_s)
+            if self.maximum_number_events is not None:
+                channels = channels[:self.maximum_number_events - number_events_sent]
+
+            client.sendall(encode_events(channels))
+            number_events_sent += channels.size
+            self.number_events_sent += channels.size
+            if self.maximum_number_events is not None and number_events_sent >= self.maximum_number_events:
+                return
+
+            # The packets are paced on the start time, so the count rate does not drift with the send time.
+            number_packets += 1
+            delay_s = start_s + number_packets * self.packet_duration_s - time.monotonic()
+            if delay_s > 0.0:
+                self._stopped.wait(delay_s)
+
+    def stop(self):
+        self._stopped.set()
+        client = self._client
+        if client is not None:
+            try:
+                client.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Simulate the event stream of an x-ray detector.")
+    parser.add_argument("--host", default="localhost", help="host name of the TCP server")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help="port of the TCP server")
+    parser.add_argument("--unix", metavar="PATH", help="path of a UNIX socket, instead of a TCP server")
+    parser.add_argument("--rate", type=float, default=DEFAULT_COUNT_RATE_cps, help="count rate (counts/s)")
+    parser.add_argument("--elements", default=",".join(DEFAULT_ELEMENTS),
+                        help="comma-separated elements of the model spectrum")
+    arguments = parser.parse_args(argv)
+
+    address = arguments.unix if arguments.unix else (arguments.host, arguments.port)
+    elements = [element for element in arguments.elements.split(",") if element.strip()]
+    simulator = AcquisitionSimulator(address, create_model_spectrum(elements), count_rate_cps=arguments.rate)
+    print("Simulating {:g} counts/s on {}".format(arguments.rate, simulator.address))
+
+    simulator.start()
+    try:
+        while simulator.is_alive():
+            simulator.join(0.5)
+    except KeyboardInterrupt:
+        simulator.stop()
+        simulator.join()
+
+    return 0
+
+
+if __name__ == '__main__':  # pragma: no cover
+    main()
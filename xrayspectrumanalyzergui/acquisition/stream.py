@@ -0,0 +1,217 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+.. py:currentmodule:: xrayspectrumanalyzergui.acquisition.stream
+   :synopsis: Stream of detector events over a socket.
+
+.. moduleauthor:: Hendrix Demers <hendrix.demers@mail.mcgill.ca>
+
+Stream of detector events over a socket.
+
+The stream is a sequence of packets, each with a header of 4 bytes for the kind and a little-endian uint32 for the
+size of the payload in bytes:
+
+* ``XSCA``: calibration, the number of channels (uint32), the offset and gain in eV (float64);
+* ``XSEV``: events, the channel of each event (uint16).
+
+:py:class:`EventStreamReader` reads the stream on its own thread and adds the events to a
+:py:class:`~xrayspectrumanalyzergui.acquisition.accumulator.SpectrumAccumulator`, so the GUI thread never handles
+the packets.
+"""
+
+###############################################################################
+# GUI for the x-ray spectrum analyzer project
+# Copyright (C) 2017  Hendrix Demers
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+###############################################################################
+
+# Standard library modules.
+import socket
+import struct
+import threading
+import logging
+
+# Third party modules.
+import numpy as np
+
+# Local modules.
+
+# Project modules.
+
+# Globals and constants variables.
+HEADER = struct.Struct("<4sI")
+CALIBRATION = struct.Struct("<Idd")
+
+CALIBRATION_KIND = b"XSCA"
+EVENTS_KIND = b"XSEV"
+PACKET_KINDS = (CALIBRATION_KIND, EVENTS_KIND)
+
+EVENT_DTYPE = np.dtype("<u2")
+MAXIMUM_PAYLOAD_SIZE = 64 * 1024 * 1024
+RECEIVE_BUFFER_SIZE = 1024 * 1024
+
+
+class StreamFormatError(Exception):
+    pass
+
+
+def encode_calibration(number_channels, offset_eV, gain_eV):
+    return HEADER.pack(CALIBRATION_KIND, CALIBRATION.size) + CALIBRATION.pack(number_channels, offset_eV, gain_eV)
+
+
+def encode_events(channels):
+    payload = np.asarray(channels, dtype=EVENT_DTYPE).tobytes()
+    return HEADER.pack(EVENTS_KIND, len(payload)) + payload
+
+
+def parse_address(text):
+    """
+    Return the socket address of a text: ``(host, port)`` for ``host:port`` or ``port``, a path otherwise.
+    """
+    text = text.strip()
+    if not text:
+        raise ValueError("Empty address")
+
+    host, separator, port = text.rpartition(":")
+    if not separator:
+        host, port = "", text
+    if port.isdigit() and "/" not in text:
+        return host or "localhost", int(port)
+
+    return text
+
+
+def create_socket(address):
+    """
+    Return a stream socket of the family of the address, a path is a UNIX socket.
+    """
+    if isinstance(address, tuple):
+        return socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    return socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+
+
+class PacketDecoder(object):
+    """
+    Split the bytes received in packets, keeping an incomplete packet until its end is received.
+    """
+
+    def __init__(self):
+        self._buffer = bytearray()
+
+    def feed(self, data):
+        """
+        Return the list of ``(kind, payload)`` of the packets completed by `data`.
+        """
+        self._buffer += data
+
+        packets = []
+        offset = 0
+        buffer_size = len(self._buffer)
+        while buffer_size - offset >= HEADER.size:
+            kind, payload_size = HEADER.unpack_from(self._buffer, offset)
+            if kind not in PACKET_KINDS or payload_size > MAXIMUM_PAYLOAD_SIZE:
+                raise StreamFormatError("Invalid packet: {!r} of {:d} bytes".format(kind, payload_size))
+
+            end = offset + HEADER.size + payload_size
+            if end > buffer_size:
+                break
+
+            packets.append((kind, bytes(self._buffer[offset + HEADER.size:end])))
+            offset = end
+
+        del self._buffer[:offset]
+        return packets
+
+
+class EventStreamReader(threading.Thread):
+    """
+    Thread reading the events of a stream into an accumulator until the stream ends or :py:meth:`stop` is called.
+
+    The ``error`` attribute is the message of the error that ended the stream, None otherwise.
+    """
+
+    def __init__(self, address, accumulator, timeout_s=5.0):
+        super(EventStreamReader, self).__init__(name="EventStreamReader")
+        self.daemon = True
+
+        self.logger = logging.getLogger(__name__)
+
+        self.address = address
+        self.accumulator = accumulator
+        self.timeout_s = timeout_s
+        self.error = None
+
+        self._socket = None
+        self._stopped = threading.Event()
+
+    def run(self):
+        try:
+            self._socket = create_socket(self.address)
+            self._socket.settimeout(self.timeout_s)
+            self._socket.connect(self.address)
+            self._socket.settimeout(None)
+            if self._stopped.is_set():
+                return
+
+            self._read()
+        except (OSError, StreamFormatError) as message:
+            if not self._stopped.is_set():
+                self.logger.error("Live acquisition stream %s: %s", self.address, message)
+                self.error = str(message)
+        finally:
+            if self._socket is not None:
+                self._socket.close()
+
+    def _read(self):
+        decoder = PacketDecoder()
+        buffer = bytearray(RECEIVE_BUFFER_SIZE)
+        view = memoryview(buffer)
+        while not self._stopped.is_set():
+            number_bytes = self._socket.recv_into(buffer)
+            if number_bytes == 0:
+                return
+
+            # The events of the packets received together are added with one histogram.
+            events = []
+            for kind, payload in decoder.feed(view[:number_bytes]):
+                if kind == EVENTS_KIND:
+                    events.append(np.frombuffer(payload, dtype=EVENT_DTYPE))
+                    continue
+
+                if len(payload) != CALIBRATION.size:
+                    raise StreamFormatError("Invalid calibration packet")
+                self._add_events(events)
+                events = []
+                self.accumulator.configure(*CALIBRATION.unpack(payload))
+
+            self._add_events(events)
+
+    def _add_events(self, events):
+        if len(events) == 1:
+            self.accumulator.add_events(events[0])
+        elif events:
+            self.accumulator.add_events(np.concatenate(events))
+
+    def stop(self):
+        """
+        Stop reading, the blocking receive is interrupted by shutting down the socket.
+        """
+        self._stopped.set()
+        if self._socket is not None:
+            try:
+                self._socket.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
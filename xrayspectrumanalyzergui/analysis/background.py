@@ -0,0 +1,336 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+.. py:currentmodule:: xrayspectrumanalyzergui.analysis.background
+   :synopsis: Estimation of the continuous background of spectra.
+
+.. moduleauthor:: Hendrix Demers <hendrix.demers@mail.mcgill.ca>
+
+Estimation of the continuous background of spectra.
+
+The default method is the statistics-sensitive non-linear iterative peak-clipping (SNIP) algorithm: each iteration
+replaces every channel by the minimum of itself and the mean of its two neighbours at a distance :math:`p`, with
+:math:`p` decreasing from the half width of the window to one. An iteration is a few whole-array NumPy operations, on
+one spectrum or on the last axis of a stack of spectra. The counts are smoothed first, otherwise the clipping of the
+Poisson noise biases the background low, and the optional log-log-square root (LLS) transform compresses the dynamic
+range before the clipping. A polynomial and a Kramers' law continuum fitted with iterative clipping of the peaks are
+also available.
+
+The backgrounds are cached by :py:class:`BackgroundCache` with the content of the spectrum and the parameters as key, so
+displaying or fitting a spectrum again does not compute its background again.
+"""
+
+###############################################################################
+# GUI for the x-ray spectrum analyzer project
+# Copyright (C) 2017  Hendrix Demers
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+###############################################################################
+
+# Standard library modules.
+from collections import OrderedDict
+import hashlib
+
+# Third party modules.
+import numpy as np
+
+# Local modules.
+
+# Project modules.
+from xrayspectrumanalyzergui.analysis.peak_identification import FWHM_MN_KA_eV
+
+# Globals and constants variables.
+METHOD_SNIP = "snip"
+METHOD_POLYNOMIAL = "polynomial"
+METHOD_KRAMERS = "kramers"
+METHODS = (METHOD_SNIP, METHOD_POLYNOMIAL, METHOD_KRAMERS)
+
+DEFAULT_WIDTH_eV = 2.0 * FWHM_MN_KA_eV
+DEFAULT_SMOOTHING_eV = 0.5 * FWHM_MN_KA_eV
+# Counts higher than the fit by this number of standard deviations are clipped.
+CLIPPING_SIGMA = 3.0
+DEFAULT_ORDER = 3
+DEFAULT_NUMBER_CLIPPING_ITERATIONS = 20
+MINIMUM_ENERGY_eV = 100.0
+
+CHUNK_SIZE = 256
+CACHE_SIZE = 256
+
+
+def lls_transform(counts):
+    """
+    Return the log-log-square root transform of the counts.
+    """
+    return np.log(np.log(np.sqrt(np.maximum(counts, 0.0) + 1.0) + 1.0) + 1.0)
+
+
+def inverse_lls_transform(values):
+    return (np.exp(np.exp(values) - 1.0) - 1.0) ** 2 - 1.0
+
+
+def smooth(counts, width_channels, dtype=np.float64):
+    """
+    Return the moving average of the counts along the last axis, the first and last channels are repeated at the ends.
+    """
+    values = np.asarray(counts, dtype=dtype)
+    half_width = int(width_channels) // 2
+    if half_width < 1 or values.shape[-1] == 0:
+        return np.array(values, dtype=dtype)
+
+    pad_width = [(0, 0)] * (values.ndim - 1) + [(half_width + 1, half_width)]
+    sums = np.cumsum(np.pad(values, pad_width, mode="edge"), axis=-1, dtype=np.float64)
+    return ((sums[..., 2 * half_width + 1:] - sums[..., :-2 * half_width - 1]) / (2 * half_width + 1)).astype(dtype)
+
+
+def snip(counts, width_channels, use_lls=True, decreasing=True, smoothing_channels=0, dtype=np.float64):
+    """
+    Return the SNIP background of the counts along the last axis.
+
+    :param counts: counts of one spectrum or of a stack of spectra with the same number of channels.
+    :param width_channels: width of the clipping window, the number of iterations is half this width.
+    :param use_lls: compress the counts with the LLS transform before the clipping.
+    :param decreasing: decrease the distance of the neighbours at each iteration, which gives a smoother background
+        than increasing it.
+    :param smoothing_channels: width of the moving average applied before the clipping.
+    """
+    values = smooth(counts, smoothing_channels, dtype)
+    if use_lls:
+        values = lls_transform(values).astype(dtype, copy=False)
+
+    number_channels = values.shape[-1]
+    number_iterations = min(int(round(width_channels / 2.0)), (number_channels - 1) // 2)
+    distances = range(1, number_iterations + 1)
+    if decreasing:
+        distances = reversed(distances)
+
+    means = np.empty_like(values)
+    for distance in distances:
+        center = values[..., distance:-distance]
+        mean = means[..., distance:-distance]
+        np.add(values[..., :-2 * distance], values[..., 2 * distance:], out=mean)
+        mean *= 0.5
+        np.minimum(center, mean, out=center)
+
+    if use_lls:
+        values = inverse_lls_transform(values)
+    return values
+
+
+def fit_clipped(counts, basis, mask=None, number_iterations=DEFAULT_NUMBER_CLIPPING_ITERATIONS):
+    """
+    Return the fit of a linear model to the counts along the last axis, with the peaks clipped iteratively.
+
+    At each iteration, the counts higher than the previous fit by :py:data:`CLIPPING_SIGMA` standard deviations are
+    replaced by the fit, so the fit converges to the continuum under the peaks without clipping the noise. A spectrum
+    is not iterated anymore once its clipped channels do not change. The pseudo-inverse of the basis is computed once
+    for all the spectra and iterations.
+
+    :param basis: values of the functions of the model for each channel, shape ``(number_channels, number_functions)``.
+    :param mask: channels used in the fit, all if None.
+    """
+    values = np.asarray(counts, dtype=np.float64)
+    if mask is None:
+        mask = np.ones(values.shape[-1], dtype=bool)
+
+    masked_basis = basis[mask]
+    pseudo_inverse = np.linalg.pinv(masked_basis)
+    masked_counts = values.reshape(-1, values.shape[-1])[:, mask]
+
+    coefficients = np.dot(masked_counts, pseudo_inverse.T)
+    is_peak = np.zeros(masked_counts.shape, dtype=bool)
+    active_indexes = np.arange(masked_counts.shape[0])
+    for _iteration in range(number_iterations):
+        if active_indexes.size == 0:
+            break
+
+        active_counts = masked_counts[active_indexes]
+        fit = np.dot(coefficients[active_indexes], masked_basis.T)
+
+        # In place, the temporary arrays of the stack are the costly part of an iteration.
+        thresholds = np.maximum(fit, 1.0)
+        np.sqrt(thresholds, out=thresholds)
+        thresholds *= CLIPPING_SIGMA
+        thresholds += fit
+        active_is_peak = np.greater(active_counts, thresholds)
+        is_changed = np.any(active_is_peak != is_peak[active_indexes], axis=1)
+
+        np.copyto(fit, active_counts, where=~active_is_peak)
+        coefficients[active_indexes] = np.dot(fit, pseudo_inverse.T)
+        is_peak[active_indexes] = active_is_peak
+        active_indexes = active_indexes[is_changed]
+
+    backgrounds = np.maximum(np.dot(coefficients, basis.T), 0.0)
+    return backgrounds.reshape(values.shape)
+
+
+def create_polynomial_basis(energies_eV, order=DEFAULT_ORDER):
+    energies_eV = np.asarray(energies_eV, dtype=np.float64)
+    energy_min_eV = energies_eV.min()
+    energy_range_eV = max(energies_eV.max() - energy_min_eV, 1.0)
+    return np.polynomial.polynomial.polyvander(2.0 * (energies_eV - energy_min_eV) / energy_range_eV - 1.0, order)
+
+
+def create_kramers_basis(energies_eV, beam_energy_eV=None, order=DEFAULT_ORDER):
+    """
+    Return the basis of a Kramers' law continuum, :math:`(E_0 - E)/E`, multiplied by a polynomial of :math:`E/E_0`
+    for the absorption and the detector efficiency.
+    """
+    energies_eV = np.asarray(energies_eV, dtype=np.float64)
+    if beam_energy_eV is None:
+        beam_energy_eV = energies_eV.max()
+
+    clipped_energies_eV = np.maximum(energies_eV, MINIMUM_ENERGY_eV)
+    kramers = np.maximum(beam_energy_eV - clipped_energies_eV, 0.0) / clipped_energies_eV
+    return kramers[:, np.newaxis] * np.polynomial.polynomial.polyvander(clipped_energies_eV / beam_energy_eV, order)
+
+
+class BackgroundParameters(object):
+    """
+    Method and parameters of the background estimation.
+
+    :param method: one of :py:data:`METHODS`.
+    :param width_eV: width of the SNIP clipping window.
+    :param use_lls: use the LLS transform with SNIP.
+    :param smoothing_eV: width of the moving average applied before SNIP.
+    :param order: order of the polynomial of the polynomial and Kramers methods.
+    :param beam_energy_eV: beam energy of the Kramers method, the maximum energy of the spectrum if None.
+    """
+
+    def __init__(self, method=METHOD_SNIP, width_eV=DEFAULT_WIDTH_eV, use_lls=True, smoothing_eV=DEFAULT_SMOOTHING_eV,
+                 order=DEFAULT_ORDER, beam_energy_eV=None):
+        if method not in METHODS:
+            raise ValueError("Unknown background method: {}".format(method))
+
+        self.method = method
+        self.width_eV = float(width_eV)
+        self.use_lls = bool(use_lls)
+        self.smoothing_eV = float(smoothing_eV)
+        self.order = int(order)
+        self.beam_energy_eV = beam_energy_eV
+
+    @property
+    def key(self):
+        return self.method, self.width_eV, self.use_lls, self.smoothing_eV, self.order, self.beam_energy_eV
+
+    def __eq__(self, other):
+        return isinstance(other, BackgroundParameters) and self.key == other.key
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __hash__(self):
+        return hash(self.key)
+
+    def __repr__(self):
+        return "BackgroundParameters({})".format(", ".join("{!r}".format(value) for value in self.key))
+
+
+def compute_backgrounds(counts, energies_eV, parameters=None, chunk_size=CHUNK_SIZE):
+    """
+    Return the backgrounds of a stack of spectra with the same calibration, shape ``(number_spectra,
+    number_channels)``.
+
+    The spectra are processed by chunks of `chunk_size`, so that the temporary arrays stay in the processor cache.
+    """
+    if parameters is None:
+        parameters = BackgroundParameters()
+
+    counts = np.atleast_2d(counts)
+    energies_eV = np.asarray(energies_eV, dtype=np.float64)
+    backgrounds = np.empty(counts.shape, dtype=np.float64)
+    if counts.size == 0:
+        return backgrounds
+
+    if parameters.method == METHOD_SNIP:
+        gain_eV = abs(energies_eV[-1] - energies_eV[0]) / max(energies_eV.size - 1, 1) or 1.0
+        width_channels = parameters.width_eV / gain_eV
+        smoothing_channels = parameters.smoothing_eV / gain_eV
+        for start in range(0, counts.shape[0], chunk_size):
+            backgrounds[start:start + chunk_size] = snip(counts[start:start + chunk_size], width_channels,
+                                                         parameters.use_lls, smoothing_channels=smoothing_channels,
+                                                         dtype=np.float32)
+        return backgrounds
+
+    if parameters.method == METHOD_POLYNOMIAL:
+        basis = create_polynomial_basis(energies_eV, parameters.order)
+        mask = energies_eV >= MINIMUM_ENERGY_eV
+    else:
+        basis = create_kramers_basis(energies_eV, parameters.beam_energy_eV, parameters.order)
+        mask = (energies_eV >= MINIMUM_ENERGY_eV) & np.any(basis != 0.0, axis=1)
+    if np.count_nonzero(mask) <= basis.shape[1]:
+        mask[:] = True
+
+    for start in range(0, counts.shape[0], chunk_size):
+        backgrounds[start:start + chunk_size] = fit_clipped(counts[start:start + chunk_size], basis, mask)
+    return backgrounds
+
+
+def compute_background(spectrum, parameters=None):
+    """
+    Return the background of a spectrum.
+    """
+    if spectrum.number_channels == 0:
+        return np.zeros(0, dtype=np.float64)
+    return compute_backgrounds(spectrum.counts, spectrum.energies_eV, parameters)[0]
+
+
+class BackgroundCache(object):
+    """
+    Least recently used cache of the backgrounds of spectra.
+
+    The key is a digest of the counts with the calibration and the parameters, so the same spectrum read again from a
+    project gets the cached background. The energy axis is part of the digest only for the explicit energies of a
+    non-linear spectrum, a linear calibration is keyed by its offset, gain and number of channels.
+    """
+
+    def __init__(self, maximum_size=CACHE_SIZE):
+        self.maximum_size = maximum_size
+        self._backgrounds = OrderedDict()
+
+    def __len__(self):
+        return len(self._backgrounds)
+
+    @staticmethod
+    def get_key(spectrum, parameters):
+        counts = np.ascontiguousarray(spectrum.counts)
+        digest = hashlib.sha1(counts.view(np.uint8))
+        if spectrum.is_linear:
+            calibration = (spectrum.offset_eV, spectrum.gain_eV, spectrum.number_channels)
+        else:
+            digest.update(np.ascontiguousarray(spectrum.energies_eV).view(np.uint8))
+            calibration = None
+        return digest.digest(), counts.dtype.str, calibration, parameters.key
+
+    def get_background(self, spectrum, parameters=None):
+        """
+        Return the read-only background of a spectrum, computed only if not in the cache.
+        """
+        if parameters is None:
+            parameters = BackgroundParameters()
+
+        key = self.get_key(spectrum, parameters)
+        background = self._backgrounds.pop(key, None)
+        if background is None:
+            background = compute_background(spectrum, parameters)
+            background.flags.writeable = False
+
+        self._backgrounds[key] = background
+        while len(self._backgrounds) > self.maximum_size:
+            self._backgrounds.popitem(last=False)
+
+        return background
+
+    def clear(self):
+        self._backgrounds.clear()
@@ -0,0 +1,187 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+.. py:currentmodule:: xrayspectrumanalyzergui.analysis.element_maps
+   :synopsis: Element maps from the ROIs of a spectrum image.
+
+.. moduleauthor:: Hendrix Demers <hendrix.demers@mail.mcgill.ca>
+
+Element maps from the ROIs of a spectrum image.
+
+The spectrum image is read by blocks of rows and the net counts of all the ROIs are computed from each block, so the
+cube is read once whatever the number of ROIs. The integrals only need the cumulative sums of the counts at the edges of
+the ROIs and their background windows: the counts between consecutive edges are summed with a single
+:py:func:`numpy.add.reduceat` over the channels of each group of overlapping ROIs, and the cumulative sums of these
+segments give the cumulative sums at the edges, without summing the channels outside the ROIs. The blocks are
+independent: with an executor, they are computed by its workers, which open the spectrum image again from its file
+instead of receiving the counts.
+"""
+
+###############################################################################
+# GUI for the x-ray spectrum analyzer project
+# Copyright (C) 2017  Hendrix Demers
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+###############################################################################
+
+# Standard library modules.
+import os.path
+from concurrent.futures import as_completed
+
+# Third party modules.
+import numpy as np
+
+# Local modules.
+
+# Project modules.
+from xrayspectrumanalyzergui.analysis.roi_integration import get_edge_positions, integrate_edges
+from xrayspectrumanalyzergui.file_format.spectrum_image import read_spectrum_image
+
+# Globals and constants variables.
+
+
+def get_row_blocks(spectrum_image, rows_per_block=None):
+    """
+    Return the ``(row_start, row_end)`` of the blocks of a spectrum image, the ends are excluded.
+
+    :param rows_per_block: number of rows of a block, the rows of a chunk of the spectrum image if None.
+    """
+    if rows_per_block is None:
+        rows_per_block = spectrum_image.rows_per_chunk
+    number_rows = spectrum_image.number_rows
+    return [(row, min(row + rows_per_block, number_rows)) for row in range(0, number_rows, rows_per_block)]
+
+
+def group_rois(indexes):
+    """
+    Return the groups of ROIs whose channels overlap, as a list of ``(rois, edges)``: the indexes of the ROIs of the
+    group and the sorted channels of their edges.
+
+    :param indexes: channels of the left, minimum, maximum and right edges, array of shape ``(4, number_rois)``.
+    """
+    groups = []
+    for roi in np.argsort(indexes[0], kind="stable"):
+        if groups and indexes[0, roi] <= groups[-1][1]:
+            groups[-1][0].append(roi)
+            groups[-1][1] = max(groups[-1][1], indexes[3, roi])
+        else:
+            groups.append([[roi], indexes[3, roi]])
+    return [(rois, np.unique(indexes[:, rois])) for rois, _stop in groups]
+
+
+def compute_maps(counts, offset_eV, gain_eV, rois):
+    """
+    Return the net counts of the ROIs in each pixel of a block of a spectrum image.
+
+    :param counts: array of shape ``(rows, columns, channels)``.
+    :param rois: list of ``(name, energy_min_eV, energy_max_eV, background_width_eV)``.
+    :return: array of shape ``(number_rois, rows, columns)``.
+    """
+    counts = np.asarray(counts)
+    number_rows, number_columns, number_channels = counts.shape
+    counts = counts.reshape(number_rows * number_columns, number_channels)
+    number_rois = len(rois)
+
+    positions = get_edge_positions([offset_eV], [gain_eV], [number_channels], rois)[0]
+    indexes = np.minimum(np.floor(positions).astype(np.int64), max(number_channels - 1, 0))
+    fractions = positions - indexes
+
+    # Cumulative sums at the edges, from the first channel of the group of the ROI, interpolated inside a channel.
+    sums = np.empty((counts.shape[0], positions.size))
+    for group, edges in group_rois(indexes.reshape(4, number_rois)):
+        start = edges[0]
+        segment_sums = np.add.reduceat(counts[:, start:edges[-1] + 1], edges - start, axis=1, dtype=np.float64)
+        edge_sums = np.zeros((counts.shape[0], edges.size))
+        np.cumsum(segment_sums[:, :-1], axis=1, out=edge_sums[:, 1:])
+
+        columns = (np.arange(4)[:, np.newaxis] * number_rois + group).ravel()
+        edge_indexes = indexes[columns]
+        sums[:, columns] = edge_sums[:, np.searchsorted(edges, edge_indexes)] + \
+            fractions[columns] * counts[:, edge_indexes]
+
+    integrals = integrate_edges(positions[np.newaxis], sums)
+    return integrals.net.T.reshape(number_rois, number_rows, number_columns)
+
+
+def _compute_file_block(file_path, dataset_path, row_start, row_end, rois):
+    spectrum_image = read_spectrum_image(file_path, dataset_path)
+    try:
+        counts = spectrum_image.data[row_start:row_end]
+        return compute_maps(counts, spectrum_image.offset_eV, spectrum_image.gain_eV, rois)
+    finally:
+        spectrum_image.close()
+
+
+def get_block_task(spectrum_image, row_start, row_end, rois):
+    """
+    Return the function and its arguments computing the maps of a block of rows, to submit to an executor.
+
+    The block of a spectrum image read from a file is read by the worker, only the counts of an image in memory are
+    sent to it.
+    """
+    file_path = spectrum_image.metadata.get("SPECTRUMIMAGE")
+    if file_path is not None:
+        return _compute_file_block, (file_path, spectrum_image.metadata.get("DATASET"), row_start, row_end, rois)
+
+    counts = np.asarray(spectrum_image.data[row_start:row_end])
+    return compute_maps, (counts, spectrum_image.offset_eV, spectrum_image.gain_eV, rois)
+
+
+def build_element_maps(spectrum_image, rois, executor=None, rows_per_block=None):
+    """
+    Return the net counts of the ROIs in each pixel of a spectrum image, array of shape
+    ``(number_rois, rows, columns)``.
+
+    :param executor: :py:class:`concurrent.futures.Executor` computing the blocks, in this process if None.
+    """
+    maps = np.zeros((len(rois),) + spectrum_image.shape[:2])
+    if not rois:
+        return maps
+
+    blocks = get_row_blocks(spectrum_image, rows_per_block)
+    if executor is None:
+        for row_start, row_end in blocks:
+            maps[:, row_start:row_end] = compute_maps(spectrum_image.data[row_start:row_end], spectrum_image.offset_eV,
+                                                      spectrum_image.gain_eV, rois)
+        return maps
+
+    futures = {}
+    for row_start, row_end in blocks:
+        function, arguments = get_block_task(spectrum_image, row_start, row_end, rois)
+        futures[executor.submit(function, *arguments)] = (row_start, row_end)
+    for future in as_completed(futures):
+        row_start, row_end = futures[future]
+        maps[:, row_start:row_end] = future.result()
+    return maps
+
+
+def get_source(spectrum_image):
+    """
+    Return the description of the file of a spectrum image identifying its maps cached in a project, None for a
+    spectrum image in memory.
+    """
+    file_path = spectrum_image.metadata.get("SPECTRUMIMAGE")
+    if file_path is None:
+        return None
+
+    data_file_path = getattr(spectrum_image.data, "filename", None) or file_path
+    try:
+        status = os.stat(data_file_path)
+    except OSError:
+        return None
+
+    return {"file_path": os.path.abspath(file_path), "dataset_path": spectrum_image.metadata.get("DATASET"),
+            "shape": list(spectrum_image.shape), "offset_eV": spectrum_image.offset_eV,
+            "gain_eV": spectrum_image.gain_eV, "size": status.st_size, "mtime": status.st_mtime}
@@ -0,0 +1,429 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+.. py:currentmodule:: xrayspectrumanalyzergui.analysis.peak_fitting
+   :synopsis: Fit of the peaks of spectra for their net intensities.
+
+.. moduleauthor:: Hendrix Demers <hendrix.demers@mail.mcgill.ca>
+
+Fit of the peaks of spectra for their net intensities.
+
+The spectrum is modelled by its background, see :py:mod:`xrayspectrumanalyzergui.analysis.background`, plus one
+component per group of lines of each element, e.g. the Ka1 and Ka2 lines of Fe form the "Fe Ka" component. A
+component is the sum of the Gaussian peaks of its lines, with their relative weights and an optional low energy
+exponential tail, normalized to unit area, so its amplitude is the net intensity in counts.
+
+The values of the components on the energy axis form a basis computed once per calibration. The amplitudes of a stack
+of spectra with the same calibration are solved at once by linear least squares with the pseudo-inverse of the basis,
+and their uncertainties are propagated from the Poisson variance of the counts. Only the spectra with a poor fit are
+refined with a non-linear least squares of the energy shift and the resolution. The chunks of a large batch are fitted
+in parallel by a process pool with :py:func:`fit_parallel`.
+"""
+
+###############################################################################
+# GUI for the x-ray spectrum analyzer project
+# Copyright (C) 2017  Hendrix Demers
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+###############################################################################
+
+# Standard library modules.
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+import multiprocessing
+
+# Third party modules.
+import numpy as np
+
+# Local modules.
+
+# Project modules.
+from xrayspectrumanalyzergui.analysis.xray_lines import get_database
+from xrayspectrumanalyzergui.analysis.peak_identification import get_fwhm_eV, FWHM_MN_KA_eV, FWHM_TO_SIGMA
+from xrayspectrumanalyzergui.analysis.background import compute_backgrounds, BackgroundParameters
+
+# Globals and constants variables.
+LINE_GROUPS = {"Ka1": "Ka", "Ka2": "Ka", "Kb1": "Kb",
+               "La1": "La", "La2": "La", "Lb1": "Lb", "Lb2": "Lb", "Lg1": "Lg",
+               "Ma1": "Ma"}
+
+MINIMUM_ENERGY_eV = 100.0
+# Reduced chi-square of the channels of the peaks above which the energy shift and the resolution are refined.
+REFINEMENT_THRESHOLD = 1.5
+# Channels where a component is above this fraction of the maximum of the basis belong to the peaks.
+PEAK_REGION_FRACTION = 1.0e-3
+MAXIMUM_NUMBER_REFINEMENT_ITERATIONS = 20
+MAXIMUM_ENERGY_SHIFT_eV = 50.0
+
+# Coefficients of the approximation 7.1.26 of Abramowitz and Stegun of erfc, relative error below 1.5e-7.
+_ERFC_P = 0.3275911
+_ERFC_COEFFICIENTS = (0.254829592, -0.284496736, 1.421413741, -1.453152027, 1.061405429)
+
+BASIS_CACHE_SIZE = 16
+CHUNK_SIZE = 512
+
+
+def erfcx(x):
+    """
+    Return the scaled complementary error function :math:`e^{x^2} \\mathrm{erfc}(x)` for :math:`x \\geq 0`.
+    """
+    t = 1.0 / (1.0 + _ERFC_P * np.asarray(x, dtype=np.float64))
+    polynomial = np.zeros_like(t)
+    for coefficient in reversed(_ERFC_COEFFICIENTS):
+        polynomial = (polynomial + coefficient) * t
+    return polynomial
+
+
+def gaussian(energies_eV, position_eV, sigma_eV):
+    """
+    Return a Gaussian peak of unit area.
+    """
+    x = (np.asarray(energies_eV) - position_eV) / sigma_eV
+    return np.exp(-0.5 * x * x) / (np.sqrt(2.0 * np.pi) * sigma_eV)
+
+
+def exponential_tail(energies_eV, position_eV, sigma_eV, slope_eV):
+    """
+    Return a low energy exponential tail convolved with the Gaussian resolution, of unit area.
+
+    The tail is :math:`\\frac{1}{2\\beta} e^{x/\\beta + \\sigma^2/2\\beta^2}
+    \\mathrm{erfc}\\left(\\frac{x/\\sigma + \\sigma/\\beta}{\\sqrt{2}}\\right)` with :math:`x = E - E_0`, computed with
+    the scaled erfc above the peak so that the exponential does not overflow.
+    """
+    x = np.asarray(energies_eV, dtype=np.float64) - position_eV
+    z = (x / sigma_eV + sigma_eV / slope_eV) / np.sqrt(2.0)
+
+    tail = np.empty_like(x)
+    is_positive = z >= 0.0
+    tail[is_positive] = np.exp(-0.5 * (x[is_positive] / sigma_eV) ** 2) * erfcx(z[is_positive])
+    negative_z = -z[~is_positive]
+    exponent = x[~is_positive] / slope_eV + 0.5 * (sigma_eV / slope_eV) ** 2
+    tail[~is_positive] = np.exp(exponent) * (2.0 - np.exp(-negative_z * negative_z) * erfcx(negative_z))
+
+    return tail / (2.0 * slope_eV)
+
+
+class BatchFitResults(object):
+    """
+    Results of the fit of a stack of spectra.
+
+    :ivar labels: labels of the components, e.g. ``"Fe Ka"``.
+    :ivar net_intensities: net intensities in counts, shape ``(number_spectra, number_components)``.
+    :ivar errors: standard deviations of the net intensities.
+    :ivar reduced_chi_squares: reduced chi-square of each spectrum.
+    :ivar peak_reduced_chi_squares: reduced chi-square of the channels of the peaks, more sensitive to a wrong
+        position or width than the reduced chi-square of the whole spectrum.
+    :ivar energy_shifts_eV: refined energy shift of each spectrum, zero if not refined.
+    :ivar fwhms_mn_ka_eV: resolution used for each spectrum.
+    :ivar is_refined: True for the spectra refined by non-linear least squares.
+    """
+
+    def __init__(self, labels, net_intensities, errors, reduced_chi_squares, peak_reduced_chi_squares,
+                 energy_shifts_eV, fwhms_mn_ka_eV, is_refined):
+        self.labels = list(labels)
+        self.net_intensities = net_intensities
+        self.errors = errors
+        self.reduced_chi_squares = reduced_chi_squares
+        self.peak_reduced_chi_squares = peak_reduced_chi_squares
+        self.energy_shifts_eV = energy_shifts_eV
+        self.fwhms_mn_ka_eV = fwhms_mn_ka_eV
+        self.is_refined = is_refined
+
+    @property
+    def number_spectra(self):
+        return self.net_intensities.shape[0]
+
+    @classmethod
+    def concatenate(cls, results):
+        results = list(results)
+        return cls(results[0].labels,
+                   np.concatenate([result.net_intensities for result in results]),
+                   np.concatenate([result.errors for result in results]),
+                   np.concatenate([result.reduced_chi_squares for result in results]),
+                   np.concatenate([result.peak_reduced_chi_squares for result in results]),
+                   np.concatenate([result.energy_shifts_eV for result in results]),
+                   np.concatenate([result.fwhms_mn_ka_eV for result in results]),
+                   np.concatenate([result.is_refined for result in results]))
+
+    def get_rows(self, spectrum_indexes=None):
+        """
+        Return the results as a list of ``(spectrum_index, label, net_intensity, error)``, the rows of the fit results
+        of a project.
+        """
+        if spectrum_indexes is None:
+            spectrum_indexes = range(self.number_spectra)
+
+        rows = []
+        for row, spectrum_index in enumerate(spectrum_indexes):
+            for column, label in enumerate(self.labels):
+                rows.append((int(spectrum_index), label, float(self.net_intensities[row, column]),
+                             float(self.errors[row, column])))
+        return rows
+
+
+class PeakFitter(object):
+    """
+    Fit the net intensities of the lines of elements.
+
+    :param elements: symbols of the elements to fit.
+    :param fwhm_mn_ka_eV: resolution of the detector.
+    :param tail_fraction: fraction of the area of each peak in its low energy tail, no tail if zero.
+    :param tail_slope: slope of the tail in unit of the standard deviation of the peak.
+    :param background_parameters: parameters of the background, see
+        :py:class:`xrayspectrumanalyzergui.analysis.background.BackgroundParameters`.
+    :param refinement_threshold: reduced chi-square of the channels of the peaks above which a spectrum is refined,
+        never refined if None.
+    """
+
+    def __init__(self, elements, fwhm_mn_ka_eV=FWHM_MN_KA_eV, tail_fraction=0.0, tail_slope=1.0,
+                 background_parameters=None, refinement_threshold=REFINEMENT_THRESHOLD):
+        database = get_database()
+        self.elements = [database.get_symbol(element) for element in elements]
+        self.fwhm_mn_ka_eV = float(fwhm_mn_ka_eV)
+        self.tail_fraction = float(tail_fraction)
+        self.tail_slope = float(tail_slope)
+        if background_parameters is None:
+            background_parameters = BackgroundParameters()
+        self.background_parameters = background_parameters
+        self.refinement_threshold = refinement_threshold
+
+        self._bases = OrderedDict()
+
+    def __getstate__(self):
+        # The bases are recomputed by each process of a pool rather than pickled.
+        state = self.__dict__.copy()
+        state["_bases"] = OrderedDict()
+        return state
+
+    def get_components(self, energy_min_eV, energy_max_eV):
+        """
+        Return the components with at least one line between the energy limits, as a list of ``(label, lines)``.
+        """
+        database = get_database()
+        components = OrderedDict()
+        for element in self.elements:
+            for line in database.get_lines(element):
+                if energy_min_eV <= line["energy_eV"] <= energy_max_eV:
+                    label = "{} {}".format(element, LINE_GROUPS[str(line["line"])])
+                    components.setdefault(label, []).append(line)
+
+        return [(label, np.array(lines)) for label, lines in components.items()]
+
+    def create_basis(self, energies_eV, energy_shift_eV=0.0, fwhm_mn_ka_eV=None):
+        """
+        Return the labels of the components and their values on the energy axis, shape ``(number_channels,
+        number_components)``, in counts per channel for a unit net intensity.
+        """
+        if fwhm_mn_ka_eV is None:
+            fwhm_mn_ka_eV = self.fwhm_mn_ka_eV
+
+        energies_eV = np.asarray(energies_eV, dtype=np.float64)
+        channel_widths_eV = np.abs(np.gradient(energies_eV)) if energies_eV.size > 1 else np.ones_like(energies_eV)
+        components = self.get_components(max(energies_eV.min(), MINIMUM_ENERGY_eV), energies_eV.max())
+
+        basis = np.zeros((energies_eV.size, len(components)))
+        for index, (_label, lines) in enumerate(components):
+            weights = lines["weight"] / lines["weight"].sum()
+            for line, weight in zip(lines, weights):
+                position_eV = line["energy_eV"] + energy_shift_eV
+                sigma_eV = get_fwhm_eV(line["energy_eV"], fwhm_mn_ka_eV) * FWHM_TO_SIGMA
+                peak = gaussian(energies_eV, position_eV, sigma_eV)
+                if self.tail_fraction > 0.0:
+                    tail = exponential_tail(energies_eV, position_eV, sigma_eV, self.tail_slope * sigma_eV)
+                    peak = (1.0 - self.tail_fraction) * peak + self.tail_fraction * tail
+                basis[:, index] += weight * peak
+        basis *= channel_widths_eV[:, np.newaxis]
+
+        return [label for label, _lines in components], basis
+
+    def get_basis(self, energies_eV):
+        """
+        Return the labels and the basis of an energy axis, computed once per calibration.
+        """
+        energies_eV = np.asarray(energies_eV, dtype=np.float64)
+        key = (energies_eV.size, float(energies_eV[0]), float(energies_eV[-1]))
+        labels_basis = self._bases.pop(key, None)
+        if labels_basis is None:
+            labels_basis = self.create_basis(energies_eV)
+
+        self._bases[key] = labels_basis
+        while len(self._bases) > BASIS_CACHE_SIZE:
+            self._bases.popitem(last=False)
+
+        return labels_basis
+
+    def fit(self, counts, energies_eV, backgrounds=None):
+        """
+        Fit a stack of spectra with the same calibration.
+
+        :param counts: counts of the spectra, shape ``(number_spectra, number_channels)``.
+        :param backgrounds: backgrounds of the spectra, computed if None.
+        :rtype: :py:class:`BatchFitResults`
+        """
+        counts = np.atleast_2d(np.asarray(counts, dtype=np.float64))
+        energies_eV = np.asarray(energies_eV, dtype=np.float64)
+        if backgrounds is None:
+            backgrounds = compute_backgrounds(counts, energies_eV, self.background_parameters)
+        backgrounds = np.atleast_2d(backgrounds)
+
+        labels, basis = self.get_basis(energies_eV)
+        mask = energies_eV >= MINIMUM_ENERGY_eV
+        net_counts = counts[:, mask] - backgrounds[:, mask]
+        variances = np.maximum(counts[:, mask], 1.0)
+
+        peak_mask = _get_peak_mask(basis[mask])
+        net_intensities, errors, reduced_chi_squares, peak_reduced_chi_squares = \
+            _solve_linear(basis[mask], net_counts, variances, peak_mask)
+
+        number_spectra = counts.shape[0]
+        energy_shifts_eV = np.zeros(number_spectra)
+        fwhms_mn_ka_eV = np.full(number_spectra, self.fwhm_mn_ka_eV)
+        is_refined = np.zeros(number_spectra, dtype=bool)
+
+        if self.refinement_threshold is not None and len(labels) > 0:
+            for index in np.flatnonzero(peak_reduced_chi_squares > self.refinement_threshold):
+                refined = self._refine(energies_eV[mask], net_counts[index], variances[index], peak_mask)
+                if refined is not None and refined[5] < peak_reduced_chi_squares[index]:
+                    energy_shifts_eV[index], fwhms_mn_ka_eV[index], net_intensities[index], errors[index], \
+                        reduced_chi_squares[index], peak_reduced_chi_squares[index] = refined
+                    is_refined[index] = True
+
+        return BatchFitResults(labels, net_intensities, errors, reduced_chi_squares, peak_reduced_chi_squares,
+                               energy_shifts_eV, fwhms_mn_ka_eV, is_refined)
+
+    def fit_spectrum(self, spectrum, background=None):
+        """
+        Fit one spectrum, see :py:meth:`fit`.
+        """
+        backgrounds = None if background is None else background[np.newaxis, :]
+        return self.fit(spectrum.counts[np.newaxis, :], spectrum.energies_eV, backgrounds)
+
+    def _refine(self, energies_eV, net_counts, variances, peak_mask):
+        """
+        Refine the energy shift and the resolution of one spectrum with the Levenberg-Marquardt algorithm, the
+        amplitudes are solved linearly for each value of the non-linear parameters.
+        """
+        weights = 1.0 / np.sqrt(variances)
+
+        def get_residuals(parameters):
+            _labels, basis = self.create_basis(energies_eV, parameters[0], parameters[1])
+            amplitudes = _solve_linear(basis, net_counts[np.newaxis, :], variances[np.newaxis, :])[0]
+            return (net_counts - np.dot(basis, amplitudes[0])) * weights
+
+        parameters = np.array([0.0, self.fwhm_mn_ka_eV])
+        steps = np.array([1.0, 1.0])
+        residuals = get_residuals(parameters)
+        chi_square = np.dot(residuals, residuals)
+        damping = 1.0e-3
+        for _iteration in range(MAXIMUM_NUMBER_REFINEMENT_ITERATIONS):
+            jacobian = np.empty((residuals.size, parameters.size))
+            for index in range(parameters.size):
+                step_parameters = parameters.copy()
+                step_parameters[index] += steps[index]
+                jacobian[:, index] = (get_residuals(step_parameters) - residuals) / steps[index]
+
+            normal_matrix = np.dot(jacobian.T, jacobian)
+            gradient = np.dot(jacobian.T, residuals)
+            while damping < 1.0e10:
+                damped_matrix = normal_matrix + damping * np.diag(np.diag(normal_matrix) + 1.0e-12)
+                try:
+                    delta = -np.linalg.solve(damped_matrix, gradient)
+                except np.linalg.LinAlgError:
+                    return None
+
+                new_parameters = parameters + delta
+                new_parameters[0] = np.clip(new_parameters[0], -MAXIMUM_ENERGY_SHIFT_eV, MAXIMUM_ENERGY_SHIFT_eV)
+                new_parameters[1] = max(new_parameters[1], 0.25 * self.fwhm_mn_ka_eV)
+                new_residuals = get_residuals(new_parameters)
+                new_chi_square = np.dot(new_residuals, new_residuals)
+                if new_chi_square < chi_square:
+                    break
+                damping *= 10.0
+            else:
+                break
+
+            is_converged = chi_square - new_chi_square < 1.0e-6 * chi_square
+            parameters, residuals, chi_square = new_parameters, new_residuals, new_chi_square
+            damping = max(damping / 10.0, 1.0e-7)
+            if is_converged:
+                break
+
+        _labels, basis = self.create_basis(energies_eV, parameters[0], parameters[1])
+        amplitudes, errors, reduced_chi_squares, peak_reduced_chi_squares = \
+            _solve_linear(basis, net_counts[np.newaxis, :], variances[np.newaxis, :], peak_mask)
+        return parameters[0], parameters[1], amplitudes[0], errors[0], reduced_chi_squares[0], \
+            peak_reduced_chi_squares[0]
+
+
+def _get_peak_mask(basis):
+    if basis.size == 0:
+        return np.zeros(basis.shape[0], dtype=bool)
+    return basis.max(axis=1) > PEAK_REGION_FRACTION * basis.max()
+
+
+def _solve_linear(basis, net_counts, variances, peak_mask=None):
+    """
+    Return the amplitudes, their standard deviations, the reduced chi-squares and the reduced chi-squares of the
+    channels of `peak_mask` of the linear least squares of a stack of spectra.
+    """
+    number_spectra, number_channels = net_counts.shape
+    number_components = basis.shape[1]
+    if number_components == 0:
+        amplitudes = errors = np.zeros((number_spectra, 0))
+        residuals = net_counts
+    else:
+        pseudo_inverse = np.linalg.pinv(basis)
+        amplitudes = np.dot(net_counts, pseudo_inverse.T)
+        errors = np.sqrt(np.dot(variances, (pseudo_inverse * pseudo_inverse).T))
+        residuals = net_counts - np.dot(amplitudes, basis.T)
+
+    normalized_squares = residuals * residuals / variances
+    reduced_chi_squares = np.sum(normalized_squares, axis=1) / max(number_channels - number_components, 1)
+    if peak_mask is None or not np.any(peak_mask):
+        peak_reduced_chi_squares = reduced_chi_squares.copy()
+    else:
+        peak_reduced_chi_squares = np.sum(normalized_squares[:, peak_mask], axis=1) / np.count_nonzero(peak_mask)
+
+    return amplitudes, errors, reduced_chi_squares, peak_reduced_chi_squares
+
+
+def fit_chunk(fitter, counts, energies_eV):
+    """
+    Fit a chunk of spectra, the picklable entry point of the workers of a process pool.
+    """
+    return fitter.fit(counts, energies_eV)
+
+
+def fit_parallel(fitter, counts, energies_eV, executor=None, chunk_size=CHUNK_SIZE):
+    """
+    Fit a stack of spectra with the same calibration by chunks in parallel.
+
+    :param executor: executor of the chunks, a process pool with one process per core is created if None.
+    :rtype: :py:class:`BatchFitResults`
+    """
+    counts = np.atleast_2d(counts)
+    chunks = [counts[start:start + chunk_size] for start in range(0, counts.shape[0], chunk_size)]
+    if len(chunks) <= 1 and executor is None:
+        return fitter.fit(counts, energies_eV)
+
+    is_owner = executor is None
+    if is_owner:
+        executor = ProcessPoolExecutor(max_workers=min(multiprocessing.cpu_count(), len(chunks)))
+    try:
+        futures = [executor.submit(fit_chunk, fitter, chunk, energies_eV) for chunk in chunks]
+        return BatchFitResults.concatenate(future.result() for future in futures)
+    finally:
+        if is_owner:
+            executor.shutdown()
@@ -0,0 +1,260 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+.. py:currentmodule:: xrayspectrumanalyzergui.analysis.peak_identification
+   :synopsis: Automatic identification of the peaks of a spectrum.
+
+.. moduleauthor:: Hendrix Demers <hendrix.demers@mail.mcgill.ca>
+
+Automatic identification of the peaks of a spectrum.
+
+The peaks are detected with a top-hat filter, which removes the slowly varying background, and kept when their
+significance, the filtered counts over their standard deviation, is above a threshold. The peaks are matched with the
+lines of the :py:mod:`xrayspectrumanalyzergui.analysis.xray_lines` database and each family of lines of each element
+is scored at once with NumPy, so identifying a 4096 channels spectrum takes a few milliseconds.
+"""
+
+###############################################################################
+# GUI for the x-ray spectrum analyzer project
+# Copyright (C) 2017  Hendrix Demers
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+###############################################################################
+
+# Standard library modules.
+
+# Third party modules.
+import numpy as np
+
+# Local modules.
+
+# Project modules.
+from xrayspectrumanalyzergui.analysis.xray_lines import get_database
+
+# Globals and constants variables.
+FWHM_MN_KA_eV = 130.0
+MN_KA_ENERGY_eV = 5898.75
+# Increase of the squared FWHM with the energy, from the Fano factor and the energy per electron-hole pair of Si.
+FWHM_ENERGY_FACTOR_eV = 2.5
+FWHM_TO_SIGMA = 1.0 / (2.0 * np.sqrt(2.0 * np.log(2.0)))
+
+MINIMUM_ENERGY_eV = 100.0
+SIGNIFICANCE_THRESHOLD = 5.0
+MINIMUM_SCORE = 0.8
+STRONG_LINE_WEIGHT = 0.5
+# A peak higher than this factor times the height expected from the principal peak is not explained by a weak line.
+EXCESS_HEIGHT_FACTOR = 2.0
+
+FAMILIES = "KLM"
+
+PEAK_DTYPE = [("channel", np.int64), ("energy_eV", np.float64), ("height", np.float64),
+              ("significance", np.float64)]
+ELEMENT_DTYPE = [("atomic_number", np.int16), ("symbol", "U2"), ("family", "U1"), ("score", np.float64),
+                 ("number_peaks", np.int64)]
+
+
+def get_fwhm_eV(energy_eV, fwhm_mn_ka_eV=FWHM_MN_KA_eV):
+    """
+    Return the energy resolution of the detector at `energy_eV`.
+    """
+    squared_fwhm = fwhm_mn_ka_eV ** 2 + FWHM_ENERGY_FACTOR_eV * (np.asarray(energy_eV) - MN_KA_ENERGY_eV)
+    return np.sqrt(np.maximum(squared_fwhm, 1.0))
+
+
+def create_top_hat_kernel(width_channels):
+    """
+    Return a top-hat kernel: a positive central lobe of about `width_channels` and two negative side lobes, with a
+    zero sum.
+    """
+    central_width = max(int(round(width_channels)), 1) | 1
+    side_width = max(central_width // 2, 1)
+
+    kernel = np.empty(central_width + 2 * side_width)
+    kernel[:side_width] = -0.5 / side_width
+    kernel[side_width:side_width + central_width] = 1.0 / central_width
+    kernel[side_width + central_width:] = -0.5 / side_width
+
+    return kernel
+
+
+def top_hat_filter(counts, width_channels):
+    """
+    Return the filtered counts and their variance, assuming Poisson counts.
+    """
+    counts = np.asarray(counts, dtype=np.float64)
+    kernel = create_top_hat_kernel(width_channels)
+
+    filtered = np.convolve(counts, kernel, mode="same")
+    variance = np.convolve(counts, kernel * kernel, mode="same")
+
+    return filtered, variance
+
+
+def detect_peaks(spectrum, fwhm_mn_ka_eV=FWHM_MN_KA_eV, threshold=SIGNIFICANCE_THRESHOLD):
+    """
+    Return the peaks of a spectrum, sorted by energy.
+
+    The local maxima of the significance closer than half the resolution are merged into the most significant one.
+    """
+    width_channels = fwhm_mn_ka_eV / abs(spectrum.gain_eV)
+    half_width = create_top_hat_kernel(width_channels).size // 2
+    if spectrum.number_channels < 2 * half_width + 3:
+        return np.zeros(0, dtype=PEAK_DTYPE)
+
+    filtered, variance = top_hat_filter(spectrum.counts, width_channels)
+    significance = filtered / np.sqrt(np.maximum(variance, 1.0))
+
+    # The filter is not valid near the ends of the spectrum.
+    energies_eV = spectrum.energies_eV
+    center = significance[1:-1]
+    is_peak = (center > significance[:-2]) & (center >= significance[2:]) & (center > threshold) & \
+        (energies_eV[1:-1] >= MINIMUM_ENERGY_eV)
+    is_peak[:half_width] = False
+    is_peak[is_peak.size - half_width:] = False
+    channels = np.flatnonzero(is_peak) + 1
+
+    if channels.size > 1:
+        channel_energies_eV = energies_eV[channels]
+        is_new_group = np.diff(channel_energies_eV) > 0.5 * get_fwhm_eV(channel_energies_eV[1:], fwhm_mn_ka_eV)
+        groups = np.concatenate(([0], np.cumsum(is_new_group)))
+        order = np.lexsort((-significance[channels], groups))
+        first_indexes = np.flatnonzero(np.concatenate(([True], np.diff(groups[order]) > 0)))
+        channels = np.sort(channels[order[first_indexes]])
+
+    # Parabolic interpolation of the maximum between the channels.
+    left = filtered[channels - 1]
+    middle = filtered[channels]
+    right = filtered[channels + 1]
+    curvature = left - 2.0 * middle + right
+    with np.errstate(divide="ignore", invalid="ignore"):
+        shifts = np.where(curvature < 0.0, 0.5 * (left - right) / curvature, 0.0)
+
+    peaks = np.empty(channels.size, dtype=PEAK_DTYPE)
+    peaks["channel"] = channels
+    peaks["energy_eV"] = np.interp(channels + np.clip(shifts, -0.5, 0.5), np.arange(energies_eV.size), energies_eV)
+    peaks["height"] = middle
+    peaks["significance"] = significance[channels]
+
+    return peaks
+
+
+def identify_elements(peaks, energy_min_eV, energy_max_eV, fwhm_mn_ka_eV=FWHM_MN_KA_eV,
+                      minimum_score=MINIMUM_SCORE, database=None):
+    """
+    Return the elements explaining the peaks, sorted by decreasing score.
+
+    Each family of lines of each element is scored with the weights of its strong lines matched by a peak, minus the
+    weights of its strong lines without a peak, normalized by the weights of its strong lines. An element is kept if
+    its best family explains at least one peak not already explained by an element with a higher score. A kept element
+    explains the peaks of its strong lines and the peaks of its weak lines not higher than expected from its principal
+    peak. Finally, the elements whose peaks are all explained by the other kept elements are removed.
+    """
+    if database is None:
+        database = get_database()
+
+    lines = database.lines
+    energy_min_eV = max(energy_min_eV, MINIMUM_ENERGY_eV)
+    lines = lines[(lines["energy_eV"] >= energy_min_eV) & (lines["energy_eV"] <= energy_max_eV)]
+    if peaks.size == 0 or lines.size == 0:
+        return np.zeros(0, dtype=ELEMENT_DTYPE)
+
+    # Nearest peak of each line.
+    line_energies_eV = lines["energy_eV"]
+    peak_energies_eV = peaks["energy_eV"]
+    indexes = np.searchsorted(peak_energies_eV, line_energies_eV)
+    left_indexes = np.clip(indexes - 1, 0, peaks.size - 1)
+    right_indexes = np.clip(indexes, 0, peaks.size - 1)
+    left_distances_eV = np.abs(line_energies_eV - peak_energies_eV[left_indexes])
+    right_distances_eV = np.abs(line_energies_eV - peak_energies_eV[right_indexes])
+    nearest_indexes = np.where(right_distances_eV < left_distances_eV, right_indexes, left_indexes)
+    distances_eV = np.minimum(left_distances_eV, right_distances_eV)
+
+    fwhms_eV = get_fwhm_eV(line_energies_eV, fwhm_mn_ka_eV)
+    is_matched = distances_eV <= 0.5 * fwhms_eV
+    quality = np.exp(-0.5 * (distances_eV / (fwhms_eV * FWHM_TO_SIGMA)) ** 2)
+
+    weights = lines["weight"]
+    is_strong = weights >= STRONG_LINE_WEIGHT
+    family_indexes = np.searchsorted(np.array(list(FAMILIES)), lines["family"])
+    groups = lines["atomic_number"].astype(np.int64) * len(FAMILIES) + family_indexes
+
+    number_groups = groups.max() + 1
+    matched_weights = np.bincount(groups, np.where(is_strong & is_matched, weights * quality, 0.0), number_groups)
+    missing_weights = np.bincount(groups, np.where(is_strong & ~is_matched, weights, 0.0), number_groups)
+    strong_weights = np.bincount(groups, np.where(is_strong, weights, 0.0), number_groups)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        scores = np.where(strong_weights > 0.0, (matched_weights - missing_weights) / strong_weights, 0.0)
+
+    # A candidate family must match its principal line.
+    has_principal = np.bincount(groups, is_matched & (weights >= 1.0), number_groups) > 0
+    candidates = np.flatnonzero(has_principal & (scores >= minimum_score))
+    candidates = candidates[np.argsort(-scores[candidates], kind="stable")]
+
+    heights = peaks["height"]
+    kept_families = []
+    is_explained = np.zeros(peaks.size, dtype=bool)
+    for group in candidates:
+        atomic_number = int(group) // len(FAMILIES)
+        if any(kept_group // len(FAMILIES) == atomic_number for kept_group, _indexes, _explained in kept_families):
+            continue
+
+        peak_indexes = np.unique(nearest_indexes[(groups == group) & is_matched & is_strong])
+        if np.all(is_explained[peak_indexes]):
+            continue
+
+        explained = np.zeros(peaks.size, dtype=bool)
+        for element_group in range(atomic_number * len(FAMILIES), (atomic_number + 1) * len(FAMILIES)):
+            if element_group >= number_groups or not has_principal[element_group]:
+                continue
+
+            # Heights of the peaks expected from the principal peak and the weights of the lines matched to each peak.
+            family_mask = (groups == element_group) & is_matched
+            peak_weights = np.bincount(nearest_indexes[family_mask], weights[family_mask], peaks.size)
+            principal_index = nearest_indexes[family_mask & (weights >= 1.0)][0]
+            expected_heights = heights[principal_index] / peak_weights[principal_index] * peak_weights
+            explained |= (peak_weights > 0.0) & (heights <= EXCESS_HEIGHT_FACTOR * expected_heights)
+            explained[nearest_indexes[family_mask & is_strong]] = True
+
+        is_explained |= explained
+        kept_families.append((group, peak_indexes, explained))
+
+    for index in reversed(range(len(kept_families))):
+        others_explained = np.zeros(peaks.size, dtype=bool)
+        for other_index, (_group, _peak_indexes, explained) in enumerate(kept_families):
+            if other_index != index:
+                others_explained |= explained
+        if np.all(others_explained[kept_families[index][1]]):
+            del kept_families[index]
+
+    elements = []
+    for group, peak_indexes, _explained in kept_families:
+        atomic_number, family_index = divmod(int(group), len(FAMILIES))
+        elements.append((atomic_number, database.get_symbol(atomic_number), FAMILIES[family_index], scores[group],
+                         peak_indexes.size))
+
+    return np.array(elements, dtype=ELEMENT_DTYPE)
+
+
+def identify_spectrum(spectrum, fwhm_mn_ka_eV=FWHM_MN_KA_eV, threshold=SIGNIFICANCE_THRESHOLD,
+                      minimum_score=MINIMUM_SCORE):
+    """
+    Detect the peaks of a spectrum and return the elements explaining them.
+    """
+    peaks = detect_peaks(spectrum, fwhm_mn_ka_eV, threshold)
+    energies_eV = spectrum.energies_eV
+    if energies_eV.size == 0:
+        return np.zeros(0, dtype=ELEMENT_DTYPE)
+
+    return identify_elements(peaks, energies_eV.min(), energies_eV.max(), fwhm_mn_ka_eV, minimum_score)
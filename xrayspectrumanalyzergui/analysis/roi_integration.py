@@ -0,0 +1,323 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+.. py:currentmodule:: xrayspectrumanalyzergui.analysis.roi_integration
+   :synopsis: Integration of the regions of interest (ROIs) of spectra.
+
+.. moduleauthor:: Hendrix Demers <hendrix.demers@mail.mcgill.ca>
+
+Integration of the regions of interest (ROIs) of spectra.
+
+A ROI is an energy window with an optional background window of the same width on each side. The counts of the
+spectra are kept as cumulative sums, one row per spectrum, so the counts in any energy window are the difference
+of two values of a row, whatever the width of the window. The cumulative sum is interpolated linearly inside a channel,
+which gives the partial counts of the channels at the edges of the window and integrals that change smoothly while an
+edge is dragged. The gross, background and net counts of all the ROIs of all the spectra are computed together with a
+single gather in the cumulative sums.
+"""
+
+###############################################################################
+# GUI for the x-ray spectrum analyzer project
+# Copyright (C) 2017  Hendrix Demers
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+###############################################################################
+
+# Standard library modules.
+
+# Third party modules.
+import numpy as np
+
+# Local modules.
+
+# Project modules.
+
+# Globals and constants variables.
+# Maximum number of spectra of the blocks merged together.
+BLOCK_SIZE = 1024
+
+
+def get_roi_limits(rois):
+    """
+    Return the minimum energies, maximum energies and background widths of ROIs.
+
+    :param rois: list of ``(name, energy_min_eV, energy_max_eV, background_width_eV)``, the background width is
+        optional.
+    """
+    limits = np.zeros((len(rois), 3))
+    for index, roi in enumerate(rois):
+        limits[index, :len(roi) - 1] = roi[1:4]
+    return limits[:, 0], limits[:, 1], limits[:, 2]
+
+
+class PrefixSums(object):
+    """
+    Cumulative sums of the counts of spectra, stored by blocks of spectra.
+
+    The element :math:`i` of the row of a spectrum is the sum of its first :math:`i` channels, the elements after its
+    number of channels are never read. A block is as wide as its largest spectrum and the sums of integer counts are
+    kept as ``uint32`` when they fit. Small blocks are appended to the last block up to :py:data:`BLOCK_SIZE` spectra,
+    the full blocks are never copied.
+    """
+
+    def __init__(self):
+        self._blocks = []
+        self._block_number_channels = []
+        self._number_spectra = 0
+        # The last block is a view of this buffer, grown by doubling until it holds BLOCK_SIZE spectra.
+        self._buffer = None
+
+    @property
+    def number_spectra(self):
+        return self._number_spectra
+
+    @property
+    def number_channels(self):
+        if not self._block_number_channels:
+            return np.zeros(0, dtype=np.int64)
+        return np.concatenate(self._block_number_channels)
+
+    @property
+    def number_blocks(self):
+        return len(self._blocks)
+
+    def clear(self):
+        self.__init__()
+
+    def get_sums(self, index):
+        """
+        Return the cumulative sum of the spectrum `index`, of size its number of channels plus one.
+        """
+        for block, number_channels in zip(self._blocks, self._block_number_channels):
+            if index < block.shape[0]:
+                return block[index, :number_channels[index] + 1]
+            index -= block.shape[0]
+        raise IndexError("Spectrum index out of range")
+
+    def append(self, counts):
+        """
+        Add the cumulative sum of a spectrum and return its index.
+        """
+        counts = np.asarray(counts)
+        return self.append_block(counts[np.newaxis, :], [counts.size])
+
+    def append_block(self, counts, number_channels):
+        """
+        Add the cumulative sums of a block of spectra and return the index of the first one.
+
+        :param counts: array of shape ``(number_spectra, channels)``, e.g. a memory-mapped chunk of a project, the
+            channels after the number of channels of a spectrum are ignored.
+        :param number_channels: number of channels of each spectrum.
+        """
+        number_channels = np.asarray(number_channels, dtype=np.int64)
+        index = self._number_spectra
+        if number_channels.size == 0:
+            return index
+
+        block = _compute_block(counts, number_channels)
+        number_spectra = number_channels.size
+
+        if self._blocks and self._blocks[-1].shape[0] + number_spectra <= BLOCK_SIZE:
+            last_block = self._blocks[-1]
+            number_rows = last_block.shape[0] + number_spectra
+            buffer = self._buffer
+            dtype = np.result_type(buffer, block)
+            if number_rows > buffer.shape[0] or block.shape[1] > buffer.shape[1] or dtype != buffer.dtype:
+                capacity = min(max(number_rows, 2 * buffer.shape[0]), BLOCK_SIZE)
+                buffer = np.zeros((capacity, max(buffer.shape[1], block.shape[1])), dtype=dtype)
+                buffer[:last_block.shape[0], :last_block.shape[1]] = last_block
+                self._buffer = buffer
+            buffer[last_block.shape[0]:number_rows, :block.shape[1]] = block
+
+            self._blocks[-1] = buffer[:number_rows]
+            self._block_number_channels[-1] = np.concatenate((self._block_number_channels[-1], number_channels))
+        else:
+            self._buffer = block
+            self._blocks.append(block)
+            self._block_number_channels.append(number_channels)
+        self._number_spectra += number_spectra
+
+        return index
+
+    def get_cumulative(self, positions):
+        """
+        Return the cumulative sums at positions of the channel boundaries, interpolated linearly inside a channel.
+
+        :param positions: array of shape ``(number_spectra, number_positions)``, the position :math:`x` is the lower
+            boundary of the channel :math:`x` and the positions outside a spectrum are clipped to the spectrum.
+        """
+        number_channels = self.number_channels[:, np.newaxis]
+        positions = np.clip(positions, 0.0, number_channels)
+        indexes = np.minimum(np.floor(positions).astype(np.int64), np.maximum(number_channels - 1, 0))
+        fractions = positions - indexes
+
+        lower_sums = np.empty(positions.shape)
+        upper_sums = np.empty(positions.shape)
+        start = 0
+        for block in self._blocks:
+            end = start + block.shape[0]
+            lower_sums[start:end] = np.take_along_axis(block, indexes[start:end], axis=1)
+            upper_sums[start:end] = np.take_along_axis(block, indexes[start:end] + 1, axis=1)
+            start = end
+        return lower_sums + fractions * (upper_sums - lower_sums)
+
+
+def _compute_block(counts, number_channels):
+    width = max(int(number_channels.max()), 1)
+    counts = counts[:number_channels.size, :width]
+    is_integer = counts.dtype.kind in "ui"
+
+    block = np.zeros((number_channels.size, counts.shape[1] + 1), dtype=np.uint64 if is_integer else np.float64)
+    np.cumsum(counts, axis=1, dtype=block.dtype, out=block[:, 1:])
+
+    if is_integer and block[:, -1].max() <= np.iinfo(np.uint32).max:
+        block = block.astype(np.uint32)
+    return block
+
+
+class RoiIntegrals(object):
+    """
+    Gross, background and net counts, and uncertainty of the net counts, of ROIs, arrays of shape
+    ``(number_spectra, number_rois)``.
+    """
+
+    def __init__(self, gross, background, net, errors):
+        self.gross = gross
+        self.background = background
+        self.net = net
+        self.errors = errors
+
+
+def get_edge_positions(offsets_eV, gains_eV, number_channels, rois):
+    """
+    Return the positions of the edges of the left background windows, the ROIs and the right background windows, in
+    channel boundaries clipped to the spectra.
+
+    :param offsets_eV: energy of the first channel of each spectrum.
+    :param gains_eV: width of the channels of each spectrum.
+    :param number_channels: number of channels of each spectrum.
+    :param rois: list of ``(name, energy_min_eV, energy_max_eV, background_width_eV)``.
+    :return: array of shape ``(number_spectra, 4 * number_rois)``, the left, minimum, maximum and right edges of all
+        the ROIs.
+    """
+    energies_min_eV, energies_max_eV, background_widths_eV = get_roi_limits(rois)
+
+    offsets_eV = np.asarray(offsets_eV, dtype=np.float64)[:, np.newaxis]
+    gains_eV = np.asarray(gains_eV, dtype=np.float64)[:, np.newaxis]
+
+    energies_eV = np.concatenate((energies_min_eV - background_widths_eV, energies_min_eV, energies_max_eV,
+                                  energies_max_eV + background_widths_eV))
+    positions = (energies_eV - offsets_eV) / gains_eV + 0.5
+    return np.clip(positions, 0.0, np.asarray(number_channels)[:, np.newaxis])
+
+
+def integrate_edges(positions, sums):
+    """
+    Integrate ROIs from the cumulative sums of the counts at the positions of their edges.
+
+    The background under a ROI is interpolated linearly between the mean counts per channel of its two background
+    windows, or is the mean of the only window inside the spectrum. Only the differences of the cumulative sums of the
+    edges of a ROI are used, so the sums of the edges of a ROI may start from any channel before its left edge.
+
+    :param positions: positions of the edges, see :py:func:`get_edge_positions`, broadcast to the shape of `sums`.
+    :param sums: cumulative sums at the positions, array of shape ``(number_spectra, 4 * number_rois)``.
+    :return: :py:class:`RoiIntegrals`.
+    """
+    number_rois = sums.shape[1] // 4
+    positions = np.broadcast_to(positions, sums.shape).reshape(sums.shape[0], 4, number_rois)
+    sums = sums.reshape(positions.shape)
+    left_positions, min_positions, max_positions, right_positions = np.moveaxis(positions, 1, 0)
+    left_sums, min_sums, max_sums, right_sums = np.moveaxis(sums, 1, 0)
+
+    gross = max_sums - min_sums
+    widths = max_positions - min_positions
+
+    left_widths = min_positions - left_positions
+    right_widths = right_positions - max_positions
+    left_counts = min_sums - left_sums
+    right_counts = right_sums - max_sums
+    has_left = left_widths > 0.0
+    has_right = right_widths > 0.0
+    left_widths = np.where(has_left, left_widths, 1.0)
+    right_widths = np.where(has_right, right_widths, 1.0)
+
+    # Weight of the right window at the centre of the ROI.
+    centre_distances = 0.5 * (left_widths + right_widths) + widths
+    right_weights = np.where(has_left, np.where(has_right, 0.5 * (left_widths + widths) / centre_distances, 0.0), 1.0)
+    left_weights = np.where(has_left, 1.0 - right_weights, 0.0)
+    right_weights = np.where(has_right, right_weights, 0.0)
+
+    background = widths * (left_weights * left_counts / left_widths + right_weights * right_counts / right_widths)
+    background_variances = widths ** 2 * (left_weights ** 2 * left_counts / left_widths ** 2 +
+                                          right_weights ** 2 * right_counts / right_widths ** 2)
+
+    net = gross - background
+    errors = np.sqrt(np.maximum(gross, 0.0) + np.maximum(background_variances, 0.0))
+
+    return RoiIntegrals(gross, background, net, errors)
+
+
+def integrate_rois(prefix_sums, offsets_eV, gains_eV, rois):
+    """
+    Integrate the ROIs of all the spectra of the cumulative sums, see :py:func:`integrate_edges`.
+
+    :param prefix_sums: :py:class:`PrefixSums` of the spectra.
+    :param offsets_eV: energy of the first channel of each spectrum.
+    :param gains_eV: width of the channels of each spectrum.
+    :param rois: list of ``(name, energy_min_eV, energy_max_eV, background_width_eV)``.
+    :return: :py:class:`RoiIntegrals`.
+    """
+    positions = get_edge_positions(offsets_eV, gains_eV, prefix_sums.number_channels, rois)
+    return integrate_edges(positions, prefix_sums.get_cumulative(positions))
+
+
+class RoiIntegrator(object):
+    """
+    Integrals of the ROIs of the spectra of a project, the cumulative sum of a spectrum is computed once when it is
+    first integrated.
+    """
+
+    def __init__(self):
+        self.prefix_sums = PrefixSums()
+        self._project = None
+
+    def clear(self):
+        self.prefix_sums.clear()
+        self._project = None
+
+    def update(self, project):
+        """
+        Add the cumulative sums of the spectra added to the project since the last update.
+        """
+        if project is not self._project:
+            self.clear()
+            self._project = project
+
+        # The new spectra are read a chunk at a time, memory mapped when the chunk is saved.
+        index = self.prefix_sums.number_spectra
+        while index < project.number_spectra:
+            chunk_index, row = divmod(index, project.chunk_size)
+            counts, number_channels = project.get_chunk_counts(chunk_index)
+            self.prefix_sums.append_block(counts[row:], number_channels[row:])
+            index += number_channels.size - row
+
+    def integrate(self, project, rois=None):
+        """
+        Return the :py:class:`RoiIntegrals` of the ROIs of the project, or of `rois` if given, in all its spectra.
+        """
+        self.update(project)
+        if rois is None:
+            rois = project.rois
+        return integrate_rois(self.prefix_sums, project.get_column("offset_eV"), project.get_column("gain_eV"), rois)
@@ -0,0 +1,175 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+.. py:currentmodule:: xrayspectrumanalyzergui.analysis.xray_lines
+   :synopsis: Database of the x-ray emission lines and absorption edges.
+
+.. moduleauthor:: Hendrix Demers <hendrix.demers@mail.mcgill.ca>
+
+Database of the x-ray emission lines and absorption edges.
+
+The main lines of the K, L and M families and the K, L3 and M5 edges of the elements Z = 3 to 98 are read from the
+bundled file ``xray_lines.csv`` into NumPy structured arrays sorted by energy. The lines near an energy are found
+with a binary search on the energy column, without scanning the database.
+"""
+
+###############################################################################
+# GUI for the x-ray spectrum analyzer project
+# Copyright (C) 2017  Hendrix Demers
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+###############################################################################
+
+# Standard library modules.
+import os.path
+import csv
+
+# Third party modules.
+import numpy as np
+
+# Local modules.
+
+# Project modules.
+
+# Globals and constants variables.
+DATA_FILE_PATH = os.path.join(os.path.dirname(__file__), "xray_lines.csv")
+
+LINE_NAMES = ("Ka1", "Ka2", "Kb1", "La1", "La2", "Lb1", "Lb2", "Lg1", "Ma1")
+EDGE_NAMES = ("K", "L3", "M5")
+
+# Approximate relative intensities of the lines in their family.
+LINE_WEIGHTS = {"Ka1": 1.0, "Ka2": 0.5, "Kb1": 0.15,
+                "La1": 1.0, "La2": 0.1, "Lb1": 0.7, "Lb2": 0.2, "Lg1": 0.08,
+                "Ma1": 1.0}
+
+LINE_DTYPE = [("energy_eV", np.float64), ("atomic_number", np.int16), ("symbol", "U2"), ("line", "U3"),
+              ("family", "U1"), ("weight", np.float64)]
+EDGE_DTYPE = [("energy_eV", np.float64), ("atomic_number", np.int16), ("symbol", "U2"), ("edge", "U2"),
+              ("family", "U1")]
+
+_database = None
+
+
+def read_xray_lines(file_path=DATA_FILE_PATH):
+    """
+    Return the lines and edges structured arrays of a database file, in the order of the file.
+    """
+    lines = []
+    edges = []
+    with open(file_path, "r") as data_file:
+        rows = csv.DictReader(row for row in data_file if not row.startswith("#"))
+        for row in rows:
+            atomic_number = int(row["atomic_number"])
+            symbol = row["symbol"]
+            for line in LINE_NAMES:
+                if row[line]:
+                    lines.append((float(row[line]), atomic_number, symbol, line, line[0], LINE_WEIGHTS[line]))
+            for edge in EDGE_NAMES:
+                if row[edge]:
+                    edges.append((float(row[edge]), atomic_number, symbol, edge, edge[0]))
+
+    return np.array(lines, dtype=LINE_DTYPE), np.array(edges, dtype=EDGE_DTYPE)
+
+
+class XrayLineDatabase(object):
+    def __init__(self, file_path=DATA_FILE_PATH):
+        lines, edges = read_xray_lines(file_path)
+
+        self.lines = lines[np.argsort(lines["energy_eV"], kind="stable")]
+        self.edges = edges[np.argsort(edges["energy_eV"], kind="stable")]
+
+        # Contiguous copies of the sorted energies for the binary searches.
+        self._line_energies_eV = np.ascontiguousarray(self.lines["energy_eV"])
+        self._edge_energies_eV = np.ascontiguousarray(self.edges["energy_eV"])
+
+        self._atomic_numbers = {}
+        self._symbols = {}
+        for atomic_number, symbol in zip(lines["atomic_number"], lines["symbol"]):
+            self._atomic_numbers[str(symbol)] = int(atomic_number)
+            self._symbols[int(atomic_number)] = str(symbol)
+
+    @property
+    def symbols(self):
+        return [self._symbols[atomic_number] for atomic_number in sorted(self._symbols)]
+
+    def get_atomic_number(self, element):
+        """
+        Return the atomic number of an element given by its symbol or atomic number.
+        """
+        if isinstance(element, str):
+            symbol = element.strip().capitalize()
+            if symbol not in self._atomic_numbers:
+                raise ValueError("Unknown element: {}".format(element))
+            return self._atomic_numbers[symbol]
+
+        atomic_number = int(element)
+        if atomic_number not in self._symbols:
+            raise ValueError("Unknown element: {}".format(element))
+        return atomic_number
+
+    def get_symbol(self, element):
+        return self._symbols[self.get_atomic_number(element)]
+
+    def find_lines(self, energy_eV, tolerance_eV):
+        """
+        Return the lines within `tolerance_eV` of `energy_eV`, sorted by energy.
+        """
+        start_index = np.searchsorted(self._line_energies_eV, energy_eV - tolerance_eV, side="left")
+        end_index = np.searchsorted(self._line_energies_eV, energy_eV + tolerance_eV, side="right")
+        return self.lines[start_index:end_index]
+
+    def find_edges(self, energy_eV, tolerance_eV):
+        """
+        Return the edges within `tolerance_eV` of `energy_eV`, sorted by energy.
+        """
+        start_index = np.searchsorted(self._edge_energies_eV, energy_eV - tolerance_eV, side="left")
+        end_index = np.searchsorted(self._edge_energies_eV, energy_eV + tolerance_eV, side="right")
+        return self.edges[start_index:end_index]
+
+    def identify(self, energy_eV, tolerance_eV, maximum_number_lines=3):
+        """
+        Return the lines closest to `energy_eV`, the strongest lines first at equal distance.
+        """
+        lines = self.find_lines(energy_eV, tolerance_eV)
+        order = np.lexsort((-lines["weight"], np.abs(lines["energy_eV"] - energy_eV)))
+        return lines[order[:maximum_number_lines]]
+
+    def get_lines(self, element, families=None):
+        """
+        Return the lines of an element, sorted by energy.
+
+        :param families: string of the families to keep, e.g. ``"KL"``, all families if None.
+        """
+        lines = self.lines[self.lines["atomic_number"] == self.get_atomic_number(element)]
+        if families is not None:
+            lines = lines[np.isin(lines["family"], list(families))]
+        return lines
+
+    def get_edges(self, element):
+        return self.edges[self.edges["atomic_number"] == self.get_atomic_number(element)]
+
+
+def format_line(line):
+    return "{} {}".format(line["symbol"], line["line"])
+
+
+def get_database():
+    """
+    Return the database of the bundled file, read on first use.
+    """
+    global _database
+    if _database is None:
+        _database = XrayLineDatabase()
+    return _database
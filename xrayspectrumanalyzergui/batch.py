@@ -0,0 +1,299 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+.. py:currentmodule:: xrayspectrumanalyzergui.batch
+   :synopsis: Headless batch processing of spectrum files.
+
+.. moduleauthor:: Hendrix Demers <hendrix.demers@mail.mcgill.ca>
+
+Headless batch processing of spectrum files.
+
+The spectra are read, their background estimated and their peaks fitted by a pool of processes, without Qt. The files
+are split in chunks processed by the workers, and the results of each chunk are written to the output file as soon as
+the chunk is done, so the memory used does not grow with the number of files. The results are written in CSV, or in
+Parquet when pyarrow is installed.
+
+Run with::
+
+    xrayspectrumanalyzer-batch -e Fe,Cr,Ni -o results.csv "data/**/*.msa"
+"""
+
+###############################################################################
+# GUI for the x-ray spectrum analyzer project
+# Copyright (C) 2017  Hendrix Demers
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+###############################################################################
+
+# Standard library modules.
+import sys
+import argparse
+import csv
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+# Third party modules.
+import numpy as np
+
+# Local modules.
+
+# Project modules.
+from xrayspectrumanalyzergui.file_format.spectrum_files import collect_spectrum_files, expand_glob_patterns, \
+    read_spectrum
+from xrayspectrumanalyzergui.analysis.xray_lines import get_database
+from xrayspectrumanalyzergui.analysis.background import BackgroundParameters, METHODS, METHOD_SNIP, DEFAULT_WIDTH_eV
+from xrayspectrumanalyzergui.analysis.peak_identification import identify_spectrum, FWHM_MN_KA_eV
+from xrayspectrumanalyzergui.analysis.peak_fitting import PeakFitter
+
+# Globals and constants variables.
+PROGRAM_NAME = "xrayspectrumanalyzer-batch"
+
+RESULT_COLUMNS = [("file_path", str), ("line", str), ("net_intensity", float), ("error", float),
+                  ("reduced_chi_square", float), ("energy_shift_eV", float), ("fwhm_mn_ka_eV", float)]
+
+FORMAT_CSV = "csv"
+FORMAT_PARQUET = "parquet"
+OUTPUT_FORMATS = (FORMAT_CSV, FORMAT_PARQUET)
+PARQUET_EXTENSIONS = (".parquet", ".pq")
+
+CHUNK_SIZE = 64
+
+logger = logging.getLogger(__name__)
+
+
+def process_files(file_paths, fitter, reader=read_spectrum):
+    """
+    Read and fit spectrum files.
+
+    The spectra with the same calibration are fitted together. If the fitter has no elements, the elements of each
+    spectrum are identified and each spectrum is fitted alone.
+
+    :return: the rows of the results, see :py:data:`RESULT_COLUMNS`, and the list of ``(file_path, message)`` of the
+        files that cannot be read or fitted.
+    """
+    rows = []
+    failures = []
+
+    groups = {}
+    for file_path in file_paths:
+        # Any error of a reader or of the identification fails only its file, in this process or in a worker.
+        try:
+            spectrum = reader(file_path)
+            if not fitter.elements:
+                symbols = [str(element["symbol"]) for element in identify_spectrum(spectrum, fitter.fwhm_mn_ka_eV)]
+        except Exception as message:
+            failures.append((file_path, str(message)))
+            continue
+
+        if fitter.elements:
+            key = (spectrum.offset_eV, spectrum.gain_eV, spectrum.counts.size)
+            groups.setdefault(key, []).append((file_path, spectrum))
+        else:
+            spectrum_fitter = PeakFitter(symbols, fitter.fwhm_mn_ka_eV, fitter.tail_fraction, fitter.tail_slope,
+                                         fitter.background_parameters, fitter.refinement_threshold)
+            _fit_group(spectrum_fitter, [(file_path, spectrum)], rows, failures)
+
+    for group in groups.values():
+        _fit_group(fitter, group, rows, failures)
+
+    return rows, failures
+
+
+def _fit_group(fitter, group, rows, failures):
+    """
+    Fit the spectra of a group together, if the fit fails each spectrum is fitted alone to report only the bad files.
+    """
+    file_paths = [file_path for file_path, _spectrum in group]
+    try:
+        counts = np.array([spectrum.counts for _file_path, spectrum in group])
+        results = fitter.fit(counts, group[0][1].energies_eV)
+    except Exception as message:
+        if len(group) == 1:
+            failures.append((file_paths[0], str(message)))
+        else:
+            for item in group:
+                _fit_group(fitter, [item], rows, failures)
+        return
+
+    for row, file_path in enumerate(file_paths):
+        for column, label in enumerate(results.labels):
+            rows.append((file_path, label, float(results.net_intensities[row, column]),
+                         float(results.errors[row, column]), float(results.reduced_chi_squares[row]),
+                         float(results.energy_shifts_eV[row]), float(results.fwhms_mn_ka_eV[row])))
+
+
+class CsvResultWriter(object):
+    def __init__(self, path):
+        self._file = open(path, "w", newline="")
+        self._writer = csv.writer(self._file)
+        self._writer.writerow([name for name, _type in RESULT_COLUMNS])
+
+    def write_rows(self, rows):
+        self._writer.writerows(rows)
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+
+class ParquetResultWriter(object):
+    """
+    Write the results in a Parquet file, one row group per call of :py:meth:`write_rows`.
+    """
+
+    def __init__(self, path):
+        try:
+            import pyarrow
+            import pyarrow.parquet
+        except ImportError:
+            raise ImportError("The Parquet output requires pyarrow")
+
+        self._pyarrow = pyarrow
+        fields = [(name, pyarrow.string() if column_type is str else pyarrow.float64())
+                  for name, column_type in RESULT_COLUMNS]
+        self._schema = pyarrow.schema(fields)
+        self._writer = pyarrow.parquet.ParquetWriter(path, self._schema)
+
+    def write_rows(self, rows):
+        if not rows:
+            return
+
+        columns = [self._pyarrow.array(column, type=field.type) for column, field in zip(zip(*rows), self._schema)]
+        self._writer.write_table(self._pyarrow.Table.from_arrays(columns, schema=self._schema))
+
+    def close(self):
+        self._writer.close()
+
+
+def create_writer(path, output_format=None):
+    """
+    Return the writer of the output file, the format is given by the extension of the file if None.
+    """
+    if output_format is None:
+        output_format = FORMAT_PARQUET if path.lower().endswith(PARQUET_EXTENSIONS) else FORMAT_CSV
+
+    if output_format == FORMAT_PARQUET:
+        return ParquetResultWriter(path)
+    elif output_format == FORMAT_CSV:
+        return CsvResultWriter(path)
+    else:
+        raise ValueError("Unknown output format: {}".format(output_format))
+
+
+def run_batch(file_paths, fitter, writer, number_workers=1, chunk_size=CHUNK_SIZE, progress_callback=None):
+    """
+    Process the files by chunks and write the results of each chunk when it is done.
+
+    :param number_workers: number of processes, the files are processed in this process if one.
+    :param progress_callback: called with the number of files done and the total number of files.
+    :return: list of ``(file_path, message)`` of the files that failed.
+    """
+    chunks = [file_paths[start:start + chunk_size] for start in range(0, len(file_paths), chunk_size)]
+    failures = []
+    number_done = 0
+
+    def write_chunk(rows, chunk_failures):
+        writer.write_rows(rows)
+        failures.extend(chunk_failures)
+        for file_path, message in chunk_failures:
+            logger.warning("Cannot process %s: %s", file_path, message)
+        if progress_callback is not None:
+            progress_callback(number_done, len(file_paths))
+
+    if number_workers <= 1:
+        for chunk in chunks:
+            rows, chunk_failures = process_files(chunk, fitter)
+            number_done += len(chunk)
+            write_chunk(rows, chunk_failures)
+        return failures
+
+    with ProcessPoolExecutor(max_workers=number_workers) as executor:
+        futures = dict((executor.submit(process_files, chunk, fitter), chunk) for chunk in chunks)
+        for future in as_completed(futures):
+            chunk = futures[future]
+            number_done += len(chunk)
+            try:
+                rows, chunk_failures = future.result()
+            except Exception as message:
+                rows, chunk_failures = [], [(file_path, str(message)) for file_path in chunk]
+            write_chunk(rows, chunk_failures)
+
+    return failures
+
+
+def create_parser():
+    parser = argparse.ArgumentParser(prog=PROGRAM_NAME,
+                                     description="Estimate the background and fit the net intensities of spectrum "
+                                                 "files, without the GUI.")
+    parser.add_argument("paths", nargs="+", help="spectrum files, directories or glob patterns")
+    parser.add_argument("-o", "--output", required=True, help="output file, .csv or .parquet")
+    parser.add_argument("-f", "--format", choices=OUTPUT_FORMATS, help="output format, from the extension if not given")
+    parser.add_argument("-e", "--elements", default="",
+                        help="elements to fit, e.g. Fe,Cr,Ni, identified in each spectrum if not given")
+    parser.add_argument("-b", "--background", choices=METHODS, default=METHOD_SNIP, help="background method")
+    parser.add_argument("--background-width", type=float, default=DEFAULT_WIDTH_eV,
+                        help="clipping window width of the SNIP background in eV")
+    parser.add_argument("--fwhm", type=float, default=FWHM_MN_KA_eV, help="resolution at Mn Ka in eV")
+    parser.add_argument("-j", "--jobs", type=int, default=multiprocessing.cpu_count(), help="number of processes")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE, help="number of files per task")
+    parser.add_argument("-q", "--quiet", action="store_true", help="do not report the progress")
+    return parser
+
+
+def main(argv=None):
+    """
+    Entry point of the batch processing, return the exit status: 0 if all files were processed, 1 if some failed.
+    """
+    parser = create_parser()
+    arguments = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.WARNING if arguments.quiet else logging.INFO, format="%(message)s")
+
+    database = get_database()
+    try:
+        elements = [database.get_symbol(symbol) for symbol in arguments.elements.replace(",", " ").split()]
+    except ValueError as message:
+        parser.error(str(message))
+
+    file_paths = collect_spectrum_files(expand_glob_patterns(arguments.paths))
+    if not file_paths:
+        parser.error("No spectrum files found")
+
+    background_parameters = BackgroundParameters(arguments.background, arguments.background_width)
+    fitter = PeakFitter(elements, arguments.fwhm, background_parameters=background_parameters)
+
+    try:
+        writer = create_writer(arguments.output, arguments.format)
+    except (ImportError, IOError, OSError) as message:
+        parser.error(str(message))
+
+    def report_progress(number_done, number_total):
+        logger.info("Processed %d/%d files", number_done, number_total)
+
+    try:
+        failures = run_batch(file_paths, fitter, writer, max(arguments.jobs, 1), max(arguments.chunk_size, 1),
+                             report_progress)
+    finally:
+        writer.close()
+
+    if failures:
+        logger.warning("%d of %d files failed", len(failures), len(file_paths))
+        return 1
+    return 0
+
+
+if __name__ == '__main__':  # pragma: no cover
+    sys.exit(main())
@@ -0,0 +1,339 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+.. py:currentmodule:: xrayspectrumanalyzergui.file_format.event_list
+   :synopsis: Read and histogram event-list files.
+
+.. moduleauthor:: Hendrix Demers <hendrix.demers@mail.mcgill.ca>
+
+Read and histogram event-list files.
+
+An event-list file is a header of :py:data:`HEADER_SIZE` bytes followed by a record per detected event: the
+timestamp in ticks (uint64), the channel (uint16) and, if the header flag is set, the x and y positions (uint16), all
+little-endian and packed.
+
+The file is memory-mapped and read in chunks of :py:data:`CHUNK_SIZE` events. :py:meth:`EventList.build_index`
+histograms the events once in a (time bin, channel) array with a single :py:func:`numpy.bincount` per chunk and keeps
+its cumulative sum over time, so the spectrum of any time window is the difference of two rows plus the events of the
+two partial bins at the edges of the window. Re-slicing or re-binning a spectrum does not re-read the file, except
+for the partial bins of an unsorted file.
+"""
+
+###############################################################################
+# GUI for the x-ray spectrum analyzer project
+# Copyright (C) 2017  Hendrix Demers
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+###############################################################################
+
+# Standard library modules.
+import os
+import struct
+
+# Third party modules.
+import numpy as np
+
+# Local modules.
+
+# Project modules.
+from xrayspectrumanalyzergui.model.spectrum_data import SpectrumData
+
+# Globals and constants variables.
+MAGIC = b"XSEVENTS"
+VERSION = 1
+HEADER = struct.Struct("<8sHHIddd")
+HEADER_SIZE = 64
+
+FLAG_POSITIONS = 0x1
+
+EVENT_DTYPE = np.dtype([("time", "<u8"), ("channel", "<u2")])
+EVENT_POSITION_DTYPE = np.dtype([("time", "<u8"), ("channel", "<u2"), ("x", "<u2"), ("y", "<u2")])
+
+CHUNK_SIZE = 4 * 1024 * 1024
+DEFAULT_NUMBER_TIME_BINS = 1000
+# Maximum number of (time bin, channel) cells of the index, 32 MB of int64.
+MAXIMUM_INDEX_SIZE = 4 * 1024 * 1024
+
+
+class EventListFormatError(ValueError):
+    pass
+
+
+def write_event_list(file_path, times, channels, tick_s=1.0e-6, offset_eV=0.0, gain_eV=10.0, number_channels=4096,
+                     x=None, y=None):
+    """
+    Write an event-list file.
+
+    :param times: timestamps of the events in ticks of `tick_s` seconds.
+    :param x: x positions of the events, written with `y` if not None.
+    """
+    has_positions = x is not None
+    events = np.empty(len(channels), dtype=EVENT_POSITION_DTYPE if has_positions else EVENT_DTYPE)
+    events["time"] = times
+    events["channel"] = channels
+    if has_positions:
+        events["x"] = x
+        events["y"] = y
+
+    flags = FLAG_POSITIONS if has_positions else 0
+    header = HEADER.pack(MAGIC, VERSION, flags, number_channels, tick_s, offset_eV, gain_eV)
+    with open(file_path, "wb") as event_file:
+        event_file.write(header.ljust(HEADER_SIZE, b"\0"))
+        events.tofile(event_file)
+
+
+def rebin_counts(counts, factor):
+    """
+    Return the counts with `factor` adjacent channels summed, the last channel is the sum of the remaining channels.
+    """
+    factor = int(factor)
+    if factor <= 1:
+        return counts
+
+    number_bins = -(-counts.size // factor)
+    padded_counts = np.zeros(number_bins * factor, dtype=counts.dtype)
+    padded_counts[:counts.size] = counts
+    return padded_counts.reshape(number_bins, factor).sum(axis=1)
+
+
+class EventList(object):
+    """
+    Events of an event-list file, memory-mapped.
+
+    :param chunk_size: number of events read at once.
+    """
+
+    def __init__(self, file_path, chunk_size=CHUNK_SIZE):
+        self.file_path = file_path
+        self.chunk_size = chunk_size
+
+        with open(file_path, "rb") as event_file:
+            header = event_file.read(HEADER_SIZE)
+        if len(header) < HEADER_SIZE or not header.startswith(MAGIC):
+            raise EventListFormatError("Not an event-list file: {}".format(file_path))
+
+        _magic, version, flags, number_channels, tick_s, offset_eV, gain_eV = HEADER.unpack_from(header)
+        if version != VERSION:
+            raise EventListFormatError("Unsupported event-list version: {:d}".format(version))
+        if number_channels == 0 or tick_s <= 0.0:
+            raise EventListFormatError("Invalid event-list header: {}".format(file_path))
+
+        self.number_channels = number_channels
+        self.tick_s = tick_s
+        self.offset_eV = offset_eV
+        self.gain_eV = gain_eV
+        self.has_positions = bool(flags & FLAG_POSITIONS)
+
+        dtype = EVENT_POSITION_DTYPE if self.has_positions else EVENT_DTYPE
+        if (os.path.getsize(file_path) - HEADER_SIZE) % dtype.itemsize != 0:
+            raise EventListFormatError("Truncated event-list file: {}".format(file_path))
+        self.events = np.memmap(file_path, dtype=dtype, mode="r", offset=HEADER_SIZE)
+
+        self.is_sorted = None
+        self._start_tick = None
+        self._span_ticks = None
+        self._bin_edges = None
+        self._cumulative_counts = None
+
+    @property
+    def number_events(self):
+        return self.events.shape[0]
+
+    @property
+    def duration_s(self):
+        if self.number_events == 0:
+            return 0.0
+        return self._get_span_ticks() * self.tick_s
+
+    @property
+    def number_time_bins(self):
+        if self._cumulative_counts is None:
+            return 0
+        return self._cumulative_counts.shape[0] - 1
+
+    def iterate_chunks(self, start=0, end=None):
+        """
+        Yield the times (int64) and channels of the events from `start` to `end` in chunks.
+        """
+        end = self.number_events if end is None else end
+        for chunk_start in range(start, end, self.chunk_size):
+            chunk = self.events[chunk_start:min(chunk_start + self.chunk_size, end)]
+            yield chunk["time"].astype(np.int64), np.asarray(chunk["channel"])
+
+    def build_index(self, number_time_bins=DEFAULT_NUMBER_TIME_BINS):
+        """
+        Histogram all the events by time bin and channel, in one pass over a sorted file.
+
+        The number of time bins is limited so the index has at most :py:data:`MAXIMUM_INDEX_SIZE` cells. The events
+        with a channel outside the spectrum are counted in an extra channel, so the index also gives the range of
+        events of each time bin of a sorted file.
+        """
+        number_columns = self.number_channels + 1
+        number_time_bins = int(max(1, min(number_time_bins, MAXIMUM_INDEX_SIZE // number_columns)))
+        number_cells = number_time_bins * number_columns
+        counts = np.zeros(number_cells, dtype=np.int64)
+
+        if self.number_events > 0:
+            # The first and last events bound the times of a sorted file, otherwise the limits are searched first.
+            self._start_tick = int(self.events[0]["time"])
+            self._span_ticks = int(self.events[-1]["time"]) - self._start_tick + 1
+            self.is_sorted = True
+            if not self._histogram(counts, number_time_bins):
+                self.is_sorted = False
+                self._find_time_limits()
+                counts.fill(0)
+                self._histogram(counts, number_time_bins)
+        else:
+            self._start_tick = 0
+            self._span_ticks = 1
+            self.is_sorted = True
+
+        cumulative_counts = np.zeros((number_time_bins + 1, number_columns), dtype=np.int64)
+        np.cumsum(counts.reshape(number_time_bins, number_columns), axis=0, out=cumulative_counts[1:])
+        self._cumulative_counts = cumulative_counts
+
+        bin_indexes = np.arange(number_time_bins + 1, dtype=np.int64)
+        self._bin_edges = self._start_tick + (bin_indexes * self._span_ticks + number_time_bins - 1) // number_time_bins
+
+    def _histogram(self, counts, number_time_bins):
+        """
+        Add the events to the (time bin, channel) counts, return False as soon as an unsorted or out of range time
+        is found.
+        """
+        number_columns = self.number_channels + 1
+        previous_tick = self._start_tick
+        for times, channels in self.iterate_chunks():
+            if self.is_sorted:
+                if times[0] < previous_tick or np.any(times[1:] < times[:-1]):
+                    return False
+                previous_tick = times[-1]
+
+            # Event in bin k if k * span <= (time - start) * number_bins < (k + 1) * span, in exact integers.
+            times -= self._start_tick
+            if number_time_bins > 1:
+                times *= number_time_bins
+                times //= self._span_ticks
+            else:
+                times.fill(0)
+            times *= number_columns
+            times += np.minimum(channels, self.number_channels)
+
+            counts += np.bincount(times, minlength=counts.size)
+
+        return True
+
+    def _find_time_limits(self):
+        minimum_tick = None
+        maximum_tick = None
+        for times, _channels in self.iterate_chunks():
+            chunk_minimum = int(times.min())
+            chunk_maximum = int(times.max())
+            minimum_tick = chunk_minimum if minimum_tick is None else min(minimum_tick, chunk_minimum)
+            maximum_tick = chunk_maximum if maximum_tick is None else max(maximum_tick, chunk_maximum)
+
+        self._start_tick = minimum_tick
+        self._span_ticks = maximum_tick - minimum_tick + 1
+
+    def _get_span_ticks(self):
+        if self._cumulative_counts is None:
+            self.build_index()
+        return self._span_ticks
+
+    def get_counts(self, start_s=None, end_s=None, rebin=1):
+        """
+        Return the counts of the events from `start_s` to `end_s`, in seconds from the first event.
+
+        :param rebin: number of adjacent channels summed, see :py:func:`rebin_counts`.
+        """
+        if self._cumulative_counts is None:
+            self.build_index()
+
+        start_tick = self._bin_edges[0]
+        if start_s is not None:
+            start_tick += int(np.ceil(start_s / self.tick_s))
+        end_tick = self._bin_edges[-1]
+        if end_s is not None:
+            end_tick = min(end_tick, self._bin_edges[0] + int(np.ceil(end_s / self.tick_s)))
+
+        counts = np.zeros(self.number_channels + 1, dtype=np.int64)
+        if end_tick > start_tick:
+            # Complete bins from the index, the partial bins at the edges from the events.
+            first_bin = int(np.searchsorted(self._bin_edges, start_tick, side="left"))
+            last_bin = int(np.searchsorted(self._bin_edges, end_tick, side="right")) - 1
+            if first_bin <= last_bin:
+                counts += self._cumulative_counts[last_bin] - self._cumulative_counts[first_bin]
+                self._add_events(counts, start_tick, self._bin_edges[first_bin], first_bin - 1)
+                self._add_events(counts, self._bin_edges[last_bin], end_tick, last_bin)
+            else:
+                self._add_events(counts, start_tick, end_tick, last_bin)
+
+        return rebin_counts(counts[:self.number_channels], rebin)
+
+    def _add_events(self, counts, start_tick, end_tick, bin_index):
+        """
+        Add the events from `start_tick` to `end_tick`, in the time bin `bin_index` for a sorted file.
+        """
+        if end_tick <= start_tick:
+            return
+
+        if self.is_sorted:
+            # The events of a bin are contiguous, their range is given by the total counts of the bins.
+            start = int(self._cumulative_counts[bin_index].sum())
+            end = int(self._cumulative_counts[bin_index + 1].sum())
+            chunks = self.iterate_chunks(start, end)
+        else:
+            chunks = self.iterate_chunks()
+
+        for times, channels in chunks:
+            channels = np.minimum(channels[(times >= start_tick) & (times < end_tick)], self.number_channels)
+            counts += np.bincount(channels, minlength=counts.size)
+
+    def get_time_profile(self):
+        """
+        Return the start time of each time bin in seconds and its total number of counts.
+        """
+        if self._cumulative_counts is None:
+            self.build_index()
+
+        totals = np.diff(self._cumulative_counts.sum(axis=1))
+        return (self._bin_edges[:-1] - self._bin_edges[0]) * self.tick_s, totals
+
+    def get_spectrum(self, start_s=None, end_s=None, rebin=1):
+        """
+        Return the spectrum of the events from `start_s` to `end_s`, with `rebin` adjacent channels summed.
+
+        The energy of a summed channel is the mean energy of its channels.
+        """
+        counts = self.get_counts(start_s, end_s, rebin)
+
+        rebin = max(1, int(rebin))
+        offset_eV = self.offset_eV + 0.5 * (rebin - 1) * self.gain_eV
+        gain_eV = self.gain_eV * rebin
+
+        start_s = 0.0 if start_s is None else max(0.0, start_s)
+        end_s = self.duration_s if end_s is None else min(end_s, self.duration_s)
+        metadata = {"REALTIME": "{:.6f}".format(max(0.0, end_s - start_s)),
+                    "SIGNALTYPE": "EDS",
+                    "EVENTLIST": str(self.file_path)}
+        return SpectrumData(counts, offset_eV, gain_eV, metadata)
+
+
+def read_event_list(file_path):
+    """
+    Read the spectrum of all the events of an event-list file.
+    """
+    event_list = EventList(file_path)
+    event_list.build_index(1)
+    return event_list.get_spectrum()
@@ -0,0 +1,116 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+.. py:currentmodule:: xrayspectrumanalyzergui.file_format.journal
+   :synopsis: Append-only journal of the project changes.
+
+.. moduleauthor:: Hendrix Demers <hendrix.demers@mail.mcgill.ca>
+
+Append-only journal of the project changes.
+
+Each record is the length of a JSON header, the header with the operation, the project revision and the scalar
+arguments, followed by the array arguments saved in the NumPy ``.npy`` format. A record truncated by a crash ends
+the journal.
+"""
+
+###############################################################################
+# GUI for the x-ray spectrum analyzer project
+# Copyright (C) 2017  Hendrix Demers
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+###############################################################################
+
+# Standard library modules.
+import os
+import json
+import struct
+
+# Third party modules.
+import numpy as np
+
+# Local modules.
+
+# Project modules.
+
+# Globals and constants variables.
+_HEADER_SIZE = struct.Struct("<I")
+
+
+def _to_json(value):
+    if isinstance(value, np.generic):
+        return value.item()
+    raise TypeError("Cannot write {!r} in the journal".format(value))
+
+
+class JournalWriter(object):
+    def __init__(self, file_path):
+        self.file_path = file_path
+        self._file = open(file_path, "ab")
+
+    def append(self, operation, revision, arguments):
+        arrays = dict((name, value) for name, value in arguments.items() if isinstance(value, np.ndarray))
+        header = {"operation": operation,
+                  "revision": revision,
+                  "arguments": dict((name, value) for name, value in arguments.items() if name not in arrays),
+                  "arrays": sorted(arrays)}
+        header_bytes = json.dumps(header, default=_to_json).encode("utf-8")
+
+        self._file.write(_HEADER_SIZE.pack(len(header_bytes)))
+        self._file.write(header_bytes)
+        for name in header["arrays"]:
+            np.save(self._file, arrays[name], allow_pickle=False)
+
+    def flush(self):
+        """
+        Write the appended records to the disk.
+        """
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def truncate(self):
+        self._file.seek(0)
+        self._file.truncate()
+        self.flush()
+
+    def size(self):
+        return self._file.tell()
+
+    def close(self):
+        self._file.close()
+
+
+def read_journal(file_path):
+    """
+    Yield the ``(operation, revision, arguments)`` records of a journal.
+    """
+    if not os.path.isfile(file_path):
+        return
+
+    with open(file_path, "rb") as journal_file:
+        while True:
+            size_bytes = journal_file.read(_HEADER_SIZE.size)
+            if len(size_bytes) < _HEADER_SIZE.size:
+                return
+            header_size, = _HEADER_SIZE.unpack(size_bytes)
+
+            try:
+                header = json.loads(journal_file.read(header_size).decode("utf-8"))
+                arguments = header["arguments"]
+                for name in header["arrays"]:
+                    arguments[name] = np.load(journal_file, allow_pickle=False)
+            except (ValueError, KeyError, EOFError, OSError):
+                return
+
+            yield header["operation"], header["revision"], arguments
@@ -0,0 +1,165 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+.. py:currentmodule:: xrayspectrumanalyzergui.file_format.msa
+   :synopsis: Read EMSA/MAS spectral data file (msa).
+
+.. moduleauthor:: Hendrix Demers <hendrix.demers@mail.mcgill.ca>
+
+Read EMSA/MAS spectral data file (msa).
+
+The keyword header is parsed line by line, it is small, but the ``#SPECTRUM`` data block is converted in a single
+NumPy pass over the raw bytes.
+"""
+
+###############################################################################
+# GUI for the x-ray spectrum analyzer project
+# Copyright (C) 2017  Hendrix Demers
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+###############################################################################
+
+# Standard library modules.
+import re
+import warnings
+
+# Third party modules.
+import numpy as np
+
+# Local modules.
+
+# Project modules.
+from xrayspectrumanalyzergui.model.spectrum_data import SpectrumData
+
+# Globals and constants variables.
+_KEYWORD_PATTERN = re.compile(r"^#([A-Za-z0-9_]+)\s*(?:-\s*([^:\s]*))?\s*:(.*)$")
+_SPECTRUM_PATTERN = re.compile(br"^#SPECTRUM[^\n]*\n?", re.MULTILINE | re.IGNORECASE)
+_END_OF_DATA_PATTERN = re.compile(br"^#ENDOFDATA", re.MULTILINE | re.IGNORECASE)
+_COMMA_TO_SPACE = bytes.maketrans(b",", b" ")
+
+
+class MsaFormatError(ValueError):
+    pass
+
+
+def read_msa(file_path):
+    """
+    Read a msa file.
+
+    :param file_path: path of the file or a binary file object.
+    :return: :py:class:`SpectrumData` with the header keywords as metadata.
+    """
+    if hasattr(file_path, "read"):
+        content = file_path.read()
+    else:
+        with open(file_path, "rb") as msa_file:
+            content = msa_file.read()
+
+    return parse_msa(content)
+
+
+def parse_msa(content):
+    """
+    Parse the content of a msa file.
+
+    :param content: bytes of the whole file.
+    """
+    match = _SPECTRUM_PATTERN.search(content)
+    if match is None:
+        raise MsaFormatError("No #SPECTRUM keyword found")
+
+    header = parse_header(content[:match.start()])
+
+    end_match = _END_OF_DATA_PATTERN.search(content, match.end())
+    if end_match is None:
+        data_block = content[match.end():]
+    else:
+        data_block = content[match.end():end_match.start()]
+
+    # NumPy 1.x only warns and returns the values read before an invalid value, NumPy 2.x raises a ValueError.
+    with warnings.catch_warnings():
+        warnings.simplefilter("error", DeprecationWarning)
+        try:
+            values = np.fromstring(data_block.translate(_COMMA_TO_SPACE), dtype=np.float64, sep=" ")
+        except (ValueError, DeprecationWarning) as message:
+            raise MsaFormatError("Invalid value in the #SPECTRUM data block: {}".format(message))
+
+    return _create_spectrum(header, values)
+
+
+def parse_header(header_block):
+    """
+    Parse the keyword lines of the header.
+
+    Keys are upper case keyword without the ``#`` and unit suffix, values are stripped strings. The unit suffix, if
+    present, is stored with the key ``<KEYWORD>_UNITS``.
+    """
+    if isinstance(header_block, bytes):
+        header_block = header_block.decode("latin-1")
+
+    header = {}
+    for line in header_block.splitlines():
+        match = _KEYWORD_PATTERN.match(line.strip())
+        if match is None:
+            continue
+
+        keyword, units, value = match.groups()
+        keyword = keyword.upper()
+        header[keyword] = value.strip()
+        if units:
+            header[keyword + "_UNITS"] = units
+
+    return header
+
+
+def get_float(header, keyword, default=None):
+    try:
+        return float(header[keyword])
+    except (KeyError, ValueError):
+        return default
+
+
+def _create_spectrum(header, values):
+    datatype = header.get("DATATYPE", "Y").strip().upper()
+    number_points = get_float(header, "NPOINTS")
+    if header.get("XUNITS", "eV").strip().lower() == "kev":
+        energy_factor = 1.0e3
+    else:
+        energy_factor = 1.0
+
+    if datatype == "XY":
+        if values.size % 2 != 0:
+            raise MsaFormatError("Odd number of values in a XY data block")
+        xy = values.reshape(-1, 2)
+        if number_points is not None:
+            _check_number_points(xy.shape[0], number_points)
+            xy = xy[:int(number_points)]
+        return SpectrumData.from_energies(xy[:, 0] * energy_factor, xy[:, 1], header)
+    elif datatype == "Y":
+        counts = values
+        if number_points is not None:
+            _check_number_points(counts.size, number_points)
+            counts = counts[:int(number_points)]
+        offset_eV = get_float(header, "OFFSET", 0.0) * energy_factor
+        gain_eV = get_float(header, "XPERCHAN", 1.0) * energy_factor
+        return SpectrumData(counts, offset_eV, gain_eV, header)
+    else:
+        raise MsaFormatError("Unknown DATATYPE: {}".format(datatype))
+
+
+def _check_number_points(number_values, number_points):
+    if number_values < int(number_points):
+        raise MsaFormatError("Expected {:d} points in the #SPECTRUM data block, found {:d}".format(
+            int(number_points), number_values))
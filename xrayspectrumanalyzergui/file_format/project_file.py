@@ -0,0 +1,200 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+.. py:currentmodule:: xrayspectrumanalyzergui.file_format.project_file
+   :synopsis: Chunked binary project file.
+
+.. moduleauthor:: Hendrix Demers <hendrix.demers@mail.mcgill.ca>
+
+Chunked binary project file.
+
+A project is a directory (by convention with the extension ``.xsa``) with:
+
+* ``project.json``: manifest with the version, the chunk size and the number of spectra and chunks;
+* ``<table>.npy``: tables (spectra columns, names, ROIs, elements, fit results) as NumPy structured arrays;
+* ``spectra/chunk_<index>.npy``: counts of a chunk of spectra as one contiguous 2D array, one row per spectrum;
+* ``spectra/chunk_<index>.json``: metadata of the spectra of the chunk.
+
+The chunks are opened with memory mapping, so only the rows of the spectra viewed are read from the disk, and each
+chunk is a separate file, so only the modified chunks need to be written. Every file is written to a temporary file
+then renamed, so an interrupted save does not corrupt the project.
+
+A project may be a layer over a base project, e.g. the autosave snapshot of a saved project: its manifest has the
+``base_path`` of the base project and the tables and chunks missing in the layer are read from the base project.
+"""
+
+###############################################################################
+# GUI for the x-ray spectrum analyzer project
+# Copyright (C) 2017  Hendrix Demers
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+###############################################################################
+
+# Standard library modules.
+import os
+import json
+import shutil
+
+# Third party modules.
+import numpy as np
+
+# Local modules.
+
+# Project modules.
+
+# Globals and constants variables.
+PROJECT_EXTENSION = ".xsa"
+FORMAT_VERSION = 1
+MANIFEST_FILENAME = "project.json"
+SPECTRA_FOLDER = "spectra"
+
+
+class ProjectFormatError(ValueError):
+    pass
+
+
+class ProjectFile(object):
+    """
+    Files of a project at `path`, the missing tables and chunks are read from the `base` :py:class:`ProjectFile` if
+    given.
+    """
+
+    def __init__(self, path, base=None):
+        self.path = path
+        self.base = base
+
+    def create(self):
+        spectra_path = os.path.join(self.path, SPECTRA_FOLDER)
+        if not os.path.isdir(spectra_path):
+            os.makedirs(spectra_path)
+
+    def exists(self):
+        return os.path.isfile(os.path.join(self.path, MANIFEST_FILENAME))
+
+    def read_manifest(self):
+        file_path = os.path.join(self.path, MANIFEST_FILENAME)
+        try:
+            with open(file_path, "r") as manifest_file:
+                manifest = json.load(manifest_file)
+        except (IOError, OSError, ValueError) as message:
+            raise ProjectFormatError("Cannot read project manifest {}: {}".format(file_path, message))
+
+        if manifest.get("version", 0) > FORMAT_VERSION:
+            raise ProjectFormatError("Unsupported project version: {}".format(manifest.get("version")))
+
+        if self.base is None and manifest.get("base_path") is not None:
+            self.base = ProjectFile(manifest["base_path"])
+
+        return manifest
+
+    def write_manifest(self, manifest):
+        manifest = dict(manifest)
+        manifest["version"] = FORMAT_VERSION
+        if self.base is not None:
+            manifest["base_path"] = os.path.abspath(self.base.path)
+        with _AtomicFile(os.path.join(self.path, MANIFEST_FILENAME), "w") as manifest_file:
+            json.dump(manifest, manifest_file, indent=2, sort_keys=True)
+
+    def read_table(self, name, mmap_mode=None):
+        """
+        Return the table `name`, or None if it does not exist.
+
+        :param mmap_mode: memory-map mode of :py:func:`numpy.load`, e.g. ``"r"``, the table is read if None.
+        """
+        file_path = self._get_table_path(name)
+        if not os.path.isfile(file_path):
+            if self.base is not None:
+                return self.base.read_table(name, mmap_mode)
+            return None
+        return np.load(file_path, mmap_mode=mmap_mode, allow_pickle=False)
+
+    def write_table(self, name, table):
+        with _AtomicFile(self._get_table_path(name), "wb") as table_file:
+            np.save(table_file, table, allow_pickle=False)
+
+    def map_chunk(self, index):
+        """
+        Return the counts of the chunk memory mapped read-only and the metadata of its spectra.
+        """
+        if not self.has_chunk(index) and self.base is not None:
+            return self.base.map_chunk(index)
+
+        counts = np.load(self._get_chunk_path(index, ".npy"), mmap_mode="r", allow_pickle=False)
+        with open(self._get_chunk_path(index, ".json"), "r") as metadata_file:
+            metadata = json.load(metadata_file)
+        return counts, metadata
+
+    def has_chunk(self, index):
+        """
+        Return True if the chunk is in this project, not only in the base project.
+        """
+        return os.path.isfile(self._get_chunk_path(index, ".npy"))
+
+    def write_chunk(self, index, counts, metadata):
+        with _AtomicFile(self._get_chunk_path(index, ".npy"), "wb") as chunk_file:
+            np.save(chunk_file, counts, allow_pickle=False)
+        with _AtomicFile(self._get_chunk_path(index, ".json"), "w") as metadata_file:
+            json.dump(metadata, metadata_file)
+
+    def copy_chunk(self, index, source_project_file):
+        while not source_project_file.has_chunk(index) and source_project_file.base is not None:
+            source_project_file = source_project_file.base
+
+        for extension in (".npy", ".json"):
+            with _AtomicFile(self._get_chunk_path(index, extension), "wb") as chunk_file:
+                with open(source_project_file._get_chunk_path(index, extension), "rb") as source_file:
+                    shutil.copyfileobj(source_file, chunk_file)
+
+    def remove_chunks(self, start_index):
+        """
+        Remove the chunk files from `start_index`, left by a previous save of a larger project.
+        """
+        index = start_index
+        while self.has_chunk(index):
+            for extension in (".npy", ".json"):
+                file_path = self._get_chunk_path(index, extension)
+                if os.path.isfile(file_path):
+                    os.remove(file_path)
+            index += 1
+
+    def _get_table_path(self, name):
+        return os.path.join(self.path, name + ".npy")
+
+    def _get_chunk_path(self, index, extension):
+        return os.path.join(self.path, SPECTRA_FOLDER, "chunk_{:06d}{}".format(index, extension))
+
+
+class _AtomicFile(object):
+    """
+    Write to a temporary file renamed to `file_path` when closed without error.
+    """
+
+    def __init__(self, file_path, mode):
+        self.file_path = file_path
+        self.temporary_file_path = file_path + ".tmp"
+        self.mode = mode
+        self.file = None
+
+    def __enter__(self):
+        self.file = open(self.temporary_file_path, self.mode)
+        return self.file
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.file.close()
+        if exc_type is None:
+            os.replace(self.temporary_file_path, self.file_path)
+        else:
+            os.remove(self.temporary_file_path)
+        return False
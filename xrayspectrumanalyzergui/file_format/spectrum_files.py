@@ -0,0 +1,99 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+.. py:currentmodule:: xrayspectrumanalyzergui.file_format.spectrum_files
+   :synopsis: Collection and reading of the spectrum files to import.
+
+.. moduleauthor:: Hendrix Demers <hendrix.demers@mail.mcgill.ca>
+
+Collection of the spectrum files to import from files, directories and glob patterns, and reading of a spectrum file
+with the reader of its format.
+"""
+
+###############################################################################
+# GUI for the x-ray spectrum analyzer project
+# Copyright (C) 2017  Hendrix Demers
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+###############################################################################
+
+# Standard library modules.
+import os
+import glob
+
+# Third party modules.
+
+# Local modules.
+
+# Project modules.
+from xrayspectrumanalyzergui.file_format.msa import read_msa
+from xrayspectrumanalyzergui.file_format.event_list import read_event_list
+
+# Globals and constants variables.
+EVENT_LIST_EXTENSIONS = (".evt",)
+SPECTRUM_FILE_EXTENSIONS = (".msa", ".txt") + EVENT_LIST_EXTENSIONS
+
+
+def read_spectrum(file_path):
+    """
+    Read the spectrum of a msa file or of all the events of an event-list file, chosen by the extension.
+    """
+    if file_path.lower().endswith(EVENT_LIST_EXTENSIONS):
+        return read_event_list(file_path)
+    return read_msa(file_path)
+
+
+def collect_spectrum_files(paths, extensions=SPECTRUM_FILE_EXTENSIONS):
+    """
+    Expand the directories recursively and remove the duplicates.
+
+    Files given explicitly are kept whatever their extension, files found in directories are kept only if their
+    extension is in `extensions`. The order is preserved.
+    """
+    extensions = tuple(extension.lower() for extension in extensions)
+
+    file_paths = []
+    seen_paths = set()
+
+    def add_file(file_path):
+        real_path = os.path.realpath(file_path)
+        if real_path not in seen_paths:
+            seen_paths.add(real_path)
+            file_paths.append(file_path)
+
+    for path in paths:
+        if os.path.isdir(path):
+            for root, directories, file_names in os.walk(path):
+                directories.sort()
+                for file_name in sorted(file_names):
+                    if file_name.lower().endswith(extensions):
+                        add_file(os.path.join(root, file_name))
+        elif os.path.isfile(path):
+            add_file(path)
+
+    return file_paths
+
+
+def expand_glob_patterns(paths):
+    """
+    Replace the paths with glob wildcards by the sorted matching paths, for the patterns not expanded by the shell.
+    """
+    expanded_paths = []
+    for path in paths:
+        if glob.has_magic(path):
+            expanded_paths.extend(sorted(glob.glob(path, recursive=True)))
+        else:
+            expanded_paths.append(path)
+    return expanded_paths
@@ -0,0 +1,210 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+.. py:currentmodule:: xrayspectrumanalyzergui.file_format.spectrum_image
+   :synopsis: Read spectrum image files without loading them.
+
+.. moduleauthor:: Hendrix Demers <hendrix.demers@mail.mcgill.ca>
+
+Read spectrum image files without loading them.
+
+Two formats are supported:
+
+* Lispix RPL: a text header ``.rpl`` describing a raw binary file ``.raw`` with the same name, mapped with
+  :py:class:`numpy.memmap`. The energy calibration is read from the keys ``ev-per-chan`` or ``depth-scale``
+  and ``depth-origin`` when present.
+* HDF5: the first 3-D dataset of the file, or a given dataset, with the attributes ``offset_eV`` and
+  ``gain_eV``. It requires h5py, which is optional.
+"""
+
+###############################################################################
+# GUI for the x-ray spectrum analyzer project
+# Copyright (C) 2017  Hendrix Demers
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+###############################################################################
+
+# Standard library modules.
+import os.path
+
+# Third party modules.
+import numpy as np
+
+# Local modules.
+
+# Project modules.
+from xrayspectrumanalyzergui.model.spectrum_image import SpectrumImage
+
+# Globals and constants variables.
+RPL_EXTENSIONS = (".rpl",)
+HDF5_EXTENSIONS = (".h5", ".hdf5")
+SPECTRUM_IMAGE_EXTENSIONS = RPL_EXTENSIONS + HDF5_EXTENSIONS
+
+_RPL_DATA_TYPES = {"signed": "i", "unsigned": "u", "float": "f"}
+_RPL_BYTE_ORDERS = {"little-endian": "<", "big-endian": ">", "dont-care": "<"}
+_ENERGY_SCALES = {"ev": 1.0, "kev": 1000.0}
+
+
+class SpectrumImageFormatError(ValueError):
+    pass
+
+
+def parse_rpl(content):
+    """
+    Return the keys and values of a RPL header, the keys in lower case.
+    """
+    header = {}
+    for line in content.splitlines():
+        line = line.split(";", 1)[0].strip()
+        if not line:
+            continue
+
+        items = line.split(None, 1)
+        if len(items) == 2 and items[0].lower() != "key":
+            header[items[0].lower()] = items[1].strip()
+
+    return header
+
+
+def _get_rpl_value(header, key, value_type, default=None):
+    if key not in header:
+        if default is None:
+            raise SpectrumImageFormatError("Missing RPL key: {}".format(key))
+        return default
+
+    try:
+        return value_type(header[key])
+    except ValueError:
+        raise SpectrumImageFormatError("Invalid RPL value of {}: {}".format(key, header[key]))
+
+
+def find_raw_file(rpl_file_path):
+    base_path = os.path.splitext(rpl_file_path)[0]
+    for extension in (".raw", ".RAW"):
+        if os.path.isfile(base_path + extension):
+            return base_path + extension
+    raise SpectrumImageFormatError("No raw file for {}".format(rpl_file_path))
+
+
+def read_rpl(file_path):
+    """
+    Map the raw file of a RPL header as a spectrum image.
+    """
+    with open(file_path, "r") as rpl_file:
+        header = parse_rpl(rpl_file.read())
+
+    width = _get_rpl_value(header, "width", int)
+    height = _get_rpl_value(header, "height", int)
+    depth = _get_rpl_value(header, "depth", int)
+    offset = _get_rpl_value(header, "offset", int, 0)
+    data_length = _get_rpl_value(header, "data-length", int)
+    data_type = header.get("data-type", "unsigned").lower()
+    byte_order = header.get("byte-order", "dont-care").lower()
+    record_by = header.get("record-by", "vector").lower()
+    if data_type not in _RPL_DATA_TYPES or byte_order not in _RPL_BYTE_ORDERS:
+        raise SpectrumImageFormatError("Unsupported RPL data type: {} {}".format(data_type, byte_order))
+
+    dtype = np.dtype("{}{}{:d}".format(_RPL_BYTE_ORDERS[byte_order], _RPL_DATA_TYPES[data_type], data_length))
+    raw_file_path = find_raw_file(file_path)
+    if os.path.getsize(raw_file_path) < offset + width * height * depth * dtype.itemsize:
+        raise SpectrumImageFormatError("Raw file too small for {}".format(file_path))
+
+    if record_by == "image":
+        # The channels are planes: the spectrum of a pixel is strided.
+        data = np.memmap(raw_file_path, dtype=dtype, mode="r", offset=offset, shape=(depth, height, width))
+        data = data.transpose(1, 2, 0)
+    else:
+        data = np.memmap(raw_file_path, dtype=dtype, mode="r", offset=offset, shape=(height, width, depth))
+
+    energy_scale = _ENERGY_SCALES.get(header.get("depth-units", "ev").lower(), 1.0)
+    if "ev-per-chan" in header:
+        gain_eV = _get_rpl_value(header, "ev-per-chan", float)
+    else:
+        gain_eV = _get_rpl_value(header, "depth-scale", float, 1.0) * energy_scale
+    offset_eV = _get_rpl_value(header, "depth-origin", float, 0.0) * energy_scale
+
+    return SpectrumImage(data, offset_eV, gain_eV, {"SPECTRUMIMAGE": file_path})
+
+
+def write_rpl(file_path, data, offset_eV=0.0, gain_eV=1.0):
+    """
+    Write a spectrum image of shape (rows, columns, channels) as a RPL header and its raw file, recorded by vector.
+    """
+    data = np.asarray(data)
+    dtype = data.dtype.newbyteorder("<")
+    data_type = {"i": "signed", "u": "unsigned", "f": "float"}[dtype.kind]
+
+    lines = [("key", "value"), ("width", data.shape[1]), ("height", data.shape[0]), ("depth", data.shape[2]),
+             ("offset", 0), ("data-length", dtype.itemsize), ("data-type", data_type),
+             ("byte-order", "little-endian"), ("record-by", "vector"), ("ev-per-chan", repr(float(gain_eV))),
+             ("depth-origin", repr(float(offset_eV))), ("depth-units", "eV")]
+    with open(file_path, "w") as rpl_file:
+        for key, value in lines:
+            rpl_file.write("{}\t{}\n".format(key, value))
+
+    data.astype(dtype, copy=False).tofile(os.path.splitext(file_path)[0] + ".raw")
+
+
+def read_hdf5(file_path, dataset_path=None):
+    """
+    Open a 3-D dataset of a HDF5 file as a spectrum image, the file stays open until the image is closed.
+    """
+    try:
+        import h5py
+    except ImportError:
+        raise ImportError("The HDF5 spectrum images require h5py")
+
+    hdf5_file = h5py.File(file_path, "r")
+    try:
+        if dataset_path is None:
+            dataset_paths = []
+
+            def add_dataset(name, item):
+                if isinstance(item, h5py.Dataset) and len(item.shape) == 3:
+                    dataset_paths.append(name)
+
+            hdf5_file.visititems(add_dataset)
+            if not dataset_paths:
+                raise SpectrumImageFormatError("No 3-D dataset in {}".format(file_path))
+            dataset_path = dataset_paths[0]
+
+        dataset = hdf5_file[dataset_path]
+        offset_eV = float(dataset.attrs.get("offset_eV", 0.0))
+        gain_eV = float(dataset.attrs.get("gain_eV", 1.0))
+        metadata = {"SPECTRUMIMAGE": file_path, "DATASET": dataset_path}
+        return SpectrumImage(dataset, offset_eV, gain_eV, metadata, file_handle=hdf5_file)
+    except Exception:
+        hdf5_file.close()
+        raise
+
+
+def read_spectrum_image(file_path, dataset_path=None):
+    """
+    Open a spectrum image with the reader of its extension.
+
+    :param dataset_path: path of the dataset in a HDF5 file, the first 3-D dataset if None.
+    """
+    if file_path.lower().endswith(HDF5_EXTENSIONS):
+        return read_hdf5(file_path, dataset_path)
+    return read_rpl(file_path)
+
+
+def load_spectrum_image(file_path):
+    """
+    Open a spectrum image and compute its sum spectrum and total-count image, to run off the GUI thread.
+    """
+    spectrum_image = read_spectrum_image(file_path)
+    spectrum_image.compute_summaries()
+    return spectrum_image
@@ -0,0 +1,311 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+.. py:currentmodule:: xrayspectrumanalyzergui.gui.autosave
+   :synopsis: Autosave of the project with a write-ahead journal.
+
+.. moduleauthor:: Hendrix Demers <hendrix.demers@mail.mcgill.ca>
+
+Autosave of the project with a write-ahead journal.
+
+The changes of the project are queued to a background thread, appended to a journal and replayed on a copy of the
+project. The copy is periodically saved as a snapshot, which writes only the modified chunks, and the journal is
+truncated. The snapshot of a saved project is a layer over the project file: only the chunks and tables modified by
+the journal are written in the session folder, the others are read from the project file. Each session has its own
+folder locked while the application runs, so the folders of crashed sessions can be recovered at the next start from
+the snapshot and the journal.
+"""
+
+###############################################################################
+# GUI for the x-ray spectrum analyzer project
+# Copyright (C) 2017  Hendrix Demers
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+###############################################################################
+
+# Standard library modules.
+import os
+import json
+import shutil
+import uuid
+import time
+import logging
+import threading
+try:
+    import queue
+except ImportError:  # pragma: no cover
+    import Queue as queue
+
+# Third party modules.
+from qtpy.QtCore import QLockFile
+
+# Local modules.
+
+# Project modules.
+from xrayspectrumanalyzergui.model.project import Project
+from xrayspectrumanalyzergui.file_format.project_file import ProjectFile, PROJECT_EXTENSION
+from xrayspectrumanalyzergui.file_format.journal import JournalWriter, read_journal
+
+# Globals and constants variables.
+AUTOSAVE_FOLDER = "autosave"
+SNAPSHOT_FOLDER = "snapshot" + PROJECT_EXTENSION
+JOURNAL_FILENAME = "journal.bin"
+SESSION_FILENAME = "session.json"
+LOCK_FILENAME = "session.lock"
+
+COMPACT_INTERVAL_s = 60.0
+COMPACT_JOURNAL_SIZE_bytes = 64 * 1024 * 1024
+
+
+class Autosave(object):
+    """
+    Autosave of the watched project in a new session folder of `location`.
+    """
+
+    def __init__(self, location, compact_interval_s=COMPACT_INTERVAL_s):
+        self.logger = logging.getLogger(__name__)
+
+        self.location = location
+        self.compact_interval_s = compact_interval_s
+
+        self.session_path = os.path.join(location, uuid.uuid4().hex)
+        os.makedirs(self.session_path)
+        self._lock_file = QLockFile(os.path.join(self.session_path, LOCK_FILENAME))
+        self._lock_file.tryLock(0)
+
+        self._project = None
+        self._queue = queue.Queue()
+
+        # Used only by the autosave thread.
+        self._journal_writer = JournalWriter(os.path.join(self.session_path, JOURNAL_FILENAME))
+        self._snapshot = None
+        self._number_records = 0
+        self._compact_time_s = time.time()
+
+        self._thread = threading.Thread(target=self._run, name="autosave")
+        self._thread.daemon = True
+        self._thread.start()
+
+    def watch(self, project):
+        """
+        Autosave the changes of `project` instead of the previous project.
+        """
+        if self._project is not None:
+            self._project.change_callback = None
+        self._project = project
+
+        # The state of the project is captured in the GUI thread, the autosave thread does not access the project.
+        if project.path is None:
+            spectra = [(project.get_spectrum(index), project.names[index]) for index in range(project.number_spectra)]
+        else:
+            spectra = []
+        state = {"path": project.path, "chunk_size": project.chunk_size, "revision": project.revision,
+                 "saved_revision": project.revision if not project.is_modified() else -1, "spectra": spectra,
+                 "rois": list(project.rois), "elements": list(project.elements),
+                 "fit_results": list(project.fit_results), "element_map_source": project.element_map_source,
+                 "element_map_rois": list(project.element_map_rois), "element_maps": project.element_maps}
+        self._queue.put(("reset", state))
+
+        project.change_callback = self._record
+
+    def saved(self, project):
+        """
+        Mark the current revision of the project as saved by the user, it does not need to be recovered.
+        """
+        self._queue.put(("saved", {"path": project.path, "saved_revision": project.revision}))
+
+    def sync(self, timeout=None):
+        """
+        Wait until the queued changes are written in the journal.
+        """
+        event = threading.Event()
+        self._queue.put(("sync", event))
+        return event.wait(timeout)
+
+    def compact(self):
+        self._queue.put(("compact", None))
+
+    def close(self):
+        """
+        Stop the autosave and remove the session folder.
+        """
+        if self._project is not None:
+            self._project.change_callback = None
+            self._project = None
+
+        self._queue.put(("stop", None))
+        self._thread.join()
+
+        self._lock_file.unlock()
+        remove_session(self.session_path)
+
+    def _record(self, operation, revision, arguments):
+        self._queue.put(("change", (operation, revision, arguments)))
+
+    def _run(self):
+        is_running = True
+        while is_running:
+            if self._number_records > 0:
+                timeout = max(self._compact_time_s + self.compact_interval_s - time.time(), 0.0)
+            else:
+                timeout = None
+
+            items = []
+            try:
+                items.append(self._queue.get(timeout=timeout))
+                while True:
+                    items.append(self._queue.get_nowait())
+            except queue.Empty:
+                pass
+
+            is_compact_requested = False
+            events = []
+            for kind, value in items:
+                try:
+                    if kind == "change":
+                        self._append(*value)
+                    elif kind == "reset":
+                        self._reset(value)
+                    elif kind == "saved":
+                        self._write_session(value)
+                    elif kind == "sync":
+                        events.append(value)
+                    elif kind == "compact":
+                        is_compact_requested = True
+                    elif kind == "stop":
+                        is_running = False
+                except Exception:
+                    self.logger.exception("Autosave %s failed", kind)
+
+            try:
+                self._journal_writer.flush()
+
+                is_compact_needed = self._number_records > 0 and \
+                    (time.time() - self._compact_time_s >= self.compact_interval_s or
+                     self._journal_writer.size() >= COMPACT_JOURNAL_SIZE_bytes)
+                if is_running and (is_compact_requested or is_compact_needed):
+                    self._compact()
+            except Exception:
+                self.logger.exception("Autosave compaction failed")
+
+            for event in events:
+                event.set()
+
+        self._journal_writer.close()
+
+    def _append(self, operation, revision, arguments):
+        self._journal_writer.append(operation, revision, arguments)
+        self._number_records += 1
+
+        if self._snapshot is not None:
+            self._snapshot.apply_change(operation, arguments)
+            self._snapshot.revision = revision
+
+    def _reset(self, state):
+        self._journal_writer.truncate()
+        self._number_records = 0
+        self._snapshot = None
+        snapshot_path = os.path.join(self.session_path, SNAPSHOT_FOLDER)
+        if os.path.isdir(snapshot_path):
+            shutil.rmtree(snapshot_path)
+
+        if state["path"] is not None:
+            snapshot = Project.open(state["path"])
+        else:
+            snapshot = Project(state["chunk_size"])
+            for spectrum, name in state["spectra"]:
+                snapshot.add_spectrum(spectrum, name)
+            snapshot.set_rois(state["rois"])
+            snapshot.set_elements(state["elements"])
+            snapshot.set_fit_results(state["fit_results"])
+            if state["element_map_source"] is not None:
+                snapshot.set_element_maps(state["element_map_source"], state["element_map_rois"], state["element_maps"])
+        snapshot.revision = state["revision"]
+
+        self._write_session(state)
+        if state["path"] is not None:
+            snapshot.save_layer(snapshot_path)
+        else:
+            snapshot.save(snapshot_path)
+        self._snapshot = snapshot
+        self._compact_time_s = time.time()
+
+    def _compact(self):
+        if self._snapshot is not None:
+            self._snapshot.save()
+            self._journal_writer.truncate()
+            self.logger.debug("Autosave compacted %i changes", self._number_records)
+
+        self._number_records = 0
+        self._compact_time_s = time.time()
+
+    def _write_session(self, state):
+        file_path = os.path.join(self.session_path, SESSION_FILENAME)
+        with open(file_path + ".tmp", "w") as session_file:
+            json.dump({"path": state["path"], "saved_revision": state["saved_revision"]}, session_file)
+        os.replace(file_path + ".tmp", file_path)
+
+
+def find_crashed_sessions(location):
+    """
+    Return the session folders of `location` not locked by a running application.
+    """
+    if not os.path.isdir(location):
+        return []
+
+    session_paths = []
+    for name in sorted(os.listdir(location)):
+        session_path = os.path.join(location, name)
+        if not os.path.isdir(session_path):
+            continue
+
+        lock_file = QLockFile(os.path.join(session_path, LOCK_FILENAME))
+        if lock_file.tryLock(0):
+            lock_file.unlock()
+            session_paths.append(session_path)
+
+    return session_paths
+
+
+def recover_session(session_path):
+    """
+    Return the project of a crashed session with its unsaved changes read in memory, or None if there are none.
+    """
+    try:
+        with open(os.path.join(session_path, SESSION_FILENAME), "r") as session_file:
+            session = json.load(session_file)
+    except (IOError, OSError, ValueError):
+        return None
+
+    snapshot_file = ProjectFile(os.path.join(session_path, SNAPSHOT_FOLDER))
+    if not snapshot_file.exists():
+        return None
+
+    project = Project.open(snapshot_file.path)
+    for operation, revision, arguments in read_journal(os.path.join(session_path, JOURNAL_FILENAME)):
+        # The changes already in the snapshot are skipped, if the application crashed during a compaction.
+        if revision > project.revision:
+            project.apply_change(operation, arguments)
+            project.revision = revision
+
+    if project.revision <= session["saved_revision"]:
+        return None
+
+    project.detach()
+    return project
+
+
+def remove_session(session_path):
+    shutil.rmtree(session_path, ignore_errors=True)
@@ -0,0 +1,176 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+.. py:currentmodule:: xrayspectrumanalyzergui.gui.element_map_service
+   :synopsis: Build the element maps of a spectrum image with a pool of processes.
+
+.. moduleauthor:: Hendrix Demers <hendrix.demers@mail.mcgill.ca>
+
+Build the element maps of a spectrum image with a pool of processes.
+
+The rows of the spectrum image are split in blocks computed by the workers, see
+:py:mod:`xrayspectrumanalyzergui.analysis.element_maps`, and the blocks are assembled in the GUI thread.
+"""
+
+###############################################################################
+# GUI for the x-ray spectrum analyzer project
+# Copyright (C) 2017  Hendrix Demers
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+###############################################################################
+
+# Standard library modules.
+import logging
+from concurrent.futures import ProcessPoolExecutor
+import multiprocessing
+
+# Third party modules.
+import numpy as np
+from qtpy.QtCore import QObject, Qt, Signal
+
+# Local modules.
+
+# Project modules.
+from xrayspectrumanalyzergui.analysis.element_maps import get_row_blocks, get_block_task
+
+# Globals and constants variables.
+
+
+class ElementMapService(QObject):
+    """
+    Build the element maps of a spectrum image with a pool of processes.
+
+    Signals:
+
+    * ``maps_finished(list, object)``: ROIs of the maps and array of the maps, of shape ``(number_rois, rows,
+      columns)``.
+    * ``maps_failed(str)``: error message, the other blocks are dropped.
+    * ``progress(int, int)``: number of rows done and total number of rows.
+    """
+
+    maps_finished = Signal(list, object)
+    maps_failed = Signal(str)
+    progress = Signal(int, int)
+
+    _block_done = Signal(int, int, int, object, str)
+
+    def __init__(self, parent=None, executor=None, rows_per_block=None):
+        super(ElementMapService, self).__init__(parent)
+
+        self.logger = logging.getLogger(__name__)
+
+        self._executor = executor
+        self.rows_per_block = rows_per_block
+
+        self._batch_id = 0
+        self._futures = []
+        self._rois = []
+        self._maps = None
+        self._number_done = 0
+        self._number_total = 0
+        self._number_pending_blocks = 0
+
+        # Emitted from the threads of the executor, or from this thread for a block done before its callback is added,
+        # the connection is always queued so the blocks are counted before any is done.
+        self._block_done.connect(self._on_block_done, Qt.QueuedConnection)
+
+    def is_running(self):
+        return self._number_pending_blocks > 0
+
+    def build_maps(self, spectrum_image, rois):
+        """
+        Build the maps of the ROIs in the spectrum image, cancel the maps being built.
+        """
+        self.cancel()
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=multiprocessing.cpu_count())
+
+        self._rois = list(rois)
+        self._maps = np.zeros((len(self._rois),) + spectrum_image.shape[:2])
+        self._number_done = 0
+        self._number_total = spectrum_image.number_rows
+
+        batch_id = self._batch_id
+        if self._rois:
+            for row_start, row_end in get_row_blocks(spectrum_image, self.rows_per_block):
+                function, arguments = get_block_task(spectrum_image, row_start, row_end, self._rois)
+                future = self._executor.submit(function, *arguments)
+                future.add_done_callback(self._create_done_callback(batch_id, row_start, row_end))
+                self._futures.append(future)
+                self._number_pending_blocks += 1
+
+        self.logger.info("Build %i element maps in %i blocks", len(self._rois), self._number_pending_blocks)
+        if self._number_pending_blocks == 0:
+            self._number_done = self._number_total
+        self.progress.emit(self._number_done, self._number_total)
+        if self._number_pending_blocks == 0:
+            self._finish()
+
+    def cancel(self):
+        if not self.is_running():
+            return
+
+        self.logger.info("Cancel element maps after %i/%i rows", self._number_done, self._number_total)
+
+        self._batch_id += 1
+        for future in self._futures:
+            future.cancel()
+        self._futures = []
+        self._number_pending_blocks = 0
+        self._maps = None
+        self.progress.emit(self._number_total, self._number_total)
+
+    def shutdown(self):
+        self.cancel()
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+
+    def _create_done_callback(self, batch_id, row_start, row_end):
+        def done_callback(future):
+            if future.cancelled():
+                return
+
+            try:
+                maps = future.result()
+            except Exception as message:
+                self._block_done.emit(batch_id, row_start, row_end, None, str(message))
+            else:
+                self._block_done.emit(batch_id, row_start, row_end, maps, "")
+
+        return done_callback
+
+    def _on_block_done(self, batch_id, row_start, row_end, maps, error_message):
+        if batch_id != self._batch_id:
+            return
+
+        if maps is None:
+            self.logger.error("Cannot build element maps: %s", error_message)
+            self.cancel()
+            self.maps_failed.emit(error_message)
+            return
+
+        self._maps[:, row_start:row_end] = maps
+        self._number_done += row_end - row_start
+        self._number_pending_blocks -= 1
+        self.progress.emit(self._number_done, self._number_total)
+
+        if self._number_pending_blocks == 0:
+            self._finish()
+
+    def _finish(self):
+        self._futures = []
+        maps = self._maps
+        self._maps = None
+        self.maps_finished.emit(self._rois, maps)
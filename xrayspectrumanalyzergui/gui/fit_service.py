@@ -0,0 +1,219 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+.. py:currentmodule:: xrayspectrumanalyzergui.gui.fit_service
+   :synopsis: Fit the peaks of the spectra of a project off the GUI thread.
+
+.. moduleauthor:: Hendrix Demers <hendrix.demers@mail.mcgill.ca>
+
+Fit the peaks of the spectra of a project off the GUI thread.
+
+The spectra are grouped by calibration, each group is split in chunks fitted by a process pool with
+:py:class:`xrayspectrumanalyzergui.analysis.peak_fitting.PeakFitter`, and the results cross back to the GUI thread
+through a queued signal, as for :py:mod:`xrayspectrumanalyzergui.gui.import_service`. Only a bounded number of chunks
+are read and submitted at a time, the next chunk is submitted when one is done, so a large project is neither read at
+once on the GUI thread nor copied in the queue of the pool.
+"""
+
+###############################################################################
+# GUI for the x-ray spectrum analyzer project
+# Copyright (C) 2017  Hendrix Demers
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+###############################################################################
+
+# Standard library modules.
+import logging
+from collections import OrderedDict, deque
+from concurrent.futures import ProcessPoolExecutor
+import multiprocessing
+
+# Third party modules.
+import numpy as np
+from qtpy.QtCore import QObject, Qt, Signal
+
+# Local modules.
+
+# Project modules.
+from xrayspectrumanalyzergui.analysis.peak_fitting import CHUNK_SIZE, fit_chunk
+
+# Globals and constants variables.
+
+
+def group_spectra(project):
+    """
+    Return the indexes of the spectra of a project grouped by calibration, as a dictionary of
+    ``(offset_eV, gain_eV, number_channels)`` to a list of indexes.
+    """
+    groups = OrderedDict()
+    for index in range(project.number_spectra):
+        key = (float(project.get_value("offset_eV", index)), float(project.get_value("gain_eV", index)),
+               int(project.get_value("number_channels", index)))
+        groups.setdefault(key, []).append(index)
+    return groups
+
+
+class FitService(QObject):
+    """
+    Fit the spectra of a project with a pool of processes.
+
+    Signals:
+
+    * ``fit_finished(list)``: fit results of all the spectra, list of ``(spectrum_index, label, net_intensity,
+      error)``.
+    * ``fit_failed(str)``: error message, the other results of the fit are dropped.
+    * ``progress(int, int)``: number of spectra fitted and total number of spectra.
+    """
+
+    fit_finished = Signal(list)
+    fit_failed = Signal(str)
+    progress = Signal(int, int)
+
+    _chunk_done = Signal(int, object, object, str)
+
+    def __init__(self, parent=None, executor=None, chunk_size=CHUNK_SIZE, maximum_submitted_chunks=None):
+        super(FitService, self).__init__(parent)
+
+        self.logger = logging.getLogger(__name__)
+
+        self._executor = executor
+        self.chunk_size = chunk_size
+        if maximum_submitted_chunks is None:
+            maximum_submitted_chunks = 2 * multiprocessing.cpu_count()
+        self.maximum_submitted_chunks = maximum_submitted_chunks
+
+        self._batch_id = 0
+        self._project = None
+        self._fitter = None
+        self._queued_chunks = deque()
+        self._futures = []
+        self._rows = []
+        self._number_done = 0
+        self._number_total = 0
+        self._number_pending_chunks = 0
+
+        # Emitted from the threads of the executor, or from this thread for a chunk done before its callback is added,
+        # the connection is always queued so the chunks are counted before any is done.
+        self._chunk_done.connect(self._on_chunk_done, Qt.QueuedConnection)
+
+    def is_running(self):
+        return self._number_pending_chunks > 0
+
+    def fit_project(self, project, fitter):
+        """
+        Fit all the spectra of the project, cancel the fit running.
+        """
+        self.cancel()
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=multiprocessing.cpu_count())
+
+        self._project = project
+        self._fitter = fitter
+        self._rows = []
+        self._number_done = 0
+        self._number_total = project.number_spectra
+
+        for (offset_eV, gain_eV, number_channels), indexes in group_spectra(project).items():
+            energies_eV = offset_eV + gain_eV * np.arange(number_channels)
+            for start in range(0, len(indexes), self.chunk_size):
+                self._queued_chunks.append((energies_eV, indexes[start:start + self.chunk_size]))
+        self._number_pending_chunks = len(self._queued_chunks)
+
+        self.logger.info("Fit %i spectra in %i chunks", self._number_total, self._number_pending_chunks)
+        self.progress.emit(self._number_done, self._number_total)
+        if self._number_pending_chunks == 0:
+            self._release()
+            self.fit_finished.emit([])
+            return
+
+        self._submit_chunks()
+
+    def cancel(self):
+        if not self.is_running():
+            return
+
+        self.logger.info("Cancel fit after %i/%i spectra", self._number_done, self._number_total)
+
+        self._batch_id += 1
+        for future in self._futures:
+            future.cancel()
+        self._futures = []
+        self._number_pending_chunks = 0
+        self._rows = []
+        self._release()
+        self.progress.emit(self._number_total, self._number_total)
+
+    def shutdown(self):
+        self.cancel()
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+
+    def _submit_chunks(self):
+        """
+        Read and submit the queued chunks until the maximum number of chunks are submitted and not done.
+        """
+        self._futures = [future for future in self._futures if not future.done()]
+
+        number_submitted = self._number_pending_chunks - len(self._queued_chunks)
+        while self._queued_chunks and number_submitted < self.maximum_submitted_chunks:
+            energies_eV, indexes = self._queued_chunks.popleft()
+            counts = np.stack([self._project.get_spectrum(index).counts for index in indexes])
+            future = self._executor.submit(fit_chunk, self._fitter, counts, energies_eV)
+            future.add_done_callback(self._create_done_callback(self._batch_id, indexes))
+            self._futures.append(future)
+            number_submitted += 1
+
+    def _release(self):
+        self._project = None
+        self._fitter = None
+        self._queued_chunks.clear()
+
+    def _create_done_callback(self, batch_id, indexes):
+        def done_callback(future):
+            if future.cancelled():
+                return
+
+            try:
+                results = future.result()
+            except Exception as message:
+                self._chunk_done.emit(batch_id, indexes, None, str(message))
+            else:
+                self._chunk_done.emit(batch_id, indexes, results, "")
+
+        return done_callback
+
+    def _on_chunk_done(self, batch_id, indexes, results, error_message):
+        if batch_id != self._batch_id:
+            return
+
+        if results is None:
+            self.logger.error("Cannot fit spectra: %s", error_message)
+            self.cancel()
+            self.fit_failed.emit(error_message)
+            return
+
+        self._rows.extend(results.get_rows(indexes))
+        self._number_done += len(indexes)
+        self._number_pending_chunks -= 1
+        self.progress.emit(self._number_done, self._number_total)
+
+        if self._number_pending_chunks == 0:
+            self._futures = []
+            self._release()
+            rows = sorted(self._rows, key=lambda row: row[0])
+            self._rows = []
+            self.fit_finished.emit(rows)
+        else:
+            self._submit_chunks()
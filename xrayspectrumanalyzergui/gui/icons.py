@@ -0,0 +1,84 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+.. py:currentmodule:: xrayspectrumanalyzergui.gui.icons
+   :synopsis: Icons of the application loaded on demand.
+
+.. moduleauthor:: Hendrix Demers <hendrix.demers@mail.mcgill.ca>
+
+Icons of the application loaded on demand.
+
+The icons are packaged in the compiled Qt resource file ``svg.rcc``. The file is memory mapped by
+:py:meth:`QResource.registerResource` the first time an icon is requested, instead of importing the generated
+:py:mod:`xrayspectrumanalyzergui.gui.svg_rc` module at startup.
+"""
+
+###############################################################################
+# GUI for the x-ray spectrum analyzer project
+# Copyright (C) 2017  Hendrix Demers
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+###############################################################################
+
+# Standard library modules.
+import os.path
+import logging
+
+# Third party modules.
+from qtpy.QtCore import QResource
+from qtpy.QtGui import QIcon
+
+# Local modules.
+
+# Project modules.
+
+# Globals and constants variables.
+RESOURCE_FILE_PATH = os.path.join(os.path.dirname(__file__), "svg.rcc")
+
+_is_registered = False
+_icon_cache = {}
+
+
+def register_resources():
+    global _is_registered
+
+    if not _is_registered:
+        _is_registered = QResource.registerResource(RESOURCE_FILE_PATH)
+        if not _is_registered:
+            logging.getLogger(__name__).error("Cannot register the resource file %s", RESOURCE_FILE_PATH)
+
+    return _is_registered
+
+
+def unregister_resources():
+    global _is_registered
+
+    if _is_registered:
+        QResource.unregisterResource(RESOURCE_FILE_PATH)
+        _is_registered = False
+        _icon_cache.clear()
+
+
+def get_icon(path):
+    """
+    Return the icon of the resource `path`, e.g. ``":/oi/svg/document.svg"``.
+    """
+    try:
+        return _icon_cache[path]
+    except KeyError:
+        register_resources()
+        icon = QIcon(path)
+        _icon_cache[path] = icon
+        return icon
@@ -0,0 +1,257 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+.. py:currentmodule:: xrayspectrumanalyzergui.gui.import_service
+   :synopsis: Import spectrum files off the GUI thread.
+
+.. moduleauthor:: Hendrix Demers <hendrix.demers@mail.mcgill.ca>
+
+Import spectrum files off the GUI thread.
+
+Files are parsed by a :py:mod:`concurrent.futures` pool. The results cross back to the GUI thread through a queued
+signal and are delivered in batches, so that importing hundreds of files does not flood the event loop. An optional
+analyzer, e.g. the automatic peak identification, is run by the same workers on each parsed spectrum. Dropped
+directories are also walked by a worker, so a whole acquisition folder never blocks the GUI thread.
+"""
+
+###############################################################################
+# GUI for the x-ray spectrum analyzer project
+# Copyright (C) 2017  Hendrix Demers
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+###############################################################################
+
+# Standard library modules.
+import logging
+from concurrent.futures import ThreadPoolExecutor
+import multiprocessing
+
+# Third party modules.
+from qtpy.QtCore import Qt, QObject, QTimer, Signal
+
+# Local modules.
+
+# Project modules.
+from xrayspectrumanalyzergui.file_format.spectrum_files import read_spectrum, collect_spectrum_files
+
+# Globals and constants variables.
+DELIVERY_INTERVAL_ms = 50
+
+
+class ImportService(QObject):
+    """
+    Parse spectrum files with a pool of workers.
+
+    Signals:
+
+    * ``spectra_imported(list)``: list of ``(file_path, spectrum)`` parsed since the last delivery.
+    * ``spectra_analyzed(list)``: list of ``(file_path, result)`` of the analyzer, emitted after
+      ``spectra_imported`` for the same spectra.
+    * ``import_failed(str, str)``: file path and error message.
+    * ``progress(int, int)``: number of files done and total number of files of the current import, the total is
+      not final while directories are walked.
+    * ``finished()``: all files of the current import are done.
+    """
+
+    spectra_imported = Signal(list)
+    spectra_analyzed = Signal(list)
+    import_failed = Signal(str, str)
+    progress = Signal(int, int)
+    finished = Signal()
+
+    _file_done = Signal(int, str, object, object, str)
+    _paths_collected = Signal(int, list)
+
+    def __init__(self, parent=None, reader=read_spectrum, executor=None, analyzer=None):
+        super(ImportService, self).__init__(parent)
+
+        self.logger = logging.getLogger(__name__)
+
+        self.reader = reader
+        self.analyzer = analyzer
+        if executor is None:
+            executor = ThreadPoolExecutor(max_workers=multiprocessing.cpu_count())
+        self._executor = executor
+
+        self._batch_id = 0
+        self._futures = []
+        self._number_done = 0
+        self._number_total = 0
+        self._number_collecting = 0
+        self._pending = []
+        self._pending_results = []
+
+        self._delivery_timer = QTimer(self)
+        self._delivery_timer.setSingleShot(True)
+        self._delivery_timer.setInterval(DELIVERY_INTERVAL_ms)
+        self._delivery_timer.timeout.connect(self._deliver)
+
+        # Emitted from the worker threads, or from the GUI thread when a future is already done as its callback is
+        # added, the connection is always queued so the files are counted before they are done.
+        self._file_done.connect(self._on_file_done, Qt.QueuedConnection)
+        self._paths_collected.connect(self._on_paths_collected, Qt.QueuedConnection)
+
+    def is_running(self):
+        return self._number_collecting > 0 or self._number_done < self._number_total
+
+    def import_paths(self, paths):
+        """
+        Queue files and directories to import, the directories are expanded recursively by a worker.
+
+        See :py:func:`xrayspectrumanalyzergui.file_format.spectrum_files.collect_spectrum_files`.
+        """
+        if not self.is_running():
+            self._reset()
+
+        future = self._executor.submit(collect_spectrum_files, list(paths))
+        future.add_done_callback(self._create_collected_callback(self._batch_id))
+        self._futures.append(future)
+        self._number_collecting += 1
+
+        self.logger.info("Collect spectrum files of %i paths", len(paths))
+        self.progress.emit(self._number_done, self._number_total)
+
+    def import_files(self, file_paths):
+        """
+        Queue files to import, files added while an import is running are part of the same import.
+        """
+        if not self.is_running():
+            self._reset()
+
+        batch_id = self._batch_id
+        for file_path in file_paths:
+            future = self._executor.submit(self._read_file, self.reader, self.analyzer, file_path)
+            future.add_done_callback(self._create_done_callback(batch_id, file_path))
+            self._futures.append(future)
+        self._number_total += len(file_paths)
+
+        self.logger.info("Import %i files", len(file_paths))
+        self.progress.emit(self._number_done, self._number_total)
+
+    def cancel(self):
+        """
+        Cancel the files not yet parsed and drop the results of the files being parsed.
+        """
+        if not self.is_running():
+            return
+
+        self.logger.info("Cancel import after %i/%i files", self._number_done, self._number_total)
+
+        self._batch_id += 1
+        for future in self._futures:
+            future.cancel()
+        self._futures = []
+
+        self._number_collecting = 0
+        self._number_total = self._number_done
+        self._deliver()
+        self.finished.emit()
+
+    def shutdown(self):
+        self.cancel()
+        self._executor.shutdown(wait=False)
+
+    def _reset(self):
+        self._number_done = 0
+        self._number_total = 0
+        self._futures = []
+
+    @staticmethod
+    def _read_file(reader, analyzer, file_path):
+        spectrum = reader(file_path)
+        if analyzer is None:
+            return spectrum, None
+
+        try:
+            result = analyzer(spectrum)
+        except Exception:
+            logging.getLogger(__name__).exception("Cannot analyze spectrum %s", file_path)
+            result = None
+        return spectrum, result
+
+    def _create_done_callback(self, batch_id, file_path):
+        def done_callback(future):
+            if future.cancelled():
+                return
+
+            try:
+                spectrum, result = future.result()
+            except Exception as message:
+                self._file_done.emit(batch_id, file_path, None, None, str(message))
+            else:
+                self._file_done.emit(batch_id, file_path, spectrum, result, "")
+
+        return done_callback
+
+    def _create_collected_callback(self, batch_id):
+        def collected_callback(future):
+            if future.cancelled():
+                return
+
+            try:
+                file_paths = future.result()
+            except Exception:
+                self.logger.exception("Cannot collect the spectrum files")
+                file_paths = []
+            self._paths_collected.emit(batch_id, file_paths)
+
+        return collected_callback
+
+    def _on_paths_collected(self, batch_id, file_paths):
+        if batch_id != self._batch_id:
+            return
+
+        # Still counted as collecting while the files are queued, so they are part of the running import.
+        if file_paths:
+            self.import_files(file_paths)
+        self._number_collecting -= 1
+
+        if not self.is_running():
+            self._deliver()
+            self.finished.emit()
+
+    def _on_file_done(self, batch_id, file_path, spectrum, result, error_message):
+        if batch_id != self._batch_id:
+            return
+
+        self._number_done += 1
+        if spectrum is None:
+            self.logger.error("Cannot import spectrum %s: %s", file_path, error_message)
+            self.import_failed.emit(file_path, error_message)
+        else:
+            self._pending.append((file_path, spectrum))
+            if result is not None:
+                self._pending_results.append((file_path, result))
+
+        if not self.is_running():
+            self._deliver()
+            self.finished.emit()
+        elif not self._delivery_timer.isActive():
+            self._delivery_timer.start()
+
+    def _deliver(self):
+        self._delivery_timer.stop()
+
+        if self._pending:
+            spectra = self._pending
+            self._pending = []
+            self.spectra_imported.emit(spectra)
+
+        if self._pending_results:
+            results = self._pending_results
+            self._pending_results = []
+            self.spectra_analyzed.emit(results)
+
+        self.progress.emit(self._number_done, self._number_total)
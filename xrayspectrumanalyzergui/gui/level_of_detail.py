@@ -0,0 +1,124 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+.. py:currentmodule:: xrayspectrumanalyzergui.gui.level_of_detail
+   :synopsis: Min/max decimation of a spectrum for the display.
+
+.. moduleauthor:: Hendrix Demers <hendrix.demers@mail.mcgill.ca>
+
+Min/max decimation of a spectrum for the display.
+
+A pyramid of the channel index of the minimum and maximum of blocks of :math:`2^k` channels is computed once per
+spectrum. For a visible range and a width in pixels, only the envelope of the level with about one block per pixel is
+plotted. The minimum and maximum channels are kept with their exact energy and intensity, so the peak maxima are
+preserved.
+"""
+
+###############################################################################
+# GUI for the x-ray spectrum analyzer project
+# Copyright (C) 2017  Hendrix Demers
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+###############################################################################
+
+# Standard library modules.
+
+# Third party modules.
+import numpy as np
+
+# Local modules.
+
+# Project modules.
+
+# Globals and constants variables.
+
+
+class MinMaxPyramid(object):
+    """
+    Min/max pyramid of a spectrum.
+
+    :param x: sorted energies of the channels.
+    :param y: intensities of the channels.
+    """
+
+    def __init__(self, x, y):
+        self.x = np.asarray(x)
+        self.y = np.asarray(y)
+
+        self.min_indexes = []
+        self.max_indexes = []
+        self._build()
+
+    def _build(self):
+        min_indexes = max_indexes = np.arange(self.y.size, dtype=np.int64)
+
+        while min_indexes.size > 1:
+            if min_indexes.size % 2 == 1:
+                min_indexes = np.append(min_indexes, min_indexes[-1])
+                max_indexes = np.append(max_indexes, max_indexes[-1])
+
+            first_indexes = min_indexes[0::2]
+            second_indexes = min_indexes[1::2]
+            min_indexes = np.where(self.y[second_indexes] < self.y[first_indexes], second_indexes, first_indexes)
+
+            first_indexes = max_indexes[0::2]
+            second_indexes = max_indexes[1::2]
+            max_indexes = np.where(self.y[second_indexes] > self.y[first_indexes], second_indexes, first_indexes)
+
+            self.min_indexes.append(min_indexes)
+            self.max_indexes.append(max_indexes)
+
+    @property
+    def number_levels(self):
+        return len(self.min_indexes)
+
+    def get_y_limits(self):
+        if self.y.size == 0:
+            return None
+        if self.number_levels == 0:
+            return self.y[0], self.y[0]
+        return self.y[self.min_indexes[-1][0]], self.y[self.max_indexes[-1][0]]
+
+    def get_envelope(self, x_min, x_max, number_pixels):
+        """
+        Return the points to plot for the visible range.
+
+        :param x_min: minimum visible energy.
+        :param x_max: maximum visible energy.
+        :param number_pixels: width of the visible range in pixels.
+        :return: x and y arrays with about two to four points per pixel, or the raw channels when there are fewer
+            channels than that.
+        """
+        start_index = max(int(np.searchsorted(self.x, x_min, side="left")) - 1, 0)
+        end_index = min(int(np.searchsorted(self.x, x_max, side="right")) + 1, self.x.size)
+        number_channels = end_index - start_index
+
+        number_pixels = max(int(number_pixels), 1)
+        if number_channels <= 2 * number_pixels:
+            return self.x[start_index:end_index], self.y[start_index:end_index]
+
+        level = min(int(np.log2(number_channels / number_pixels)), self.number_levels)
+        block_size = 2 ** level
+        start_block = start_index // block_size
+        end_block = -(-end_index // block_size)
+
+        min_indexes = self.min_indexes[level - 1][start_block:end_block]
+        max_indexes = self.max_indexes[level - 1][start_block:end_block]
+
+        indexes = np.empty(2 * min_indexes.size, dtype=np.int64)
+        indexes[0::2] = np.minimum(min_indexes, max_indexes)
+        indexes[1::2] = np.maximum(min_indexes, max_indexes)
+
+        return self.x[indexes], self.y[indexes]
@@ -0,0 +1,129 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+.. py:currentmodule:: xrayspectrumanalyzergui.gui.live_acquisition
+   :synopsis: Live acquisition of a spectrum from a detector event stream.
+
+.. moduleauthor:: Hendrix Demers <hendrix.demers@mail.mcgill.ca>
+
+Live acquisition of a spectrum from a detector event stream.
+
+The events are read and histogrammed on the thread of an
+:py:class:`~xrayspectrumanalyzergui.acquisition.stream.EventStreamReader`, the GUI thread is never notified per
+packet. A timer polls the accumulator at a capped frame rate and emits the spectrum only when new counts arrived, so the
+display cost does not depend on the count rate.
+"""
+
+###############################################################################
+# GUI for the x-ray spectrum analyzer project
+# Copyright (C) 2017  Hendrix Demers
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+###############################################################################
+
+# Standard library modules.
+import logging
+
+# Third party modules.
+from qtpy.QtCore import QObject, QTimer, Signal
+
+# Local modules.
+
+# Project modules.
+from xrayspectrumanalyzergui.acquisition.accumulator import SpectrumAccumulator
+from xrayspectrumanalyzergui.acquisition.stream import EventStreamReader
+
+# Globals and constants variables.
+MAXIMUM_FRAME_RATE_Hz = 20.0
+
+
+class LiveAcquisition(QObject):
+    """
+    Accumulate the spectrum of an event stream and emit it at a capped frame rate.
+
+    Signals:
+
+    * ``spectrum_updated(object)``: :py:class:`~xrayspectrumanalyzergui.model.spectrum_data.SpectrumData` of the
+      counts accumulated, at most :py:data:`MAXIMUM_FRAME_RATE_Hz` times per second.
+    * ``stopped(str)``: the acquisition stopped, with the error message or an empty string.
+    """
+
+    spectrum_updated = Signal(object)
+    stopped = Signal(str)
+
+    def __init__(self, parent=None, frame_rate_Hz=MAXIMUM_FRAME_RATE_Hz):
+        super(LiveAcquisition, self).__init__(parent)
+
+        self.logger = logging.getLogger(__name__)
+
+        self.accumulator = SpectrumAccumulator()
+        self.spectrum = None
+        self._reader = None
+        self._revision = self.accumulator.revision
+
+        self._timer = QTimer(self)
+        self._timer.setInterval(int(round(1000.0 / frame_rate_Hz)))
+        self._timer.timeout.connect(self._refresh)
+
+    def is_running(self):
+        return self._reader is not None
+
+    def start(self, address):
+        """
+        Start a new acquisition from the stream at `address`, ``(host, port)`` or the path of a UNIX socket.
+        """
+        self.stop()
+
+        self.logger.info("Start live acquisition from %s", address)
+        self.accumulator.clear()
+        self.spectrum = None
+        self._revision = self.accumulator.revision
+        self._reader = EventStreamReader(address, self.accumulator)
+        self._reader.start()
+        self._timer.start()
+
+    def stop(self):
+        """
+        Stop the acquisition, the last spectrum is kept in :py:attr:`spectrum`.
+        """
+        if self._reader is None:
+            return
+
+        self._reader.stop()
+        self._reader.join(1.0)
+        error = self._reader.error or ""
+        self._reader = None
+        self._timer.stop()
+
+        self._refresh()
+        self.logger.info("Stop live acquisition: %i counts", self.accumulator.number_events)
+        self.stopped.emit(error)
+
+    def get_count_rate(self):
+        return self.accumulator.get_count_rate()
+
+    def _refresh(self):
+        if self._reader is not None and not self._reader.is_alive():
+            self.stop()
+            return
+
+        # The revision is read first: the spectrum is at least as recent.
+        revision = self.accumulator.revision
+        if revision == self._revision:
+            return
+
+        self.spectrum = self.accumulator.get_spectrum()
+        self._revision = revision
+        self.spectrum_updated.emit(self.spectrum)
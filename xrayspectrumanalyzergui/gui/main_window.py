@@ -35,29 +35,54 @@ import logging
 from logging.handlers import RotatingFileHandler
 
 # Third party modules.
+import numpy as np
 from qtpy.QtWidgets import QMainWindow, QAction, QApplication, QStyle, QFileDialog, QDockWidget, QLabel, \
-    QDesktopWidget, QMessageBox, QHBoxLayout, QGroupBox, QSizePolicy, QVBoxLayout, QListWidget, QToolTip, QTextEdit
-from qtpy.QtCore import QSettings, Qt, QPoint, QSize, QStandardPaths
-from qtpy.QtGui import QIcon, QKeySequence, QFont
-
-import matplotlib
-# Make sure that we are using QT5
-matplotlib.use('Qt5Agg')
-from matplotlib.backend_bases import key_press_handler
-from matplotlib.backends.backend_qt4agg import FigureCanvasQTAgg as FigureCanvas
-from matplotlib.backends.backend_qt4agg import NavigationToolbar2QT as NavigationToolbar
-from matplotlib.figure import Figure
+    QDesktopWidget, QMessageBox, QHBoxLayout, QGroupBox, QSizePolicy, QVBoxLayout, QToolTip, QTextEdit, \
+    QProgressBar, QTableView, QListView, QAbstractItemView, QHeaderView, QInputDialog, QComboBox, QWidget, \
+    QActionGroup
+from qtpy.QtCore import QSettings, Qt, QPoint, QSize, QStandardPaths, QTimer
+from qtpy.QtGui import QKeySequence, QFont
+
+# matplotlib is imported with the spectrum widget, after the main window is painted, see create_spectrum_widget.
 
 # Local modules.
 
 # Project modules.
-from xrayspectrumanalyzergui.gui.spectrum_widget import SpectrumWidget
-import xrayspectrumanalyzergui.gui.svg_rc
+from xrayspectrumanalyzergui.gui.import_service import ImportService
+from xrayspectrumanalyzergui.gui.fit_service import FitService
+from xrayspectrumanalyzergui.gui.element_map_service import ElementMapService
+from xrayspectrumanalyzergui.gui.live_acquisition import LiveAcquisition
+from xrayspectrumanalyzergui.gui.map_view import MapView
+from xrayspectrumanalyzergui.gui.multi_spectrum import MultiSpectrum, NORMALISATIONS, NORMALISATION_NONE, \
+    NORMALISATION_LIVE_TIME, NORMALISATION_TOTAL_COUNTS, NORMALISATION_PEAK
+from xrayspectrumanalyzergui.gui.icons import get_icon
+from xrayspectrumanalyzergui.gui.project_models import SpectraTableModel, RoiListModel, ElementListModel
+from xrayspectrumanalyzergui.gui.thumbnails import ThumbnailService, THUMBNAIL_SIZE
+from xrayspectrumanalyzergui.gui.autosave import Autosave, AUTOSAVE_FOLDER, find_crashed_sessions, recover_session, \
+    remove_session
+from xrayspectrumanalyzergui.model.project import Project, create_roi
+from xrayspectrumanalyzergui.file_format.project_file import PROJECT_EXTENSION, ProjectFormatError
+from xrayspectrumanalyzergui.file_format.spectrum_files import SPECTRUM_FILE_EXTENSIONS
+from xrayspectrumanalyzergui.file_format.event_list import EventList, EventListFormatError
+from xrayspectrumanalyzergui.file_format.spectrum_image import SPECTRUM_IMAGE_EXTENSIONS, load_spectrum_image
+from xrayspectrumanalyzergui.analysis.xray_lines import get_database, format_line
+from xrayspectrumanalyzergui.analysis.peak_identification import identify_spectrum
+from xrayspectrumanalyzergui.analysis.peak_fitting import PeakFitter
+from xrayspectrumanalyzergui.analysis.background import BackgroundCache, BackgroundParameters, METHODS, METHOD_SNIP, \
+    METHOD_POLYNOMIAL, METHOD_KRAMERS
+from xrayspectrumanalyzergui.analysis.roi_integration import RoiIntegrator
+from xrayspectrumanalyzergui.analysis.element_maps import get_source
+from xrayspectrumanalyzergui.model.spectrum_data import SpectrumData
+from xrayspectrumanalyzergui.acquisition.stream import parse_address
 
 # Globals and constants variables.
 APPLICATION_NAME = "xrayspectrumanalyzer"
 ORGANIZATION_NAME = "McGill University"
 LOG_FILENAME = APPLICATION_NAME + '.log'
+LINE_IDENTIFICATION_TOLERANCE_eV = 50.0
+# Width of a new ROI relative to the visible energy range, its background windows are half as wide.
+ROI_WIDTH_FRACTION = 0.05
+LIVE_ACQUISITION_ADDRESS = "localhost:5555"
 
 MODULE_LOGGER = logging.getLogger(APPLICATION_NAME)
 
@@ -77,56 +102,194 @@ class MainWindow(QMainWindow):
         # Define standard icon.
         standard_icon = self.style().standardIcon
 
-        # Central widget.
-        self.main_widget = SpectrumWidget()
-        self.main_widget.setFocus()
-        self.setCentralWidget(self.main_widget)
+        # Central widget, the spectrum widget replaces the placeholder once the window is shown.
+        self.main_widget = None
+        self._is_spectrum_widget_scheduled = False
+        self.current_spectrum = None
+        self.normalisation = NORMALISATION_NONE
+        self._multi_spectrum = None
+        self._multi_spectrum_indexes = None
+        self.background_cache = BackgroundCache()
+        self.background_parameters = BackgroundParameters()
+        self.roi_integrator = RoiIntegrator()
+        self.event_list = None
+        self.spectrum_image = None
+        self.element_maps = None
+        placeholder_label = QLabel("Loading ...")
+        placeholder_label.setAlignment(Qt.AlignCenter)
+        self.setCentralWidget(placeholder_label)
+
+        # Import service.
+        self.import_service = ImportService(self)
+        self.import_service.spectra_imported.connect(self.spectra_imported)
+        self.import_service.spectra_analyzed.connect(self.spectra_analyzed)
+        self.import_service.import_failed.connect(self.import_failed)
+        self.import_service.progress.connect(self.import_progress)
+
+        # Fit service.
+        self.fit_service = FitService(self)
+        self.fit_service.fit_finished.connect(self.fit_finished)
+        self.fit_service.fit_failed.connect(self.fit_failed)
+        self.fit_service.progress.connect(self.fit_progress)
+
+        # Element map service.
+        self.element_map_service = ElementMapService(self)
+        self.element_map_service.maps_finished.connect(self.element_maps_finished)
+        self.element_map_service.maps_failed.connect(self.element_maps_failed)
+        self.element_map_service.progress.connect(self.element_map_progress)
+
+        # Spectrum images are opened and summed off the GUI thread.
+        self.spectrum_image_service = ImportService(self, reader=load_spectrum_image)
+        self.spectrum_image_service.spectra_imported.connect(self.spectrum_image_loaded)
+        self.spectrum_image_service.import_failed.connect(self.spectrum_image_failed)
+
+        # Live acquisition.
+        self.live_acquisition = LiveAcquisition(self)
+        self.live_acquisition.spectrum_updated.connect(self.live_spectrum_updated)
+        self.live_acquisition.stopped.connect(self.live_acquisition_stopped)
 
         # Project action
-        new_project_action = QAction(QIcon(':/oi/svg/document.svg'), 'New project', self)
+        new_project_action = QAction(get_icon(':/oi/svg/document.svg'), 'New project', self)
         new_project_action.setShortcut('Ctrl+N')
         new_project_action.setStatusTip('New project')
         new_project_action.triggered.connect(self.new_project)
 
-        open_project_action = QAction(QIcon(':/oi/svg/envelope-open.svg'), 'Open project', self)
+        open_project_action = QAction(get_icon(':/oi/svg/envelope-open.svg'), 'Open project', self)
         open_project_action.setShortcut('Ctrl+O')
         open_project_action.setStatusTip('Open project')
         open_project_action.triggered.connect(self.open_project)
 
-        close_project_action = QAction(QIcon(':/oi/svg/envelope-closed.svg'), 'Close project', self)
+        close_project_action = QAction(get_icon(':/oi/svg/envelope-closed.svg'), 'Close project', self)
         close_project_action.setShortcut('Ctrl+C')
         close_project_action.setStatusTip('Close project')
         close_project_action.triggered.connect(self.close_project)
 
-        save_project_action = QAction(QIcon(':/oi/svg/hard-drive.svg'), 'Save project', self)
+        save_project_action = QAction(get_icon(':/oi/svg/hard-drive.svg'), 'Save project', self)
         save_project_action.setShortcut('Ctrl+S')
         save_project_action.setStatusTip('Save project')
         save_project_action.triggered.connect(self.save_project)
 
-        saveas_project_action = QAction(QIcon(':/oi/svg/hard-drive.svg'), 'Save project as ...', self)
+        saveas_project_action = QAction(get_icon(':/oi/svg/hard-drive.svg'), 'Save project as ...', self)
         # saveas_project_action.setShortcut('Ctrl+S')
         saveas_project_action.setStatusTip('Save project as ...')
         saveas_project_action.triggered.connect(self.saveas_project)
 
         # Spectrum action
-        import_spectrum_action = QAction(QIcon(':/oi/svg/account-login.svg'), 'Import spectrum', self)
+        import_spectrum_action = QAction(get_icon(':/oi/svg/account-login.svg'), 'Import spectrum', self)
         import_spectrum_action.setShortcut('Ctrl+I')
         import_spectrum_action.setStatusTip('Import spectrum')
         import_spectrum_action.triggered.connect(self.import_spectrum)
 
-        export_spectrum_action = QAction(QIcon(':/oi/svg/account-logout.svg'), 'Export spectrum', self)
+        cancel_import_action = QAction(get_icon(':/oi/svg/x.svg'), 'Cancel import', self)
+        cancel_import_action.setShortcut('Esc')
+        cancel_import_action.setStatusTip('Cancel import')
+        cancel_import_action.triggered.connect(self.import_service.cancel)
+
+        self.start_live_action = QAction(get_icon(':/oi/svg/media-play.svg'), 'Start live acquisition ...', self)
+        self.start_live_action.setShortcut('Ctrl+L')
+        self.start_live_action.setStatusTip('Acquire a spectrum from a detector event stream')
+        self.start_live_action.triggered.connect(self.start_live_acquisition)
+
+        self.stop_live_action = QAction(get_icon(':/oi/svg/media-stop.svg'), 'Stop live acquisition', self)
+        self.stop_live_action.setStatusTip('Stop the acquisition and add the spectrum to the project')
+        self.stop_live_action.setEnabled(False)
+        self.stop_live_action.triggered.connect(self.live_acquisition.stop)
+
+        open_spectrum_image_action = QAction(get_icon(':/oi/svg/grid-three-up.svg'), 'Open spectrum image ...', self)
+        open_spectrum_image_action.setShortcut('Ctrl+Shift+I')
+        open_spectrum_image_action.setStatusTip('Open a spectrum image (RPL or HDF5) in the map view')
+        open_spectrum_image_action.triggered.connect(self.open_spectrum_image)
+
+        event_list_window_action = QAction(get_icon(':/oi/svg/timer.svg'), 'Event-list time window ...', self)
+        event_list_window_action.setStatusTip('Show the spectrum of a time window of the event list of the spectrum')
+        event_list_window_action.triggered.connect(self.select_event_list_window)
+
+        self.overlay_spectra_action = QAction(get_icon(':/oi/svg/bar-chart.svg'), 'Overlay selected spectra', self)
+        self.overlay_spectra_action.setShortcut('Ctrl+Shift+O')
+        self.overlay_spectra_action.setCheckable(True)
+        self.overlay_spectra_action.setStatusTip('Show all the spectra selected in the list together')
+        self.overlay_spectra_action.toggled.connect(self.update_spectrum_display)
+
+        normalisation_labels = {NORMALISATION_NONE: "None", NORMALISATION_LIVE_TIME: "Live time",
+                                NORMALISATION_TOTAL_COUNTS: "Total counts", NORMALISATION_PEAK: "Highest channel"}
+        self.normalisation_action_group = QActionGroup(self)
+        for normalisation in NORMALISATIONS:
+            normalisation_action = QAction(normalisation_labels[normalisation], self.normalisation_action_group)
+            normalisation_action.setCheckable(True)
+            normalisation_action.setChecked(normalisation == self.normalisation)
+            normalisation_action.setData(normalisation)
+            normalisation_action.setStatusTip('Normalise the overlaid spectra')
+        self.normalisation_action_group.triggered.connect(lambda action: self.set_normalisation(action.data()))
+
+        export_spectrum_action = QAction(get_icon(':/oi/svg/account-logout.svg'), 'Export spectrum', self)
         # export_spectrum_action.setShortcut('Ctrl+I')
         export_spectrum_action.setStatusTip('Export spectrum')
         export_spectrum_action.triggered.connect(self.export_spectrum)
 
+        # Analysis action
+        add_elements_action = QAction(get_icon(':/oi/svg/plus.svg'), 'Add elements ...', self)
+        add_elements_action.setShortcut('Ctrl+E')
+        add_elements_action.setStatusTip('Add elements and show their x-ray lines')
+        add_elements_action.triggered.connect(self.add_elements)
+
+        clear_elements_action = QAction(get_icon(':/oi/svg/trash.svg'), 'Clear elements', self)
+        clear_elements_action.setStatusTip('Clear elements')
+        clear_elements_action.triggered.connect(self.clear_elements)
+
+        add_roi_action = QAction(get_icon(':/oi/svg/resize-width.svg'), 'Add ROI', self)
+        add_roi_action.setShortcut('Ctrl+R')
+        add_roi_action.setStatusTip('Add a ROI with background windows at the centre of the view')
+        add_roi_action.triggered.connect(self.add_roi)
+
+        clear_rois_action = QAction(get_icon(':/oi/svg/trash.svg'), 'Clear ROIs', self)
+        clear_rois_action.setStatusTip('Clear ROIs')
+        clear_rois_action.triggered.connect(self.clear_rois)
+
+        identify_elements_action = QAction(get_icon(':/oi/svg/magnifying-glass.svg'), 'Identify elements', self)
+        identify_elements_action.setShortcut('Ctrl+Shift+E')
+        identify_elements_action.setStatusTip('Identify the elements of the current spectrum')
+        identify_elements_action.triggered.connect(self.identify_elements)
+
+        self.identify_on_import_action = QAction('Identify elements on import', self)
+        self.identify_on_import_action.setCheckable(True)
+        self.identify_on_import_action.setStatusTip('Identify the elements of each imported spectrum')
+        self.identify_on_import_action.toggled.connect(self.set_identify_on_import)
+
+        self.show_background_action = QAction(get_icon(':/oi/svg/graph.svg'), 'Show background', self)
+        self.show_background_action.setShortcut('Ctrl+B')
+        self.show_background_action.setCheckable(True)
+        self.show_background_action.setStatusTip('Show the background of the current spectrum')
+        self.show_background_action.toggled.connect(self.update_spectrum_display)
+
+        self.subtract_background_action = QAction(get_icon(':/oi/svg/minus.svg'), 'Subtract background', self)
+        self.subtract_background_action.setCheckable(True)
+        self.subtract_background_action.setStatusTip('Show the current spectrum without its background')
+        self.subtract_background_action.toggled.connect(self.update_spectrum_display)
+
+        background_settings_action = QAction('Background settings ...', self)
+        background_settings_action.setStatusTip('Select the background method and its parameters')
+        background_settings_action.triggered.connect(self.edit_background_parameters)
+
+        fit_peaks_action = QAction(get_icon(':/oi/svg/pulse.svg'), 'Fit peaks', self)
+        fit_peaks_action.setShortcut('Ctrl+Shift+F')
+        fit_peaks_action.setStatusTip('Fit the net intensities of the elements in all the spectra')
+        fit_peaks_action.triggered.connect(self.fit_peaks)
+
+        element_maps_action = QAction(get_icon(':/oi/svg/layers.svg'), 'Element maps', self)
+        element_maps_action.setStatusTip('Build the maps of the ROIs in the spectrum image')
+        element_maps_action.triggered.connect(self.build_element_maps)
+
         # Exit action
-        exit_action = QAction(QIcon(':/oi/svg/x.svg'), 'Exit', self)
+        exit_action = QAction(get_icon(':/oi/svg/x.svg'), 'Exit', self)
         exit_action.setShortcut('Ctrl+Q')
         exit_action.setStatusTip('Exit application')
         exit_action.triggered.connect(self.close)
 
         # Status bar.
-        self.statusBar()
+        self.import_progress_bar = QProgressBar(self)
+        self.import_progress_bar.setMaximumWidth(200)
+        self.import_progress_bar.setVisible(False)
+        self.statusBar().addPermanentWidget(self.import_progress_bar)
 
         # Menu bar.
         menubar = self.menuBar()
@@ -143,8 +306,34 @@ class MainWindow(QMainWindow):
 
         spectrum_menu = menubar.addMenu('&Spectrum')
         spectrum_menu.addAction(import_spectrum_action)
+        spectrum_menu.addAction(cancel_import_action)
+        spectrum_menu.addAction(open_spectrum_image_action)
+        spectrum_menu.addAction(event_list_window_action)
+        spectrum_menu.addSeparator()
+        spectrum_menu.addAction(self.start_live_action)
+        spectrum_menu.addAction(self.stop_live_action)
+        spectrum_menu.addSeparator()
+        spectrum_menu.addAction(self.overlay_spectra_action)
+        normalisation_menu = spectrum_menu.addMenu('Normalisation')
+        for normalisation_action in self.normalisation_action_group.actions():
+            normalisation_menu.addAction(normalisation_action)
 
         analysis_menu = menubar.addMenu('&Analysis')
+        analysis_menu.addAction(add_elements_action)
+        analysis_menu.addAction(clear_elements_action)
+        analysis_menu.addSeparator()
+        analysis_menu.addAction(add_roi_action)
+        analysis_menu.addAction(clear_rois_action)
+        analysis_menu.addSeparator()
+        analysis_menu.addAction(identify_elements_action)
+        analysis_menu.addAction(self.identify_on_import_action)
+        analysis_menu.addSeparator()
+        analysis_menu.addAction(self.show_background_action)
+        analysis_menu.addAction(self.subtract_background_action)
+        analysis_menu.addAction(background_settings_action)
+        analysis_menu.addSeparator()
+        analysis_menu.addAction(fit_peaks_action)
+        analysis_menu.addAction(element_maps_action)
 
         # Toolbar
         file_toolbar = self.addToolBar('File')
@@ -158,9 +347,17 @@ class MainWindow(QMainWindow):
 
         spectrum_toolbar = self.addToolBar('Spectrum')
         spectrum_toolbar.addAction(import_spectrum_action)
+        spectrum_toolbar.addAction(self.start_live_action)
+        spectrum_toolbar.addAction(self.stop_live_action)
         view_menu.addAction(spectrum_toolbar.toggleViewAction())
 
         analysis_toolbar = self.addToolBar('Analysis')
+        analysis_toolbar.addAction(add_elements_action)
+        analysis_toolbar.addAction(add_roi_action)
+        analysis_toolbar.addAction(identify_elements_action)
+        analysis_toolbar.addAction(self.show_background_action)
+        analysis_toolbar.addAction(self.subtract_background_action)
+        analysis_toolbar.addAction(fit_peaks_action)
         view_menu.addAction(analysis_toolbar.toggleViewAction())
 
         view_menu.addSeparator()
@@ -175,10 +372,71 @@ class MainWindow(QMainWindow):
         self.addDockWidget(Qt.AllDockWidgetAreas, self.graphic_settings_dock)
         print(self.graphic_settings_dock.objectName())
 
+        self.data_dock = QDockWidget("Data", self)
+        self.data_dock.setObjectName("data_dock")
+        self.data_dock.setAllowedAreas(Qt.AllDockWidgetAreas)
+        self._create_data_display()
+        self.data_dock.setWidget(self.dataGroupBox)
+        view_menu.addAction(self.data_dock.toggleViewAction())
+        self.addDockWidget(Qt.LeftDockWidgetArea, self.data_dock)
+
+        self.map_view = MapView()
+        self.map_view.pixel_selected.connect(self.map_pixel_selected)
+        self.map_view.region_selected.connect(self.map_region_selected)
+        self.map_combo_box = QComboBox()
+        self.map_combo_box.setStatusTip('Map shown: the total counts or the net counts of a ROI')
+        self.map_combo_box.currentIndexChanged.connect(self.show_map)
+        map_widget = QWidget()
+        map_layout = QVBoxLayout(map_widget)
+        map_layout.setContentsMargins(0, 0, 0, 0)
+        map_layout.addWidget(self.map_combo_box)
+        map_layout.addWidget(self.map_view)
+        self.map_dock = QDockWidget("Map", self)
+        self.map_dock.setObjectName("map_dock")
+        self.map_dock.setAllowedAreas(Qt.AllDockWidgetAreas)
+        self.map_dock.setWidget(map_widget)
+        view_menu.addAction(self.map_dock.toggleViewAction())
+        self.addDockWidget(Qt.RightDockWidgetArea, self.map_dock)
+        self.map_dock.setVisible(False)
+
         # Final options.
-        self.setWindowTitle('X-ray spectrum analyzer')
+        self.autosave = Autosave(os.path.join(get_data_location(), AUTOSAVE_FOLDER))
+        self.set_project(Project())
         self.show()
 
+        QTimer.singleShot(0, self.recover_autosave)
+
+    def paintEvent(self, event):
+        super(MainWindow, self).paintEvent(event)
+
+        # The plotting stack is loaded once the skeleton of the window has been painted.
+        if self.main_widget is None and not self._is_spectrum_widget_scheduled:
+            self._is_spectrum_widget_scheduled = True
+            QTimer.singleShot(0, self.create_spectrum_widget)
+
+    def create_spectrum_widget(self):
+        """
+        Import the plotting stack and create the central spectrum widget, if not already done.
+        """
+        if self.main_widget is not None:
+            return self.main_widget
+
+        self.logger.info("MainWindow.create_spectrum_widget")
+
+        from xrayspectrumanalyzergui.gui.spectrum_widget import SpectrumWidget
+
+        self.main_widget = SpectrumWidget()
+        self.main_widget.spectrum_canvas.files_dropped.connect(self.import_service.import_paths)
+        self.main_widget.spectrum_canvas.roi_changed.connect(self.roi_changed)
+        self.main_widget.spectrum_canvas.roi_drag_finished.connect(self.roi_drag_finished)
+        self.main_widget.spectrum_canvas.overlay.identify_callback = self.identify_lines
+        self.setCentralWidget(self.main_widget)
+        self._update_roi_spans()
+        self._update_line_markers()
+        self.main_widget.setFocus()
+
+        return self.main_widget
+
     def closeEvent(self, event):
         self.save_settings()
         super(MainWindow, self).closeEvent(event)
@@ -238,9 +496,516 @@ class MainWindow(QMainWindow):
         self.statusBar().showMessage("Import spectrum", 2000)
 
         path = os.path.dirname(__file__)
-        formats = ["*.msa", "*.txt"]
+        formats = ["*" + extension for extension in SPECTRUM_FILE_EXTENSIONS]
         file_filters = "Spectrum file ({:s})".format(" ".join(formats))
-        file_names = QFileDialog.getOpenFileName(self, "Import an x-ray spectrum", path, file_filters)
+        file_paths, _filter = QFileDialog.getOpenFileNames(self, "Import x-ray spectra", path, file_filters)
+        if file_paths:
+            self.import_service.import_files(file_paths)
+
+    def spectra_imported(self, spectra):
+        for file_path, spectrum in spectra:
+            self.project.add_spectrum(spectrum, os.path.basename(file_path))
+        self._update_window_title()
+
+        self.spectra_model.spectra_added()
+        self.update_roi_integrals()
+
+        _file_path, spectrum = spectra[-1]
+        self.show_spectrum(spectrum)
+
+    def spectra_analyzed(self, results):
+        symbols = [str(element["symbol"]) for _file_path, elements in results for element in elements]
+        self.add_identified_elements(symbols)
+
+    def open_spectrum_image(self):
+        formats = ["*" + extension for extension in SPECTRUM_IMAGE_EXTENSIONS]
+        file_filters = "Spectrum image ({:s})".format(" ".join(formats))
+        file_path, _filter = QFileDialog.getOpenFileName(self, "Open spectrum image", "", file_filters)
+        if file_path:
+            self.statusBar().showMessage("Open spectrum image {}".format(os.path.basename(file_path)))
+            self.spectrum_image_service.import_files([file_path])
+
+    def spectrum_image_loaded(self, spectrum_images):
+        """
+        Show the total-count image in the map view and the sum spectrum.
+        """
+        _file_path, spectrum_image = spectrum_images[-1]
+        self.set_spectrum_image(spectrum_image)
+
+    def spectrum_image_failed(self, file_path, message):
+        self.statusBar().showMessage("Cannot open spectrum image {}: {}".format(os.path.basename(file_path), message),
+                                     5000)
+
+    def set_spectrum_image(self, spectrum_image):
+        self.element_map_service.cancel()
+        if self.spectrum_image is not None:
+            self.spectrum_image.close()
+        self.spectrum_image = spectrum_image
+
+        if spectrum_image is None:
+            self._update_map_list()
+            self.map_view.clear()
+            self.map_dock.setVisible(False)
+            return
+
+        self._update_map_list()
+        self.map_dock.setVisible(True)
+        self.show_spectrum(spectrum_image.get_sum_spectrum())
+        number_rows, number_columns, number_channels = spectrum_image.shape
+        self.statusBar().showMessage("Spectrum image of {:d} x {:d} pixels and {:d} channels".format(
+            number_columns, number_rows, number_channels), 5000)
+
+    def show_map(self, index):
+        """
+        Show the total-count image, index 0, or the element map of a ROI in the map view.
+        """
+        if self.spectrum_image is None:
+            return
+
+        if index > 0 and self.element_maps is not None:
+            self.map_view.set_image(self.element_maps[index - 1])
+        else:
+            self.map_view.set_image(self.spectrum_image.get_total_image())
+
+    def _update_map_list(self):
+        """
+        List the total counts and the element maps of the ROIs cached in the project for the spectrum image, the map
+        shown is kept if it is still listed.
+        """
+        self.element_maps = None
+        if self.spectrum_image is not None:
+            self.element_maps = self.project.get_element_maps(get_source(self.spectrum_image), self.project.rois)
+
+        index = self.map_combo_box.currentIndex()
+        self.map_combo_box.blockSignals(True)
+        self.map_combo_box.clear()
+        self.map_combo_box.addItem("Total counts")
+        if self.element_maps is not None:
+            self.map_combo_box.addItems([roi[0] for roi in self.project.rois])
+        self.map_combo_box.setCurrentIndex(index if 0 <= index < self.map_combo_box.count() else 0)
+        self.map_combo_box.blockSignals(False)
+
+        self.show_map(self.map_combo_box.currentIndex())
+
+    def build_element_maps(self):
+        """
+        Show the element maps of the ROIs in the spectrum image, built with the element map service if not cached in the
+        project.
+        """
+        if self.spectrum_image is None:
+            self.statusBar().showMessage("No spectrum image to map", 2000)
+            return
+        if not self.project.rois:
+            self.statusBar().showMessage("No ROIs to map", 2000)
+            return
+
+        if self.project.get_element_maps(get_source(self.spectrum_image), self.project.rois) is not None:
+            self._update_map_list()
+            self.map_combo_box.setCurrentIndex(1)
+            self.statusBar().showMessage("Element maps cached in the project", 2000)
+            return
+
+        self.element_map_service.build_maps(self.spectrum_image, self.project.rois)
+
+    def element_maps_finished(self, rois, maps):
+        source = get_source(self.spectrum_image) if self.spectrum_image is not None else None
+        if source is None:
+            return
+
+        self.project.set_element_maps(source, rois, maps)
+        self._update_map_list()
+        if self.element_maps is not None:
+            self.map_combo_box.setCurrentIndex(1)
+        self._update_window_title()
+
+    def element_maps_failed(self, message):
+        self.statusBar().showMessage("Cannot build element maps: {}".format(message), 5000)
+
+    def element_map_progress(self, number_done, number_total):
+        if number_done < number_total:
+            self.import_progress_bar.setRange(0, number_total)
+            self.import_progress_bar.setValue(number_done)
+            self.import_progress_bar.setVisible(True)
+            self.statusBar().showMessage("Building element maps {:d}/{:d} rows".format(number_done, number_total))
+        else:
+            self.import_progress_bar.setVisible(False)
+            self.statusBar().showMessage("Built element maps of {:d} rows".format(number_total), 2000)
+
+    def map_pixel_selected(self, row, column):
+        if self.spectrum_image is not None:
+            self.show_spectrum(self.spectrum_image.get_spectrum(row, column))
+
+    def map_region_selected(self, row_start, row_end, column_start, column_end):
+        if self.spectrum_image is not None:
+            self.show_spectrum(self.spectrum_image.get_region_spectrum(row_start, row_end, column_start, column_end))
+
+    def select_event_list_window(self):
+        """
+        Show the spectrum of a time window of the event list of the current spectrum, with adjacent channels summed.
+
+        The event list is indexed once, the other windows are computed from the index.
+        """
+        spectrum = self.current_spectrum
+        file_path = spectrum.metadata.get("EVENTLIST") if spectrum is not None else None
+        if not file_path:
+            self.statusBar().showMessage("The spectrum is not from an event list", 2000)
+            return
+
+        if self.event_list is None or self.event_list.file_path != file_path:
+            try:
+                self.event_list = EventList(file_path)
+                self.event_list.build_index()
+            except (IOError, OSError, EventListFormatError) as message:
+                self.logger.error("Cannot read event list %s: %s", file_path, message)
+                self.statusBar().showMessage("Cannot read event list: {}".format(message), 5000)
+                self.event_list = None
+                return
+
+        duration_s = self.event_list.duration_s
+        label = "Start and end times (0 to {:.3f} s) and number of channels summed:".format(duration_s)
+        text, is_accepted = QInputDialog.getText(self, "Event-list time window", label,
+                                                 text="0 {:.3f} 1".format(duration_s))
+        if not is_accepted:
+            return
+
+        try:
+            start_s, end_s, rebin = text.replace(",", " ").split()
+            start_s, end_s, rebin = float(start_s), float(end_s), int(rebin)
+        except ValueError:
+            self.statusBar().showMessage("Invalid time window: {}".format(text), 5000)
+            return
+
+        self.show_spectrum(self.event_list.get_spectrum(start_s, end_s, rebin))
+
+    def start_live_acquisition(self):
+        text, is_accepted = QInputDialog.getText(self, "Live acquisition",
+                                                 "Event stream address (host:port or socket path):",
+                                                 text=LIVE_ACQUISITION_ADDRESS)
+        if not is_accepted:
+            return
+
+        try:
+            address = parse_address(text)
+        except ValueError as message:
+            self.statusBar().showMessage(str(message), 5000)
+            return
+
+        self.live_acquisition.start(address)
+        self.start_live_action.setEnabled(False)
+        self.stop_live_action.setEnabled(True)
+
+    def live_spectrum_updated(self, spectrum):
+        self.current_spectrum = spectrum
+        self.create_spectrum_widget().spectrum_canvas.update_live_figure(spectrum)
+
+        accumulator = self.live_acquisition.accumulator
+        self.statusBar().showMessage("Live: {:d} counts, {:.0f} counts/s".format(
+            accumulator.number_events, accumulator.get_count_rate()))
+
+    def live_acquisition_stopped(self, message):
+        """
+        Add the spectrum acquired to the project and show it as a static spectrum.
+        """
+        self.start_live_action.setEnabled(True)
+        self.stop_live_action.setEnabled(False)
+        if message:
+            self.statusBar().showMessage("Live acquisition stopped: {}".format(message), 5000)
+        else:
+            self.statusBar().clearMessage()
+
+        if self.main_widget is not None:
+            self.main_widget.spectrum_canvas.set_live(False)
+
+        spectrum = self.live_acquisition.spectrum
+        if spectrum is not None and spectrum.counts.any():
+            self.spectra_imported([("live_{:d}".format(self.project.number_spectra + 1), spectrum)])
+        else:
+            self.update_spectrum_display()
+
+    def spectrum_selected(self, current, _previous):
+        if current.isValid():
+            spectrum_index = self.spectra_model.get_spectrum_index(current.row())
+            self.show_spectrum(self.project.get_spectrum(spectrum_index))
+
+    def spectra_selection_changed(self, _selected, _deselected):
+        if self.overlay_spectra_action.isChecked():
+            self.update_spectrum_display()
+
+    def show_spectrum(self, spectrum):
+        self.current_spectrum = spectrum
+        self.update_spectrum_display()
+
+    def get_selected_spectrum_indexes(self):
+        """
+        Return the indexes in the project of the spectra selected in the list, in the order of the list.
+        """
+        rows = sorted(index.row() for index in self.spectra_list_view.selectionModel().selectedRows())
+        return [self.spectra_model.get_spectrum_index(row) for row in rows]
+
+    def set_normalisation(self, normalisation):
+        if normalisation == self.normalisation:
+            return
+
+        self.normalisation = normalisation
+        for normalisation_action in self.normalisation_action_group.actions():
+            normalisation_action.setChecked(normalisation_action.data() == normalisation)
+        self.update_spectrum_display()
+
+    def get_multi_spectrum(self, spectrum_indexes):
+        """
+        Return the overlay of spectra of the project, kept until the selection changes so a new normalisation does not
+        rebuild the pyramids.
+        """
+        if spectrum_indexes != self._multi_spectrum_indexes:
+            self._multi_spectrum = MultiSpectrum([self.project.get_spectrum(index) for index in spectrum_indexes],
+                                                 self.project.get_column("live_time_s")[spectrum_indexes],
+                                                 self.project.get_column("total_counts")[spectrum_indexes])
+            self._multi_spectrum_indexes = spectrum_indexes
+        return self._multi_spectrum
+
+    def update_spectrum_display(self):
+        """
+        Show the current spectrum with or without its background, the background is computed once per spectrum and
+        parameters, or the selected spectra together when they are overlaid.
+        """
+        if self.overlay_spectra_action.isChecked() and not self.live_acquisition.is_running():
+            spectrum_indexes = self.get_selected_spectrum_indexes()
+            if len(spectrum_indexes) > 1:
+                spectrum_widget = self.create_spectrum_widget()
+                spectrum_widget.update_multi_spectrum_figure(self.get_multi_spectrum(spectrum_indexes),
+                                                             self.normalisation)
+                return
+
+        spectrum = self.current_spectrum
+        if spectrum is None:
+            return
+
+        is_shown = self.show_background_action.isChecked()
+        is_subtracted = self.subtract_background_action.isChecked()
+        background = None
+        if is_shown or is_subtracted:
+            background = self.background_cache.get_background(spectrum, self.background_parameters)
+
+        spectrum_widget = self.create_spectrum_widget()
+        if is_subtracted:
+            net_counts = spectrum.counts.astype(np.float64) - background
+            spectrum_widget.update_figure(SpectrumData.from_energies(spectrum.energies_eV, net_counts,
+                                                                     spectrum.metadata))
+            spectrum_widget.spectrum_canvas.set_background(spectrum.energies_eV, None)
+        else:
+            spectrum_widget.update_figure(spectrum)
+            spectrum_widget.spectrum_canvas.set_background(spectrum.energies_eV, background if is_shown else None)
+
+    def edit_background_parameters(self):
+        parameters = self.background_parameters
+        method_labels = {METHOD_SNIP: "SNIP", METHOD_POLYNOMIAL: "Polynomial", METHOD_KRAMERS: "Kramers"}
+        labels = [method_labels[method] for method in METHODS]
+        label, is_accepted = QInputDialog.getItem(self, "Background", "Method:", labels,
+                                                  METHODS.index(parameters.method), False)
+        if not is_accepted:
+            return
+        method = METHODS[labels.index(label)]
+
+        width_eV = parameters.width_eV
+        order = parameters.order
+        if method == METHOD_SNIP:
+            width_eV, is_accepted = QInputDialog.getDouble(self, "Background", "Clipping window width (eV):",
+                                                           width_eV, 10.0, 10000.0, 1)
+        else:
+            order, is_accepted = QInputDialog.getInt(self, "Background", "Polynomial order:", order, 0, 10)
+        if not is_accepted:
+            return
+
+        self.set_background_parameters(BackgroundParameters(method, width_eV, parameters.use_lls,
+                                                            parameters.smoothing_eV, order,
+                                                            parameters.beam_energy_eV))
+
+    def set_background_parameters(self, parameters):
+        if parameters == self.background_parameters:
+            return
+
+        self.background_parameters = parameters
+        self.update_spectrum_display()
+
+    def add_roi(self):
+        axes = self.create_spectrum_widget().spectrum_canvas.axes
+        energy_min_eV, energy_max_eV = axes.get_xlim()
+        width_eV = ROI_WIDTH_FRACTION * (energy_max_eV - energy_min_eV)
+        centre_eV = 0.5 * (energy_min_eV + energy_max_eV)
+
+        rois = list(self.project.rois)
+        rois.append(("ROI {:d}".format(len(rois) + 1), centre_eV - 0.5 * width_eV, centre_eV + 0.5 * width_eV,
+                     0.5 * width_eV))
+        self.set_rois(rois)
+
+    def clear_rois(self):
+        self.set_rois([])
+
+    def set_rois(self, rois):
+        self.project.set_rois(rois)
+        self.roi_model.refresh()
+        self._update_roi_spans()
+        self.update_roi_integrals()
+        self._update_map_list()
+        self._update_window_title()
+
+    def roi_changed(self, index, energy_min_eV, energy_max_eV):
+        """
+        Update the integrals in all the spectra of the ROI being dragged in the canvas, only its column is changed and
+        the project is only changed when the drag is finished.
+        """
+        rois = self._get_dragged_rois(index, energy_min_eV, energy_max_eV)
+        integrals = self.roi_integrator.integrate(self.project, rois[index:index + 1])
+        self.spectra_model.set_roi_integral(index, integrals.net[:, 0])
+
+    def roi_drag_finished(self, index, energy_min_eV, energy_max_eV):
+        """
+        Store the ROI dragged in the canvas in the project, its integrals are already updated by :py:meth:`roi_changed`.
+        """
+        rois = self._get_dragged_rois(index, energy_min_eV, energy_max_eV)
+        if rois == self.project.rois:
+            return
+
+        self.project.set_rois(rois)
+        self.roi_model.refresh()
+        self._update_map_list()
+        self._update_window_title()
+
+    def _get_dragged_rois(self, index, energy_min_eV, energy_max_eV):
+        rois = list(self.project.rois)
+        name, _energy_min_eV, _energy_max_eV, background_width_eV = rois[index]
+        rois[index] = create_roi((name, energy_min_eV, energy_max_eV, background_width_eV))
+        return rois
+
+    def update_roi_integrals(self):
+        rois = self.project.rois
+        if rois:
+            integrals = self.roi_integrator.integrate(self.project)
+            self.spectra_model.set_roi_integrals([roi[0] for roi in rois], integrals.net)
+        else:
+            self.spectra_model.set_roi_integrals([], None)
+
+    def _update_roi_spans(self):
+        if self.main_widget is None:
+            return
+
+        overlay = self.main_widget.spectrum_canvas.overlay
+        overlay.clear_rois()
+        for _name, energy_min_eV, energy_max_eV, background_width_eV in self.project.rois:
+            overlay.add_roi(energy_min_eV, energy_max_eV, background_width_eV)
+
+    def identify_lines(self, energy_eV):
+        lines = get_database().identify(energy_eV, LINE_IDENTIFICATION_TOLERANCE_eV)
+        return ", ".join(format_line(line) for line in lines)
+
+    def add_elements(self):
+        text, is_accepted = QInputDialog.getText(self, "Add elements", "Element symbols (e.g. Fe Cr Ni):")
+        if not is_accepted:
+            return
+
+        database = get_database()
+        elements = list(self.project.elements)
+        for symbol in text.replace(",", " ").split():
+            try:
+                symbol = database.get_symbol(symbol)
+            except ValueError as message:
+                self.statusBar().showMessage(str(message), 5000)
+                continue
+            if symbol not in elements:
+                elements.append(symbol)
+
+        self.set_elements(elements)
+
+    def clear_elements(self):
+        self.set_elements([])
+
+    def identify_elements(self):
+        if self.current_spectrum is None:
+            self.statusBar().showMessage("No spectrum to identify", 2000)
+            return
+
+        elements = identify_spectrum(self.current_spectrum)
+        symbols = [str(element["symbol"]) for element in elements]
+        self.statusBar().showMessage("Identified elements: {}".format(" ".join(symbols) or "none"), 5000)
+        self.add_identified_elements(symbols)
+
+    def set_identify_on_import(self, is_enabled):
+        self.import_service.analyzer = identify_spectrum if is_enabled else None
+
+    def add_identified_elements(self, symbols):
+        elements = list(self.project.elements)
+        for symbol in symbols:
+            if symbol not in elements:
+                elements.append(symbol)
+        self.set_elements(elements)
+
+    def set_elements(self, elements):
+        if list(elements) == list(self.project.elements):
+            return
+
+        self.project.set_elements(elements)
+        self.element_model.refresh()
+        self._update_line_markers()
+        self._update_window_title()
+
+    def fit_peaks(self):
+        if not self.project.elements:
+            self.statusBar().showMessage("No elements to fit", 2000)
+            return
+        if self.project.number_spectra == 0:
+            self.statusBar().showMessage("No spectra to fit", 2000)
+            return
+
+        fitter = PeakFitter(self.project.elements, background_parameters=self.background_parameters)
+        self.fit_service.fit_project(self.project, fitter)
+
+    def fit_finished(self, fit_results):
+        self.project.set_fit_results(fit_results)
+        self._update_window_title()
+
+    def fit_failed(self, message):
+        self.statusBar().showMessage("Cannot fit spectra: {}".format(message), 5000)
+
+    def fit_progress(self, number_done, number_total):
+        if number_done < number_total:
+            self.import_progress_bar.setRange(0, number_total)
+            self.import_progress_bar.setValue(number_done)
+            self.import_progress_bar.setVisible(True)
+            self.statusBar().showMessage("Fitting spectra {:d}/{:d}".format(number_done, number_total))
+        else:
+            self.import_progress_bar.setVisible(False)
+            self.statusBar().showMessage("Fitted {:d} spectra".format(number_total), 2000)
+
+    def _update_line_markers(self):
+        if self.main_widget is None:
+            return
+
+        database = get_database()
+        markers = []
+        for element in self.project.elements:
+            for line in database.get_lines(element):
+                if line["weight"] >= 0.5:
+                    markers.append((line["energy_eV"], format_line(line)))
+        self.main_widget.spectrum_canvas.overlay.set_line_markers(markers)
+
+    def import_failed(self, file_path, message):
+        self.statusBar().showMessage("Cannot import spectrum {}: {}".format(os.path.basename(file_path), message),
+                                     5000)
+
+    def import_progress(self, number_done, number_total):
+        if number_total == 0 and self.import_service.is_running():
+            # Busy indicator while the dropped directories are walked.
+            self.import_progress_bar.setRange(0, 0)
+            self.import_progress_bar.setVisible(True)
+            self.statusBar().showMessage("Collecting spectrum files")
+        elif number_done < number_total:
+            self.import_progress_bar.setRange(0, number_total)
+            self.import_progress_bar.setValue(number_done)
+            self.import_progress_bar.setVisible(True)
+            self.statusBar().showMessage("Importing spectra {:d}/{:d}".format(number_done, number_total))
+        else:
+            self.import_progress_bar.setVisible(False)
+            self.statusBar().showMessage("Imported {:d} spectra".format(number_total), 2000)
 
     def export_spectrum(self):
         self.statusBar().showMessage("Export spectrum", 2000)
@@ -248,18 +1013,124 @@ class MainWindow(QMainWindow):
     def new_project(self):
         self.statusBar().showMessage("New project", 2000)
 
+        if not self.maybeSave():
+            return
+
+        self.import_service.cancel()
+        self.set_project(Project())
+
     def open_project(self):
         self.statusBar().showMessage("Open project", 2000)
 
+        if not self.maybeSave():
+            return
+
+        path = QFileDialog.getExistingDirectory(self, "Open project")
+        if not path:
+            return
+
+        try:
+            project = Project.open(path)
+        except (IOError, OSError, ProjectFormatError) as message:
+            self.logger.error("Cannot open project %s: %s", path, message)
+            QMessageBox.warning(self, "Open project", "Cannot open project {}:\n{}".format(path, message))
+            return
+
+        self.import_service.cancel()
+        self.set_project(project)
+        if project.number_spectra > 0:
+            self.show_spectrum(project.get_spectrum(0))
+
     def close_project(self):
         self.statusBar().showMessage("Close project", 2000)
 
+        if not self.maybeSave():
+            return
+
+        self.import_service.cancel()
+        self.set_project(Project())
+
     def save_project(self):
+        if self.project.path is None:
+            return self.saveas_project()
+
         self.statusBar().showMessage("Save project", 2000)
+        return self._save_project(self.project.path)
 
     def saveas_project(self):
         self.statusBar().showMessage("Save project as ...", 2000)
 
+        path, _filter = QFileDialog.getSaveFileName(self, "Save project as", "",
+                                                    "Project (*{})".format(PROJECT_EXTENSION))
+        if not path:
+            return False
+
+        if not path.endswith(PROJECT_EXTENSION):
+            path += PROJECT_EXTENSION
+        return self._save_project(path)
+
+    def _save_project(self, path):
+        try:
+            self.project.save(path)
+        except (IOError, OSError) as message:
+            self.logger.error("Cannot save project %s: %s", path, message)
+            QMessageBox.warning(self, "Save project", "Cannot save project {}:\n{}".format(path, message))
+            return False
+
+        self.autosave.saved(self.project)
+        self._update_window_title()
+        return True
+
+    def set_project(self, project):
+        self.fit_service.cancel()
+        self.element_map_service.cancel()
+        self.live_acquisition.stop()
+        self.event_list = None
+        self.project = project
+        self.current_spectrum = None
+        self._multi_spectrum = None
+        self._multi_spectrum_indexes = None
+        self.autosave.watch(project)
+        self.spectra_model.set_project(project)
+        self.roi_model.set_project(project)
+        self.element_model.set_project(project)
+        self._update_roi_spans()
+        self.update_roi_integrals()
+        self._update_map_list()
+        self._update_line_markers()
+        self._update_window_title()
+
+    def recover_autosave(self):
+        """
+        Offer to recover the unsaved changes of the sessions that did not close normally.
+        """
+        for session_path in find_crashed_sessions(self.autosave.location):
+            try:
+                project = recover_session(session_path)
+            except (IOError, OSError, ValueError) as message:
+                self.logger.error("Cannot recover autosave %s: %s", session_path, message)
+                project = None
+
+            if project is not None:
+                answer = QMessageBox.question(self, "Recover project",
+                                              "The application did not close normally.\nDo you want to recover the "
+                                              "unsaved project with {:d} spectra?".format(project.number_spectra),
+                                              QMessageBox.Yes | QMessageBox.No)
+                if answer == QMessageBox.Yes and self.maybeSave():
+                    self.import_service.cancel()
+                    self.set_project(project)
+                    if project.number_spectra > 0:
+                        self.show_spectrum(project.get_spectrum(0))
+
+            remove_session(session_path)
+
+    def _update_window_title(self):
+        title = 'X-ray spectrum analyzer'
+        if self.project.path is not None:
+            title += " - " + os.path.basename(self.project.path)
+        self.setWindowTitle(title + "[*]")
+        self.setWindowModified(self.project.is_modified())
+
     def create_gui(self):
         self.logger.info("MainWindow.create_gui")
 
@@ -321,6 +1192,9 @@ class MainWindow(QMainWindow):
         self.setCentralWidget(self.mainGroupBox)
 
     def _create_spectra_display(self):
+        from matplotlib.figure import Figure
+        from xrayspectrumanalyzergui.gui.spectrum_widget import FigureCanvas, NavigationToolbar
+
         self.plotGroupBox = QGroupBox("Plot layout")
 
         self.figure1 = Figure(facecolor=(1, 1, 1), edgecolor=(0, 0, 0))
@@ -351,8 +1225,24 @@ class MainWindow(QMainWindow):
         data_layout = QVBoxLayout()
 
         group_box = QGroupBox("Spectra")
-        self.spectra_list_view = QListWidget(self)
+        self.thumbnail_service = ThumbnailService(self)
+        self.spectra_model = SpectraTableModel(parent=self, thumbnail_service=self.thumbnail_service)
+        self.spectra_list_view = QTableView(self)
+        self.spectra_list_view.setModel(self.spectra_model)
+        self.spectra_list_view.setIconSize(THUMBNAIL_SIZE)
         self.spectra_list_view.setMinimumWidth(200)
+        self.spectra_list_view.setSortingEnabled(True)
+        self.spectra_list_view.sortByColumn(-1, Qt.AscendingOrder)
+        self.spectra_list_view.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.spectra_list_view.setSelectionMode(QAbstractItemView.ExtendedSelection)
+        self.spectra_list_view.setWordWrap(False)
+        # Fixed row heights, the view does not measure the rows.
+        self.spectra_list_view.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
+        self.spectra_list_view.verticalHeader().setDefaultSectionSize(THUMBNAIL_SIZE.height() + 4)
+        self.spectra_list_view.verticalHeader().setVisible(False)
+        self.spectra_list_view.horizontalHeader().setStretchLastSection(True)
+        self.spectra_list_view.selectionModel().currentRowChanged.connect(self.spectrum_selected)
+        self.spectra_list_view.selectionModel().selectionChanged.connect(self.spectra_selection_changed)
 
         layout = QVBoxLayout()
         layout.addWidget(self.spectra_list_view)
@@ -360,16 +1250,22 @@ class MainWindow(QMainWindow):
         data_layout.addWidget(group_box)
 
         group_box = QGroupBox("ROI")
-        roi_list_view = QListWidget(self)
+        self.roi_model = RoiListModel(parent=self)
+        self.roi_list_view = QListView(self)
+        self.roi_list_view.setModel(self.roi_model)
+        self.roi_list_view.setUniformItemSizes(True)
         layout = QVBoxLayout()
-        layout.addWidget(roi_list_view)
+        layout.addWidget(self.roi_list_view)
         group_box.setLayout(layout)
         data_layout.addWidget(group_box)
 
         group_box = QGroupBox("Elements")
-        element_list_view = QListWidget(self)
+        self.element_model = ElementListModel(parent=self)
+        self.element_list_view = QListView(self)
+        self.element_list_view.setModel(self.element_model)
+        self.element_list_view.setUniformItemSizes(True)
         layout = QVBoxLayout()
-        layout.addWidget(element_list_view)
+        layout.addWidget(self.element_list_view)
         group_box.setLayout(layout)
         data_layout.addWidget(group_box)
 
@@ -456,14 +1352,16 @@ class MainWindow(QMainWindow):
     def maybeSave(self):
         self.logger.info("MainWindow.maybeSave")
 
-        if self.textEdit.document().isModified():
+        # The spectrum of a live acquisition is added to the project before it is saved or discarded.
+        self.live_acquisition.stop()
+        if self.project.is_modified():
             ret = QMessageBox.warning(self, "Application",
-                    "The document has been modified.\nDo you want to save "
+                    "The project has been modified.\nDo you want to save "
                     "your changes?",
                     QMessageBox.Save | QMessageBox.Discard |
                     QMessageBox.Cancel)
             if ret == QMessageBox.Save:
-                return self.save()
+                return self.save_project()
             elif ret == QMessageBox.Cancel:
                 return False
         return True
@@ -473,6 +1371,13 @@ class MainWindow(QMainWindow):
 
         if self.maybeSave():
             self._write_settings()
+            self.import_service.shutdown()
+            self.fit_service.shutdown()
+            self.element_map_service.shutdown()
+            self.spectrum_image_service.shutdown()
+            self.set_spectrum_image(None)
+            self.thumbnail_service.shutdown()
+            self.autosave.close()
             event.accept()
         else:
             event.ignore()
@@ -490,11 +1395,7 @@ class MainWindow(QMainWindow):
         if self.maybeSave():
             filepath, _filtr = QFileDialog.getOpenFileName(self)
             if filepath:
-                self.spectrumAnalyzer.readSpectrum(filepath)
-                filename = os.path.basename(filepath)
-                self.spectra_list_view.addItem(filename)
-                self.spectrumAnalyzer.plotSpectrum(self.figure1)
-                self.canvas1.draw()
+                self.import_service.import_files([filepath])
 
     def save(self):
         self.logger.info("MainWindow.save")
@@ -528,11 +1429,11 @@ class MainWindow(QMainWindow):
         print('you pressed', event.key)
         # implement the default mpl key press events described at
         # http://matplotlib.org/users/navigation_toolbar.html#navigation-keyboard-shortcuts
+        from matplotlib.backend_bases import key_press_handler
         key_press_handler(event, self.canvas1, self.mpl_toolbar1)
 
 # TODO: Add Menubar
 # TODO: Add statusbar
-# TODO: Save project (autosave)
 # TODO: Add toolbars
 # TODO: Add spectrum list
 # TODO: Add spectrum display
@@ -544,7 +1445,6 @@ class MainWindow(QMainWindow):
 # TODO: Add layout management
 # TODO: Add log file
 # TODO: Fit dialog recipe
-# TODO: Add drag and drop
 
 
 def create_application():
@@ -555,12 +1455,18 @@ def create_application():
     return application
 
 
-def start_logging():
+def get_data_location():
     data_location = QStandardPaths.writableLocation(QStandardPaths.GenericDataLocation) + \
                     "/data/{}/{}".format(ORGANIZATION_NAME, APPLICATION_NAME)
     if not os.path.isdir(data_location):
         os.makedirs(data_location)
 
+    return data_location
+
+
+def start_logging():
+    data_location = get_data_location()
+
     log_filepath = os.path.join(data_location, LOG_FILENAME)
     fh = RotatingFileHandler(log_filepath, maxBytes=1024*30, backupCount=10)
     MODULE_LOGGER.setLevel(logging.DEBUG)
@@ -0,0 +1,192 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+.. py:currentmodule:: xrayspectrumanalyzergui.gui.map_view
+   :synopsis: View of the total-count image of a spectrum image.
+
+.. moduleauthor:: Hendrix Demers <hendrix.demers@mail.mcgill.ca>
+
+View of the total-count image of a spectrum image.
+
+The image is converted once to an 8-bit grayscale :py:class:`QImage` and scaled when painted, the pixels are not
+interpolated. A click selects a pixel and a drag selects a rectangular region, in the pixel coordinates of the map.
+"""
+
+###############################################################################
+# GUI for the x-ray spectrum analyzer project
+# Copyright (C) 2017  Hendrix Demers
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+###############################################################################
+
+# Standard library modules.
+
+# Third party modules.
+import numpy as np
+from qtpy.QtWidgets import QWidget, QSizePolicy
+from qtpy.QtCore import Qt, Signal, QRectF, QSize
+from qtpy.QtGui import QImage, QPainter, QPen, QColor
+
+# Local modules.
+
+# Project modules.
+
+# Globals and constants variables.
+SATURATION_PERCENTILE = 99.5
+SELECTION_COLOR = QColor(255, 64, 64)
+
+
+def create_grayscale(image):
+    """
+    Return the image scaled to uint8, the values above the :py:data:`SATURATION_PERCENTILE` percentile are white.
+    """
+    image = np.asarray(image, dtype=np.float64)
+    if image.size == 0:
+        return np.zeros(image.shape, dtype=np.uint8)
+
+    minimum = float(image.min())
+    maximum = float(np.percentile(image, SATURATION_PERCENTILE))
+    if maximum <= minimum:
+        maximum = float(image.max())
+    if maximum <= minimum:
+        return np.zeros(image.shape, dtype=np.uint8)
+
+    scaled = (image - minimum) * (255.0 / (maximum - minimum))
+    return np.clip(scaled, 0.0, 255.0).astype(np.uint8)
+
+
+class MapView(QWidget):
+    """
+    Map of a spectrum image.
+
+    Signals:
+
+    * ``pixel_selected(int, int)``: row and column of the pixel clicked.
+    * ``region_selected(int, int, int, int)``: first row, end row, first column and end column of the region dragged,
+      the ends are excluded.
+    """
+
+    pixel_selected = Signal(int, int)
+    region_selected = Signal(int, int, int, int)
+
+    def __init__(self, parent=None):
+        super(MapView, self).__init__(parent)
+
+        self.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
+
+        self._pixels = None
+        self._image = None
+        self._drag_start = None
+        self.selection = None
+
+    def sizeHint(self):
+        return QSize(256, 256)
+
+    def set_image(self, image):
+        """
+        Show an image of shape (rows, columns), the selection is cleared.
+        """
+        # The QImage uses the buffer of the array, which is kept with the image.
+        self._pixels = np.ascontiguousarray(create_grayscale(image))
+        number_rows, number_columns = self._pixels.shape
+        self._image = QImage(self._pixels.data, number_columns, number_rows, number_columns,
+                             QImage.Format_Grayscale8)
+        self.selection = None
+        self.update()
+
+    def clear(self):
+        self._pixels = None
+        self._image = None
+        self.selection = None
+        self.update()
+
+    def get_image_rect(self):
+        """
+        Return the rectangle of the widget where the image is painted, centered with the aspect ratio of the map.
+        """
+        if self._image is None:
+            return QRectF()
+
+        number_rows, number_columns = self._pixels.shape
+        scale = min(self.width() / float(number_columns), self.height() / float(number_rows))
+        width = number_columns * scale
+        height = number_rows * scale
+        return QRectF((self.width() - width) / 2.0, (self.height() - height) / 2.0, width, height)
+
+    def map_to_pixel(self, position, clip=False):
+        """
+        Return the row and column of the pixel at a position of the widget, None outside the image unless `clip`.
+        """
+        if self._image is None:
+            return None
+
+        rectangle = self.get_image_rect()
+        number_rows, number_columns = self._pixels.shape
+        row = int(np.floor((position.y() - rectangle.top()) * number_rows / rectangle.height()))
+        column = int(np.floor((position.x() - rectangle.left()) * number_columns / rectangle.width()))
+        if clip:
+            return min(max(row, 0), number_rows - 1), min(max(column, 0), number_columns - 1)
+        if 0 <= row < number_rows and 0 <= column < number_columns:
+            return row, column
+        return None
+
+    def mousePressEvent(self, event):
+        if event.button() != Qt.LeftButton:
+            return
+
+        self._drag_start = self.map_to_pixel(event.pos())
+        if self._drag_start is not None:
+            self._set_selection(self._drag_start, self._drag_start)
+
+    def mouseMoveEvent(self, event):
+        if self._drag_start is not None:
+            self._set_selection(self._drag_start, self.map_to_pixel(event.pos(), clip=True))
+
+    def mouseReleaseEvent(self, event):
+        if event.button() != Qt.LeftButton or self._drag_start is None:
+            return
+
+        self._set_selection(self._drag_start, self.map_to_pixel(event.pos(), clip=True))
+        self._drag_start = None
+
+        row_start, row_end, column_start, column_end = self.selection
+        if row_end - row_start == 1 and column_end - column_start == 1:
+            self.pixel_selected.emit(row_start, column_start)
+        else:
+            self.region_selected.emit(row_start, row_end, column_start, column_end)
+
+    def _set_selection(self, first_pixel, second_pixel):
+        rows = sorted((first_pixel[0], second_pixel[0]))
+        columns = sorted((first_pixel[1], second_pixel[1]))
+        self.selection = (rows[0], rows[1] + 1, columns[0], columns[1] + 1)
+        self.update()
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        painter.fillRect(self.rect(), Qt.black)
+        if self._image is not None:
+            rectangle = self.get_image_rect()
+            painter.drawImage(rectangle, self._image)
+
+            if self.selection is not None:
+                row_start, row_end, column_start, column_end = self.selection
+                number_rows, number_columns = self._pixels.shape
+                scale_x = rectangle.width() / number_columns
+                scale_y = rectangle.height() / number_rows
+                painter.setPen(QPen(SELECTION_COLOR, 1.0))
+                painter.drawRect(QRectF(rectangle.left() + column_start * scale_x,
+                                        rectangle.top() + row_start * scale_y,
+                                        (column_end - column_start) * scale_x, (row_end - row_start) * scale_y))
+        painter.end()
@@ -0,0 +1,146 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+.. py:currentmodule:: xrayspectrumanalyzergui.gui.multi_spectrum
+   :synopsis: Several spectra shown together, with their normalisation.
+
+.. moduleauthor:: Hendrix Demers <hendrix.demers@mail.mcgill.ca>
+
+Several spectra shown together, with their normalisation.
+
+The spectra are decimated for the display by their min/max pyramids, see
+:py:mod:`xrayspectrumanalyzergui.gui.level_of_detail`. The normalisation factors of all the spectra are computed
+together from their live times, total counts or highest channels; a factor is positive, so it scales the envelope of
+its spectrum and the pyramids are built once whatever the normalisation.
+"""
+
+###############################################################################
+# GUI for the x-ray spectrum analyzer project
+# Copyright (C) 2017  Hendrix Demers
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+###############################################################################
+
+# Standard library modules.
+
+# Third party modules.
+import numpy as np
+
+# Local modules.
+
+# Project modules.
+from xrayspectrumanalyzergui.gui.level_of_detail import MinMaxPyramid
+from xrayspectrumanalyzergui.model.project import get_live_time_s
+
+# Globals and constants variables.
+NORMALISATION_NONE = "none"
+NORMALISATION_LIVE_TIME = "live_time"
+NORMALISATION_TOTAL_COUNTS = "total_counts"
+NORMALISATION_PEAK = "peak"
+NORMALISATIONS = (NORMALISATION_NONE, NORMALISATION_LIVE_TIME, NORMALISATION_TOTAL_COUNTS, NORMALISATION_PEAK)
+
+NORMALISATION_LABELS = {NORMALISATION_NONE: "Intensity",
+                        NORMALISATION_LIVE_TIME: "Intensity (counts/s)",
+                        NORMALISATION_TOTAL_COUNTS: "Fraction of the total counts",
+                        NORMALISATION_PEAK: "Fraction of the highest channel"}
+
+
+def get_normalisation_factors(normalisation, live_times_s, total_counts, peaks):
+    """
+    Return the factors scaling the counts of spectra, a spectrum without live time, counts or peak is not scaled.
+
+    :param normalisation: one of :py:data:`NORMALISATIONS`.
+    :param live_times_s: live time of each spectrum.
+    :param total_counts: total number of counts of each spectrum.
+    :param peaks: counts in the highest channel of each spectrum.
+    """
+    values = {NORMALISATION_NONE: None,
+              NORMALISATION_LIVE_TIME: live_times_s,
+              NORMALISATION_TOTAL_COUNTS: total_counts,
+              NORMALISATION_PEAK: peaks}
+    if normalisation not in values:
+        raise ValueError("Unknown normalisation: {}".format(normalisation))
+
+    factors = np.ones(len(peaks))
+    if values[normalisation] is not None:
+        values = np.asarray(values[normalisation], dtype=np.float64)
+        np.divide(1.0, values, out=factors, where=values > 0.0)
+    return factors
+
+
+class MultiSpectrum(object):
+    """
+    Spectra shown together, with the min/max pyramid of each spectrum.
+
+    :param spectra: list of :py:class:`SpectrumData`.
+    :param live_times_s: live time of each spectrum, read from the metadata if None.
+    :param total_counts: total number of counts of each spectrum, computed if None.
+    """
+
+    def __init__(self, spectra, live_times_s=None, total_counts=None):
+        self.pyramids = [MinMaxPyramid(spectrum.energies_eV, spectrum.counts) for spectrum in spectra]
+
+        if live_times_s is None:
+            live_times_s = [get_live_time_s(spectrum.metadata) for spectrum in spectra]
+        if total_counts is None:
+            total_counts = [np.sum(spectrum.counts, dtype=np.float64) for spectrum in spectra]
+        self.live_times_s = np.asarray(live_times_s, dtype=np.float64)
+        self.total_counts = np.asarray(total_counts, dtype=np.float64)
+
+        y_limits = np.zeros((len(self.pyramids), 2))
+        for index, pyramid in enumerate(self.pyramids):
+            limits = pyramid.get_y_limits()
+            if limits is not None:
+                y_limits[index] = limits
+        self.minimums = y_limits[:, 0]
+        self.peaks = y_limits[:, 1]
+
+    @property
+    def number_spectra(self):
+        return len(self.pyramids)
+
+    def get_factors(self, normalisation):
+        return get_normalisation_factors(normalisation, self.live_times_s, self.total_counts, self.peaks)
+
+    def get_x_limits(self):
+        """
+        Return the lowest and highest energies of the spectra, None without channels.
+        """
+        energies_eV = [(pyramid.x[0], pyramid.x[-1]) for pyramid in self.pyramids if pyramid.x.size > 0]
+        if not energies_eV:
+            return None
+        energies_eV = np.array(energies_eV, dtype=np.float64)
+        return float(energies_eV[:, 0].min()), float(energies_eV[:, 1].max())
+
+    def get_y_limits(self, factors):
+        """
+        Return the lowest and highest scaled counts of the spectra.
+        """
+        if not self.pyramids:
+            return 0.0, 0.0
+        return float((self.minimums * factors).min()), float((self.peaks * factors).max())
+
+    def get_segments(self, x_min, x_max, number_pixels, factors):
+        """
+        Return the scaled envelope of each spectrum for the visible range, arrays of shape ``(number_points, 2)``.
+        """
+        segments = []
+        for pyramid, factor in zip(self.pyramids, factors):
+            x, y = pyramid.get_envelope(x_min, x_max, number_pixels)
+            segment = np.empty((x.size, 2))
+            segment[:, 0] = x
+            np.multiply(y, factor, out=segment[:, 1])
+            segments.append(segment)
+        return segments
@@ -0,0 +1,338 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+.. py:currentmodule:: xrayspectrumanalyzergui.gui.project_models
+   :synopsis: Qt item models of the project.
+
+.. moduleauthor:: Hendrix Demers <hendrix.demers@mail.mcgill.ca>
+
+Qt item models of the project.
+
+The spectra model reads the columns of the project on demand, no item is created per spectrum. Rows are fetched by
+batches as the view scrolls and sorting only permutes an array of spectrum indexes.
+"""
+
+###############################################################################
+# GUI for the x-ray spectrum analyzer project
+# Copyright (C) 2017  Hendrix Demers
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+###############################################################################
+
+# Standard library modules.
+
+# Third party modules.
+import numpy as np
+from qtpy.QtCore import Qt, QAbstractTableModel, QAbstractListModel, QModelIndex
+
+# Local modules.
+
+# Project modules.
+
+# Globals and constants variables.
+FETCH_SIZE = 1000
+
+SPECTRA_MODEL_COLUMNS = [("name", "Name"), ("live_time_s", "Live time (s)"), ("total_counts", "Total counts")]
+
+
+class SpectraTableModel(QAbstractTableModel):
+    """
+    Table of the spectra of a project, sortable by name, live time and total counts.
+
+    The net counts of the ROIs, set with :py:meth:`set_roi_integrals`, are shown in one column per ROI after the
+    columns of the project.
+    """
+
+    def __init__(self, project=None, parent=None, fetch_size=FETCH_SIZE, thumbnail_service=None):
+        super(SpectraTableModel, self).__init__(parent)
+
+        self.fetch_size = fetch_size
+
+        self.thumbnail_service = thumbnail_service
+        if thumbnail_service is not None:
+            thumbnail_service.thumbnail_ready.connect(self._thumbnail_ready)
+
+        self._project = None
+        self._number_spectra = 0
+        self._number_rows = 0
+        self._order = None
+        self._rows = None
+        self._sort_column = -1
+        self._sort_order = Qt.AscendingOrder
+        self._roi_names = []
+        self._roi_values = None
+
+        self.set_project(project)
+
+    def set_project(self, project):
+        self.beginResetModel()
+        self._project = project
+        self._number_spectra = 0 if project is None else project.number_spectra
+        self._number_rows = 0
+        self._order = None
+        self._rows = None
+        self._sort_column = -1
+        self._roi_names = []
+        self._roi_values = None
+        if self.thumbnail_service is not None:
+            self.thumbnail_service.clear()
+        self.endResetModel()
+
+    def set_roi_integrals(self, names, values):
+        """
+        Show the integrals of the ROIs, the ROI columns are updated in place when their number does not change.
+
+        :param names: names of the ROIs.
+        :param values: array of shape ``(number_spectra, number_rois)``.
+        """
+        number_columns = len(SPECTRA_MODEL_COLUMNS)
+        number_rois = len(self._roi_names)
+        if len(names) > number_rois:
+            self.beginInsertColumns(QModelIndex(), number_columns + number_rois, number_columns + len(names) - 1)
+            self._roi_names, self._roi_values = list(names), values
+            self.endInsertColumns()
+        elif len(names) < number_rois:
+            self.beginRemoveColumns(QModelIndex(), number_columns + len(names), number_columns + number_rois - 1)
+            self._roi_names, self._roi_values = list(names), values
+            self.endRemoveColumns()
+        else:
+            self._roi_names, self._roi_values = list(names), values
+
+        if names:
+            self.headerDataChanged.emit(Qt.Horizontal, number_columns, number_columns + len(names) - 1)
+            if self._number_rows > 0:
+                self.dataChanged.emit(self.index(0, number_columns),
+                                      self.index(self._number_rows - 1, number_columns + len(names) - 1),
+                                      [Qt.DisplayRole])
+
+    def set_roi_integral(self, roi_index, values):
+        """
+        Update in place the integrals of one ROI, the other ROI columns are not changed.
+
+        :param roi_index: index of the ROI.
+        :param values: array of shape ``(number_spectra,)``, the spectra without integrals yet are skipped.
+        """
+        if self._roi_values is None:
+            return
+
+        number_values = min(self._roi_values.shape[0], len(values))
+        self._roi_values[:number_values, roi_index] = values[:number_values]
+
+        column = len(SPECTRA_MODEL_COLUMNS) + roi_index
+        if self._number_rows > 0:
+            self.dataChanged.emit(self.index(0, column), self.index(self._number_rows - 1, column), [Qt.DisplayRole])
+
+    def get_spectrum_index(self, row):
+        if self._order is None:
+            return row
+        return int(self._order[row])
+
+    def spectra_added(self):
+        """
+        Update the model after spectra were added to the project, the new rows are inserted in one batch.
+        """
+        number_spectra = self._project.number_spectra
+        if number_spectra == self._number_spectra:
+            return
+
+        first_index = self._number_spectra
+        self._number_spectra = number_spectra
+        if self._order is not None:
+            self._order = np.append(self._order, np.arange(first_index, number_spectra))
+
+        # The new rows are inserted only if all rows were fetched, otherwise they are fetched with the others.
+        if self._number_rows == first_index:
+            number_rows = min(number_spectra - first_index, self.fetch_size)
+            self.beginInsertRows(QModelIndex(), first_index, first_index + number_rows - 1)
+            self._number_rows += number_rows
+            self.endInsertRows()
+
+        if self._sort_column >= 0:
+            self.sort(self._sort_column, self._sort_order)
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return self._number_rows
+
+    def columnCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(SPECTRA_MODEL_COLUMNS) + len(self._roi_names)
+
+    def canFetchMore(self, parent=QModelIndex()):
+        if parent.isValid():
+            return False
+        return self._number_rows < self._number_spectra
+
+    def fetchMore(self, parent=QModelIndex()):
+        if parent.isValid():
+            return
+
+        number_rows = min(self.fetch_size, self._number_spectra - self._number_rows)
+        if number_rows <= 0:
+            return
+
+        self.beginInsertRows(QModelIndex(), self._number_rows, self._number_rows + number_rows - 1)
+        self._number_rows += number_rows
+        self.endInsertRows()
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+
+        if index.column() >= len(SPECTRA_MODEL_COLUMNS):
+            return self._roi_data(index, role)
+
+        name = SPECTRA_MODEL_COLUMNS[index.column()][0]
+        if role == Qt.DisplayRole:
+            value = self._project.get_value(name, self.get_spectrum_index(index.row()))
+            if name == "name":
+                return value
+            elif name == "live_time_s":
+                return "{:.2f}".format(value)
+            else:
+                return "{:.0f}".format(value)
+        elif role == Qt.TextAlignmentRole and name != "name":
+            return int(Qt.AlignRight | Qt.AlignVCenter)
+        elif role == Qt.DecorationRole and name == "name" and self.thumbnail_service is not None:
+            spectrum_index = self.get_spectrum_index(index.row())
+            return self.thumbnail_service.get_thumbnail(
+                spectrum_index, lambda: self._project.get_spectrum(spectrum_index).counts)
+
+        return None
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            if section >= len(SPECTRA_MODEL_COLUMNS):
+                return "{} net".format(self._roi_names[section - len(SPECTRA_MODEL_COLUMNS)])
+            return SPECTRA_MODEL_COLUMNS[section][1]
+        return None
+
+    def sort(self, column, order=Qt.AscendingOrder):
+        if self._project is None or not 0 <= column < self.columnCount():
+            return
+
+        self.layoutAboutToBeChanged.emit()
+
+        persistent_indexes = self.persistentIndexList()
+        spectrum_indexes = [self.get_spectrum_index(index.row()) for index in persistent_indexes]
+
+        values = self._get_sort_values(column)
+        sort_order = np.argsort(values, kind="stable")
+        if order == Qt.DescendingOrder:
+            sort_order = sort_order[::-1]
+        self._order = sort_order
+        self._sort_column = column
+        self._sort_order = order
+
+        self._rows = np.empty_like(sort_order)
+        self._rows[sort_order] = np.arange(sort_order.size)
+        new_indexes = []
+        for index, spectrum_index in zip(persistent_indexes, spectrum_indexes):
+            row = int(self._rows[spectrum_index])
+            if row < self._number_rows:
+                new_indexes.append(self.index(row, index.column()))
+            else:
+                new_indexes.append(QModelIndex())
+        self.changePersistentIndexList(persistent_indexes, new_indexes)
+
+        self.layoutChanged.emit()
+
+    def _roi_data(self, index, role):
+        if role == Qt.DisplayRole:
+            spectrum_index = self.get_spectrum_index(index.row())
+            if self._roi_values is None or spectrum_index >= self._roi_values.shape[0]:
+                return None
+            return "{:.0f}".format(self._roi_values[spectrum_index, index.column() - len(SPECTRA_MODEL_COLUMNS)])
+        elif role == Qt.TextAlignmentRole:
+            return int(Qt.AlignRight | Qt.AlignVCenter)
+        return None
+
+    def _get_sort_values(self, column):
+        if column < len(SPECTRA_MODEL_COLUMNS):
+            return self._project.get_column(SPECTRA_MODEL_COLUMNS[column][0])
+
+        # The spectra without integrals yet are sorted last.
+        values = np.full(self._number_spectra, np.nan)
+        if self._roi_values is not None:
+            number_values = min(self._roi_values.shape[0], self._number_spectra)
+            values[:number_values] = self._roi_values[:number_values, column - len(SPECTRA_MODEL_COLUMNS)]
+        return values
+
+    def _thumbnail_ready(self, spectrum_index):
+        if spectrum_index >= self._number_spectra:
+            return
+
+        row = spectrum_index if self._rows is None else int(self._rows[spectrum_index])
+        if row < self._number_rows:
+            index = self.index(row, 0)
+            self.dataChanged.emit(index, index, [Qt.DecorationRole])
+
+
+class _ProjectListModel(QAbstractListModel):
+    """
+    List of the items of a project table, the items are few and read directly from the project.
+    """
+
+    def __init__(self, project=None, parent=None):
+        super(_ProjectListModel, self).__init__(parent)
+
+        self._project = project
+
+    def set_project(self, project):
+        self.beginResetModel()
+        self._project = project
+        self.endResetModel()
+
+    def refresh(self):
+        self.beginResetModel()
+        self.endResetModel()
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid() or self._project is None:
+            return 0
+        return len(self._get_items())
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or role != Qt.DisplayRole:
+            return None
+        return self._format_item(self._get_items()[index.row()])
+
+    def _get_items(self):
+        raise NotImplementedError
+
+    def _format_item(self, item):
+        raise NotImplementedError
+
+
+class RoiListModel(_ProjectListModel):
+    def _get_items(self):
+        return self._project.rois
+
+    def _format_item(self, roi):
+        name, energy_min_eV, energy_max_eV, background_width_eV = roi
+        text = "{} ({:.0f}-{:.0f} eV)".format(name, energy_min_eV, energy_max_eV)
+        if background_width_eV > 0.0:
+            text += ", background {:.0f} eV".format(background_width_eV)
+        return text
+
+
+class ElementListModel(_ProjectListModel):
+    def _get_items(self):
+        return self._project.elements
+
+    def _format_item(self, element):
+        return element
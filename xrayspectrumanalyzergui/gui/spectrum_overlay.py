@@ -0,0 +1,273 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+.. py:currentmodule:: xrayspectrumanalyzergui.gui.spectrum_overlay
+   :synopsis: Interactive overlays of the spectrum canvas drawn with blitting.
+
+.. moduleauthor:: Hendrix Demers <hendrix.demers@mail.mcgill.ca>
+
+Interactive overlays of the spectrum canvas drawn with blitting.
+
+The overlay artists are animated: they are not drawn with the figure. After each full draw, the background of the axes
+is cached with :py:meth:`copy_from_bbox` and mouse moves only restore the background, draw the overlay artists and
+blit the axes, whatever the size of the spectrum.
+"""
+
+###############################################################################
+# GUI for the x-ray spectrum analyzer project
+# Copyright (C) 2017  Hendrix Demers
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+###############################################################################
+
+# Standard library modules.
+
+# Third party modules.
+import numpy as np
+from matplotlib.patches import Rectangle
+
+# Local modules.
+
+# Project modules.
+
+# Globals and constants variables.
+PICK_TOLERANCE_px = 5
+ROI_COLOR = "tab:green"
+ROI_BACKGROUND_COLOR = "tab:gray"
+MARKER_COLOR = "tab:red"
+CROSSHAIR_COLOR = "0.5"
+
+
+class SpectrumOverlay(object):
+    """
+    Crosshair with energy and intensity readout, draggable ROI spans and x-ray line markers.
+
+    :param canvas: matplotlib canvas.
+    :param axes: axes of the spectrum.
+    :param roi_changed_callback: called with ``(index, energy_min_eV, energy_max_eV)`` on each move of a dragged ROI
+        edge.
+    :param roi_drag_finished_callback: called with ``(index, energy_min_eV, energy_max_eV)`` once when the ROI edge is
+        released.
+
+    The ``identify_callback`` attribute, if set, is called with the energy under the cursor and returns the label of
+    the x-ray lines shown in the readout.
+    """
+
+    def __init__(self, canvas, axes, roi_changed_callback=None, roi_drag_finished_callback=None):
+        self.canvas = canvas
+        self.axes = axes
+        self.roi_changed_callback = roi_changed_callback
+        self.roi_drag_finished_callback = roi_drag_finished_callback
+        self.identify_callback = None
+
+        self._energies_eV = None
+        self._counts = None
+        self._background = None
+        self._drag = None
+
+        self.vertical_line = axes.axvline(0.0, color=CROSSHAIR_COLOR, linewidth=0.8, animated=True, visible=False)
+        self.horizontal_line = axes.axhline(0.0, color=CROSSHAIR_COLOR, linewidth=0.8, animated=True, visible=False)
+        self.readout_text = axes.text(0.98, 0.95, "", transform=axes.transAxes, horizontalalignment="right",
+                                      verticalalignment="top", animated=True, visible=False)
+
+        self.roi_spans = []
+        self.roi_background_spans = []
+        self.roi_background_widths_eV = []
+        self.marker_lines = []
+        self.marker_texts = []
+        # Artists of the canvas temporarily animated, e.g. the spectrum during a live acquisition.
+        self.live_artists = []
+
+        canvas.mpl_connect("draw_event", self._on_draw)
+        canvas.mpl_connect("motion_notify_event", self._on_motion)
+        canvas.mpl_connect("button_press_event", self._on_press)
+        canvas.mpl_connect("button_release_event", self._on_release)
+        canvas.mpl_connect("axes_leave_event", self._on_leave)
+
+    def set_spectrum(self, energies_eV, counts):
+        self._energies_eV = energies_eV
+        self._counts = counts
+
+    def add_roi(self, energy_min_eV, energy_max_eV, background_width_eV=0.0):
+        """
+        Add a ROI span, with a background window of `background_width_eV` on each side, and return its index.
+        """
+        roi_span = self._add_span(ROI_COLOR, 0.2)
+        background_spans = (self._add_span(ROI_BACKGROUND_COLOR, 0.15), self._add_span(ROI_BACKGROUND_COLOR, 0.15))
+        self.roi_spans.append(roi_span)
+        self.roi_background_spans.append(background_spans)
+        self.roi_background_widths_eV.append(background_width_eV)
+
+        index = len(self.roi_spans) - 1
+        self._place_roi(index, energy_min_eV, energy_max_eV)
+        self.blit()
+
+        return index
+
+    def set_roi(self, index, energy_min_eV, energy_max_eV, background_width_eV=None):
+        if background_width_eV is not None:
+            self.roi_background_widths_eV[index] = background_width_eV
+        self._place_roi(index, energy_min_eV, energy_max_eV)
+        self.blit()
+
+    def get_roi(self, index):
+        roi_span = self.roi_spans[index]
+        return roi_span.get_x(), roi_span.get_x() + roi_span.get_width()
+
+    def clear_rois(self):
+        for roi_span in self.roi_spans + [span for spans in self.roi_background_spans for span in spans]:
+            roi_span.remove()
+        self.roi_spans = []
+        self.roi_background_spans = []
+        self.roi_background_widths_eV = []
+        self._drag = None
+        self.blit()
+
+    def set_line_markers(self, markers):
+        """
+        Replace the x-ray line markers.
+
+        :param markers: list of ``(energy_eV, label)``.
+        """
+        for artist in self.marker_lines + self.marker_texts:
+            artist.remove()
+        self.marker_lines = []
+        self.marker_texts = []
+
+        for energy_eV, label in markers:
+            line = self.axes.axvline(energy_eV, color=MARKER_COLOR, linewidth=1.0, animated=True)
+            text = self.axes.text(energy_eV, 0.98, label, transform=self.axes.get_xaxis_transform(),
+                                  color=MARKER_COLOR, rotation=90, horizontalalignment="right",
+                                  verticalalignment="top", animated=True)
+            self.marker_lines.append(line)
+            self.marker_texts.append(text)
+
+        self.blit()
+
+    def get_animated_artists(self):
+        background_spans = [span for spans in self.roi_background_spans for span in spans]
+        return self.live_artists + background_spans + self.roi_spans + self.marker_lines + self.marker_texts + \
+            [self.vertical_line, self.horizontal_line, self.readout_text]
+
+    def blit(self):
+        """
+        Restore the cached background and draw only the overlay artists.
+        """
+        if self._background is None:
+            return
+
+        self.canvas.restore_region(self._background)
+        for artist in self.get_animated_artists():
+            self.axes.draw_artist(artist)
+        self.canvas.blit(self.axes.bbox)
+
+    def _on_draw(self, event):
+        self._background = self.canvas.copy_from_bbox(self.axes.bbox)
+        for artist in self.get_animated_artists():
+            self.axes.draw_artist(artist)
+
+    def _is_navigating(self):
+        toolbar = self.canvas.toolbar
+        return toolbar is not None and bool(toolbar.mode)
+
+    def _on_motion(self, event):
+        if event.inaxes is not self.axes or event.xdata is None:
+            return
+
+        if self._drag is not None:
+            self._drag_edge(event.xdata)
+        else:
+            self._update_crosshair(event.xdata, event.ydata)
+
+        self.blit()
+
+    def _update_crosshair(self, energy_eV, intensity):
+        self.vertical_line.set_xdata([energy_eV, energy_eV])
+        self.horizontal_line.set_ydata([intensity, intensity])
+
+        readout = "E = {:.1f} eV".format(energy_eV)
+        if self._counts is not None and len(self._counts) > 0:
+            channel = int(np.searchsorted(self._energies_eV, energy_eV))
+            channel = min(max(channel, 0), len(self._counts) - 1)
+            readout += "\nI = {:g}".format(self._counts[channel])
+        if self.identify_callback is not None:
+            label = self.identify_callback(energy_eV)
+            if label:
+                readout += "\n" + label
+        self.readout_text.set_text(readout)
+
+        self.vertical_line.set_visible(True)
+        self.horizontal_line.set_visible(True)
+        self.readout_text.set_visible(True)
+
+    def _on_leave(self, event):
+        self.vertical_line.set_visible(False)
+        self.horizontal_line.set_visible(False)
+        self.readout_text.set_visible(False)
+        self.blit()
+
+    def _on_press(self, event):
+        if event.inaxes is not self.axes or event.button != 1 or self._is_navigating():
+            return
+
+        for index in range(len(self.roi_spans)):
+            energy_min_eV, energy_max_eV = self.get_roi(index)
+            for edge, energy_eV in enumerate((energy_min_eV, energy_max_eV)):
+                x_px = self.axes.transData.transform((energy_eV, 0.0))[0]
+                if abs(x_px - event.x) <= PICK_TOLERANCE_px:
+                    self._drag = (index, edge)
+                    return
+
+    def _drag_edge(self, energy_eV):
+        index, edge = self._drag
+        energy_min_eV, energy_max_eV = self.get_roi(index)
+        if edge == 0:
+            energy_min_eV = min(energy_eV, energy_max_eV)
+        else:
+            energy_max_eV = max(energy_eV, energy_min_eV)
+
+        self._place_roi(index, energy_min_eV, energy_max_eV)
+
+        if self.roi_changed_callback is not None:
+            self.roi_changed_callback(index, energy_min_eV, energy_max_eV)
+
+    def _add_span(self, color, alpha):
+        span = Rectangle((0.0, 0.0), 0.0, 1.0, transform=self.axes.get_xaxis_transform(), facecolor=color, alpha=alpha,
+                         animated=True)
+        self.axes.add_patch(span)
+        return span
+
+    def _place_roi(self, index, energy_min_eV, energy_max_eV):
+        roi_span = self.roi_spans[index]
+        roi_span.set_x(energy_min_eV)
+        roi_span.set_width(energy_max_eV - energy_min_eV)
+
+        background_width_eV = self.roi_background_widths_eV[index]
+        left_span, right_span = self.roi_background_spans[index]
+        left_span.set_x(energy_min_eV - background_width_eV)
+        right_span.set_x(energy_max_eV)
+        for span in (left_span, right_span):
+            span.set_width(background_width_eV)
+            span.set_visible(background_width_eV > 0.0)
+
+    def _on_release(self, event):
+        if self._drag is None:
+            return
+
+        index, _edge = self._drag
+        self._drag = None
+        if self.roi_drag_finished_callback is not None:
+            energy_min_eV, energy_max_eV = self.get_roi(index)
+            self.roi_drag_finished_callback(index, energy_min_eV, energy_max_eV)
@@ -29,13 +29,13 @@ Widget to display an eels spectrum.
 ###############################################################################
 
 # Standard library modules.
-import os.path
 import logging
 
 # Third party modules.
-import six
+import numpy as np
 from qtpy.QtWidgets import QSizePolicy, QWidget, QVBoxLayout
-from qtpy.QtCore import Qt
+from qtpy.QtCore import Qt, Signal, QTimer
+from qtpy.QtGui import QPainter, QResizeEvent
 
 from matplotlib.backend_bases import key_press_handler
 import qtpy
@@ -46,20 +46,38 @@ elif qtpy.API == 'pyqt':
     from matplotlib.backends.backend_qt4agg import FigureCanvasQTAgg as FigureCanvas
     from matplotlib.backends.backend_qt4agg import NavigationToolbar2QT as NavigationToolbar
 from matplotlib.figure import Figure
+from matplotlib.collections import LineCollection
+from matplotlib import cm
 
 # Local modules.
 
 # Project modules.
+from xrayspectrumanalyzergui.gui.level_of_detail import MinMaxPyramid
+from xrayspectrumanalyzergui.gui.multi_spectrum import NORMALISATION_NONE, NORMALISATION_LABELS
+from xrayspectrumanalyzergui.gui.spectrum_overlay import SpectrumOverlay
 
 # Globals and constants variables.
+RESIZE_DELAY_ms = 150
+# The y limit of a live spectrum grows by this factor, so the axes are redrawn only a few times per acquisition.
+LIVE_Y_LIMIT_GROWTH = 1.5
 
 
 class SpectrumCanvas(FigureCanvas):
     """
     Ultimately, this is a QWidget (as well as a FigureCanvasAgg, etc.).
+
+    Files and directories dropped on the canvas are emitted as is with ``files_dropped(list)``, the receiver expands
+    the directories. ROI edges dragged in the overlay are emitted with ``roi_changed(int, float, float)`` on each move
+    and with ``roi_drag_finished(int, float, float)`` when released.
     """
 
+    files_dropped = Signal(list)
+    roi_changed = Signal(int, float, float)
+    roi_drag_finished = Signal(int, float, float)
+
     def __init__(self, parent=None, width=3, height=2, dpi=100):
+        self.logger = logging.getLogger(__name__)
+
         self.fig = Figure(figsize=(width, height), dpi=dpi)
 
         self.axes = self.fig.add_subplot(111)
@@ -68,11 +86,21 @@ class SpectrumCanvas(FigureCanvas):
         self.setParent(parent)
 
         self.compute_initial_figure()
+        self.overlay = SpectrumOverlay(self, self.axes, self.roi_changed.emit, self.roi_drag_finished.emit)
 
         FigureCanvas.setSizePolicy(self, QSizePolicy.Preferred, QSizePolicy.Preferred)
         FigureCanvas.updateGeometry(self)
 
         self.setAcceptDrops(True)
+
+        # Resize events are coalesced, the last rendered frame is scaled until the resize settles.
+        self._resize_pixmap = None
+        self._resize_old_size = None
+        self._resize_timer = QTimer(self)
+        self._resize_timer.setSingleShot(True)
+        self._resize_timer.setInterval(RESIZE_DELAY_ms)
+        self._resize_timer.timeout.connect(self._finish_resize)
+
         self.draw()
 
     def compute_initial_figure(self):
@@ -81,58 +109,247 @@ class SpectrumCanvas(FigureCanvas):
 
         self.axes.set_xlabel(r"X-ray energy (eV)")
         self.axes.set_ylabel(r"Intensity")
-        self.figure.tight_layout()
 
-    def update_figure(self, spectrum_data):
-        self.axes.cla()
-        self.axes.plot(spectrum_data.energies_eV, spectrum_data.counts)
-
-        self.axes.set_xlabel(r"X-ray energy (eV)")
-        self.axes.set_ylabel(r"Intensity")
+        # The artists are created once and updated with set_data, see update_figure.
+        self.spectrum_line, = self.axes.plot([], [])
+        self.background_line, = self.axes.plot([], [], "--")
+        self.multi_spectrum_lines = LineCollection([], linewidths=1.0)
+        self.axes.add_collection(self.multi_spectrum_lines)
+        self._pyramid = None
+        self._multi_spectrum = None
+        self._multi_spectrum_factors = None
+        self._x_limits = None
+        self._y_limits = None
+        self._layout_key = None
+        self._is_live = False
+        self.axes.callbacks.connect("xlim_changed", self._on_xlim_changed)
 
         self.figure.tight_layout()
-        self.draw()
+
+    def update_figure(self, spectrum_data):
+        self._clear_multi_spectrum()
+        self._pyramid = MinMaxPyramid(spectrum_data.energies_eV, spectrum_data.counts)
+        self.overlay.set_spectrum(self._pyramid.x, self._pyramid.y)
+
+        y_limits = self._pyramid.get_y_limits()
+        if y_limits is not None:
+            energies_eV = self._pyramid.x
+            x_limits = (float(energies_eV[0]), float(energies_eV[-1]))
+            y_limits = (min(0.0, float(y_limits[0])), float(y_limits[1]) * 1.05 or 1.0)
+            self._update_limits(x_limits, y_limits)
+
+        self._update_envelope()
+        self.draw_idle()
+
+    def update_multi_spectrum_figure(self, multi_spectrum, normalisation=NORMALISATION_NONE):
+        """
+        Show several spectra with a single line collection, coloured along the viridis colour map in their order.
+
+        :param multi_spectrum: :py:class:`xrayspectrumanalyzergui.gui.multi_spectrum.MultiSpectrum`.
+        :param normalisation: one of :py:data:`xrayspectrumanalyzergui.gui.multi_spectrum.NORMALISATIONS`.
+        """
+        self._pyramid = None
+        self.spectrum_line.set_data([], [])
+        self.background_line.set_data([], [])
+        self.overlay.set_spectrum(None, None)
+
+        self._multi_spectrum = multi_spectrum
+        self._multi_spectrum_factors = multi_spectrum.get_factors(normalisation)
+        self.multi_spectrum_lines.set_color(cm.viridis(np.linspace(0.0, 1.0, multi_spectrum.number_spectra)))
+        self._set_y_label(NORMALISATION_LABELS[normalisation])
+
+        x_limits = multi_spectrum.get_x_limits()
+        if x_limits is not None:
+            y_minimum, y_maximum = multi_spectrum.get_y_limits(self._multi_spectrum_factors)
+            self._update_limits(x_limits, (min(0.0, y_minimum), y_maximum * 1.05 or 1.0))
+
+        self._update_envelope()
+        self.draw_idle()
+
+    def is_multi_spectrum(self):
+        return self._multi_spectrum is not None
+
+    def _clear_multi_spectrum(self):
+        if self._multi_spectrum is None:
+            return
+
+        self._multi_spectrum = None
+        self._multi_spectrum_factors = None
+        self.multi_spectrum_lines.set_segments([])
+        self._set_y_label(NORMALISATION_LABELS[NORMALISATION_NONE])
+
+    def _set_y_label(self, label):
+        if label != self.axes.get_ylabel():
+            self.axes.set_ylabel(label)
+            # The width of the label and of the tick labels change with the normalisation.
+            self._layout_key = None
+
+    def set_live(self, is_live):
+        """
+        Start or stop the live mode, where the spectrum line is animated and drawn with the overlay by blitting.
+        """
+        if is_live == self._is_live:
+            return
+
+        self._is_live = is_live
+        # The first live spectrum sets its own limits.
+        self._y_limits = None
+        self.spectrum_line.set_animated(is_live)
+        self.overlay.live_artists = [self.spectrum_line] if is_live else []
+        self.draw_idle()
+
+    def is_live(self):
+        return self._is_live
+
+    def update_live_figure(self, spectrum_data):
+        """
+        Update the spectrum of a live acquisition.
+
+        The artists are reused: while the limits do not change, only the spectrum line and the overlay are blitted
+        over the cached background of the axes. The y limit grows by :py:data:`LIVE_Y_LIMIT_GROWTH` when the counts
+        exceed it, so the full figure is only drawn a few times per acquisition.
+        """
+        if not self._is_live:
+            self.set_live(True)
+
+        self._clear_multi_spectrum()
+        self._pyramid = MinMaxPyramid(spectrum_data.energies_eV, spectrum_data.counts)
+        self.overlay.set_spectrum(self._pyramid.x, self._pyramid.y)
+        self._update_envelope()
+
+        y_limits = self._pyramid.get_y_limits()
+        if y_limits is None:
+            return
+
+        energies_eV = self._pyramid.x
+        x_limits = (float(energies_eV[0]), float(energies_eV[-1]))
+        maximum = float(y_limits[1])
+        if x_limits != self._x_limits or self._y_limits is None or maximum > self._y_limits[1]:
+            self._update_limits(x_limits, (0.0, max(maximum, 1.0) * LIVE_Y_LIMIT_GROWTH))
+            self.draw_idle()
+        else:
+            self.overlay.blit()
+
+    def set_background(self, energies_eV, background):
+        """
+        Show the background of the spectrum, hide it if `background` is None.
+        """
+        if background is None:
+            self.background_line.set_data([], [])
+        else:
+            self.background_line.set_data(energies_eV, background)
+        self.draw_idle()
+
+    def _on_xlim_changed(self, axes):
+        self._update_envelope()
+
+    def _update_envelope(self):
+        """
+        Plot only the min/max envelopes needed for the visible range and the width of the axes in pixels.
+        """
+        x_min, x_max = self.axes.get_xlim()
+        if self._multi_spectrum is not None:
+            segments = self._multi_spectrum.get_segments(x_min, x_max, self.axes.bbox.width,
+                                                         self._multi_spectrum_factors)
+            self.multi_spectrum_lines.set_segments(segments)
+
+        if self._pyramid is None:
+            return
+
+        x, y = self._pyramid.get_envelope(x_min, x_max, self.axes.bbox.width)
+        self.spectrum_line.set_data(x, y)
+
+    def _update_limits(self, x_limits, y_limits):
+        """
+        Set the axes limits and the layout only when they change.
+
+        The layout depends on the width of the tick labels, so it is only recomputed when the x limits or the order of
+        magnitude of the maximum intensity change.
+        """
+        if x_limits == self._x_limits and y_limits == self._y_limits:
+            return
+
+        self._x_limits = x_limits
+        self._y_limits = y_limits
+        self.axes.set_xlim(x_limits)
+        self.axes.set_ylim(y_limits)
+
+        if self.toolbar is not None:
+            # Home view of the navigation toolbar is the new limits.
+            self.toolbar.update()
+
+        layout_key = (x_limits, len("{:d}".format(int(abs(y_limits[1])))))
+        if layout_key != self._layout_key:
+            self._layout_key = layout_key
+            self.figure.tight_layout()
 
     def resize_canvas(self):
         self.figure.tight_layout()
-        self.draw()
+        self._update_envelope()
+        self.draw_idle()
+
+    def resizeEvent(self, event):
+        if not self.isVisible():
+            super(SpectrumCanvas, self).resizeEvent(event)
+            self._resize_timer.start()
+            return
+
+        if self._resize_pixmap is None:
+            self._resize_pixmap = self.grab()
+            self._resize_old_size = event.oldSize()
+
+        QWidget.resizeEvent(self, event)
+        self._resize_timer.start()
+
+    def paintEvent(self, event):
+        if self._resize_pixmap is None:
+            super(SpectrumCanvas, self).paintEvent(event)
+            return
+
+        painter = QPainter(self)
+        painter.drawPixmap(self.rect(), self._resize_pixmap)
+        painter.end()
+
+    def _finish_resize(self):
+        if self._resize_pixmap is not None:
+            self._resize_pixmap = None
+            super(SpectrumCanvas, self).resizeEvent(QResizeEvent(self.size(), self._resize_old_size))
+
+        self.resize_canvas()
 
     def dragEnterEvent(self, event):
-        if event.mimeData().hasFormat('application/x-qt-windows-mime;value="FileName"'):
+        if self._get_local_paths(event.mimeData()):
             event.accept()
         else:
             event.ignore()
 
     def dragMoveEvent(self, event):
-        if event.mimeData().hasFormat('application/x-qt-windows-mime;value="FileName"'):
+        if self._get_local_paths(event.mimeData()):
             event.setDropAction(Qt.CopyAction)
             event.accept()
         else:
             event.ignore()
 
     def dropEvent(self, event):
-        if event.mimeData().hasFormat('application/x-qt-windows-mime;value="FileName"'):
-            if six.PY3:
-                data = event.mimeData().text()
-                print(data)
-                file_path = data.lstrip("file:///")
-            elif six.PY2:
-                mime_data = event.mimeData().data('application/x-qt-windows-mime;value="FileName"')
-                print(mime_data)
-                file_path = mime_data.data()
-            self.open_spectrum(file_path)
+        paths = self._get_local_paths(event.mimeData())
+        if paths:
+            self.open_spectra(paths)
             event.setDropAction(Qt.CopyAction)
             event.accept()
         else:
             event.ignore()
 
-    def open_spectrum(self, file_path):
-        logging.info("Open spectrum file: %s", file_path)
-        # self.spectra.import_spectrum(file_path)
+    def open_spectra(self, paths):
+        self.logger.info("Open %i dropped paths", len(paths))
+        if paths:
+            self.files_dropped.emit(paths)
+
+    @staticmethod
+    def _get_local_paths(mime_data):
+        if not mime_data.hasUrls():
+            return []
 
-        # elv_file = self.spectra.get_current_elv_file()
-        # spectrum_data = elv_file.get_spectrum_data()
-        # self.update_figure(spectrum_data)
+        return [url.toLocalFile() for url in mime_data.urls() if url.isLocalFile()]
 
 
 class SpectrumWidget(QWidget):
@@ -158,5 +375,5 @@ class SpectrumWidget(QWidget):
     def update_figure(self, spectrum_data):
         self.spectrum_canvas.update_figure(spectrum_data)
 
-    def resizeEvent(self, QResizeEvent):
-        self.spectrum_canvas.resize_canvas()
+    def update_multi_spectrum_figure(self, multi_spectrum, normalisation=NORMALISATION_NONE):
+        self.spectrum_canvas.update_multi_spectrum_figure(multi_spectrum, normalisation)
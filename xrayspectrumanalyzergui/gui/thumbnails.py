@@ -0,0 +1,239 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+.. py:currentmodule:: xrayspectrumanalyzergui.gui.thumbnails
+   :synopsis: Sparkline thumbnails of the spectra.
+
+.. moduleauthor:: Hendrix Demers <hendrix.demers@mail.mcgill.ca>
+
+Sparkline thumbnails of the spectra.
+
+The counts are decimated to one minimum and maximum per pixel and painted on a QImage by a pool of workers. The images
+are converted to pixmaps in the GUI thread and kept in a LRU cache. Only the thumbnails asked by the view, i.e. of the
+visible rows, are rendered, and the newest requests are rendered first so that fast scrolling does not queue work for
+rows already scrolled away.
+"""
+
+###############################################################################
+# GUI for the x-ray spectrum analyzer project
+# Copyright (C) 2017  Hendrix Demers
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+###############################################################################
+
+# Standard library modules.
+import logging
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+import multiprocessing
+
+# Third party modules.
+import numpy as np
+from qtpy.QtCore import QObject, Signal, QSize, QPointF, Qt
+from qtpy.QtGui import QImage, QPixmap, QPainter, QColor, QPen
+
+# Local modules.
+
+# Project modules.
+
+# Globals and constants variables.
+THUMBNAIL_SIZE = QSize(96, 20)
+CACHE_SIZE = 2000
+MAXIMUM_PENDING = 256
+LINE_COLOR = QColor(31, 119, 180)
+
+
+def decimate_counts(counts, number_pixels):
+    """
+    Return the minimum and maximum of the counts for each pixel.
+    """
+    counts = np.asarray(counts, dtype=np.float64)
+    if counts.size == 0:
+        return np.zeros(number_pixels), np.zeros(number_pixels)
+
+    edges = np.linspace(0, counts.size, number_pixels + 1).astype(np.int64)[:-1]
+    edges = np.minimum(edges, counts.size - 1)
+    return np.minimum.reduceat(counts, edges), np.maximum.reduceat(counts, edges)
+
+
+def render_sparkline(counts, size=THUMBNAIL_SIZE, color=LINE_COLOR):
+    """
+    Paint the sparkline of the counts on a QImage, can be called from any thread.
+
+    The intensities are on a logarithmic scale, so that the minor peaks are visible.
+    """
+    width = size.width()
+    height = size.height()
+
+    image = QImage(size, QImage.Format_ARGB32_Premultiplied)
+    image.fill(Qt.transparent)
+
+    minimums, maximums = decimate_counts(counts, width)
+    minimums = np.log1p(np.maximum(minimums, 0.0))
+    maximums = np.log1p(np.maximum(maximums, 0.0))
+    scale = maximums.max()
+    if scale <= 0.0:
+        return image
+
+    top_ys = (height - 1) * (1.0 - maximums / scale)
+    bottom_ys = (height - 1) * (1.0 - minimums / scale)
+
+    painter = QPainter(image)
+    painter.setPen(QPen(color, 1.0))
+    for x, (top_y, bottom_y) in enumerate(zip(top_ys, bottom_ys)):
+        painter.drawLine(QPointF(x + 0.5, top_y), QPointF(x + 0.5, max(bottom_y, top_y + 1.0)))
+    painter.end()
+
+    return image
+
+
+class PixmapCache(object):
+    """
+    Least recently used cache of pixmaps.
+    """
+
+    def __init__(self, maximum_size=CACHE_SIZE):
+        self.maximum_size = maximum_size
+        self._pixmaps = OrderedDict()
+
+    def __len__(self):
+        return len(self._pixmaps)
+
+    def __contains__(self, key):
+        return key in self._pixmaps
+
+    def get(self, key):
+        pixmap = self._pixmaps.pop(key, None)
+        if pixmap is not None:
+            self._pixmaps[key] = pixmap
+        return pixmap
+
+    def put(self, key, pixmap):
+        self._pixmaps.pop(key, None)
+        self._pixmaps[key] = pixmap
+        while len(self._pixmaps) > self.maximum_size:
+            self._pixmaps.popitem(last=False)
+
+    def clear(self):
+        self._pixmaps.clear()
+
+
+class ThumbnailService(QObject):
+    """
+    Render the thumbnails of the spectra with a pool of workers.
+
+    Signals:
+
+    * ``thumbnail_ready(object)``: key of the thumbnail now in the cache.
+    """
+
+    thumbnail_ready = Signal(object)
+
+    _rendered = Signal(int, object, object)
+
+    def __init__(self, parent=None, size=THUMBNAIL_SIZE, executor=None, cache_size=CACHE_SIZE):
+        super(ThumbnailService, self).__init__(parent)
+
+        self.logger = logging.getLogger(__name__)
+
+        self.size = size
+        if executor is None:
+            executor = ThreadPoolExecutor(max_workers=max(multiprocessing.cpu_count() - 1, 1))
+        self._executor = executor
+
+        self._cache = PixmapCache(cache_size)
+        self._generation = 0
+
+        # Requests not yet rendered, the workers take the newest first.
+        self._lock = threading.Lock()
+        self._pending = OrderedDict()
+        self._rendering = set()
+
+        # Emitted from the worker threads, the connection is queued to the thread of this object.
+        self._rendered.connect(self._on_rendered)
+
+    def get_thumbnail(self, key, get_counts):
+        """
+        Return the thumbnail of `key` if in the cache, otherwise queue its rendering and return None.
+
+        :param get_counts: called in the GUI thread to get the counts, only on a cache miss.
+        """
+        cache_key = (key, self.size.width(), self.size.height())
+        pixmap = self._cache.get(cache_key)
+        if pixmap is not None:
+            return pixmap
+
+        with self._lock:
+            if cache_key in self._pending:
+                self._pending.move_to_end(cache_key)
+                return None
+            if cache_key in self._rendering:
+                return None
+
+            self._pending[cache_key] = (self._generation, get_counts())
+            if len(self._pending) > MAXIMUM_PENDING:
+                # The oldest requests are for rows most likely scrolled away.
+                self._pending.popitem(last=False)
+
+        self._executor.submit(self._render_newest)
+        return None
+
+    def set_size(self, size):
+        """
+        Change the size of the thumbnails, the thumbnails of the other sizes stay in the cache.
+        """
+        self.size = QSize(size)
+
+    def clear(self):
+        """
+        Clear the cache and drop the thumbnails being rendered.
+        """
+        self._generation += 1
+        with self._lock:
+            self._pending.clear()
+            self._rendering.clear()
+        self._cache.clear()
+
+    def shutdown(self):
+        self.clear()
+        self._executor.shutdown(wait=False)
+
+    def _render_newest(self):
+        with self._lock:
+            if not self._pending:
+                return
+            cache_key, (generation, counts) = self._pending.popitem(last=True)
+            self._rendering.add(cache_key)
+
+        key, width, height = cache_key
+        try:
+            image = render_sparkline(counts, QSize(width, height))
+        except Exception as message:
+            self.logger.error("Cannot render thumbnail %s: %s", key, message)
+            with self._lock:
+                self._rendering.discard(cache_key)
+            return
+
+        self._rendered.emit(generation, cache_key, image)
+
+    def _on_rendered(self, generation, cache_key, image):
+        if generation != self._generation:
+            return
+
+        with self._lock:
+            self._rendering.discard(cache_key)
+        self._cache.put(cache_key, QPixmap.fromImage(image))
+        self.thumbnail_ready.emit(cache_key[0])
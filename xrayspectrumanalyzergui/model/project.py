@@ -0,0 +1,455 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+.. py:currentmodule:: xrayspectrumanalyzergui.model.project
+   :synopsis: Project with the spectra, ROIs, elements and fit results.
+
+.. moduleauthor:: Hendrix Demers <hendrix.demers@mail.mcgill.ca>
+
+Project with the spectra, ROIs, elements and fit results.
+
+The spectra are stored by chunks of :py:data:`CHUNK_SIZE` spectra and their properties (name, calibration, live time,
+total counts) as columns. A project opened from a file only maps the chunks when one of their spectra is requested,
+and only the chunks and tables modified since the last save are written, see
+:py:mod:`xrayspectrumanalyzergui.file_format.project_file`.
+"""
+
+###############################################################################
+# GUI for the x-ray spectrum analyzer project
+# Copyright (C) 2017  Hendrix Demers
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+###############################################################################
+
+# Standard library modules.
+import os.path
+
+# Third party modules.
+import numpy as np
+
+# Local modules.
+
+# Project modules.
+from xrayspectrumanalyzergui.model.spectrum_data import SpectrumData
+from xrayspectrumanalyzergui.file_format.project_file import ProjectFile
+
+# Globals and constants variables.
+CHUNK_SIZE = 1024
+
+SPECTRA_TABLE = "spectra"
+NAMES_TABLE = "names"
+ROIS_TABLE = "rois"
+ELEMENTS_TABLE = "elements"
+FIT_RESULTS_TABLE = "fit_results"
+ELEMENT_MAPS_TABLE = "element_maps"
+ELEMENT_MAP_ROIS_TABLE = "element_map_rois"
+
+SPECTRA_COLUMNS = ["number_channels", "offset_eV", "gain_eV", "live_time_s", "total_counts"]
+SPECTRA_DTYPE = [("number_channels", np.int64), ("offset_eV", np.float64), ("gain_eV", np.float64),
+                 ("live_time_s", np.float64), ("total_counts", np.float64)]
+ROI_DTYPE = [("name", "U64"), ("energy_min_eV", np.float64), ("energy_max_eV", np.float64),
+             ("background_width_eV", np.float64)]
+FIT_RESULT_DTYPE = [("spectrum_index", np.int64), ("line", "U16"), ("net_intensity", np.float64),
+                    ("error", np.float64)]
+
+
+def create_roi(roi):
+    """
+    Return a ROI as ``(name, energy_min_eV, energy_max_eV, background_width_eV)``, the background width of a ROI
+    without one is zero.
+    """
+    name, energy_min_eV, energy_max_eV = roi[:3]
+    background_width_eV = roi[3] if len(roi) > 3 else 0.0
+    return str(name), float(energy_min_eV), float(energy_max_eV), float(background_width_eV)
+
+
+def stack_rows(rows):
+    """
+    Return the counts of spectra as one 2D array, the rows are padded with zeros to the largest spectrum.
+    """
+    number_channels = max(row.size for row in rows)
+    counts = np.zeros((len(rows), number_channels), dtype=np.result_type(*rows))
+    for row_index, row in enumerate(rows):
+        counts[row_index, :row.size] = row
+    return counts
+
+
+def get_live_time_s(metadata):
+    try:
+        return float(metadata["LIVETIME"])
+    except (KeyError, ValueError):
+        return 0.0
+
+
+class _Chunk(object):
+    """
+    Counts of a chunk of spectra, either mapped from the project file or as a list of rows in memory.
+    """
+
+    __slots__ = ("counts", "metadata", "rows")
+
+    def __init__(self, counts=None, metadata=None, rows=None):
+        self.counts = counts
+        self.metadata = metadata
+        self.rows = rows
+
+    def is_loaded(self):
+        return self.counts is not None or self.rows is not None
+
+
+class Project(object):
+    def __init__(self, chunk_size=CHUNK_SIZE):
+        self.chunk_size = chunk_size
+
+        self._project_file = None
+        self._chunks = []
+
+        self.names = []
+        self._columns = dict((name, []) for name in SPECTRA_COLUMNS)
+
+        self.rois = []
+        self.elements = []
+        self.fit_results = []
+
+        # Element maps of a spectrum image, identified by the description of its file and the ROIs of the maps.
+        self.element_map_source = None
+        self.element_map_rois = []
+        self.element_maps = None
+
+        self._dirty_chunks = set()
+        self._dirty_tables = set()
+
+        # Incremented by each change, the changes are reported to change_callback(operation, revision, arguments).
+        self.revision = 0
+        self.change_callback = None
+
+    @property
+    def path(self):
+        if self._project_file is None:
+            return None
+        return self._project_file.path
+
+    @property
+    def number_spectra(self):
+        return len(self.names)
+
+    def is_modified(self):
+        return bool(self._dirty_chunks or self._dirty_tables)
+
+    def add_spectrum(self, spectrum, name):
+        """
+        Add a spectrum and return its index.
+        """
+        index = self.number_spectra
+        chunk_index = index // self.chunk_size
+        if chunk_index == len(self._chunks):
+            self._chunks.append(_Chunk(metadata=[], rows=[]))
+        chunk = self._get_chunk_rows(chunk_index)
+
+        chunk.rows.append(spectrum.counts)
+        chunk.metadata.append(spectrum.metadata)
+
+        self.names.append(name)
+        self._columns["number_channels"].append(spectrum.counts.size)
+        self._columns["offset_eV"].append(spectrum.offset_eV)
+        self._columns["gain_eV"].append(spectrum.gain_eV)
+        self._columns["live_time_s"].append(get_live_time_s(spectrum.metadata))
+        self._columns["total_counts"].append(float(np.sum(spectrum.counts, dtype=np.float64)))
+
+        self._dirty_chunks.add(chunk_index)
+        self._dirty_tables.update((SPECTRA_TABLE, NAMES_TABLE))
+
+        self._notify_change("add_spectrum", {"name": name, "counts": spectrum.counts, "offset_eV": spectrum.offset_eV,
+                                             "gain_eV": spectrum.gain_eV, "metadata": spectrum.metadata})
+
+        return index
+
+    def get_spectrum(self, index):
+        """
+        Return the spectrum `index`, its counts are read from the project file only when the chunk is not in memory.
+        """
+        if not 0 <= index < self.number_spectra:
+            raise IndexError("Spectrum index out of range: {}".format(index))
+
+        chunk_index, row = divmod(index, self.chunk_size)
+        chunk = self._get_chunk(chunk_index)
+        if chunk.rows is not None:
+            counts = chunk.rows[row]
+        else:
+            counts = chunk.counts[row, :self._columns["number_channels"][index]]
+
+        return SpectrumData(counts, self._columns["offset_eV"][index], self._columns["gain_eV"][index],
+                            chunk.metadata[row])
+
+    def get_chunk_counts(self, chunk_index):
+        """
+        Return the counts of the spectra of a chunk as one 2D array padded with zeros, memory mapped if the chunk is
+        not modified, and the number of channels of each spectrum.
+        """
+        chunk = self._get_chunk(chunk_index)
+        start_index = chunk_index * self.chunk_size
+        end_index = min(start_index + self.chunk_size, self.number_spectra)
+        number_channels = np.array(self._columns["number_channels"][start_index:end_index], dtype=np.int64)
+        if chunk.rows is not None:
+            return stack_rows(chunk.rows[:end_index - start_index]), number_channels
+        return chunk.counts[:end_index - start_index], number_channels
+
+    def get_column(self, name):
+        if name == "name":
+            return np.array(self.names)
+        return np.array(self._columns[name])
+
+    def get_value(self, name, index):
+        if name == "name":
+            return self.names[index]
+        return self._columns[name][index]
+
+    def set_calibration(self, index, offset_eV, gain_eV):
+        if not 0 <= index < self.number_spectra:
+            raise IndexError("Spectrum index out of range: {}".format(index))
+
+        self._columns["offset_eV"][index] = offset_eV
+        self._columns["gain_eV"][index] = gain_eV
+        self._dirty_tables.add(SPECTRA_TABLE)
+
+        self._notify_change("set_calibration", {"index": index, "offset_eV": offset_eV, "gain_eV": gain_eV})
+
+    def set_rois(self, rois):
+        """
+        :param rois: list of ``(name, energy_min_eV, energy_max_eV, background_width_eV)``, the background width is
+            optional.
+        """
+        self.rois = [create_roi(roi) for roi in rois]
+        self._dirty_tables.add(ROIS_TABLE)
+
+        self._notify_change("set_rois", {"rois": self.rois})
+
+    def set_elements(self, elements):
+        self.elements = list(elements)
+        self._dirty_tables.add(ELEMENTS_TABLE)
+
+        self._notify_change("set_elements", {"elements": self.elements})
+
+    def set_fit_results(self, fit_results):
+        """
+        :param fit_results: list of ``(spectrum_index, line, net_intensity, error)``.
+        """
+        self.fit_results = [tuple(result) for result in fit_results]
+        self._dirty_tables.add(FIT_RESULTS_TABLE)
+
+        self._notify_change("set_fit_results", {"fit_results": self.fit_results})
+
+    def set_element_maps(self, source, rois, maps):
+        """
+        :param source: dictionary describing the file of the spectrum image, see
+            :py:func:`xrayspectrumanalyzergui.analysis.element_maps.get_source`.
+        :param rois: list of ``(name, energy_min_eV, energy_max_eV, background_width_eV)`` of the maps.
+        :param maps: array of shape ``(number_rois, rows, columns)``.
+        """
+        self.element_map_source = dict(source)
+        self.element_map_rois = [create_roi(roi) for roi in rois]
+        self.element_maps = np.asarray(maps, dtype=np.float64)
+        self._dirty_tables.update((ELEMENT_MAPS_TABLE, ELEMENT_MAP_ROIS_TABLE))
+
+        self._notify_change("set_element_maps", {"source": self.element_map_source, "rois": self.element_map_rois,
+                                                 "maps": self.element_maps})
+
+    def get_element_maps(self, source, rois):
+        """
+        Return the cached element maps of the spectrum image described by `source` for the ROIs, None if not cached.
+        """
+        if self.element_maps is None or source is None or source != self.element_map_source:
+            return None
+        if [create_roi(roi) for roi in rois] != self.element_map_rois:
+            return None
+        return self.element_maps
+
+    def apply_change(self, operation, arguments):
+        """
+        Apply a change reported to change_callback, used to replay a journal.
+        """
+        if operation == "add_spectrum":
+            spectrum = SpectrumData(arguments["counts"], arguments["offset_eV"], arguments["gain_eV"],
+                                    arguments["metadata"])
+            self.add_spectrum(spectrum, arguments["name"])
+        elif operation == "set_calibration":
+            self.set_calibration(arguments["index"], arguments["offset_eV"], arguments["gain_eV"])
+        elif operation == "set_rois":
+            self.set_rois(arguments["rois"])
+        elif operation == "set_elements":
+            self.set_elements(arguments["elements"])
+        elif operation == "set_fit_results":
+            self.set_fit_results(arguments["fit_results"])
+        elif operation == "set_element_maps":
+            self.set_element_maps(arguments["source"], arguments["rois"], arguments["maps"])
+        else:
+            raise ValueError("Unknown project change: {}".format(operation))
+
+    def save(self, path=None):
+        """
+        Save the project, to `path` if given.
+
+        Saving to the current path writes only the chunks and tables modified since the last save.
+        """
+        if path is None:
+            if self._project_file is None:
+                raise ValueError("No path to save the project")
+            path = self._project_file.path
+
+        source_project_file = self._project_file
+        is_new_location = source_project_file is None or \
+            os.path.abspath(path) != os.path.abspath(source_project_file.path)
+
+        project_file = ProjectFile(path, None if is_new_location else source_project_file.base)
+        project_file.create()
+
+        for chunk_index, chunk in enumerate(self._chunks):
+            if chunk.rows is not None:
+                self._write_chunk(project_file, chunk_index, chunk)
+            elif is_new_location:
+                project_file.copy_chunk(chunk_index, source_project_file)
+        if is_new_location or SPECTRA_TABLE in self._dirty_tables:
+            project_file.remove_chunks(len(self._chunks))
+
+        tables = {SPECTRA_TABLE: self._create_spectra_table,
+                  NAMES_TABLE: lambda: np.array(self.names, dtype=np.str_),
+                  ROIS_TABLE: lambda: np.array([tuple(roi) for roi in self.rois], dtype=ROI_DTYPE),
+                  ELEMENTS_TABLE: lambda: np.array(self.elements, dtype=np.str_),
+                  FIT_RESULTS_TABLE: lambda: np.array([tuple(result) for result in self.fit_results],
+                                                      dtype=FIT_RESULT_DTYPE),
+                  ELEMENT_MAPS_TABLE: lambda: np.zeros((0, 0, 0)) if self.element_maps is None else self.element_maps,
+                  ELEMENT_MAP_ROIS_TABLE: lambda: np.array([tuple(roi) for roi in self.element_map_rois],
+                                                           dtype=ROI_DTYPE)}
+        for name, create_table in tables.items():
+            if is_new_location or name in self._dirty_tables:
+                project_file.write_table(name, create_table())
+
+        project_file.write_manifest({"chunk_size": self.chunk_size,
+                                     "number_spectra": self.number_spectra,
+                                     "number_chunks": len(self._chunks),
+                                     "revision": self.revision,
+                                     "element_map_source": self.element_map_source})
+
+        # The saved chunks are mapped again when needed, which releases the rows in memory.
+        self._project_file = project_file
+        self._chunks = [_Chunk() for _chunk in self._chunks]
+        self._dirty_chunks.clear()
+        self._dirty_tables.clear()
+
+    def save_layer(self, path):
+        """
+        Save the project to `path` as a layer over its project file, which becomes the base project.
+
+        Only the modified chunks and tables, and the spectra and names tables, are written to the layer, the other
+        chunks and tables are read from the base project. The project is then saved to the layer.
+        """
+        if self._project_file is None:
+            raise ValueError("No project file to save a layer over")
+
+        self._project_file = ProjectFile(path, self._project_file)
+        # The spectra of the layer are fixed even if the base project is saved again with more spectra.
+        self._dirty_tables.update((SPECTRA_TABLE, NAMES_TABLE))
+        self.save()
+
+    @classmethod
+    def open(cls, path):
+        """
+        Open a project, only the manifest and the tables are read.
+        """
+        project_file = ProjectFile(path)
+        manifest = project_file.read_manifest()
+
+        project = cls(chunk_size=manifest["chunk_size"])
+        project._project_file = project_file
+        project._chunks = [_Chunk() for _chunk_index in range(manifest["number_chunks"])]
+        project.revision = manifest.get("revision", 0)
+
+        spectra_table = project_file.read_table(SPECTRA_TABLE)
+        if spectra_table is not None:
+            for name in SPECTRA_COLUMNS:
+                project._columns[name] = spectra_table[name].tolist()
+        names = project_file.read_table(NAMES_TABLE)
+        if names is not None:
+            project.names = names.tolist()
+
+        rois = project_file.read_table(ROIS_TABLE)
+        if rois is not None:
+            project.rois = [create_roi(roi) for roi in rois.tolist()]
+        elements = project_file.read_table(ELEMENTS_TABLE)
+        if elements is not None:
+            project.elements = elements.tolist()
+        fit_results = project_file.read_table(FIT_RESULTS_TABLE)
+        if fit_results is not None:
+            project.fit_results = fit_results.tolist()
+
+        # The element maps are mapped, they are read when shown.
+        element_map_source = manifest.get("element_map_source")
+        element_map_rois = project_file.read_table(ELEMENT_MAP_ROIS_TABLE)
+        if element_map_source is not None and element_map_rois is not None:
+            project.element_map_source = element_map_source
+            project.element_map_rois = [create_roi(roi) for roi in element_map_rois.tolist()]
+            project.element_maps = project_file.read_table(ELEMENT_MAPS_TABLE, mmap_mode="r")
+
+        return project
+
+    def detach(self):
+        """
+        Read all the spectra in memory and forget the project file, the project is then saved as a new project.
+        """
+        for chunk_index in range(len(self._chunks)):
+            self._get_chunk_rows(chunk_index)
+            self._dirty_chunks.add(chunk_index)
+
+        self._project_file = None
+        self._dirty_tables.update((SPECTRA_TABLE, NAMES_TABLE, ROIS_TABLE, ELEMENTS_TABLE, FIT_RESULTS_TABLE,
+                                   ELEMENT_MAPS_TABLE, ELEMENT_MAP_ROIS_TABLE))
+        if self.element_maps is not None:
+            self.element_maps = np.array(self.element_maps)
+
+    def _notify_change(self, operation, arguments):
+        self.revision += 1
+        if self.change_callback is not None:
+            self.change_callback(operation, self.revision, arguments)
+
+    def _get_chunk(self, chunk_index):
+        chunk = self._chunks[chunk_index]
+        if not chunk.is_loaded():
+            chunk.counts, chunk.metadata = self._project_file.map_chunk(chunk_index)
+        return chunk
+
+    def _get_chunk_rows(self, chunk_index):
+        """
+        Return the chunk with its rows in memory, to be modified.
+        """
+        chunk = self._get_chunk(chunk_index)
+        if chunk.rows is None:
+            number_channels = self._columns["number_channels"]
+            start_index = chunk_index * self.chunk_size
+            # The chunk of a base project saved again since may have more spectra than the project.
+            number_rows = min(chunk.counts.shape[0], self.number_spectra - start_index)
+            chunk.rows = [np.array(chunk.counts[row, :number_channels[start_index + row]])
+                          for row in range(number_rows)]
+            chunk.metadata = chunk.metadata[:number_rows]
+            chunk.counts = None
+        return chunk
+
+    def _write_chunk(self, project_file, chunk_index, chunk):
+        project_file.write_chunk(chunk_index, stack_rows(chunk.rows), chunk.metadata)
+
+    def _create_spectra_table(self):
+        table = np.empty(self.number_spectra, dtype=SPECTRA_DTYPE)
+        for name in SPECTRA_COLUMNS:
+            table[name] = self._columns[name]
+        return table
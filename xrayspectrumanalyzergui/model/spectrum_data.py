@@ -0,0 +1,159 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+.. py:currentmodule:: xrayspectrumanalyzergui.model.spectrum_data
+   :synopsis: Compact model of a spectrum.
+
+.. moduleauthor:: Hendrix Demers <hendrix.demers@mail.mcgill.ca>
+
+Compact model of a spectrum.
+
+The counts are stored with the smallest adequate dtype and the energy axis as a linear calibration (offset and gain).
+The energies are created only when requested and the array is shared between the spectra with the same calibration
+and number of channels.
+"""
+
+###############################################################################
+# GUI for the x-ray spectrum analyzer project
+# Copyright (C) 2017  Hendrix Demers
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+###############################################################################
+
+# Standard library modules.
+import sys
+import weakref
+
+# Third party modules.
+import numpy as np
+
+# Local modules.
+
+# Project modules.
+
+# Globals and constants variables.
+LINEAR_CALIBRATION_TOLERANCE = 1.0e-6
+COMPACT_DTYPES = (np.dtype(np.uint16), np.dtype(np.uint32), np.dtype(np.float32))
+
+_energy_axes = weakref.WeakValueDictionary()
+
+
+def compact_counts(counts):
+    """
+    Return the counts with the smallest adequate dtype: uint16, uint32 for integer counts, float32 otherwise.
+
+    Counts already with one of these dtypes are returned as is, without copy.
+    """
+    counts = np.asarray(counts)
+    if counts.dtype in COMPACT_DTYPES:
+        return counts
+    if counts.size == 0:
+        return counts.astype(np.uint16)
+
+    if np.issubdtype(counts.dtype, np.integer) or np.all(np.mod(counts, 1.0) == 0.0):
+        minimum = counts.min()
+        maximum = counts.max()
+        if minimum >= 0:
+            if maximum <= np.iinfo(np.uint16).max:
+                return counts.astype(np.uint16)
+            if maximum <= np.iinfo(np.uint32).max:
+                return counts.astype(np.uint32)
+
+    return counts.astype(np.float32)
+
+
+def get_energy_axis(offset_eV, gain_eV, number_channels):
+    """
+    Return the read-only energy axis of a linear calibration, shared by all the spectra using it.
+    """
+    key = (float(offset_eV), float(gain_eV), int(number_channels))
+    energies_eV = _energy_axes.get(key)
+    if energies_eV is None:
+        energies_eV = offset_eV + gain_eV * np.arange(number_channels, dtype=np.float64)
+        energies_eV.flags.writeable = False
+        _energy_axes[key] = energies_eV
+
+    return energies_eV
+
+
+class SpectrumData(object):
+    """
+    Counts of a spectrum with its energy calibration and metadata.
+
+    :param counts: counts of each channel, converted with :py:func:`compact_counts`.
+    :param offset_eV: energy of the first channel.
+    :param gain_eV: energy width of a channel.
+    :param metadata: dictionary of metadata, e.g. the keywords of the msa header.
+    """
+
+    __slots__ = ("counts", "offset_eV", "gain_eV", "metadata", "_energies_eV")
+
+    def __init__(self, counts, offset_eV=0.0, gain_eV=1.0, metadata=None):
+        self.counts = compact_counts(counts)
+        self.offset_eV = float(offset_eV)
+        self.gain_eV = float(gain_eV)
+        if metadata:
+            self.metadata = dict((sys.intern(str(key)), value) for key, value in metadata.items())
+        else:
+            self.metadata = {}
+        self._energies_eV = None
+
+    @classmethod
+    def from_energies(cls, energies_eV, counts, metadata=None):
+        """
+        Create a spectrum from explicit energies.
+
+        The energies are replaced by a linear calibration when they are linear, otherwise they are kept.
+        """
+        energies_eV = np.asarray(energies_eV, dtype=np.float64)
+        number_channels = energies_eV.size
+
+        offset_eV = energies_eV[0] if number_channels > 0 else 0.0
+        gain_eV = (energies_eV[-1] - offset_eV) / (number_channels - 1) if number_channels > 1 else 1.0
+
+        spectrum = cls(counts, offset_eV, gain_eV, metadata)
+
+        linear_energies_eV = offset_eV + gain_eV * np.arange(number_channels)
+        tolerance_eV = LINEAR_CALIBRATION_TOLERANCE * max(abs(gain_eV), 1.0)
+        if not np.allclose(energies_eV, linear_energies_eV, rtol=0.0, atol=tolerance_eV):
+            spectrum._energies_eV = energies_eV
+
+        return spectrum
+
+    @property
+    def number_channels(self):
+        return self.counts.size
+
+    @property
+    def energies_eV(self):
+        if self._energies_eV is None:
+            self._energies_eV = get_energy_axis(self.offset_eV, self.gain_eV, self.counts.size)
+        return self._energies_eV
+
+    @property
+    def is_linear(self):
+        """
+        True if the energies are given by the linear calibration, False if explicit energies are kept.
+        """
+        if self._energies_eV is None:
+            return True
+        key = (self.offset_eV, self.gain_eV, self.counts.size)
+        return self._energies_eV is _energy_axes.get(key)
+
+    def get_channel(self, energy_eV):
+        """
+        Return the channel of `energy_eV` with the linear calibration.
+        """
+        return int(round((energy_eV - self.offset_eV) / self.gain_eV))
@@ -0,0 +1,172 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+.. py:currentmodule:: xrayspectrumanalyzergui.model.spectrum_image
+   :synopsis: Spectrum image: a spectrum per pixel of a map.
+
+.. moduleauthor:: Hendrix Demers <hendrix.demers@mail.mcgill.ca>
+
+Spectrum image: a spectrum per pixel of a map.
+
+The cube of counts is any array-like of shape (rows, columns, channels) supporting basic slicing, such as a
+:py:class:`numpy.memmap` over a raw file or a HDF5 dataset, so only the slices used are read. The spectrum of a pixel
+or a region is read on demand and the sum spectrum and the total-count image are computed in one pass over chunks of
+rows of at most :py:data:`CHUNK_SIZE_BYTES`, so cubes larger than the memory can be browsed.
+"""
+
+###############################################################################
+# GUI for the x-ray spectrum analyzer project
+# Copyright (C) 2017  Hendrix Demers
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+###############################################################################
+
+# Standard library modules.
+
+# Third party modules.
+import numpy as np
+
+# Local modules.
+
+# Project modules.
+from xrayspectrumanalyzergui.model.spectrum_data import SpectrumData
+
+# Globals and constants variables.
+CHUNK_SIZE_BYTES = 64 * 1024 * 1024
+
+
+class SpectrumImage(object):
+    """
+    Counts of a spectrum image with their energy calibration.
+
+    :param data: array-like of shape (rows, columns, channels).
+    :param offset_eV: energy of the first channel.
+    :param gain_eV: energy width of a channel.
+    :param metadata: dictionary of metadata copied in the spectra.
+    :param file_handle: object with a ``close`` method, e.g. the HDF5 file of the data, closed with the image.
+    """
+
+    def __init__(self, data, offset_eV=0.0, gain_eV=1.0, metadata=None, file_handle=None):
+        if len(data.shape) != 3:
+            raise ValueError("A spectrum image has 3 dimensions, not {:d}".format(len(data.shape)))
+
+        self.data = data
+        self.offset_eV = float(offset_eV)
+        self.gain_eV = float(gain_eV)
+        self.metadata = dict(metadata) if metadata else {}
+        self._file_handle = file_handle
+
+        self._sum_counts = None
+        self._total_image = None
+
+    @property
+    def shape(self):
+        return tuple(self.data.shape)
+
+    @property
+    def number_rows(self):
+        return self.data.shape[0]
+
+    @property
+    def number_columns(self):
+        return self.data.shape[1]
+
+    @property
+    def number_channels(self):
+        return self.data.shape[2]
+
+    @property
+    def sum_dtype(self):
+        """
+        Type of the sums of counts: int64 for integer counts, float64 otherwise.
+        """
+        return np.int64 if np.issubdtype(self.data.dtype, np.integer) else np.float64
+
+    @property
+    def rows_per_chunk(self):
+        row_size_bytes = self.number_columns * self.number_channels * np.dtype(self.data.dtype).itemsize
+        return max(1, CHUNK_SIZE_BYTES // max(1, row_size_bytes))
+
+    def iterate_chunks(self, row_start=0, row_end=None, column_start=0, column_end=None):
+        """
+        Yield the first row and the counts of chunks of rows of a region, read from the data.
+        """
+        row_end = self.number_rows if row_end is None else row_end
+        column_end = self.number_columns if column_end is None else column_end
+        rows_per_chunk = self.rows_per_chunk
+        for row in range(row_start, row_end, rows_per_chunk):
+            yield row, np.asarray(self.data[row:min(row + rows_per_chunk, row_end), column_start:column_end])
+
+    def _create_spectrum(self, counts, title):
+        metadata = dict(self.metadata)
+        metadata["TITLE"] = title
+        return SpectrumData(counts, self.offset_eV, self.gain_eV, metadata)
+
+    def get_spectrum(self, row, column):
+        """
+        Return the spectrum of a pixel, only its counts are read.
+        """
+        if not (0 <= row < self.number_rows and 0 <= column < self.number_columns):
+            raise IndexError("Pixel ({:d}, {:d}) outside the map {}".format(row, column, self.shape[:2]))
+
+        counts = np.asarray(self.data[row, column])
+        return self._create_spectrum(counts, "Pixel ({:d}, {:d})".format(row, column))
+
+    def get_region_spectrum(self, row_start, row_end, column_start, column_end):
+        """
+        Return the sum spectrum of the pixels of a rectangle, the ends are excluded.
+        """
+        row_start, row_end = max(0, row_start), min(self.number_rows, row_end)
+        column_start, column_end = max(0, column_start), min(self.number_columns, column_end)
+
+        counts = np.zeros(self.number_channels, dtype=self.sum_dtype)
+        if row_end > row_start and column_end > column_start:
+            for _row, chunk in self.iterate_chunks(row_start, row_end, column_start, column_end):
+                counts += chunk.sum(axis=(0, 1), dtype=self.sum_dtype)
+
+        title = "Region ({:d}:{:d}, {:d}:{:d})".format(row_start, row_end, column_start, column_end)
+        return self._create_spectrum(counts, title)
+
+    def compute_summaries(self):
+        """
+        Compute the sum spectrum and the total-count image in one pass over the data, if not already done.
+        """
+        if self._sum_counts is not None:
+            return
+
+        sum_counts = np.zeros(self.number_channels, dtype=self.sum_dtype)
+        total_image = np.zeros(self.shape[:2], dtype=self.sum_dtype)
+        for row, chunk in self.iterate_chunks():
+            sum_counts += chunk.sum(axis=(0, 1), dtype=self.sum_dtype)
+            total_image[row:row + chunk.shape[0]] = chunk.sum(axis=2, dtype=self.sum_dtype)
+
+        self._sum_counts = sum_counts
+        self._total_image = total_image
+
+    def get_sum_spectrum(self):
+        self.compute_summaries()
+        return self._create_spectrum(self._sum_counts, "Sum spectrum")
+
+    def get_total_image(self):
+        """
+        Return the total number of counts of each pixel.
+        """
+        self.compute_summaries()
+        return self._total_image
+
+    def close(self):
+        if self._file_handle is not None:
+            self._file_handle.close()
+            self._file_handle = None